@@ -7,7 +7,9 @@ removing duplicate files using hash-based detection.
 """
 
 import argparse
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
@@ -38,6 +40,10 @@ class DedupeConfig:
         max_size: Optional[int] = None,
         include_patterns: Optional[List[str]] = None,
         exclude_patterns: Optional[List[str]] = None,
+        link_method: Optional[str] = None,
+        report_path: Optional[str] = None,
+        report_format: Optional[str] = None,
+        report_only: bool = False,
     ):
         """Initialize deduplication configuration.
 
@@ -53,6 +59,12 @@ class DedupeConfig:
             max_size: Maximum file size to consider (bytes, None for unlimited)
             include_patterns: File patterns to include (e.g., ['*.jpg', '*.png'])
             exclude_patterns: File patterns to exclude
+            link_method: If 'hardlink' or 'reflink', replace duplicates with
+                links to the kept file instead of deleting them
+            report_path: Write a machine-readable report here ('-' for stdout)
+            report_format: Report format ('ndjson', 'csv', 'parquet');
+                inferred from report_path if None
+            report_only: If True, only write the report; never remove files
         """
         self.directory = directory
         self.algorithm = algorithm
@@ -65,6 +77,10 @@ class DedupeConfig:
         self.max_size = max_size
         self.include_patterns = include_patterns or []
         self.exclude_patterns = exclude_patterns or []
+        self.link_method = link_method
+        self.report_path = report_path
+        self.report_format = report_format
+        self.report_only = report_only
 
 
 def format_size(size_bytes: int) -> str:
@@ -133,6 +149,11 @@ def display_duplicate_group(
 
         # Mark the file that will be kept (for strategies)
         status = "✓" if file_info.get('keep', False) else ""
+        if file_info.get('file_id') is not None and any(
+            other is not file_info and other.get('file_id') == file_info['file_id']
+            for other in files
+        ):
+            status = f"{status} link".strip()
 
         table.add_row(
             str(idx),
@@ -144,12 +165,42 @@ def display_duplicate_group(
 
     console.print(table)
 
-    # Calculate space that can be saved
-    total_size = sum(f['size'] for f in files)
-    saved_space = total_size - files[0]['size']  # Keep one file
+    # Calculate space that can be saved (hardlinks share one copy)
+    saved_space = reclaimable_space(files, range(1, len(files)))  # Keep one file
     console.print(f"\n[dim]Potential space savings: {format_size(saved_space)}[/dim]")
 
 
+def reclaimable_space(files: List[Dict], remove_indices) -> int:
+    """Calculate the bytes freed by removing some files of a group.
+
+    A removed path frees nothing if a kept path is a hardlink to the same
+    file, and several removed links to one file free its space once.
+
+    Args:
+        files: List of duplicate file metadata (with optional 'file_id')
+        remove_indices: Indices of files to remove
+
+    Returns:
+        Reclaimable space in bytes
+    """
+    remove = set(remove_indices)
+    kept_ids = {
+        f.get('file_id') for i, f in enumerate(files) if i not in remove
+    }
+    freed_ids = set()
+    freed = 0
+
+    for idx in sorted(remove):
+        file_id = files[idx].get('file_id')
+        if file_id is not None:
+            if file_id in kept_ids or file_id in freed_ids:
+                continue
+            freed_ids.add(file_id)
+        freed += files[idx]['size']
+
+    return freed
+
+
 def select_files_to_keep(
     files: List[Dict],
     strategy: str
@@ -257,7 +308,8 @@ def display_summary(
     total_duplicates: int,
     total_removed: int,
     space_saved: int,
-    dry_run: bool
+    dry_run: bool,
+    action: str = "removed"
 ) -> None:
     """Display summary of deduplication operation.
 
@@ -267,6 +319,7 @@ def display_summary(
         total_removed: Number of files removed
         space_saved: Total space saved in bytes
         dry_run: Whether this was a dry run
+        action: What happened to the files ('removed' or 'linked')
     """
     console.print()
     console.print("=" * 70)
@@ -277,7 +330,7 @@ def display_summary(
             "[bold yellow]DRY RUN SUMMARY[/bold yellow]\n\n"
             f"Duplicate groups found: [cyan]{total_groups}[/cyan]\n"
             f"Total duplicate files: [cyan]{total_duplicates}[/cyan]\n"
-            f"Files that would be removed: [cyan]{total_removed}[/cyan]\n"
+            f"Files that would be {action}: [cyan]{total_removed}[/cyan]\n"
             f"Space that would be saved: [green]{format_size(space_saved)}[/green]\n\n"
             "[dim]Run without --dry-run to actually remove files.[/dim]",
             title="Summary",
@@ -288,13 +341,33 @@ def display_summary(
             "[bold green]DEDUPLICATION COMPLETE[/bold green]\n\n"
             f"Duplicate groups found: [cyan]{total_groups}[/cyan]\n"
             f"Total duplicate files: [cyan]{total_duplicates}[/cyan]\n"
-            f"Files removed: [cyan]{total_removed}[/cyan]\n"
+            f"Files {action}: [cyan]{total_removed}[/cyan]\n"
             f"Space saved: [green]{format_size(space_saved)}[/green]",
             title="Summary",
             expand=False
         ))
 
 
+def display_report_summary(summary, report_path: str) -> None:
+    """Display the summary of a written duplicate report.
+
+    Args:
+        summary: ReportSummary from the report writer
+        report_path: Where the report was written
+    """
+    console.print()
+    console.print(Panel(
+        "[bold green]REPORT WRITTEN[/bold green]\n\n"
+        f"Duplicate groups: [cyan]{summary.groups}[/cyan]\n"
+        f"Duplicate files: [cyan]{summary.files}[/cyan]\n"
+        f"Largest group: [cyan]{summary.largest_group}[/cyan] files\n"
+        f"Reclaimable space: [green]{format_size(summary.wasted_space)}[/green]\n"
+        f"Report: [dim]{'standard output' if report_path == '-' else report_path}[/dim]",
+        title="Summary",
+        expand=False
+    ))
+
+
 def dedupe_command(args: Optional[List[str]] = None) -> int:
     """Execute the dedupe command.
 
@@ -323,6 +396,9 @@ Examples:
 
   # Find large duplicate files only (>10MB)
   python -m file_organizer.cli.dedupe ~/Videos --min-size 10485760
+
+  # Write an NDJSON report sorted by wasted space, without removing anything
+  python -m file_organizer.cli.dedupe /data --report-only --report - > dupes.ndjson
         """
     )
 
@@ -397,7 +473,37 @@ Examples:
         "--exclude",
         type=str,
         action="append",
-        help="File patterns to exclude (e.g., '*.tmp'). Can be specified multiple times."
+        help="File or directory patterns to exclude (e.g., '*.tmp', 'node_modules'). Can be specified multiple times."
+    )
+
+    parser.add_argument(
+        "--link",
+        type=str,
+        choices=["hardlink", "reflink"],
+        default=None,
+        help="Replace duplicates with hardlinks or reflinks to the kept file instead of deleting them"
+    )
+
+    parser.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Write duplicate groups sorted by wasted space to PATH ('-' for stdout)"
+    )
+
+    parser.add_argument(
+        "--report-format",
+        type=str,
+        choices=["ndjson", "csv", "parquet"],
+        default=None,
+        help="Report format (default: from the file extension, else ndjson)"
+    )
+
+    parser.add_argument(
+        "--report-only",
+        action="store_true",
+        help="Only write the report and a summary; never prompt or remove files"
     )
 
     parser.add_argument(
@@ -408,6 +514,13 @@ Examples:
 
     parsed_args = parser.parse_args(args)
 
+    if parsed_args.report_only and parsed_args.report is None:
+        parsed_args.report = "-"
+
+    # Keep standard output clean for a piped report
+    if parsed_args.report == "-":
+        console.file = sys.stderr
+
     # Configure logging
     if parsed_args.verbose:
         logger.remove()
@@ -439,6 +552,10 @@ Examples:
         max_size=parsed_args.max_size,
         include_patterns=parsed_args.include or [],
         exclude_patterns=parsed_args.exclude or [],
+        link_method=parsed_args.link,
+        report_path=parsed_args.report,
+        report_format=parsed_args.report_format,
+        report_only=parsed_args.report_only,
     )
 
     # Display banner
@@ -456,7 +573,8 @@ Examples:
         f"[bold]Strategy:[/bold] {config.strategy}\n"
         f"[bold]Recursive:[/bold] {'Yes' if config.recursive else 'No'}\n"
         f"[bold]Safe Mode:[/bold] {'Enabled' if config.safe_mode else 'Disabled'}\n"
-        f"[bold]Mode:[/bold] {'DRY RUN' if config.dry_run else 'LIVE'}"
+        f"[bold]Duplicates:[/bold] {'Replace with ' + config.link_method + 's' if config.link_method else 'Delete'}\n"
+        f"[bold]Mode:[/bold] {'REPORT ONLY' if config.report_only else 'DRY RUN' if config.dry_run else 'LIVE'}"
     )
 
     if config.batch and config.strategy != "manual":
@@ -464,19 +582,38 @@ Examples:
 
     console.print(Panel(config_text, title="Configuration", expand=False))
 
-    if config.dry_run:
+    if config.report_only:
+        console.print("[yellow]⚠ REPORT ONLY: No files will be deleted[/yellow]\n")
+    elif config.dry_run:
         console.print("[yellow]⚠ DRY RUN MODE: No files will be deleted[/yellow]\n")
     elif not config.safe_mode:
         console.print("[red]⚠ WARNING: Safe mode disabled - no backups will be created![/red]\n")
 
+    index_dir = None
+    disk_index = None
+    report_writer = None
+
     try:
         # Import deduplication services
         from file_organizer.services.deduplication.detector import DuplicateDetector, ScanOptions
         from file_organizer.services.deduplication.backup import BackupManager
+        from file_organizer.services.deduplication.index import DuplicateIndex
+        from file_organizer.services.deduplication.linking import replace_with_link
+        from file_organizer.services.deduplication.reporter import DuplicateReportWriter
+
+        # Initialize services; report-only runs keep the index on disk so
+        # memory does not grow with the number of files
+        if config.report_only:
+            index_dir = tempfile.mkdtemp(prefix="dedupe_index_")
+            disk_index = DuplicateIndex(db_path=Path(index_dir) / "index.db")
+        detector = DuplicateDetector(index=disk_index)
+        backup_manager = (
+            BackupManager(config.directory)
+            if config.safe_mode and not config.report_only else None
+        )
 
-        # Initialize services
-        detector = DuplicateDetector()
-        backup_manager = BackupManager(config.directory) if config.safe_mode else None
+        if config.report_path:
+            report_writer = DuplicateReportWriter(config.report_path, config.report_format)
 
         console.print("[bold]Step 1: Scanning for files...[/bold]")
 
@@ -506,6 +643,7 @@ Examples:
             file_patterns=config.include_patterns if config.include_patterns else None,
             exclude_patterns=config.exclude_patterns if config.exclude_patterns else None,
             progress_callback=progress_callback if has_tqdm else None,
+            group_callback=report_writer.write_group if report_writer else None,
         )
 
         # Scan directory (return value not needed, detector updates internal index)
@@ -514,6 +652,13 @@ Examples:
         if progress_bar:
             progress_bar.close()
 
+        if report_writer:
+            summary = report_writer.close()
+            if config.report_only:
+                display_report_summary(summary, config.report_path)
+                return 0
+            console.print(f"[dim]Report written to {config.report_path}[/dim]")
+
         # Get duplicate groups
         duplicate_groups = detector.get_duplicate_groups()
 
@@ -537,6 +682,7 @@ Examples:
                     'path': file_meta.path,
                     'size': file_meta.size,
                     'mtime': file_meta.modified_time.timestamp(),
+                    'file_id': file_meta.file_id,
                 }
                 for file_meta in group.files
             ]
@@ -551,9 +697,24 @@ Examples:
             remove_indices = get_user_selection(files, config.strategy, config.batch)
 
             if remove_indices:
+                verb = "link" if config.link_method else "remove"
+                kept = next(
+                    (f for i, f in enumerate(files) if i not in remove_indices), None
+                )
+                processed_indices = []
+
                 # Process each file to remove
                 for idx in remove_indices:
                     file_to_remove = files[idx]['path']
+                    file_id = files[idx].get('file_id')
+
+                    if config.link_method:
+                        if kept is None:
+                            console.print("[yellow]All files selected; nothing to link to[/yellow]")
+                            break
+                        if file_id is not None and file_id == kept.get('file_id'):
+                            logger.debug(f"Already linked: {file_to_remove}")
+                            continue
 
                     try:
                         # Create backup if safe mode is enabled
@@ -561,23 +722,30 @@ Examples:
                             backup_path = backup_manager.create_backup(file_to_remove)
                             logger.debug(f"Created backup: {backup_path}")
 
-                        # Delete the file (unless dry run)
+                        # Delete or link the file (unless dry run)
                         if not config.dry_run:
-                            file_to_remove.unlink()
-                            logger.info(f"Removed: {file_to_remove}")
+                            if config.link_method:
+                                replace_with_link(file_to_remove, kept['path'], config.link_method)
+                                logger.info(f"Linked: {file_to_remove} -> {kept['path']}")
+                            else:
+                                file_to_remove.unlink()
+                                logger.info(f"Removed: {file_to_remove}")
 
-                        # Update counters
-                        space_saved += files[idx]['size']
-                        total_removed += 1
+                        processed_indices.append(idx)
 
                     except Exception as e:
-                        console.print(f"[red]Error removing {file_to_remove}: {e}[/red]")
-                        logger.exception(f"Failed to remove {file_to_remove}")
+                        console.print(f"[red]Error processing {file_to_remove}: {e}[/red]")
+                        logger.exception(f"Failed to {verb} {file_to_remove}")
+
+                # Update counters (hardlinks to a kept file free nothing)
+                space_saved += reclaimable_space(files, processed_indices)
+                total_removed += len(processed_indices)
 
                 if not config.dry_run:
-                    console.print(f"\n[green]✓ Removed {len(remove_indices)} file(s)[/green]")
+                    done = "Linked" if config.link_method else "Removed"
+                    console.print(f"\n[green]✓ {done} {len(processed_indices)} file(s)[/green]")
                 else:
-                    console.print(f"\n[yellow]✓ Would remove {len(remove_indices)} file(s)[/yellow]")
+                    console.print(f"\n[yellow]✓ Would {verb} {len(processed_indices)} file(s)[/yellow]")
             else:
                 console.print("\n[dim]Skipped this group[/dim]")
 
@@ -587,7 +755,8 @@ Examples:
             total_duplicates=total_duplicates,
             total_removed=total_removed,
             space_saved=space_saved,
-            dry_run=config.dry_run
+            dry_run=config.dry_run,
+            action="replaced with links" if config.link_method else "removed"
         )
 
         if config.safe_mode and not config.dry_run and total_removed > 0:
@@ -603,6 +772,13 @@ Examples:
         console.print(f"\n[red]Error: {e}[/red]")
         logger.exception("Deduplication failed")
         return 1
+    finally:
+        if report_writer:
+            report_writer.close()
+        if disk_index is not None:
+            disk_index.close()
+        if index_dir:
+            shutil.rmtree(index_dir, ignore_errors=True)
 
 
 def main():
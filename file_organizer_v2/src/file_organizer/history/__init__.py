@@ -13,9 +13,9 @@ from .models import (
     OperationStatus,
     TransactionStatus
 )
-from .tracker import OperationHistory
+from .tracker import OperationBatch, OperationHistory
 from .transaction import OperationTransaction
-from .cleanup import HistoryCleanup, HistoryCleanupConfig
+from .cleanup import CleanupProgress, HistoryCleanup, HistoryCleanupConfig
 from .export import HistoryExporter
 
 __all__ = [
@@ -26,9 +26,11 @@ __all__ = [
     'OperationStatus',
     'TransactionStatus',
     'OperationHistory',
+    'OperationBatch',
     'OperationTransaction',
     'HistoryCleanup',
     'HistoryCleanupConfig',
+    'CleanupProgress',
     'HistoryExporter',
 ]
 
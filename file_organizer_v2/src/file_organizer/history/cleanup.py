@@ -3,15 +3,19 @@ History cleanup and maintenance utilities.
 
 This module provides functionality for managing operation history size,
 including automatic cleanup, manual purging, and database maintenance.
+Cleanup deletes in small batches and can run on a background thread.
 """
 
 import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from pathlib import Path
+from typing import Callable, Optional, Dict, Any, Tuple
 
 from .database import DatabaseManager
-from .models import OperationStatus, TransactionStatus
+from .models import OperationStatus, TransactionStatus, format_timestamp, to_epoch_us
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +30,12 @@ class HistoryCleanupConfig:
         max_size_mb: Maximum database size in MB (default: 100)
         auto_cleanup_enabled: Whether to run cleanup automatically (default: True)
         cleanup_batch_size: Number of operations to delete per batch (default: 1000)
+        batch_pause: Seconds to sleep between batches so other writers get
+            the database (default: 0.005)
+        checkpoint_interval: Batches between incremental vacuum and WAL
+            checkpoint steps (default: 10)
+        min_operations: Size cleanup never deletes below this many
+            operations (default: 100)
     """
 
     def __init__(
@@ -34,13 +44,41 @@ class HistoryCleanupConfig:
         max_age_days: int = 90,
         max_size_mb: int = 100,
         auto_cleanup_enabled: bool = True,
-        cleanup_batch_size: int = 1000
+        cleanup_batch_size: int = 1000,
+        batch_pause: float = 0.005,
+        checkpoint_interval: int = 10,
+        min_operations: int = 100
     ):
         self.max_operations = max_operations
         self.max_age_days = max_age_days
         self.max_size_mb = max_size_mb
         self.auto_cleanup_enabled = auto_cleanup_enabled
         self.cleanup_batch_size = cleanup_batch_size
+        self.batch_pause = batch_pause
+        self.checkpoint_interval = max(1, checkpoint_interval)
+        self.min_operations = max(0, min_operations)
+
+
+@dataclass
+class CleanupProgress:
+    """
+    Progress of a running cleanup step.
+
+    Attributes:
+        phase: Which cleanup is running (age, count, size, failed, rolled_back)
+        deleted: Operations deleted so far in this phase
+        total: Operations expected to be deleted, if known
+        elapsed: Seconds since the phase started
+    """
+    phase: str
+    deleted: int = 0
+    total: Optional[int] = None
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Operations deleted per second."""
+        return self.deleted / self.elapsed if self.elapsed > 0 else 0.0
 
 
 class HistoryCleanup:
@@ -49,18 +87,37 @@ class HistoryCleanup:
 
     This class provides methods to automatically clean up old operations,
     manage database size, and perform maintenance tasks.
+
+    Deletes run in batches of ``cleanup_batch_size`` operations, each in its
+    own short transaction, so logging from a running organize job is only
+    ever delayed by one batch. Free pages are returned with incremental
+    vacuum and the WAL is checkpointed as the cleanup goes, instead of one
+    full VACUUM at the end. ``start_background()`` runs ``auto_cleanup`` on
+    a separate thread.
     """
 
-    def __init__(self, db: DatabaseManager, config: Optional[HistoryCleanupConfig] = None):
+    # Estimate-and-delete rounds before cleanup_by_size gives up
+    MAX_SIZE_ROUNDS = 5
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        config: Optional[HistoryCleanupConfig] = None,
+        progress_callback: Optional[Callable[[CleanupProgress], None]] = None
+    ):
         """
         Initialize history cleanup manager.
 
         Args:
             db: Database manager instance
             config: Cleanup configuration. Uses defaults if not provided.
+            progress_callback: Called with a CleanupProgress after each batch
         """
         self.db = db
         self.config = config or HistoryCleanupConfig()
+        self.progress_callback = progress_callback
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
         logger.info("History cleanup manager initialized")
 
     def should_cleanup(self) -> bool:
@@ -101,15 +158,11 @@ class HistoryCleanup:
             max_age_days = self.config.max_age_days
 
         cutoff_date = datetime.utcnow() - timedelta(days=max_age_days)
-        cutoff_str = cutoff_date.isoformat() + 'Z'
+        cutoff = to_epoch_us(cutoff_date)
 
-        logger.info(f"Cleaning up operations older than {max_age_days} days (before {cutoff_str})")
+        logger.info(f"Cleaning up operations older than {max_age_days} days (before {cutoff_date.isoformat()}Z)")
 
-        # Delete old operations
-        query = "DELETE FROM operations WHERE timestamp < ?"
-        with self.db.transaction() as conn:
-            cursor = conn.execute(query, (cutoff_str,))
-            deleted_count = cursor.rowcount
+        deleted_count = self._delete_matching("age", "timestamp < ?", (cutoff,))
 
         # Clean up orphaned transactions
         self._cleanup_orphaned_transactions()
@@ -121,6 +174,9 @@ class HistoryCleanup:
         """
         Keep only the most recent N operations, delete older ones.
 
+        Operations are ordered by ID, which follows the order they were
+        logged, so the cutoff is found on the primary key without sorting.
+
         Args:
             max_operations: Maximum number of operations to keep. Uses config default if not specified.
 
@@ -138,25 +194,19 @@ class HistoryCleanup:
         operations_to_delete = current_count - max_operations
         logger.info(f"Cleaning up {operations_to_delete} operations to maintain limit of {max_operations}")
 
-        # Get the timestamp of the Nth most recent operation
-        query = """
-        SELECT timestamp FROM operations
-        ORDER BY timestamp DESC
-        LIMIT 1 OFFSET ?
-        """
-        result = self.db.fetch_one(query, (max_operations,))
+        # The newest operation to delete: the first one past the kept ones
+        result = self.db.fetch_one(
+            "SELECT id FROM operations ORDER BY id DESC LIMIT 1 OFFSET ?",
+            (max_operations,)
+        )
 
         if result is None:
-            logger.warning("Could not determine cutoff timestamp")
+            logger.warning("Could not determine cutoff operation")
             return 0
 
-        cutoff_timestamp = result['timestamp']
-
-        # Delete operations older than the cutoff
-        delete_query = "DELETE FROM operations WHERE timestamp < ?"
-        with self.db.transaction() as conn:
-            cursor = conn.execute(delete_query, (cutoff_timestamp,))
-            deleted_count = cursor.rowcount
+        deleted_count = self._delete_oldest(
+            "count", max_id=result['id'], total=operations_to_delete
+        )
 
         # Clean up orphaned transactions
         self._cleanup_orphaned_transactions()
@@ -164,10 +214,17 @@ class HistoryCleanup:
         logger.info(f"Deleted {deleted_count} operations")
         return deleted_count
 
-    def cleanup_by_size(self, max_size_mb: Optional[int] = None) -> int:
+    def cleanup_by_size(self, max_size_mb: Optional[float] = None) -> int:
         """
         Delete old operations until database is under size limit.
 
+        The number of operations to keep is estimated from the average
+        space per operation (rows, indexes and path index), the oldest
+        operations beyond it are deleted, and the path index is compacted
+        so its space is actually released. This repeats while the used
+        size is still over the limit, but never deletes below
+        ``min_operations``.
+
         Args:
             max_size_mb: Maximum database size in MB. Uses config default if not specified.
 
@@ -177,6 +234,7 @@ class HistoryCleanup:
         if max_size_mb is None:
             max_size_mb = self.config.max_size_mb
 
+        max_bytes = int(max_size_mb * 1024 * 1024)
         current_size_mb = self.db.get_database_size() / (1024 * 1024)
 
         if current_size_mb <= max_size_mb:
@@ -186,41 +244,33 @@ class HistoryCleanup:
         logger.info(f"Database size {current_size_mb:.2f}MB exceeds limit of {max_size_mb}MB, cleaning up...")
 
         total_deleted = 0
-        batch_size = self.config.cleanup_batch_size
-
-        # Delete operations in batches until size is acceptable
-        while current_size_mb > max_size_mb:
-            # Get oldest operations
-            query = """
-            SELECT id FROM operations
-            ORDER BY timestamp ASC
-            LIMIT ?
-            """
-            rows = self.db.fetch_all(query, (batch_size,))
-
-            if not rows:
+        for _ in range(self.MAX_SIZE_ROUNDS):
+            if self._stop_event.is_set():
                 break
 
-            # Delete the batch
-            ids = [row['id'] for row in rows]
-            placeholders = ','.join('?' * len(ids))
-            delete_query = f"DELETE FROM operations WHERE id IN ({placeholders})"
-
-            with self.db.transaction() as conn:
-                cursor = conn.execute(delete_query, ids)
-                deleted = cursor.rowcount
-                total_deleted += deleted
+            used = self.db.get_used_size()
+            count = self.db.get_operation_count()
+            if used <= max_bytes or count <= self.config.min_operations:
+                break
 
-            # Vacuum to reclaim space
-            self.db.vacuum()
+            # Fixed overhead makes this an overestimate, so rounds converge from above
+            keep = max(self.config.min_operations, count * max_bytes // used)
+            cutoff = self.db.fetch_one(
+                "SELECT id FROM operations ORDER BY id DESC LIMIT 1 OFFSET ?", (keep,)
+            )
+            if cutoff is None:
+                break
 
-            # Check new size
-            current_size_mb = self.db.get_database_size() / (1024 * 1024)
-            logger.info(f"Deleted {deleted} operations, current size: {current_size_mb:.2f}MB")
+            deleted = self._delete_oldest("size", max_id=cutoff['id'], total=count - keep)
+            total_deleted += deleted
+            if deleted == 0:
+                break
 
         # Clean up orphaned transactions
         self._cleanup_orphaned_transactions()
+        self._reclaim_space()
 
+        current_size_mb = self.db.get_used_size() / (1024 * 1024)
         logger.info(f"Cleanup complete: deleted {total_deleted} operations, final size: {current_size_mb:.2f}MB")
         return total_deleted
 
@@ -235,14 +285,13 @@ class HistoryCleanup:
             Number of operations deleted
         """
         cutoff_date = datetime.utcnow() - timedelta(days=older_than_days)
-        cutoff_str = cutoff_date.isoformat() + 'Z'
+        cutoff = to_epoch_us(cutoff_date)
 
         logger.info(f"Cleaning up failed operations older than {older_than_days} days")
 
-        query = "DELETE FROM operations WHERE status = ? AND timestamp < ?"
-        with self.db.transaction() as conn:
-            cursor = conn.execute(query, (OperationStatus.FAILED.value, cutoff_str))
-            deleted_count = cursor.rowcount
+        deleted_count = self._delete_matching(
+            "failed", "status = ? AND timestamp < ?", (OperationStatus.FAILED.value, cutoff)
+        )
 
         logger.info(f"Deleted {deleted_count} failed operations")
         return deleted_count
@@ -258,14 +307,13 @@ class HistoryCleanup:
             Number of operations deleted
         """
         cutoff_date = datetime.utcnow() - timedelta(days=older_than_days)
-        cutoff_str = cutoff_date.isoformat() + 'Z'
+        cutoff = to_epoch_us(cutoff_date)
 
         logger.info(f"Cleaning up rolled back operations older than {older_than_days} days")
 
-        query = "DELETE FROM operations WHERE status = ? AND timestamp < ?"
-        with self.db.transaction() as conn:
-            cursor = conn.execute(query, (OperationStatus.ROLLED_BACK.value, cutoff_str))
-            deleted_count = cursor.rowcount
+        deleted_count = self._delete_matching(
+            "rolled_back", "status = ? AND timestamp < ?", (OperationStatus.ROLLED_BACK.value, cutoff)
+        )
 
         logger.info(f"Deleted {deleted_count} rolled back operations")
         return deleted_count
@@ -274,17 +322,25 @@ class HistoryCleanup:
         """
         Delete transactions that have no associated operations.
 
+        Transactions still in progress are kept unless they were started
+        more than ``max_age_days`` ago: their operations may not have been
+        logged yet, or may still be buffered in an ``OperationBatch``.
+
         Returns:
             Number of transactions deleted
         """
+        abandoned_before = to_epoch_us(datetime.utcnow() - timedelta(days=self.config.max_age_days))
+
+        # NOT EXISTS probes the (transaction_id, id) index per transaction
         query = """
         DELETE FROM transactions
-        WHERE transaction_id NOT IN (
-            SELECT DISTINCT transaction_id FROM operations WHERE transaction_id IS NOT NULL
+        WHERE (status != ? OR started_at < ?)
+        AND NOT EXISTS (
+            SELECT 1 FROM operations WHERE operations.transaction_id = transactions.transaction_id
         )
         """
         with self.db.transaction() as conn:
-            cursor = conn.execute(query)
+            cursor = conn.execute(query, (TransactionStatus.IN_PROGRESS.value, abandoned_before))
             deleted_count = cursor.rowcount
 
         if deleted_count > 0:
@@ -332,12 +388,198 @@ class HistoryCleanup:
         deleted = self._cleanup_orphaned_transactions()
         stats['deleted_transactions'] = deleted
 
-        # Vacuum to reclaim space
-        self.db.vacuum()
+        # Return remaining free pages and fold the WAL into the database
+        self._reclaim_space()
+        self.db.checkpoint("TRUNCATE")
 
         logger.info(f"Auto cleanup complete: {stats}")
         return stats
 
+    def start_background(self) -> threading.Thread:
+        """
+        Run ``auto_cleanup`` on a background thread.
+
+        Returns:
+            The cleanup thread (the running one if already started)
+        """
+        if self.is_running:
+            return self._thread
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run_background, name="history-cleanup", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Ask a running cleanup to stop after its current batch.
+
+        Args:
+            timeout: Seconds to wait for the background thread (None waits)
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if not self.is_running:
+            self._stop_event.clear()
+
+    @property
+    def is_running(self) -> bool:
+        """Whether a background cleanup is in progress."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run_background(self) -> None:
+        """Background thread body."""
+        try:
+            self.auto_cleanup()
+        except Exception as e:
+            logger.error(f"Background history cleanup failed: {e}")
+
+    def _delete_matching(self, phase: str, where: str, params: Tuple[Any, ...]) -> int:
+        """
+        Delete operations matching a condition, one indexed batch at a time.
+
+        Args:
+            phase: Name reported in progress updates
+            where: SQL condition on operations
+            params: Parameters for the condition
+
+        Returns:
+            Number of operations deleted
+        """
+        query = f"""
+        DELETE FROM operations WHERE id IN (
+            SELECT id FROM operations WHERE {where} LIMIT ?
+        )
+        """
+
+        def delete_batch(conn: sqlite3.Connection) -> int:
+            return conn.execute(query, (*params, self.config.cleanup_batch_size)).rowcount
+
+        return self._run_batches(phase, delete_batch)
+
+    def _delete_oldest(
+        self,
+        phase: str,
+        max_id: Optional[int] = None,
+        total: Optional[int] = None
+    ) -> int:
+        """
+        Delete the oldest operations by rowid range.
+
+        Each batch deletes the ``cleanup_batch_size`` lowest IDs, located on
+        the primary key, so a batch costs the same however large the table.
+
+        Args:
+            phase: Name reported in progress updates
+            max_id: Never delete operations with a higher ID
+            total: Expected number of deletions, for progress reporting
+
+        Returns:
+            Number of operations deleted
+        """
+        upper_bound = max_id if max_id is not None else self._max_operation_id()
+        batch_size = self.config.cleanup_batch_size
+
+        def delete_batch(conn: sqlite3.Connection) -> int:
+            row = conn.execute("SELECT MIN(id) FROM operations").fetchone()
+            if row[0] is None or row[0] > upper_bound:
+                return 0
+            low = row[0]
+            high = min(low + batch_size - 1, upper_bound)
+            return conn.execute(
+                "DELETE FROM operations WHERE id BETWEEN ? AND ?", (low, high)
+            ).rowcount
+
+        return self._run_batches(phase, delete_batch, total)
+
+    def _max_operation_id(self) -> int:
+        """Highest operation ID at the start of a cleanup."""
+        row = self.db.fetch_one("SELECT MAX(id) AS max_id FROM operations")
+        return row['max_id'] if row and row['max_id'] is not None else 0
+
+    def _run_batches(
+        self,
+        phase: str,
+        delete_batch: Callable[[sqlite3.Connection], int],
+        total: Optional[int] = None
+    ) -> int:
+        """
+        Run delete batches until one deletes nothing.
+
+        Each batch is its own transaction. Between batches the writer is
+        released, progress is reported, and every ``checkpoint_interval``
+        batches free pages are returned and the WAL is checkpointed. Once
+        done, the path index is compacted so its deleted entries are
+        dropped too.
+
+        Args:
+            phase: Name reported in progress updates
+            delete_batch: Deletes one batch on the given connection and
+                returns the number deleted
+            total: Expected number of deletions, for progress reporting
+
+        Returns:
+            Number of operations deleted
+        """
+        progress = CleanupProgress(phase=phase, total=total)
+        started = time.monotonic()
+        batches = 0
+
+        while not self._stop_event.is_set():
+            with self.db.transaction() as conn:
+                deleted = delete_batch(conn)
+            if deleted == 0:
+                break
+
+            progress.deleted += deleted
+            progress.elapsed = time.monotonic() - started
+            batches += 1
+
+            if batches % self.config.checkpoint_interval == 0:
+                self.db.incremental_vacuum()
+                self.db.checkpoint("PASSIVE")
+                logger.info(
+                    f"History cleanup ({phase}): {progress.deleted} deleted, "
+                    f"{progress.rate:.0f} operations/s"
+                )
+
+            if self.progress_callback is not None:
+                self.progress_callback(progress)
+
+            if self.config.batch_pause > 0:
+                time.sleep(self.config.batch_pause)
+
+        if self._stop_event.is_set():
+            logger.info(f"History cleanup ({phase}) stopped after {progress.deleted} deletions")
+
+        if progress.deleted:
+            self._compact_path_index()
+        self.db.incremental_vacuum()
+        return progress.deleted
+
+    def _compact_path_index(self) -> None:
+        """Merge the path index in short steps, pausing between them like delete batches."""
+        while not self._stop_event.is_set() and self.db.merge_path_index():
+            if self.config.batch_pause > 0:
+                time.sleep(self.config.batch_pause)
+
+    def _reclaim_space(self) -> None:
+        """
+        Return free pages to the filesystem.
+
+        Databases still on ``auto_vacuum=NONE`` (created before incremental
+        vacuum was enabled) never shrink otherwise, so they get one full
+        ``vacuum()``, which also switches them to incremental mode.
+        """
+        if self.db.uses_incremental_vacuum():
+            self.db.incremental_vacuum()
+        else:
+            logger.info("Converting history database to incremental auto-vacuum")
+            self.db.vacuum()
+
     def clear_all(self, confirm: bool = False) -> bool:
         """
         Delete all operations and transactions from the database.
@@ -398,7 +640,7 @@ class HistoryCleanup:
         query = "SELECT MIN(timestamp) as oldest, MAX(timestamp) as newest FROM operations"
         result = self.db.fetch_one(query)
         if result:
-            stats['oldest_operation'] = result['oldest']
-            stats['newest_operation'] = result['newest']
+            stats['oldest_operation'] = format_timestamp(result['oldest'])
+            stats['newest_operation'] = format_timestamp(result['newest'])
 
         return stats
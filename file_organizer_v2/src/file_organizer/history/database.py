@@ -8,25 +8,52 @@ and migration support for the operation history system.
 import sqlite3
 import logging
 from pathlib import Path
-from typing import Optional, Any, Tuple, List
+from typing import Optional, Any, Iterator, Tuple, List
 from contextlib import contextmanager
-from threading import Lock
+from threading import Lock, get_ident
+
+from ..utils.sqlite_pool import (
+    DEFAULT_CACHE_SIZE_KB,
+    DEFAULT_MMAP_SIZE,
+    DEFAULT_POOL_SIZE,
+    configure_connection,
+    create_pool,
+)
+from .models import to_epoch_us
 
 logger = logging.getLogger(__name__)
 
 
+def _iso_to_epoch_us(value: Any) -> Optional[int]:
+    """SQL function converting v1 ISO timestamps, passing other values through."""
+    if isinstance(value, str):
+        try:
+            return to_epoch_us(value)
+        except ValueError:
+            logger.warning(f"Keeping unparseable timestamp during migration: {value!r}")
+    return value
+
+
 class DatabaseManager:
-    """Manages SQLite database connections and schema for operation history."""
+    """
+    Manages SQLite database connections and schema for operation history.
+
+    Writes go through a single writer connection guarded by a lock. Reads
+    (``fetch_one``/``fetch_all``) use a pool of reader connections, so they
+    run concurrently and do not wait for writes. A thread that has
+    uncommitted writes reads through the writer, so it sees its own changes.
+    """
 
     # Database schema version
-    SCHEMA_VERSION = 1
+    SCHEMA_VERSION = 2
 
-    # SQL schema definitions
+    # SQL schema definitions. Timestamps are integer microseconds since the
+    # Unix epoch (UTC), so range filters and ordering compare integers.
     SCHEMA_SQL = """
     CREATE TABLE IF NOT EXISTS operations (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         operation_type TEXT NOT NULL,
-        timestamp TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
         source_path TEXT NOT NULL,
         destination_path TEXT,
         file_hash TEXT,
@@ -39,8 +66,8 @@ class DatabaseManager:
 
     CREATE TABLE IF NOT EXISTS transactions (
         transaction_id TEXT PRIMARY KEY,
-        started_at TEXT NOT NULL,
-        completed_at TEXT,
+        started_at INTEGER NOT NULL,
+        completed_at INTEGER,
         operation_count INTEGER DEFAULT 0,
         status TEXT NOT NULL DEFAULT 'in_progress',
         metadata TEXT
@@ -50,21 +77,64 @@ class DatabaseManager:
         version INTEGER PRIMARY KEY,
         applied_at TEXT DEFAULT (datetime('now'))
     );
+    """
 
+    # Created after migrations, once the tables have their current layout
+    INDEX_SQL = """
     CREATE INDEX IF NOT EXISTS idx_operations_timestamp ON operations(timestamp);
-    CREATE INDEX IF NOT EXISTS idx_operations_transaction ON operations(transaction_id);
+    CREATE INDEX IF NOT EXISTS idx_operations_transaction ON operations(transaction_id, id);
     CREATE INDEX IF NOT EXISTS idx_operations_type ON operations(operation_type);
-    CREATE INDEX IF NOT EXISTS idx_operations_status ON operations(status);
+    CREATE INDEX IF NOT EXISTS idx_operations_status ON operations(status, timestamp);
     CREATE INDEX IF NOT EXISTS idx_transactions_status ON transactions(status);
     """
 
-    def __init__(self, db_path: Optional[Path] = None):
+    # Substring index over source and destination paths, kept in sync by triggers
+    PATH_INDEX_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS operation_paths USING fts5(
+        source_path, destination_path,
+        content='operations', content_rowid='id',
+        tokenize='trigram case_sensitive 1'
+    );
+
+    CREATE TRIGGER IF NOT EXISTS operation_paths_insert AFTER INSERT ON operations BEGIN
+        INSERT INTO operation_paths(rowid, source_path, destination_path)
+        VALUES (new.id, new.source_path, new.destination_path);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS operation_paths_delete AFTER DELETE ON operations BEGIN
+        INSERT INTO operation_paths(operation_paths, rowid, source_path, destination_path)
+        VALUES ('delete', old.id, old.source_path, old.destination_path);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS operation_paths_update
+    AFTER UPDATE OF source_path, destination_path ON operations BEGIN
+        INSERT INTO operation_paths(operation_paths, rowid, source_path, destination_path)
+        VALUES ('delete', old.id, old.source_path, old.destination_path);
+        INSERT INTO operation_paths(rowid, source_path, destination_path)
+        VALUES (new.id, new.source_path, new.destination_path);
+    END;
+    """
+
+    # Trigram queries need at least this many characters
+    PATH_INDEX_MIN_QUERY = 3
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        mmap_size: int = DEFAULT_MMAP_SIZE,
+        cache_size_kb: int = DEFAULT_CACHE_SIZE_KB
+    ):
         """
         Initialize database manager.
 
         Args:
             db_path: Path to SQLite database file.
                     Defaults to ~/.file_organizer/history.db
+            pool_size: Maximum number of reader connections (0 reads
+                through the writer connection)
+            mmap_size: Bytes of the database to memory-map per connection
+            cache_size_kb: Page cache size per connection in KiB
         """
         if db_path is None:
             db_path = Path.home() / '.file_organizer' / 'history.db'
@@ -72,9 +142,14 @@ class DatabaseManager:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
         self._connection: Optional[sqlite3.Connection] = None
+        self._pool = create_pool(self.db_path, pool_size, mmap_size, cache_size_kb)
         self._lock = Lock()
+        self._writer_thread: Optional[int] = None
         self._initialized = False
+        self.has_path_index = False
 
         logger.info(f"Database manager initialized with path: {self.db_path}")
 
@@ -91,6 +166,10 @@ class DatabaseManager:
             conn = self.get_connection()
 
             try:
+                # Let cleanup return free pages in small steps. This takes
+                # effect for new databases; existing ones switch on vacuum().
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+
                 # Enable WAL mode for better concurrent access
                 conn.execute("PRAGMA journal_mode=WAL")
 
@@ -114,6 +193,10 @@ class DatabaseManager:
                         self._migrate(current_version, self.SCHEMA_VERSION, conn)
                     logger.info(f"Database schema version: {current_version}")
 
+                conn.commit()
+                conn.executescript(self.INDEX_SQL)
+                self.has_path_index = self._create_path_index(conn)
+
                 conn.commit()
                 self._initialized = True
                 logger.info("Database initialization complete")
@@ -123,6 +206,31 @@ class DatabaseManager:
                 logger.error(f"Database initialization failed: {e}")
                 raise
 
+    def _create_path_index(self, conn: sqlite3.Connection) -> bool:
+        """
+        Create the trigram path index if this SQLite build supports it.
+
+        Args:
+            conn: Database connection
+
+        Returns:
+            True if the path index is available
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'operation_paths'"
+        ).fetchone() is not None
+
+        try:
+            conn.executescript(self.PATH_INDEX_SQL)
+        except sqlite3.OperationalError as e:
+            # FTS5 or the trigram tokenizer (SQLite 3.34+) is missing
+            logger.info(f"Path index unavailable, path search will scan: {e}")
+            return False
+
+        if not exists:
+            conn.execute("INSERT INTO operation_paths(operation_paths) VALUES ('rebuild')")
+        return True
+
     def _migrate(self, from_version: int, to_version: int, conn: sqlite3.Connection) -> None:
         """
         Perform database migration from one version to another.
@@ -134,12 +242,56 @@ class DatabaseManager:
         """
         logger.info(f"Migrating database from version {from_version} to {to_version}")
 
-        # Future migrations will be added here
-        # For now, this is a placeholder for migration logic
+        if from_version < 2:
+            self._migrate_to_integer_timestamps(conn)
 
         conn.execute("INSERT INTO schema_version (version) VALUES (?)", (to_version,))
         logger.info(f"Migration to version {to_version} complete")
 
+    def _migrate_to_integer_timestamps(self, conn: sqlite3.Connection) -> None:
+        """
+        Rebuild the v1 tables with integer epoch timestamps.
+
+        The v1 columns are declared TEXT, whose affinity would turn stored
+        integers back into strings, so both tables are copied into tables
+        created from the current schema. Their v1 indexes are dropped with
+        the old tables and recreated from ``INDEX_SQL``.
+        """
+        conn.create_function("to_epoch_us", 1, _iso_to_epoch_us, deterministic=True)
+
+        # One transaction for the whole rebuild; executescript() would commit
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        conn.execute("ALTER TABLE operations RENAME TO operations_v1")
+        conn.execute("ALTER TABLE transactions RENAME TO transactions_v1")
+        for statement in self.SCHEMA_SQL.split(';'):
+            if statement.strip():
+                conn.execute(statement)
+
+        conn.execute("""
+        INSERT INTO operations (
+            id, operation_type, timestamp, source_path, destination_path,
+            file_hash, metadata, transaction_id, status, error_message, created_at
+        )
+        SELECT
+            id, operation_type, to_epoch_us(timestamp), source_path, destination_path,
+            file_hash, metadata, transaction_id, status, error_message, created_at
+        FROM operations_v1
+        """)
+        conn.execute("""
+        INSERT INTO transactions (
+            transaction_id, started_at, completed_at, operation_count, status, metadata
+        )
+        SELECT
+            transaction_id, to_epoch_us(started_at), to_epoch_us(completed_at),
+            operation_count, status, metadata
+        FROM transactions_v1
+        """)
+
+        conn.execute("DROP TABLE operations_v1")
+        conn.execute("DROP TABLE transactions_v1")
+        logger.info("Converted history timestamps to integer epoch microseconds")
+
     def get_connection(self) -> sqlite3.Connection:
         """
         Get or create database connection.
@@ -155,6 +307,7 @@ class DatabaseManager:
             )
             # Enable row factory for easier data access
             self._connection.row_factory = sqlite3.Row
+            configure_connection(self._connection, self.mmap_size, self.cache_size_kb)
 
         return self._connection
 
@@ -172,6 +325,7 @@ class DatabaseManager:
         """
         with self._lock:
             conn = self.get_connection()
+            self._writer_thread = get_ident()
             try:
                 yield conn
                 conn.commit()
@@ -193,6 +347,7 @@ class DatabaseManager:
         """
         with self._lock:
             conn = self.get_connection()
+            self._writer_thread = get_ident()
             if params is None:
                 return conn.execute(query)
             else:
@@ -220,8 +375,12 @@ class DatabaseManager:
         Returns:
             Single row result or None
         """
-        cursor = self.execute_query(query, params)
-        return cursor.fetchone()
+        with self._read_connection() as conn:
+            cursor = conn.execute(query, params or ())
+            try:
+                return cursor.fetchone()
+            finally:
+                cursor.close()
 
     def fetch_all(self, query: str, params: Optional[Tuple] = None) -> List[sqlite3.Row]:
         """
@@ -234,8 +393,64 @@ class DatabaseManager:
         Returns:
             List of row results
         """
-        cursor = self.execute_query(query, params)
-        return cursor.fetchall()
+        with self._read_connection() as conn:
+            return conn.execute(query, params or ()).fetchall()
+
+    def iter_query(
+        self,
+        query: str,
+        params: Optional[Tuple] = None,
+        chunk_size: int = 1000
+    ) -> Iterator[sqlite3.Row]:
+        """
+        Execute a query and stream its results in chunks.
+
+        The rows come from one cursor, so the caller sees a single
+        consistent snapshot without holding the whole result in memory.
+        Consume the iterator fully (or close it) before issuing other
+        queries: without a reader pool it holds the database lock while
+        open.
+
+        Args:
+            query: SQL query string
+            params: Query parameters tuple
+            chunk_size: Rows fetched per round trip
+
+        Yields:
+            Row results
+        """
+        with self._read_connection() as conn:
+            cursor = conn.execute(query, params or ())
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def _read_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Connection for a read query.
+
+        Yields:
+            A pooled reader, or the writer (under the lock) when pooling is
+            off or this thread has an uncommitted write transaction
+        """
+        writer = self._connection
+        own_writes = (
+            writer is not None
+            and writer.in_transaction
+            and self._writer_thread == get_ident()
+        )
+        if self._pool is None or own_writes:
+            with self._lock:
+                yield self.get_connection()
+        else:
+            with self._pool.reader() as conn:
+                yield conn
 
     def get_database_size(self) -> int:
         """
@@ -258,17 +473,114 @@ class DatabaseManager:
         result = self.fetch_one("SELECT COUNT(*) as count FROM operations")
         return result['count'] if result else 0
 
+    def get_used_size(self) -> int:
+        """
+        Get the size of the pages holding data, excluding free pages.
+
+        Unlike the file size, this drops as soon as rows are deleted and
+        does not include the WAL.
+
+        Returns:
+            Used size in bytes
+        """
+        row = self.fetch_one(
+            "SELECT (page_count - freelist_count) * page_size AS used "
+            "FROM pragma_page_count, pragma_freelist_count, pragma_page_size"
+        )
+        return row['used'] if row else 0
+
     def vacuum(self) -> None:
         """
         Vacuum the database to reclaim space and optimize performance.
+
+        Also switches older databases to incremental auto-vacuum.
         """
         logger.info("Vacuuming database...")
-        conn = self.get_connection()
-        conn.execute("VACUUM")
+        with self._lock:
+            conn = self.get_connection()
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
         logger.info("Database vacuum complete")
 
+    def incremental_vacuum(self, pages: Optional[int] = None) -> None:
+        """
+        Return free pages to the filesystem without rewriting the database.
+
+        Does nothing unless the database uses incremental auto-vacuum.
+
+        Args:
+            pages: Maximum number of pages to free (None frees all)
+        """
+        with self._lock:
+            conn = self.get_connection()
+            # Pragma arguments cannot be bound; int() keeps this safe
+            pragma = "PRAGMA incremental_vacuum" if pages is None else f"PRAGMA incremental_vacuum({int(pages)})"
+            # execute() steps a statement without result columns only once,
+            # which frees a single page; executescript() runs it to completion
+            conn.executescript(pragma + ";")
+
+    def uses_incremental_vacuum(self) -> bool:
+        """
+        Check whether free pages can be returned with ``incremental_vacuum``.
+
+        Databases created before incremental auto-vacuum was enabled keep
+        ``auto_vacuum=NONE`` until the next ``vacuum()``.
+
+        Returns:
+            True if the database uses incremental auto-vacuum
+        """
+        row = self.fetch_one("PRAGMA auto_vacuum")
+        return row is not None and row[0] == 2
+
+    def merge_path_index(self, pages: int = 500) -> bool:
+        """
+        Run one step of merging the path index into a single segment.
+
+        FTS5 records deletions as extra index entries and only drops them
+        when segments are merged, so the index does not shrink when rows
+        are deleted. Each call is a short transaction writing about
+        ``pages`` pages; call it until it returns False to compact the
+        whole index (equivalent to the FTS5 'optimize' command, without
+        holding the writer for the whole rewrite).
+
+        Args:
+            pages: Approximate number of pages to write in this step
+
+        Returns:
+            True if there was merge work to do
+        """
+        if not self.has_path_index:
+            return False
+        with self.transaction() as conn:
+            before = conn.total_changes
+            conn.execute(
+                "INSERT INTO operation_paths(operation_paths, rank) VALUES('merge', ?)",
+                (-abs(int(pages)),)
+            )
+            # The command itself counts as one change; more means work was done
+            return conn.total_changes - before > 1
+
+    def checkpoint(self, mode: str = "PASSIVE") -> Tuple[int, int, int]:
+        """
+        Copy WAL content into the database file.
+
+        Args:
+            mode: PASSIVE (never waits for readers), FULL, RESTART or TRUNCATE
+
+        Returns:
+            Tuple of (busy, WAL frames, frames checkpointed)
+        """
+        mode = mode.upper()
+        if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Invalid checkpoint mode: {mode}")
+        with self._lock:
+            row = self.get_connection().execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        return tuple(row)
+
     def close(self) -> None:
-        """Close database connection."""
+        """Close reader and writer connections."""
+        if self._pool is not None:
+            self._pool.close()
         if self._connection is not None:
             try:
                 self._connection.close()
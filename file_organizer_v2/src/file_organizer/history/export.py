@@ -2,38 +2,61 @@
 Export utilities for operation history.
 
 This module provides functionality to export operation history
-to various formats (JSON, CSV).
+to various formats (JSON, JSON Lines, CSV, Parquet).
+
+Exports stream rows from a database cursor in chunks of ``chunk_size``
+instead of loading the whole result set, so memory use stays constant
+however large the history is. Text outputs are gzip-compressed when the
+output path ends in ``.gz`` (or ``compress=True`` is passed).
 """
 
-import json
 import csv
+import gzip
+import json
 import logging
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
 
 from .database import DatabaseManager
-from .models import Operation, Transaction, OperationType, OperationStatus, TransactionStatus
+from .models import (
+    Transaction, OperationType, OperationStatus, TransactionStatus,
+    format_timestamp, from_epoch_us, to_epoch_us
+)
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CHUNK_SIZE = 5000
+
 
 class HistoryExporter:
     """
     Exports operation history to various formats.
 
     This class provides methods to export operations and transactions
-    to JSON and CSV formats.
+    to JSON, JSON Lines, CSV and Parquet formats.
     """
 
-    def __init__(self, db: DatabaseManager):
+    OPERATION_CSV_COLUMNS = [
+        'id', 'operation_type', 'timestamp', 'source_path', 'destination_path',
+        'file_hash', 'transaction_id', 'status', 'error_message', 'created_at',
+        'file_size', 'file_type', 'is_file', 'is_dir'
+    ]
+
+    def __init__(self, db: DatabaseManager, chunk_size: int = DEFAULT_CHUNK_SIZE):
         """
         Initialize history exporter.
 
         Args:
             db: Database manager instance
+            chunk_size: Rows fetched from the database per round trip
         """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
         self.db = db
+        self.chunk_size = chunk_size
         logger.info("History exporter initialized")
 
     def export_to_json(
@@ -42,82 +65,107 @@ class HistoryExporter:
         operation_type: Optional[OperationType] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-        include_transactions: bool = True
+        include_transactions: bool = True,
+        compress: Optional[bool] = None
     ) -> Dict[str, int]:
         """
         Export operations to JSON file.
 
+        The document is written incrementally: ``operations`` is streamed
+        first and ``operation_count`` follows it. The transactions of the
+        exported operations are then streamed by a second query with the
+        same filter.
+
         Args:
             output_path: Path to output JSON file
             operation_type: Filter by operation type (optional)
             start_date: Filter by start date (optional)
             end_date: Filter by end date (optional)
             include_transactions: Whether to include transaction details
+            compress: Gzip the output (default: when the path ends in .gz)
 
         Returns:
             Dictionary with export statistics
         """
         logger.info(f"Exporting operations to JSON: {output_path}")
 
-        # Build query
-        query = "SELECT * FROM operations WHERE 1=1"
-        params = []
+        query, params = self._build_operation_query(operation_type, start_date, end_date)
+        count = 0
+        transaction_count = 0
 
-        if operation_type:
-            query += " AND operation_type = ?"
-            params.append(operation_type.value if isinstance(operation_type, OperationType) else operation_type)
+        with self._open_output(output_path, compress) as f:
+            export_date = datetime.utcnow().isoformat() + 'Z'
+            f.write('{\n  "export_date": ' + json.dumps(export_date) + ',\n  "operations": [')
 
-        if start_date:
-            query += " AND timestamp >= ?"
-            params.append(start_date.isoformat() + 'Z')
+            for row in self._iter_rows(query, params):
+                operation = self._operation_record(row)
+                f.write(',\n    ' if count else '\n    ')
+                f.write(json.dumps(operation))
+                count += 1
 
-        if end_date:
-            query += " AND timestamp <= ?"
-            params.append(end_date.isoformat() + 'Z')
+            f.write('\n  ]' if count else ']')
+            f.write(',\n  "operation_count": ' + str(count))
 
-        query += " ORDER BY timestamp DESC"
+            if include_transactions and count:
+                for transaction in self._iter_transactions(operation_type, start_date, end_date):
+                    if not transaction_count:
+                        f.write(',\n  "transactions": [')
+                    f.write(',\n    ' if transaction_count else '\n    ')
+                    f.write(json.dumps(transaction.to_dict()))
+                    transaction_count += 1
+                if transaction_count:
+                    f.write('\n  ],\n  "transaction_count": ' + str(transaction_count))
 
-        # Fetch operations
-        rows = self.db.fetch_all(query, tuple(params) if params else None)
-        operations = [Operation.from_row(row).to_dict() for row in rows]
+            f.write('\n}\n')
 
-        # Build export data
-        export_data = {
-            'export_date': datetime.utcnow().isoformat() + 'Z',
-            'operation_count': len(operations),
-            'operations': operations
+        logger.info(f"Exported {count} operations to {output_path}")
+        return {
+            'operations_exported': count,
+            'transactions_exported': transaction_count
         }
 
-        # Include transactions if requested
-        if include_transactions:
-            # Get unique transaction IDs
-            transaction_ids = set(op.get('transaction_id') for op in operations if op.get('transaction_id'))
+    def export_to_jsonl(
+        self,
+        output_path: Path,
+        operation_type: Optional[OperationType] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        compress: Optional[bool] = None
+    ) -> int:
+        """
+        Export operations to a JSON Lines file, one operation per line.
 
-            if transaction_ids:
-                placeholders = ','.join('?' * len(transaction_ids))
-                txn_query = f"SELECT * FROM transactions WHERE transaction_id IN ({placeholders})"
-                txn_rows = self.db.fetch_all(txn_query, tuple(transaction_ids))
-                transactions = [Transaction.from_row(row).to_dict() for row in txn_rows]
-                export_data['transactions'] = transactions
-                export_data['transaction_count'] = len(transactions)
+        Args:
+            output_path: Path to output file (e.g. ``history.jsonl.gz``)
+            operation_type: Filter by operation type (optional)
+            start_date: Filter by start date (optional)
+            end_date: Filter by end date (optional)
+            compress: Gzip the output (default: when the path ends in .gz)
 
-        # Write to file
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w') as f:
-            json.dump(export_data, f, indent=2)
+        Returns:
+            Number of operations exported
+        """
+        logger.info(f"Exporting operations to JSON Lines: {output_path}")
 
-        logger.info(f"Exported {len(operations)} operations to {output_path}")
-        return {
-            'operations_exported': len(operations),
-            'transactions_exported': len(export_data.get('transactions', []))
-        }
+        query, params = self._build_operation_query(operation_type, start_date, end_date)
+        count = 0
+
+        with self._open_output(output_path, compress) as f:
+            for row in self._iter_rows(query, params):
+                f.write(json.dumps(self._operation_record(row)))
+                f.write('\n')
+                count += 1
+
+        logger.info(f"Exported {count} operations to {output_path}")
+        return count
 
     def export_to_csv(
         self,
         output_path: Path,
         operation_type: Optional[OperationType] = None,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        compress: Optional[bool] = None
     ) -> int:
         """
         Export operations to CSV file.
@@ -127,90 +175,160 @@ class HistoryExporter:
             operation_type: Filter by operation type (optional)
             start_date: Filter by start date (optional)
             end_date: Filter by end date (optional)
+            compress: Gzip the output (default: when the path ends in .gz)
 
         Returns:
             Number of operations exported
         """
         logger.info(f"Exporting operations to CSV: {output_path}")
 
-        # Build query
-        query = "SELECT * FROM operations WHERE 1=1"
-        params = []
-
-        if operation_type:
-            query += " AND operation_type = ?"
-            params.append(operation_type.value if isinstance(operation_type, OperationType) else operation_type)
-
-        if start_date:
-            query += " AND timestamp >= ?"
-            params.append(start_date.isoformat() + 'Z')
-
-        if end_date:
-            query += " AND timestamp <= ?"
-            params.append(end_date.isoformat() + 'Z')
-
-        query += " ORDER BY timestamp DESC"
+        query, params = self._build_operation_query(operation_type, start_date, end_date)
+        rows = self._iter_rows(query, params)
 
-        # Fetch operations
-        rows = self.db.fetch_all(query, tuple(params) if params else None)
-
-        if not rows:
+        first = next(rows, None)
+        if first is None:
             logger.warning("No operations to export")
             return 0
 
-        # Define CSV columns
-        columns = [
-            'id', 'operation_type', 'timestamp', 'source_path', 'destination_path',
-            'file_hash', 'transaction_id', 'status', 'error_message', 'created_at',
-            'file_size', 'file_type', 'is_file', 'is_dir'
-        ]
-
-        # Write to CSV
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=columns)
+        count = 0
+        with self._open_output(output_path, compress) as f:
+            writer = csv.DictWriter(f, fieldnames=self.OPERATION_CSV_COLUMNS)
             writer.writeheader()
 
-            for row in rows:
-                operation = Operation.from_row(row)
+            for row in self._chain(first, rows):
+                record = self._operation_record(row)
+                metadata = record['metadata'] or {}
                 csv_row = {
-                    'id': operation.id,
-                    'operation_type': operation.operation_type.value if isinstance(operation.operation_type, OperationType) else operation.operation_type,
-                    'timestamp': operation.timestamp.isoformat() if isinstance(operation.timestamp, datetime) else operation.timestamp,
-                    'source_path': str(operation.source_path),
-                    'destination_path': str(operation.destination_path) if operation.destination_path else '',
-                    'file_hash': operation.file_hash or '',
-                    'transaction_id': operation.transaction_id or '',
-                    'status': operation.status.value if isinstance(operation.status, OperationStatus) else operation.status,
-                    'error_message': operation.error_message or '',
-                    'created_at': operation.created_at.isoformat() if operation.created_at and isinstance(operation.created_at, datetime) else operation.created_at or '',
-                    'file_size': operation.metadata.get('size', ''),
-                    'file_type': 'file' if operation.metadata.get('is_file') else 'dir' if operation.metadata.get('is_dir') else '',
-                    'is_file': operation.metadata.get('is_file', ''),
-                    'is_dir': operation.metadata.get('is_dir', '')
+                    'id': record['id'],
+                    'operation_type': record['operation_type'],
+                    'timestamp': record['timestamp'],
+                    'source_path': record['source_path'],
+                    'destination_path': record['destination_path'] or '',
+                    'file_hash': record['file_hash'] or '',
+                    'transaction_id': record['transaction_id'] or '',
+                    'status': record['status'],
+                    'error_message': record['error_message'] or '',
+                    'created_at': record['created_at'] or '',
+                    'file_size': metadata.get('size', ''),
+                    'file_type': 'file' if metadata.get('is_file') else 'dir' if metadata.get('is_dir') else '',
+                    'is_file': metadata.get('is_file', ''),
+                    'is_dir': metadata.get('is_dir', '')
                 }
                 writer.writerow(csv_row)
+                count += 1
+
+        logger.info(f"Exported {count} operations to {output_path}")
+        return count
+
+    def export_to_parquet(
+        self,
+        output_path: Path,
+        operation_type: Optional[OperationType] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        compression: str = 'zstd'
+    ) -> int:
+        """
+        Export operations to a Parquet file (requires pyarrow).
+
+        Rows are written as one row group per chunk with a typed schema:
+        ``timestamp`` is a UTC microsecond timestamp taken directly from
+        the stored integers, size and type flags are split out of the
+        metadata, and the full metadata is kept as a JSON string.
+
+        Args:
+            output_path: Path to output Parquet file
+            operation_type: Filter by operation type (optional)
+            start_date: Filter by start date (optional)
+            end_date: Filter by end date (optional)
+            compression: Parquet compression codec
+
+        Returns:
+            Number of operations exported
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "pyarrow is required for Parquet exports. "
+                "Install it with: pip install pyarrow"
+            ) from e
+
+        logger.info(f"Exporting operations to Parquet: {output_path}")
+
+        schema = pa.schema([
+            ('id', pa.int64()),
+            ('operation_type', pa.string()),
+            ('timestamp', pa.timestamp('us', tz='UTC')),
+            ('source_path', pa.string()),
+            ('destination_path', pa.string()),
+            ('file_hash', pa.string()),
+            ('transaction_id', pa.string()),
+            ('status', pa.string()),
+            ('error_message', pa.string()),
+            ('created_at', pa.string()),
+            ('file_size', pa.int64()),
+            ('is_file', pa.bool_()),
+            ('is_dir', pa.bool_()),
+            ('metadata', pa.string()),
+        ])
+        raw_columns = [
+            'id', 'operation_type', 'timestamp', 'source_path', 'destination_path',
+            'file_hash', 'transaction_id', 'status', 'error_message', 'created_at'
+        ]
 
-        logger.info(f"Exported {len(rows)} operations to {output_path}")
-        return len(rows)
+        query, params = self._build_operation_query(operation_type, start_date, end_date)
+        columns: Dict[str, List[Any]] = {name: [] for name in schema.names}
+        count = 0
 
-    def export_transactions_to_csv(self, output_path: Path) -> int:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with pq.ParquetWriter(str(output_path), schema, compression=compression) as writer:
+            def write_chunk() -> None:
+                writer.write_table(pa.table(columns, schema=schema))
+                for values in columns.values():
+                    values.clear()
+
+            for row in self._iter_rows(query, params):
+                for name in raw_columns:
+                    columns[name].append(row[name])
+                metadata = json.loads(row['metadata']) if row['metadata'] else {}
+                columns['file_size'].append(metadata.get('size'))
+                columns['is_file'].append(metadata.get('is_file'))
+                columns['is_dir'].append(metadata.get('is_dir'))
+                columns['metadata'].append(row['metadata'])
+                count += 1
+                if len(columns['id']) >= self.chunk_size:
+                    write_chunk()
+
+            if columns['id'] or not count:
+                write_chunk()
+
+        logger.info(f"Exported {count} operations to {output_path}")
+        return count
+
+    def export_transactions_to_csv(self, output_path: Path, compress: Optional[bool] = None) -> int:
         """
         Export transactions to CSV file.
 
         Args:
             output_path: Path to output CSV file
+            compress: Gzip the output (default: when the path ends in .gz)
 
         Returns:
             Number of transactions exported
         """
         logger.info(f"Exporting transactions to CSV: {output_path}")
 
-        # Fetch all transactions
+        # Stream all transactions
         query = "SELECT * FROM transactions ORDER BY started_at DESC"
-        rows = self.db.fetch_all(query)
+        rows = self._iter_rows(query, ())
 
-        if not rows:
+        first = next(rows, None)
+        if first is None:
             logger.warning("No transactions to export")
             return 0
 
@@ -220,13 +338,12 @@ class HistoryExporter:
             'operation_count', 'status'
         ]
 
-        # Write to CSV
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w', newline='') as f:
+        count = 0
+        with self._open_output(output_path, compress) as f:
             writer = csv.DictWriter(f, fieldnames=columns)
             writer.writeheader()
 
-            for row in rows:
+            for row in self._chain(first, rows):
                 transaction = Transaction.from_row(row)
                 csv_row = {
                     'transaction_id': transaction.transaction_id,
@@ -236,9 +353,10 @@ class HistoryExporter:
                     'status': transaction.status.value if isinstance(transaction.status, TransactionStatus) else transaction.status
                 }
                 writer.writerow(csv_row)
+                count += 1
 
-        logger.info(f"Exported {len(rows)} transactions to {output_path}")
-        return len(rows)
+        logger.info(f"Exported {count} transactions to {output_path}")
+        return count
 
     def export_statistics(self, output_path: Path) -> bool:
         """
@@ -279,8 +397,8 @@ class HistoryExporter:
         query = "SELECT MIN(timestamp) as oldest, MAX(timestamp) as newest FROM operations"
         result = self.db.fetch_one(query)
         if result:
-            stats['oldest_operation'] = result['oldest']
-            stats['newest_operation'] = result['newest']
+            stats['oldest_operation'] = format_timestamp(result['oldest'])
+            stats['newest_operation'] = format_timestamp(result['newest'])
 
         # Export date
         stats['export_date'] = datetime.utcnow().isoformat() + 'Z'
@@ -292,3 +410,146 @@ class HistoryExporter:
 
         logger.info(f"Exported statistics to {output_path}")
         return True
+
+    def _build_operation_query(
+        self,
+        operation_type: Optional[OperationType],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> Tuple[str, Tuple]:
+        """
+        Build the filtered operations query shared by all exports.
+
+        Returns:
+            Tuple of (query, params)
+        """
+        where, params = self._operation_filter(operation_type, start_date, end_date)
+        return f"SELECT * FROM operations WHERE {where} ORDER BY timestamp DESC", params
+
+    @staticmethod
+    def _operation_filter(
+        operation_type: Optional[OperationType],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> Tuple[str, Tuple]:
+        """
+        Build the WHERE clause selecting the operations to export.
+
+        Returns:
+            Tuple of (condition, params)
+        """
+        query = "1=1"
+        params: List[Any] = []
+
+        if operation_type:
+            query += " AND operation_type = ?"
+            params.append(operation_type.value if isinstance(operation_type, OperationType) else operation_type)
+
+        if start_date:
+            query += " AND timestamp >= ?"
+            params.append(to_epoch_us(start_date))
+
+        if end_date:
+            query += " AND timestamp <= ?"
+            params.append(to_epoch_us(end_date))
+
+        return query, tuple(params)
+
+    def _iter_rows(self, query: str, params: Tuple) -> Iterator[Any]:
+        """
+        Stream query results in chunks of ``chunk_size`` rows.
+
+        See ``DatabaseManager.iter_query`` for the snapshot and locking rules.
+
+        Returns:
+            Iterator of sqlite3.Row results
+        """
+        return self.db.iter_query(query, params, self.chunk_size)
+
+    @staticmethod
+    def _operation_record(row: Any) -> Dict[str, Any]:
+        """
+        Serialize an operations row like ``Operation.from_row(row).to_dict()``.
+
+        Building the dictionary straight from the row skips constructing
+        paths, enums and datetimes that would only be turned back into
+        strings, which dominates export time on large histories.
+
+        Args:
+            row: sqlite3.Row from the operations table
+
+        Returns:
+            Dictionary representation of the operation
+        """
+        timestamp = row['timestamp']
+        if isinstance(timestamp, int):
+            timestamp = from_epoch_us(timestamp).isoformat()
+
+        created_at = row['created_at']
+        if created_at:
+            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00')).isoformat()
+
+        metadata = row['metadata']
+        if isinstance(metadata, str):
+            metadata = json.loads(metadata)
+
+        return {
+            'id': row['id'],
+            'operation_type': row['operation_type'],
+            'timestamp': timestamp,
+            'source_path': row['source_path'],
+            'destination_path': row['destination_path'] or None,
+            'file_hash': row['file_hash'],
+            'metadata': metadata,
+            'transaction_id': row['transaction_id'],
+            'status': row['status'],
+            'error_message': row['error_message'],
+            'created_at': created_at
+        }
+
+    def _iter_transactions(
+        self,
+        operation_type: Optional[OperationType],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> Iterator[Transaction]:
+        """Stream the transactions of operations matching the export filter, by ID."""
+        where, params = self._operation_filter(operation_type, start_date, end_date)
+        txn_query = (
+            "SELECT * FROM transactions WHERE transaction_id IN ("
+            f"SELECT transaction_id FROM operations WHERE {where} "
+            "AND transaction_id IS NOT NULL) ORDER BY transaction_id"
+        )
+        for row in self._iter_rows(txn_query, params):
+            yield Transaction.from_row(row)
+
+    @staticmethod
+    def _chain(first: Any, rest: Iterator[Any]) -> Iterator[Any]:
+        """Yield a row peeked from an iterator, then the remaining rows."""
+        yield first
+        yield from rest
+
+    @staticmethod
+    @contextmanager
+    def _open_output(output_path: Path, compress: Optional[bool]) -> Iterator[IO[str]]:
+        """
+        Open a text output file, gzip-compressed if requested.
+
+        Args:
+            output_path: Output file path; parent directories are created
+            compress: Gzip the output; None decides by a ``.gz`` suffix
+
+        Yields:
+            Writable text file object
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if compress is None:
+            compress = output_path.suffix == '.gz'
+
+        if compress:
+            # Level 6 compresses nearly as well as 9 at a fraction of the CPU
+            f = gzip.open(output_path, 'wt', encoding='utf-8', newline='', compresslevel=6)
+        else:
+            f = open(output_path, 'w', encoding='utf-8', newline='')
+        with f:
+            yield f
@@ -5,11 +5,91 @@ This module defines the data structures for operations and transactions.
 """
 
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 from enum import Enum
 import json
+import os
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_epoch_us(value: Union[datetime, str]) -> int:
+    """
+    Convert a timestamp to the integer form stored in the database.
+
+    Args:
+        value: Datetime (naive values are taken as UTC) or ISO 8601 string
+
+    Returns:
+        Microseconds since the Unix epoch
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def from_epoch_us(value: int) -> datetime:
+    """
+    Convert a stored timestamp to an aware UTC datetime.
+
+    Args:
+        value: Microseconds since the Unix epoch
+
+    Returns:
+        Timezone-aware datetime in UTC
+    """
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def format_timestamp(value: Any) -> Any:
+    """
+    Format a stored timestamp as an ISO 8601 UTC string.
+
+    Args:
+        value: Microseconds since the Unix epoch; other values (None, v1
+            ISO strings) are returned unchanged
+
+    Returns:
+        ISO 8601 string ending in 'Z', or the value unchanged
+    """
+    if isinstance(value, int):
+        return from_epoch_us(value).replace(tzinfo=None).isoformat() + 'Z'
+    return value
+
+
+def file_fingerprint(st: os.stat_result) -> Dict[str, int]:
+    """
+    Describe a file version by its stat fields.
+
+    Recorded next to ``file_hash`` so integrity checks can skip re-hashing
+    a file whose size, modification time and inode are unchanged.
+
+    Args:
+        st: Result of ``os.stat`` for the file
+
+    Returns:
+        Dictionary with size, mtime_ns, inode and device
+    """
+    return {
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'inode': st.st_ino,
+        'device': st.st_dev
+    }
+
+
+def _parse_timestamp(value: Any) -> Any:
+    """Parse a stored (integer) or serialized (ISO string) timestamp."""
+    if isinstance(value, int):
+        return from_epoch_us(value)
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value
 
 
 class OperationType(str, Enum):
@@ -105,9 +185,7 @@ class Operation:
             op_type = OperationType(op_type)
 
         # Parse timestamp
-        timestamp = data['timestamp']
-        if isinstance(timestamp, str):
-            timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        timestamp = _parse_timestamp(data['timestamp'])
 
         # Parse paths
         source_path = Path(data['source_path'])
@@ -205,13 +283,8 @@ class Transaction:
             Transaction instance
         """
         # Parse timestamps
-        started_at = data['started_at']
-        if isinstance(started_at, str):
-            started_at = datetime.fromisoformat(started_at.replace('Z', '+00:00'))
-
-        completed_at = data.get('completed_at')
-        if completed_at and isinstance(completed_at, str):
-            completed_at = datetime.fromisoformat(completed_at.replace('Z', '+00:00'))
+        started_at = _parse_timestamp(data['started_at'])
+        completed_at = _parse_timestamp(data.get('completed_at'))
 
         # Parse status
         status = data.get('status', 'in_progress')
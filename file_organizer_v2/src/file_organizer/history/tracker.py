@@ -7,13 +7,23 @@ and managing operation history.
 
 import hashlib
 import logging
+import os
+import stat as stat_module
+import threading
+import time
+import weakref
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import json
 
 from .database import DatabaseManager
-from .models import Operation, OperationType, OperationStatus, Transaction, TransactionStatus
+from .models import (
+    Operation, OperationType, OperationStatus, Transaction, TransactionStatus,
+    file_fingerprint, to_epoch_us
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +36,15 @@ class OperationHistory:
     and query operation history.
     """
 
+    INSERT_OPERATION_SQL = """
+    INSERT INTO operations (
+        operation_type, timestamp, source_path, destination_path,
+        file_hash, metadata, transaction_id, status, error_message
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    HASH_CHUNK_SIZE = 1024 * 1024
+
     def __init__(self, db_path: Optional[Path] = None):
         """
         Initialize operation history tracker.
@@ -36,6 +55,7 @@ class OperationHistory:
         """
         self.db = DatabaseManager(db_path)
         self.db.initialize()
+        self._batches: "weakref.WeakSet[OperationBatch]" = weakref.WeakSet()
         logger.info("Operation history tracker initialized")
 
     def log_operation(
@@ -51,6 +71,9 @@ class OperationHistory:
         """
         Log a file operation to the database.
 
+        Each call is its own database transaction. Use ``batch()`` to log
+        many operations at once.
+
         Args:
             operation_type: Type of operation (move, rename, delete, copy)
             source_path: Source file path
@@ -63,59 +86,22 @@ class OperationHistory:
         Returns:
             Operation ID
         """
-        timestamp = datetime.utcnow()
-
-        # Calculate file hash if source file exists
-        file_hash = None
-        if source_path.exists() and source_path.is_file():
-            try:
-                file_hash = self._calculate_file_hash(source_path)
-            except Exception as e:
-                logger.warning(f"Failed to calculate file hash for {source_path}: {e}")
-
-        # Collect metadata
-        if metadata is None:
-            metadata = {}
+        metadata, _ = self._collect_metadata(source_path, metadata)
 
-        # Add file metadata if source exists
-        if source_path.exists():
-            try:
-                stat = source_path.stat()
-                metadata.update({
-                    'size': stat.st_size,
-                    'mode': stat.st_mode,
-                    'mtime': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    'is_file': source_path.is_file(),
-                    'is_dir': source_path.is_dir()
-                })
-            except Exception as e:
-                logger.warning(f"Failed to collect metadata for {source_path}: {e}")
-
-        # Convert metadata to JSON
-        metadata_json = json.dumps(metadata)
-
-        # Insert operation into database
-        query = """
-        INSERT INTO operations (
-            operation_type, timestamp, source_path, destination_path,
-            file_hash, metadata, transaction_id, status, error_message
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
+        # Hash the file where it is now, with the fingerprint it was hashed at
+        file_hash, fingerprint = self._hash_first_file(
+            tuple(p for p in (source_path, destination_path) if p)
+        )
+        if fingerprint:
+            metadata['fingerprint'] = fingerprint
 
-        params = (
-            operation_type.value if isinstance(operation_type, OperationType) else operation_type,
-            timestamp.isoformat() + 'Z',
-            str(source_path),
-            str(destination_path) if destination_path else None,
-            file_hash,
-            metadata_json,
-            transaction_id,
-            status.value if isinstance(status, OperationStatus) else status,
-            error_message
+        params = self._operation_params(
+            operation_type, source_path, destination_path, metadata,
+            transaction_id, status, error_message, file_hash
         )
 
         with self.db.transaction() as conn:
-            cursor = conn.execute(query, params)
+            cursor = conn.execute(self.INSERT_OPERATION_SQL, params)
             operation_id = cursor.lastrowid
 
             # Update transaction operation count if in a transaction
@@ -125,9 +111,103 @@ class OperationHistory:
                     (transaction_id,)
                 )
 
-        logger.debug(f"Logged operation {operation_id}: {operation_type.value} {source_path}")
+        logger.debug(f"Logged operation {operation_id}: {params[0]} {source_path}")
         return operation_id
 
+    def batch(
+        self,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        hash_files: bool = True,
+        hash_workers: int = 4
+    ) -> 'OperationBatch':
+        """
+        Create a buffer for logging many operations efficiently.
+
+        Example:
+            with history.batch() as batch:
+                for src, dest in moves:
+                    batch.log_operation(OperationType.MOVE, src, dest, transaction_id=txn_id)
+
+        Args:
+            batch_size: Number of buffered operations that triggers a flush
+            flush_interval: Seconds after which buffered operations are
+                flushed by the next ``log_operation`` call
+            hash_files: Whether to hash files at flush time
+            hash_workers: Number of threads hashing files during a flush
+
+        Returns:
+            OperationBatch bound to this history
+        """
+        batch = OperationBatch(self, batch_size, flush_interval, hash_files, hash_workers)
+        self._batches.add(batch)
+        return batch
+
+    def flush(self) -> None:
+        """Write operations buffered by open batches to the database."""
+        for batch in list(self._batches):
+            batch.flush()
+
+    def _collect_metadata(
+        self,
+        source_path: Path,
+        metadata: Optional[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Add file metadata for the source path with a single stat call.
+
+        Args:
+            source_path: Source file path
+            metadata: Caller-supplied metadata, updated in place
+
+        Returns:
+            Tuple of (metadata, whether the source is a regular file)
+        """
+        if metadata is None:
+            metadata = {}
+
+        try:
+            st = os.stat(source_path)
+        except FileNotFoundError:
+            return metadata, False
+        except OSError as e:
+            logger.warning(f"Failed to collect metadata for {source_path}: {e}")
+            return metadata, False
+
+        is_file = stat_module.S_ISREG(st.st_mode)
+        metadata.update({
+            'size': st.st_size,
+            'mode': st.st_mode,
+            'mtime': datetime.fromtimestamp(st.st_mtime).isoformat(),
+            'is_file': is_file,
+            'is_dir': stat_module.S_ISDIR(st.st_mode)
+        })
+        return metadata, is_file
+
+    @staticmethod
+    def _operation_params(
+        operation_type: OperationType,
+        source_path: Path,
+        destination_path: Optional[Path],
+        metadata: Dict[str, Any],
+        transaction_id: Optional[str],
+        status: OperationStatus,
+        error_message: Optional[str],
+        file_hash: Optional[str]
+    ) -> List[Any]:
+        """Build the parameters for ``INSERT_OPERATION_SQL``."""
+        return [
+            operation_type.value if isinstance(operation_type, OperationType) else operation_type,
+            time.time_ns() // 1000,
+            str(source_path),
+            str(destination_path) if destination_path else None,
+            file_hash,
+            json.dumps(metadata),
+            transaction_id,
+            status.value if isinstance(status, OperationStatus) else status,
+            error_message
+        ]
+
     def start_transaction(self, metadata: Optional[Dict[str, Any]] = None) -> str:
         """
         Start a new transaction for batch operations.
@@ -151,7 +231,7 @@ class OperationHistory:
 
         params = (
             transaction_id,
-            started_at.isoformat() + 'Z',
+            to_epoch_us(started_at),
             TransactionStatus.IN_PROGRESS.value,
             metadata_json
         )
@@ -172,6 +252,7 @@ class OperationHistory:
         Returns:
             True if successful, False otherwise
         """
+        self.flush()
         completed_at = datetime.utcnow()
 
         query = """
@@ -182,7 +263,7 @@ class OperationHistory:
 
         params = (
             TransactionStatus.COMPLETED.value,
-            completed_at.isoformat() + 'Z',
+            to_epoch_us(completed_at),
             transaction_id
         )
 
@@ -206,11 +287,12 @@ class OperationHistory:
             True if successful, False otherwise
         """
         try:
+            self.flush()
             with self.db.transaction() as conn:
                 # Update transaction status
                 conn.execute(
                     "UPDATE transactions SET status = ?, completed_at = ? WHERE transaction_id = ?",
-                    (TransactionStatus.FAILED.value, datetime.utcnow().isoformat() + 'Z', transaction_id)
+                    (TransactionStatus.FAILED.value, to_epoch_us(datetime.utcnow()), transaction_id)
                 )
 
                 # Update all operations in this transaction
@@ -265,11 +347,11 @@ class OperationHistory:
 
         if start_date:
             query += " AND timestamp >= ?"
-            params.append(start_date.isoformat() + 'Z')
+            params.append(to_epoch_us(start_date))
 
         if end_date:
             query += " AND timestamp <= ?"
-            params.append(end_date.isoformat() + 'Z')
+            params.append(to_epoch_us(end_date))
 
         query += " ORDER BY timestamp DESC"
 
@@ -284,6 +366,46 @@ class OperationHistory:
         rows = self.db.fetch_all(query, tuple(params) if params else None)
         return [Operation.from_row(row) for row in rows]
 
+    def search_by_path(self, path: str, limit: Optional[int] = None) -> List[Operation]:
+        """
+        Find operations whose source or destination path contains a substring.
+
+        Uses the trigram path index when available; queries shorter than
+        three characters, or databases without FTS5, fall back to a scan.
+
+        Args:
+            path: Substring to search for (case-sensitive)
+            limit: Maximum number of results
+
+        Returns:
+            Matching operations, newest first
+        """
+        if self.db.has_path_index and len(path) >= self.db.PATH_INDEX_MIN_QUERY:
+            query = """
+            SELECT operations.* FROM operation_paths
+            JOIN operations ON operations.id = operation_paths.rowid
+            WHERE operation_paths MATCH ?
+            ORDER BY operations.timestamp DESC
+            """
+            params: List[Any] = ['"' + path.replace('"', '""') + '"']
+        else:
+            query = """
+            SELECT * FROM operations
+            WHERE instr(source_path, ?) > 0 OR instr(destination_path, ?) > 0
+            ORDER BY timestamp DESC
+            """
+            params = [path, path]
+
+        if limit:
+            limit_value = int(limit)
+            if limit_value < 0:
+                raise ValueError("limit must be non-negative")
+            query += " LIMIT ?"
+            params.append(limit_value)
+
+        rows = self.db.fetch_all(query, tuple(params))
+        return [Operation.from_row(row) for row in rows]
+
     def get_transaction(self, transaction_id: str) -> Optional[Transaction]:
         """
         Get transaction by ID.
@@ -326,12 +448,48 @@ class OperationHistory:
         sha256_hash = hashlib.sha256()
         with open(file_path, "rb") as f:
             # Read file in chunks to handle large files
-            for byte_block in iter(lambda: f.read(4096), b""):
+            for byte_block in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b""):
                 sha256_hash.update(byte_block)
         return sha256_hash.hexdigest()
 
+    def _hash_first_file(
+        self,
+        paths: Tuple[Path, ...]
+    ) -> Tuple[Optional[str], Optional[Dict[str, int]]]:
+        """
+        Hash the first of the paths that is a regular file.
+
+        That is where the operation's file is at log time: the source when
+        logged before the file operation ran, otherwise the destination.
+
+        Args:
+            paths: Candidate paths, in order of preference
+
+        Returns:
+            Tuple of (hash, fingerprint). Both are None if no path is a
+            file; the fingerprint is None if the file changed while it was
+            being hashed.
+        """
+        for path in paths:
+            try:
+                before = os.stat(path)
+                if not stat_module.S_ISREG(before.st_mode):
+                    continue
+                file_hash = self._calculate_file_hash(path)
+                after = os.stat(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning(f"Failed to calculate file hash for {path}: {e}")
+                continue
+
+            fingerprint = file_fingerprint(after)
+            return file_hash, fingerprint if fingerprint == file_fingerprint(before) else None
+        return None, None
+
     def close(self) -> None:
-        """Close database connection."""
+        """Flush open batches and close database connection."""
+        self.flush()
         self.db.close()
 
     def __enter__(self):
@@ -341,3 +499,197 @@ class OperationHistory:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
         self.close()
+
+
+class OperationBatch:
+    """
+    Buffer that logs operations with one database transaction per flush.
+
+    Operations are inserted with ``executemany`` when ``batch_size`` of them
+    are buffered, when ``flush_interval`` seconds have passed since the first
+    buffered one (checked on the next ``log_operation`` call), on ``flush()``
+    and on exit. Each flush updates ``operation_count`` once per transaction.
+
+    File hashes are computed at flush time, in parallel. If the source has
+    been moved away by then, the destination is hashed instead, since it
+    holds the same content. The file's fingerprint is taken at log time and
+    a flush-time hash is only kept if the file still matches it, so a file
+    replaced in the meantime (e.g. by an overwriting move) gets no hash
+    rather than a wrong one. Deletes are hashed at log time, because the
+    file is usually gone by the flush.
+
+    If writing a flush fails, its operations stay buffered for the next
+    flush. Buffered operations have no ID until flushed.
+    """
+
+    def __init__(
+        self,
+        history: OperationHistory,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        hash_files: bool = True,
+        hash_workers: int = 4
+    ):
+        """
+        Initialize operation batch.
+
+        Args:
+            history: OperationHistory to write to
+            batch_size: Number of buffered operations that triggers a flush
+            flush_interval: Seconds after which buffered operations are flushed
+            hash_files: Whether to hash files at flush time
+            hash_workers: Number of threads hashing files during a flush
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.history = history
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.hash_files = hash_files
+        self.hash_workers = max(1, hash_workers)
+        self.logged_count = 0
+
+        # (params, paths to hash at flush, metadata, fingerprint at log time)
+        self._pending: List[
+            Tuple[List[Any], Tuple[Path, ...], Dict[str, Any], Optional[Dict[str, int]]]
+        ] = []
+        self._first_pending_at = 0.0
+        self._lock = threading.Lock()
+
+    def log_operation(
+        self,
+        operation_type: OperationType,
+        source_path: Path,
+        destination_path: Optional[Path] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        transaction_id: Optional[str] = None,
+        status: OperationStatus = OperationStatus.COMPLETED,
+        error_message: Optional[str] = None
+    ) -> None:
+        """
+        Buffer a file operation.
+
+        Args:
+            operation_type: Type of operation (move, rename, delete, copy)
+            source_path: Source file path
+            destination_path: Destination file path (for move/rename/copy)
+            metadata: Additional metadata about the operation
+            transaction_id: ID of the transaction this operation belongs to
+            status: Current status of the operation
+            error_message: Error message if operation failed
+        """
+        metadata, _ = self.history._collect_metadata(source_path, metadata)
+        params = self.history._operation_params(
+            operation_type, source_path, destination_path, metadata,
+            transaction_id, status, error_message, None
+        )
+        hash_paths = tuple(p for p in (source_path, destination_path) if p) if self.hash_files else ()
+        logged_fingerprint = None
+        if hash_paths and operation_type == OperationType.DELETE:
+            # Nothing is left to hash at flush time once the file is deleted
+            self._set_hash(params, metadata, *self.history._hash_first_file(hash_paths))
+            hash_paths = ()
+        elif hash_paths:
+            logged_fingerprint = self._fingerprint_first_file(hash_paths)
+
+        with self._lock:
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+            self._pending.append((params, hash_paths, metadata, logged_fingerprint))
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._first_pending_at >= self.flush_interval
+            )
+
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write buffered operations to the database.
+
+        Returns:
+            Number of operations written
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return 0
+
+            self._hash_pending(pending)
+            rows = [params for params, _, _, _ in pending]
+            counts = Counter(params[6] for params in rows if params[6])
+
+            try:
+                with self.history.db.transaction() as conn:
+                    conn.executemany(self.history.INSERT_OPERATION_SQL, rows)
+                    conn.executemany(
+                        "UPDATE transactions SET operation_count = operation_count + ? WHERE transaction_id = ?",
+                        [(count, transaction_id) for transaction_id, count in counts.items()]
+                    )
+            except Exception:
+                # Keep the (already hashed) operations for the next flush
+                self._pending = [(params, (), metadata, None) for params, _, metadata, _ in pending]
+                raise
+
+            self.logged_count += len(rows)
+
+        logger.debug(f"Flushed {len(rows)} operations")
+        return len(rows)
+
+    def _hash_pending(
+        self,
+        pending: List[Tuple[List[Any], Tuple[Path, ...], Dict[str, Any], Optional[Dict[str, int]]]]
+    ) -> None:
+        """Fill in file hashes and fingerprints for buffered operations."""
+        to_hash = [entry for entry in pending if entry[1]]
+        if not to_hash:
+            return
+
+        paths = (hash_paths for _, hash_paths, _, _ in to_hash)
+        if self.hash_workers == 1 or len(to_hash) == 1:
+            results = [self.history._hash_first_file(p) for p in paths]
+        else:
+            with ThreadPoolExecutor(max_workers=self.hash_workers) as executor:
+                results = list(executor.map(self.history._hash_first_file, paths))
+
+        for (params, _, metadata, logged), (file_hash, fingerprint) in zip(to_hash, results):
+            if fingerprint != logged:
+                # Changed or replaced since it was logged: the hash would be wrong
+                logger.debug(f"File changed before flush, not hashing operation on {params[1]}")
+                continue
+            self._set_hash(params, metadata, file_hash, fingerprint)
+
+    @staticmethod
+    def _set_hash(
+        params: List[Any],
+        metadata: Dict[str, Any],
+        file_hash: Optional[str],
+        fingerprint: Optional[Dict[str, int]]
+    ) -> None:
+        """Store a hash and its fingerprint in an operation's insert parameters."""
+        params[4] = file_hash
+        if fingerprint:
+            metadata['fingerprint'] = fingerprint
+            params[5] = json.dumps(metadata)
+
+    @staticmethod
+    def _fingerprint_first_file(paths: Tuple[Path, ...]) -> Optional[Dict[str, int]]:
+        """Fingerprint of the first path that is a regular file (no hashing)."""
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if stat_module.S_ISREG(st.st_mode):
+                return file_fingerprint(st)
+        return None
+
+    def __enter__(self) -> 'OperationBatch':
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit; flushes buffered operations."""
+        self.flush()
@@ -10,6 +10,7 @@ This module provides:
 from .backup import BackupManager
 from .detector import DuplicateDetector
 from .hasher import FileHasher
+from .hash_store import PerceptualHashStore
 from .image_dedup import ImageDeduplicator
 from .image_utils import (
     ImageMetadata,
@@ -19,12 +20,15 @@ from .image_utils import (
     get_best_quality_image,
     get_image_info_string,
     get_image_metadata,
+    probe_image,
     validate_image_file,
 )
 from .index import DuplicateIndex
 from .extractor import DocumentExtractor
-from .embedder import DocumentEmbedder
+from .embedder import DocumentEmbedder, HashingDocumentEmbedder
+from .embedding_cache import EmbeddingCache
 from .semantic import SemanticAnalyzer
+from .lsh import CosineLSHIndex
 from .document_dedup import DocumentDeduplicator
 from .reporter import StorageReporter
 
@@ -37,8 +41,10 @@ __all__ = [
     # Image deduplication
     "ImageDeduplicator",
     "ImageMetadata",
+    "PerceptualHashStore",
     # Image utilities
     "get_image_metadata",
+    "probe_image",
     "validate_image_file",
     "filter_valid_images",
     "find_images_in_directory",
@@ -48,7 +54,10 @@ __all__ = [
     # Document deduplication
     "DocumentExtractor",
     "DocumentEmbedder",
+    "HashingDocumentEmbedder",
+    "EmbeddingCache",
     "SemanticAnalyzer",
+    "CosineLSHIndex",
     "DocumentDeduplicator",
     "StorageReporter",
 ]
@@ -7,20 +7,26 @@ This module provides safe backup management for file operations, including:
 - Maintaining backup manifests with metadata
 - Restoring files from backups
 - Cleaning up old backups
+
+Backups avoid copying data where the filesystem allows it: a reflink
+(copy-on-write clone) is tried first, then a hardlink, and only then a
+full copy. The manifest is an SQLite database, so recording a backup is a
+single row insert rather than a rewrite of the whole manifest.
 """
 
 import json
+import logging
+import os
 import shutil
+import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
+from threading import Lock
 from typing import Optional
 
-# fcntl is Unix-only, not available on Windows
-try:
-    import fcntl
-    HAS_FCNTL = True
-except ImportError:
-    HAS_FCNTL = False
+from .linking import LINK_UNSUPPORTED_ERRNOS, reflink_file
+
+logger = logging.getLogger(__name__)
 
 
 class BackupManager:
@@ -31,33 +37,72 @@ class BackupManager:
     file deletion operations, maintains a manifest of all backups with
     timestamps and metadata, and provides restoration and cleanup capabilities.
 
+    With ``link_mode="auto"`` a backup may be a hardlink to the original,
+    which shares its data until the original is deleted. That is exactly
+    the dedupe workflow (back up, then delete) and makes backing up a large
+    file instant; use ``"reflink"`` or ``"copy"`` when backed-up files will
+    keep being modified in place.
+
     Attributes:
         backup_dir: Path to the backup directory (.file_organizer_backups/)
-        manifest_path: Path to the backup manifest JSON file
+        manifest_path: Path to the backup manifest database
+        link_mode: How backups are created ("auto", "reflink" or "copy")
     """
 
     BACKUP_DIR_NAME = ".file_organizer_backups"
-    MANIFEST_FILE = "manifest.json"
+    MANIFEST_FILE = "manifest.db"
+    LEGACY_MANIFEST_FILE = "manifest.json"
+    LINK_MODES = ("auto", "reflink", "copy")
+
+    SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS backups (
+        backup_path TEXT PRIMARY KEY,
+        original_path TEXT NOT NULL,
+        backup_time TEXT NOT NULL,
+        file_size INTEGER NOT NULL,
+        original_mtime TEXT NOT NULL,
+        method TEXT NOT NULL DEFAULT 'copy'
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_backups_time ON backups(backup_time);
+    """
 
-    def __init__(self, base_dir: Optional[Path] = None):
+    def __init__(self, base_dir: Optional[Path] = None, link_mode: str = "auto"):
         """
         Initialize the BackupManager.
 
         Args:
             base_dir: Base directory for backups. If None, uses current working directory.
+            link_mode: "auto" tries reflink, then hardlink, then copy;
+                "reflink" tries reflink, then copy; "copy" always copies.
+
+        Raises:
+            ValueError: If link_mode is not recognized
         """
+        if link_mode not in self.LINK_MODES:
+            raise ValueError(
+                f"Invalid link_mode: {link_mode}. Must be one of {self.LINK_MODES}"
+            )
+
         if base_dir is None:
             base_dir = Path.cwd()
 
+        self.link_mode = link_mode
         self.backup_dir = Path(base_dir) / self.BACKUP_DIR_NAME
         self.manifest_path = self.backup_dir / self.MANIFEST_FILE
 
         # Create backup directory if it doesn't exist
         self.backup_dir.mkdir(parents=True, exist_ok=True)
 
-        # Initialize manifest if it doesn't exist
-        if not self.manifest_path.exists():
-            self._save_manifest({})
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.manifest_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA_SQL)
+        self._conn.commit()
+
+        self._import_legacy_manifest()
 
     def create_backup(self, file_path: Path) -> Path:
         """
@@ -82,34 +127,39 @@ class BackupManager:
         if not file_path.is_file():
             raise ValueError(f"Path is not a file: {file_path}")
 
-        # Generate unique backup filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        backup_filename = f"{file_path.stem}_{timestamp}{file_path.suffix}"
-        backup_path = (self.backup_dir / backup_filename).resolve()
+        stat = file_path.stat()
 
-        # Copy file to backup directory
         try:
-            shutil.copy2(file_path, backup_path)
+            backup_path, method = self._place_backup(file_path)
         except Exception as e:
             raise OSError(f"Failed to create backup: {e}")
 
-        # Update manifest
-        manifest = self._load_manifest()
-        manifest[str(backup_path)] = {
-            "original_path": str(file_path),
-            "backup_path": str(backup_path),
-            "backup_time": datetime.now().isoformat(),
-            "file_size": file_path.stat().st_size,
-            "original_mtime": datetime.fromtimestamp(file_path.stat().st_mtime).isoformat(),
-        }
-        self._save_manifest(manifest)
-
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO backups "
+                    "(backup_path, original_path, backup_time, file_size, original_mtime, method) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        str(backup_path),
+                        str(file_path),
+                        datetime.now().isoformat(),
+                        stat.st_size,
+                        datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                        method,
+                    ),
+                )
+
+        logger.debug(f"Backed up {file_path} by {method}")
         return backup_path
 
     def restore_backup(self, backup_path: Path, target_path: Optional[Path] = None) -> Path:
         """
         Restore a file from backup.
 
+        The restored file never shares data with the backup: it is a
+        reflink where possible, otherwise a copy.
+
         Args:
             backup_path: Path to the backup file
             target_path: Target path for restoration. If None, restores to original location.
@@ -128,24 +178,22 @@ class BackupManager:
             raise FileNotFoundError(f"Backup file not found: {backup_path}")
 
         # Get original path from manifest
-        manifest = self._load_manifest()
-        backup_key = str(backup_path)
-
-        if backup_key not in manifest:
+        info = self.get_backup_info(backup_path)
+        if info is None:
             raise ValueError(f"Backup not found in manifest: {backup_path}")
 
         # Determine target path
         if target_path is None:
-            target_path = Path(manifest[backup_key]["original_path"])
+            target_path = Path(info["original_path"])
         else:
             target_path = Path(target_path).resolve()
 
         # Create parent directory if needed
         target_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Copy backup to target location
         try:
-            shutil.copy2(backup_path, target_path)
+            if target_path.exists() or not reflink_file(backup_path, target_path):
+                shutil.copy2(backup_path, target_path)
         except Exception as e:
             raise OSError(f"Failed to restore backup: {e}")
 
@@ -164,31 +212,28 @@ class BackupManager:
         if max_age_days < 0:
             raise ValueError("max_age_days must be non-negative")
 
-        cutoff_date = datetime.now() - timedelta(days=max_age_days)
-        manifest = self._load_manifest()
-        removed_backups = []
-
-        # Find and remove old backups
-        for backup_key, _metadata in list(manifest.items()):
-            backup_time = datetime.fromisoformat(metadata["backup_time"])
-
-            if backup_time < cutoff_date:
-                backup_path = Path(backup_key)
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT backup_path FROM backups WHERE backup_time < ?", (cutoff,)
+            ).fetchall()
 
-                # Remove backup file if it exists
-                if backup_path.exists():
-                    try:
-                        backup_path.unlink()
-                        removed_backups.append(backup_path)
-                    except Exception:
-                        # Continue even if deletion fails
-                        pass
+        removed_backups = []
+        for row in rows:
+            backup_path = Path(row["backup_path"])
 
-                # Remove from manifest
-                del manifest[backup_key]
+            # Remove backup file if it exists
+            if backup_path.exists():
+                try:
+                    backup_path.unlink()
+                    removed_backups.append(backup_path)
+                except Exception:
+                    # Continue even if deletion fails
+                    pass
 
-        # Save updated manifest
-        self._save_manifest(manifest)
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM backups WHERE backup_time < ?", (cutoff,))
 
         return removed_backups
 
@@ -202,28 +247,31 @@ class BackupManager:
         Returns:
             Dictionary containing backup metadata, or None if not found
         """
-        manifest = self._load_manifest()
         backup_key = str(Path(backup_path).resolve())
-        return manifest.get(backup_key)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM backups WHERE backup_path = ?", (backup_key,)
+            ).fetchone()
+        return dict(row) if row is not None else None
 
     def list_backups(self) -> list[dict]:
         """
         List all backups with their metadata.
 
         Returns:
-            List of dictionaries containing backup information
+            List of dictionaries containing backup information, newest first
         """
-        manifest = self._load_manifest()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM backups ORDER BY backup_time DESC"
+            ).fetchall()
 
         backups = []
-        for backup_key, _metadata in manifest.items():
-            backup_info = metadata.copy()
-            backup_info["exists"] = Path(backup_key).exists()
+        for row in rows:
+            backup_info = dict(row)
+            backup_info["exists"] = Path(row["backup_path"]).exists()
             backups.append(backup_info)
 
-        # Sort by backup time (newest first)
-        backups.sort(key=lambda x: x["backup_time"], reverse=True)
-
         return backups
 
     def get_statistics(self) -> dict:
@@ -233,14 +281,17 @@ class BackupManager:
         Returns:
             Dictionary containing backup statistics
         """
-        manifest = self._load_manifest()
+        with self._lock:
+            rows = self._conn.execute("SELECT backup_path, method FROM backups").fetchall()
 
-        total_backups = len(manifest)
+        total_backups = len(rows)
         total_size = 0
         existing_backups = 0
+        by_method: dict[str, int] = {}
 
-        for backup_key, _metadata in manifest.items():
-            backup_path = Path(backup_key)
+        for row in rows:
+            backup_path = Path(row["backup_path"])
+            by_method[row["method"]] = by_method.get(row["method"], 0) + 1
             if backup_path.exists():
                 existing_backups += 1
                 total_size += backup_path.stat().st_size
@@ -251,6 +302,7 @@ class BackupManager:
             "missing_backups": total_backups - existing_backups,
             "total_size_bytes": total_size,
             "total_size_mb": round(total_size / (1024 * 1024), 2),
+            "backups_by_method": by_method,
             "backup_directory": str(self.backup_dir),
         }
 
@@ -261,10 +313,12 @@ class BackupManager:
         Returns:
             List of backup paths that are missing or corrupted
         """
-        manifest = self._load_manifest()
-        issues = []
+        with self._lock:
+            rows = self._conn.execute("SELECT backup_path, file_size FROM backups").fetchall()
 
-        for backup_key, _metadata in manifest.items():
+        issues = []
+        for row in rows:
+            backup_key = row["backup_path"]
             backup_path = Path(backup_key)
 
             # Check if backup file exists
@@ -273,61 +327,96 @@ class BackupManager:
                 continue
 
             # Check if file size matches
-            if backup_path.stat().st_size != metadata["file_size"]:
+            if backup_path.stat().st_size != row["file_size"]:
                 issues.append(f"Size mismatch: {backup_key}")
 
         return issues
 
-    def _load_manifest(self) -> dict:
-        """
-        Load the backup manifest from disk with file locking.
+    def close(self) -> None:
+        """Close the manifest database."""
+        with self._lock:
+            self._conn.close()
 
-        Returns:
-            Dictionary containing manifest data
-        """
-        if not self.manifest_path.exists():
-            return {}
+    def __enter__(self) -> "BackupManager":
+        return self
 
-        try:
-            with open(self.manifest_path, 'r', encoding='utf-8') as f:
-                # Acquire shared lock for reading (Unix only)
-                if HAS_FCNTL:
-                    fcntl.flock(f.fileno(), fcntl.LOCK_SH)
-                try:
-                    data = json.load(f)
-                finally:
-                    # Release lock (Unix only)
-                    if HAS_FCNTL:
-                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-                return data
-        except (json.JSONDecodeError, OSError):
-            # If manifest is corrupted, start fresh
-            return {}
-
-    def _save_manifest(self, manifest: dict) -> None:
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _place_backup(self, file_path: Path) -> tuple[Path, str]:
         """
-        Save the backup manifest to disk with file locking.
+        Create the backup file by the cheapest method available.
 
         Args:
-            manifest: Dictionary containing manifest data
+            file_path: Resolved source file
+
+        Returns:
+            Tuple of (backup path, method used)
         """
+        # Generate unique backup filename with timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        stem = f"{file_path.stem}_{timestamp}"
+        counter = 0
+
+        while True:
+            suffix = f"_{counter}" if counter else ""
+            backup_path = (self.backup_dir / f"{stem}{suffix}{file_path.suffix}").resolve()
+            counter += 1
+            if backup_path.exists():
+                continue
+
+            try:
+                if self.link_mode != "copy" and reflink_file(file_path, backup_path):
+                    return backup_path, "reflink"
+
+                if self.link_mode == "auto":
+                    try:
+                        os.link(file_path, backup_path)
+                        return backup_path, "hardlink"
+                    except OSError as e:
+                        if e.errno not in LINK_UNSUPPORTED_ERRNOS:
+                            raise
+
+                # Exclusive create so a concurrent backup is never overwritten
+                with open(file_path, "rb") as src, open(backup_path, "xb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                shutil.copystat(file_path, backup_path)
+                return backup_path, "copy"
+            except FileExistsError:
+                continue
+
+    def _import_legacy_manifest(self) -> None:
+        """Move entries from a JSON manifest written by older versions."""
+        legacy_path = self.backup_dir / self.LEGACY_MANIFEST_FILE
+        if not legacy_path.exists():
+            return
+
         try:
-            # Open in read+ mode to avoid truncating before lock
-            mode = 'r+' if self.manifest_path.exists() else 'w'
-            with open(self.manifest_path, mode, encoding='utf-8') as f:
-                # Acquire exclusive lock for writing (Unix only)
-                if HAS_FCNTL:
-                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-                try:
-                    # Truncate file after acquiring lock
-                    if mode == 'r+':
-                        f.seek(0)
-                        f.truncate()
-                    json.dump(manifest, f, indent=2, ensure_ascii=False)
-                    f.flush()
-                finally:
-                    # Release lock (Unix only)
-                    if HAS_FCNTL:
-                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-        except OSError as e:
-            raise OSError(f"Failed to save manifest: {e}") from e
+            manifest = json.loads(legacy_path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable legacy backup manifest: {e}")
+            manifest = {}
+
+        rows = [
+            (
+                backup_key,
+                entry["original_path"],
+                entry["backup_time"],
+                entry["file_size"],
+                entry.get("original_mtime", entry["backup_time"]),
+            )
+            for backup_key, entry in manifest.items()
+            if isinstance(entry, dict) and "original_path" in entry
+        ]
+
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO backups "
+                    "(backup_path, original_path, backup_time, file_size, original_mtime) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+        legacy_path.rename(legacy_path.with_suffix(".json.migrated"))
+        logger.info(f"Imported {len(rows)} backups from legacy manifest")
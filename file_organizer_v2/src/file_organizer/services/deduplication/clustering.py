@@ -0,0 +1,219 @@
+"""
+Union-find clustering for duplicate groups.
+
+Provides a disjoint-set structure with path compression and union by size,
+used to turn "these two items are similar" pairs into transitive clusters
+in near-linear time. ``SimilarityClusters`` additionally keeps running
+similarity aggregates per cluster, merged on every union.
+"""
+
+from collections.abc import Hashable, Iterable
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+class UnionFind(Generic[T]):
+    """
+    Disjoint-set forest over arbitrary hashable items.
+
+    Items are added lazily on first use. ``find`` uses path halving and
+    ``union`` attaches the smaller tree under the larger, so a sequence of
+    m operations on n items runs in O(m α(n)).
+    """
+
+    def __init__(self, items: Iterable[T] = ()):
+        """
+        Initialize the structure.
+
+        Args:
+            items: Optional items to register as singleton sets
+        """
+        self._parent: Dict[T, T] = {}
+        self._size: Dict[T, int] = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item: T) -> None:
+        """Register an item as a singleton set (no-op if already present)."""
+        if item not in self._parent:
+            self._parent[item] = item
+            self._size[item] = 1
+
+    def find(self, item: T) -> T:
+        """
+        Return the representative of the set containing ``item``.
+
+        Args:
+            item: Item to look up (added if unknown)
+
+        Returns:
+            Root item of the set
+        """
+        parent = self._parent
+        if item not in parent:
+            self.add(item)
+            return item
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: T, b: T) -> T:
+        """
+        Merge the sets containing ``a`` and ``b``.
+
+        Returns:
+            Root of the merged set
+        """
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self._size[root_a] < self._size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._size[root_a] += self._size.pop(root_b)
+        return root_a
+
+    def union_pairs(self, pairs: Iterable[Tuple[T, T]]) -> None:
+        """Merge the sets of every pair in ``pairs``."""
+        for a, b in pairs:
+            self.union(a, b)
+
+    def connected(self, a: T, b: T) -> bool:
+        """Check whether two items are in the same set."""
+        return self.find(a) == self.find(b)
+
+    def set_size(self, item: T) -> int:
+        """Number of items in the set containing ``item``."""
+        return self._size[self.find(item)]
+
+    def groups(self, min_size: int = 1) -> List[List[T]]:
+        """
+        Collect sets as lists, preserving item insertion order.
+
+        Args:
+            min_size: Only return sets with at least this many items
+
+        Returns:
+            List of groups, ordered by the first-inserted member of each
+        """
+        groups: Dict[T, List[T]] = {}
+        for item in self._parent:
+            groups.setdefault(self.find(item), []).append(item)
+        return [group for group in groups.values() if len(group) >= min_size]
+
+    def __len__(self) -> int:
+        """Number of registered items."""
+        return len(self._parent)
+
+    def __contains__(self, item: object) -> bool:
+        """Check whether an item has been registered."""
+        return item in self._parent
+
+
+class ClusterStats:
+    """Running similarity aggregates over the pairs linking a cluster."""
+
+    __slots__ = ("pair_count", "similarity_sum", "min_similarity", "max_similarity")
+
+    def __init__(self) -> None:
+        """Initialize empty aggregates."""
+        self.pair_count = 0
+        self.similarity_sum = 0.0
+        self.min_similarity = float("inf")
+        self.max_similarity = float("-inf")
+
+    def add(self, similarity: float) -> None:
+        """Record one similar pair."""
+        self.pair_count += 1
+        self.similarity_sum += similarity
+        if similarity < self.min_similarity:
+            self.min_similarity = similarity
+        if similarity > self.max_similarity:
+            self.max_similarity = similarity
+
+    def merge(self, other: "ClusterStats") -> None:
+        """Fold another cluster's aggregates into this one."""
+        self.pair_count += other.pair_count
+        self.similarity_sum += other.similarity_sum
+        self.min_similarity = min(self.min_similarity, other.min_similarity)
+        self.max_similarity = max(self.max_similarity, other.max_similarity)
+
+    @property
+    def mean_similarity(self) -> float:
+        """Average similarity of recorded pairs (0.0 if none)."""
+        return self.similarity_sum / self.pair_count if self.pair_count else 0.0
+
+
+class SimilarityClusters(UnionFind[T]):
+    """
+    Union-find that also aggregates pair similarities per cluster.
+
+    Each ``add_pair`` merges the two clusters and records the similarity
+    in O(α(n)), so statistics never require revisiting cluster members.
+    """
+
+    def __init__(self, items: Iterable[T] = ()):
+        """
+        Initialize the structure.
+
+        Args:
+            items: Optional items to register as singleton sets
+        """
+        self._stats: Dict[T, ClusterStats] = {}
+        super().__init__(items)
+
+    def union(self, a: T, b: T) -> T:
+        """
+        Merge the sets containing ``a`` and ``b``, combining their aggregates.
+
+        Returns:
+            Root of the merged set
+        """
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return root_a
+        root = super().union(root_a, root_b)
+        absorbed = root_b if root == root_a else root_a
+        stats = self._stats.pop(absorbed, None)
+        if stats is not None:
+            self._stats.setdefault(root, ClusterStats()).merge(stats)
+        return root
+
+    def add_pair(self, a: T, b: T, similarity: float) -> T:
+        """
+        Link two similar items and record their similarity.
+
+        Returns:
+            Root of the merged set
+        """
+        root = self.union(a, b)
+        self._stats.setdefault(root, ClusterStats()).add(similarity)
+        return root
+
+    def add_pairs(self, pairs: Iterable[Tuple[T, T, float]]) -> None:
+        """Link every (item, item, similarity) triple in ``pairs``."""
+        for a, b, similarity in pairs:
+            self.add_pair(a, b, similarity)
+
+    def stats(self, item: T) -> Optional[ClusterStats]:
+        """Aggregates of the cluster containing ``item`` (None if no pairs)."""
+        return self._stats.get(self.find(item))
+
+    def clusters(self, min_size: int = 2) -> List[Tuple[List[T], ClusterStats]]:
+        """
+        Collect clusters with their aggregates.
+
+        Args:
+            min_size: Only return clusters with at least this many items
+
+        Returns:
+            List of (members, stats), ordered by the first-inserted member
+        """
+        return [
+            (group, self._stats.get(self.find(group[0])) or ClusterStats())
+            for group in self.groups(min_size=min_size)
+        ]
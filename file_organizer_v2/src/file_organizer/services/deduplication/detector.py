@@ -5,13 +5,14 @@ Coordinates hash computation, index building, and provides high-level
 interface for duplicate detection workflows.
 """
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
 from .hasher import FileHasher, HashAlgorithm
-from .index import DuplicateIndex, FileMetadata
+from .index import DuplicateGroup, DuplicateIndex, FileMetadata
+from .scanner import ScannedFile, scan_files
 
 
 @dataclass
@@ -24,8 +25,10 @@ class ScanOptions:
     min_file_size: int = 0  # Minimum file size to consider (bytes)
     max_file_size: Optional[int] = None  # Maximum file size (None = no limit)
     file_patterns: Optional[list[str]] = None  # Glob patterns to include
-    exclude_patterns: Optional[list[str]] = None  # Glob patterns to exclude
+    exclude_patterns: Optional[list[str]] = None  # Glob patterns to exclude (prunes matching directories)
     progress_callback: Optional[Callable[[int, int], None]] = None  # (current, total)
+    # Called with each duplicate group as soon as it is complete, during the scan
+    group_callback: Optional[Callable[[DuplicateGroup], None]] = None
 
 
 class DuplicateDetector:
@@ -34,7 +37,9 @@ class DuplicateDetector:
     
     Coordinates FileHasher and DuplicateIndex to provide a complete
     duplicate detection workflow. Includes optimizations like size
-    pre-filtering to avoid unnecessary hashing.
+    pre-filtering to avoid unnecessary hashing, and hashes each inode once:
+    hardlinked paths share the hash of their first path and are not
+    counted as extra copies.
     """
     
     def __init__(
@@ -50,7 +55,8 @@ class DuplicateDetector:
             index: DuplicateIndex instance (creates new if None)
         """
         self.hasher = hasher or FileHasher()
-        self.index = index or DuplicateIndex()
+        # An empty index is falsy (len() == 0), so test for None explicitly
+        self.index = index if index is not None else DuplicateIndex()
     
     def scan_directory(
         self,
@@ -61,9 +67,9 @@ class DuplicateDetector:
         Scan a directory for duplicate files.
         
         This is the main entry point for duplicate detection. It:
-        1. Recursively finds all files in the directory
+        1. Recursively finds all files in the directory (one stat per file)
         2. Groups files by size (optimization)
-        3. Hashes only files with duplicate sizes
+        3. Hashes only files with duplicate sizes, once per inode
         4. Builds the duplicate index
         
         Args:
@@ -84,15 +90,13 @@ class DuplicateDetector:
         
         options = options or ScanOptions()
         
-        # Step 1: Find all files
-        files = self._find_files(directory, options)
+        # Steps 1 and 2: Stream files and group by size (optimization -
+        # different sizes can't be duplicates)
+        size_groups = self._group_by_size(self._find_files(directory, options), options)
         
-        if not files:
+        if not size_groups:
             return self.index
         
-        # Step 2: Group by size (optimization - different sizes can't be duplicates)
-        size_groups = self._group_by_size(files, options)
-        
         # Step 3: Hash files and build index
         self._process_files(size_groups, options)
         
@@ -102,7 +106,7 @@ class DuplicateDetector:
         self,
         directory: Path,
         options: ScanOptions
-    ) -> list[Path]:
+    ) -> Iterator[ScannedFile]:
         """
         Find all files in directory matching the criteria.
         
@@ -111,122 +115,133 @@ class DuplicateDetector:
             options: Scan options with filters
             
         Returns:
-            List of file paths matching criteria
+            Iterator of ScannedFile records (path, size, times, inode)
         """
-        files = []
-        
-        # Use rglob for recursive, glob for non-recursive
-        if options.recursive:
-            pattern = "**/*"
-        else:
-            pattern = "*"
-        
-        for path in directory.rglob(pattern) if options.recursive else directory.glob(pattern):
-            # Skip if not a file
-            if not path.is_file():
-                continue
-            
-            # Skip symlinks if requested
-            if path.is_symlink() and not options.follow_symlinks:
-                continue
-            
-            # Check file size constraints
-            try:
-                size = path.stat().st_size
-                
-                if size < options.min_file_size:
-                    continue
-                
-                if options.max_file_size is not None and size > options.max_file_size:
-                    continue
-            except (OSError, PermissionError):
-                continue
-            
-            # Check include patterns
-            if options.file_patterns:
-                if not any(path.match(pattern) for pattern in options.file_patterns):
-                    continue
-            
-            # Check exclude patterns
-            if options.exclude_patterns:
-                if any(path.match(pattern) for pattern in options.exclude_patterns):
-                    continue
-            
-            files.append(path)
-        
-        return files
+        return scan_files(
+            directory,
+            recursive=options.recursive,
+            follow_symlinks=options.follow_symlinks,
+            include=options.file_patterns,
+            exclude=options.exclude_patterns,
+            min_size=options.min_file_size,
+            max_size=options.max_file_size,
+        )
     
     def _group_by_size(
         self,
-        files: list[Path],
+        files: Iterable[ScannedFile],
         options: ScanOptions
-    ) -> dict[int, list[Path]]:
+    ) -> dict[int, list[ScannedFile]]:
         """
         Group files by size.
         
         This is an optimization - files with unique sizes cannot be duplicates,
-        so we skip hashing them.
+        so we skip hashing them. Sizes come from the scan, so no file is
+        stat-ed again.
         
         Args:
-            files: list of files to group
+            files: Scanned files to group
             options: Scan options (unused but kept for consistency)
             
         Returns:
-            Dictionary mapping file sizes to lists of files
+            Dictionary mapping file sizes to lists of scanned files
         """
-        size_groups: dict[int, list[Path]] = {}
+        size_groups: dict[int, list[ScannedFile]] = {}
         
-        for file_path in files:
-            try:
-                size = file_path.stat().st_size
-                
-                if size not in size_groups:
-                    size_groups[size] = []
-                
-                size_groups[size].append(file_path)
-            except (OSError, PermissionError):
-                # Skip files we can't access
-                continue
+        for entry in files:
+            group = size_groups.get(entry.size)
+            if group is None:
+                size_groups[entry.size] = [entry]
+            else:
+                group.append(entry)
         
         return size_groups
     
+    @staticmethod
+    def _metadata(entry: ScannedFile) -> dict:
+        """Index metadata for a scanned file."""
+        return {
+            "size": entry.size,
+            "mtime_ns": entry.mtime_ns,
+            "atime_ns": entry.atime_ns,
+            "inode": entry.inode,
+            "device": entry.device,
+            "nlink": entry.nlink,
+        }
+    
+    @staticmethod
+    def _group_by_inode(files: list[ScannedFile]) -> list[list[ScannedFile]]:
+        """
+        Group paths that are hardlinks to the same inode.
+        
+        Files without inode information (e.g. on Windows) form their own group.
+        
+        Args:
+            files: Scanned files of one size
+            
+        Returns:
+            Lists of paths, one list per distinct file on disk
+        """
+        by_inode: dict[tuple[int, int], list[ScannedFile]] = {}
+        groups: list[list[ScannedFile]] = []
+        for entry in files:
+            if not entry.inode or entry.nlink <= 1:
+                groups.append([entry])
+                continue
+            key = (entry.device, entry.inode)
+            links = by_inode.get(key)
+            if links is None:
+                links = by_inode[key] = []
+                groups.append(links)
+            links.append(entry)
+        return groups
+    
     def _process_files(
         self,
-        size_groups: dict[int, list[Path]],
+        size_groups: dict[int, list[ScannedFile]],
         options: ScanOptions
     ) -> None:
         """
         Process files by hashing and adding to index.
         
-        Only hashes files that have potential duplicates (2+ files with same size).
+        Only hashes files that have potential duplicates (2+ distinct files
+        with same size), and only one path per inode. Files of different
+        sizes cannot match, so a size group's duplicate groups are complete
+        (and passed to ``group_callback``) once that size group is hashed.
         
         Args:
-            size_groups: dictionary of size to file lists
+            size_groups: dictionary of size to scanned files
             options: Scan options including algorithm and progress callback
         """
-        # Count total files to hash (only those with potential duplicates)
-        files_to_hash = [
-            file_path
-            for files in size_groups.values()
-            if len(files) > 1  # Only hash if there are potential duplicates
-            for file_path in files
-        ]
+        inode_groups = {
+            size: self._group_by_inode(files) if len(files) > 1 else [files]
+            for size, files in size_groups.items()
+        }
         
-        total = len(files_to_hash)
+        # Count total inodes to hash (only those with potential duplicates)
+        total = sum(
+            len(groups)
+            for groups in inode_groups.values()
+            if len(groups) > 1  # Only hash if there are potential duplicates
+        )
         processed = 0
         
         # Process each size group
-        for size, files in size_groups.items():
-            # Optimization: skip groups with only one file
-            if len(files) == 1:
+        for size, groups in inode_groups.items():
+            # Optimization: skip groups with only one distinct file
+            if len(groups) == 1:
                 # Still add to index for completeness
-                file_path = files[0]
-                # Give it a unique "hash" since we're not computing it
-                self.index.add_file(file_path, f"unique_{size}_{file_path}")
+                for entry in groups[0]:
+                    # Give it a unique "hash" since we're not computing it
+                    self.index.add_file(
+                        entry.path, f"unique_{size}_{entry.path}", self._metadata(entry)
+                    )
                 continue
             
-            # Hash files in this size group
-            for file_path in files:
+            # Hash one path per inode in this size group
+            hashes: dict[str, None] = {}
+            for links in groups:
+                file_path = links[0].path
                 try:
                     # Compute hash
                     file_hash = self.hasher.compute_hash(
@@ -234,8 +249,10 @@ class DuplicateDetector:
                         options.algorithm
                     )
                     
-                    # Add to index
-                    self.index.add_file(file_path, file_hash)
+                    # Add every link to the index under the same hash
+                    for entry in links:
+                        self.index.add_file(entry.path, file_hash, self._metadata(entry))
+                    hashes[file_hash] = None
                     
                     processed += 1
                     
@@ -247,6 +264,12 @@ class DuplicateDetector:
                     # Log error but continue
                     print(f"Warning: Could not process {file_path}: {e}")
                     continue
+            
+            if options.group_callback:
+                for file_hash in hashes:
+                    group = DuplicateGroup(file_hash, self.index.get_files_by_hash(file_hash))
+                    if group.copies > 1:
+                        options.group_callback(group)
     
     def find_duplicates_of_file(
         self,
@@ -5,14 +5,17 @@ Integrates text extraction, embedding, and semantic similarity analysis
 for finding duplicate and similar documents.
 """
 
+from collections.abc import Iterable
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Literal, Optional, Tuple
 import logging
 
 from .extractor import DocumentExtractor
-from .embedder import DocumentEmbedder
+from .embedder import DocumentEmbedder, HashingDocumentEmbedder
 from .semantic import SemanticAnalyzer
 
+EmbeddingMethod = Literal["tfidf", "hashing"]
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,7 +33,11 @@ class DocumentDeduplicator:
     def __init__(
         self,
         similarity_threshold: float = 0.85,
-        max_features: int = 5000
+        max_features: int = 5000,
+        approximate: bool = False,
+        embedding_method: EmbeddingMethod = "tfidf",
+        max_workers: Optional[int] = None,
+        batch_size: int = 256
     ):
         """
         Initialize document deduplicator.
@@ -38,10 +45,28 @@ class DocumentDeduplicator:
         Args:
             similarity_threshold: Minimum similarity to consider duplicates
             max_features: Maximum TF-IDF features
+            approximate: Use LSH candidate generation instead of comparing
+                        every pair (faster on large collections, may miss a
+                        small fraction of pairs near the threshold)
+            embedding_method: "tfidf" fits a vocabulary once all text is
+                             extracted; "hashing" vectorizes documents in
+                             batches while extraction is still running
+            max_workers: Extraction worker processes (None = CPU count)
+            batch_size: Documents per vectorization batch ("hashing" only)
         """
+        if embedding_method not in ("tfidf", "hashing"):
+            raise ValueError(
+                f"Unsupported embedding method: {embedding_method}. "
+                f"Use 'tfidf' or 'hashing'."
+            )
+
         self.extractor = DocumentExtractor()
         self.embedder = DocumentEmbedder(max_features=max_features)
         self.analyzer = SemanticAnalyzer(threshold=similarity_threshold)
+        self.approximate = approximate
+        self.embedding_method = embedding_method
+        self.max_workers = max_workers
+        self.batch_size = batch_size
 
         logger.info(
             f"DocumentDeduplicator initialized: "
@@ -73,38 +98,44 @@ class DocumentDeduplicator:
 
         logger.info(f"Analyzing {len(supported_files)} supported documents")
 
-        # Extract text
-        extracted_texts = self.extractor.extract_batch(supported_files)
+        # Extract text, streaming results as workers finish
+        extracted = self._filter_texts(
+            self.extractor.iter_extract(supported_files, max_workers=self.max_workers),
+            min_text_length
+        )
 
-        # Filter by minimum length
-        valid_docs = {}
-        valid_paths = []
+        if self.embedding_method == "hashing":
+            valid_paths, embeddings = self._embed_streaming(extracted)
+        else:
+            valid_docs = dict(extracted)
+            valid_paths = list(valid_docs)
+            embeddings = None
 
-        for path, text in extracted_texts.items():
-            if len(text) >= min_text_length:
-                valid_docs[path] = text
-                valid_paths.append(path)
-            else:
-                logger.debug(f"Skipping {path.name}: text too short ({len(text)} chars)")
+        # Restore input order (extraction completes out of order)
+        position = {path: i for i, path in enumerate(supported_files)}
+        order = sorted(range(len(valid_paths)), key=lambda i: position[valid_paths[i]])
+        valid_paths = [valid_paths[i] for i in order]
 
-        logger.info(f"{len(valid_docs)} documents have sufficient text")
+        logger.info(f"{len(valid_paths)} documents have sufficient text")
 
-        if len(valid_docs) < 2:
+        if len(valid_paths) < 2:
             logger.warning("Not enough valid documents for comparison")
             return {
                 'duplicate_groups': [],
                 'total_documents': len(file_paths),
-                'analyzed_documents': len(valid_docs),
+                'analyzed_documents': len(valid_paths),
                 'space_wasted': 0
             }
 
         # Generate embeddings
-        texts = [valid_docs[p] for p in valid_paths]
-        embeddings = self.embedder.fit_transform(texts)
+        if embeddings is None:
+            embeddings = self.embedder.fit_transform([valid_docs[p] for p in valid_paths])
+        else:
+            embeddings = embeddings[order]
 
         # Find similar documents
         duplicate_groups = self.analyzer.get_duplicate_groups(
-            embeddings, valid_paths
+            embeddings, valid_paths, approximate=self.approximate
         )
 
         # Calculate space wasted
@@ -113,7 +144,7 @@ class DocumentDeduplicator:
         results = {
             'duplicate_groups': duplicate_groups,
             'total_documents': len(file_paths),
-            'analyzed_documents': len(valid_docs),
+            'analyzed_documents': len(valid_paths),
             'space_wasted': space_wasted,
             'num_groups': len(duplicate_groups)
         }
@@ -125,6 +156,41 @@ class DocumentDeduplicator:
 
         return results
 
+    @staticmethod
+    def _filter_texts(
+        extracted: Iterable[Tuple[Path, str]],
+        min_text_length: int
+    ) -> Iterable[Tuple[Path, str]]:
+        """Drop documents whose text is shorter than ``min_text_length``."""
+        for path, text in extracted:
+            if len(text) >= min_text_length:
+                yield path, text
+            else:
+                logger.debug(f"Skipping {path.name}: text too short ({len(text)} chars)")
+
+    def _embed_streaming(
+        self,
+        extracted: Iterable[Tuple[Path, str]]
+    ) -> Tuple[List[Path], Any]:
+        """
+        Vectorize documents in mini-batches as they arrive.
+
+        Returns:
+            (paths, sparse TF-IDF matrix) in arrival order
+        """
+        paths: List[Path] = []
+
+        def texts() -> Iterable[str]:
+            for path, text in extracted:
+                paths.append(path)
+                yield text
+
+        embedder = HashingDocumentEmbedder(
+            ngram_range=self.embedder.ngram_range, batch_size=self.batch_size
+        )
+        embeddings = embedder.fit_transform_stream(texts())
+        return paths, embeddings
+
     def compare_documents(
         self,
         doc1_path: Path,
@@ -173,15 +239,10 @@ class DocumentDeduplicator:
         wasted = 0
 
         for group in duplicate_groups:
-            # Assume keeping first file, rest are wasted
-            files = [Path(f) for f in group['files']]
-            if len(files) > 1:
-                sizes = [
-                    f.stat().st_size for f in files if f.exists()
-                ]
-                if sizes:
-                    # Wasted = (count - 1) * avg_size
-                    avg_size = sum(sizes) / len(sizes)
-                    wasted += int((len(files) - 1) * avg_size)
+            # Assume keeping one file, rest are wasted
+            count = group['count']
+            if count > 1:
+                # Wasted = (count - 1) * avg_size, from sizes looked up once
+                wasted += int(group['total_size'] * (count - 1) / count)
 
         return wasted
@@ -2,23 +2,75 @@
 Document embedding module using TF-IDF vectorization.
 
 Converts text documents into numerical vectors for similarity comparison.
+Batch embeddings are returned as sparse CSR matrices of float32, since
+TF-IDF rows are almost entirely zeros.
+
+DocumentEmbedder fits a vocabulary on the whole corpus; HashingDocumentEmbedder
+uses a fixed hashed feature space with incrementally updated IDF, for
+corpora that arrive in batches or keep growing.
 """
 
-from typing import List, Dict, Optional, Tuple
+from collections.abc import Iterable
+from typing import Any, List, Dict, Optional, Tuple
 from pathlib import Path
+import hashlib
 import numpy as np
 import logging
 import pickle
 
+import scipy.sparse as sp
+
+from .embedding_cache import EmbeddingCache
+
 logger = logging.getLogger(__name__)
 
+# Embedding dtype (halves memory compared to scikit-learn's float64 default)
+EMBEDDING_DTYPE = np.float32
+
+
+def matrix_statistics(matrix: Any) -> Dict[str, Any]:
+    """
+    Describe the size and sparsity of an embedding matrix.
+
+    Args:
+        matrix: Sparse (scipy) or dense embedding matrix
+
+    Returns:
+        Dictionary with n_documents, n_features, nnz, density,
+        memory_bytes and dense_memory_bytes (footprint if densified)
+    """
+    n_documents, n_features = matrix.shape if matrix.ndim == 2 else (0, 0)
+    cells = n_documents * n_features
+    dense_bytes = cells * matrix.dtype.itemsize
+
+    if hasattr(matrix, "nnz"):
+        nnz = int(matrix.nnz)
+        memory_bytes = sum(
+            getattr(matrix, attr).nbytes
+            for attr in ("data", "indices", "indptr")
+            if hasattr(matrix, attr)
+        )
+    else:
+        nnz = int(np.count_nonzero(matrix))
+        memory_bytes = matrix.nbytes
+
+    return {
+        "n_documents": n_documents,
+        "n_features": n_features,
+        "nnz": nnz,
+        "density": nnz / cells if cells else 0.0,
+        "memory_bytes": memory_bytes,
+        "dense_memory_bytes": dense_bytes,
+    }
+
 
 class DocumentEmbedder:
     """
     Embeds documents using TF-IDF vectorization.
 
     Uses scikit-learn's TfidfVectorizer for efficient text vectorization.
-    Supports caching for performance optimization.
+    Transformed embeddings are cached per document content and vectorizer
+    state (see EmbeddingCache).
     """
 
     def __init__(
@@ -27,7 +79,8 @@ class DocumentEmbedder:
         ngram_range: Tuple[int, int] = (1, 2),
         min_df: int = 1,
         max_df: float = 0.95,
-        cache_path: Optional[Path] = None
+        cache_path: Optional[Path] = None,
+        cache_size: int = 100_000
     ):
         """
         Initialize the document embedder.
@@ -37,7 +90,8 @@ class DocumentEmbedder:
             ngram_range: Range of n-grams to consider (e.g., (1,2) for unigrams and bigrams)
             min_df: Minimum document frequency for terms
             max_df: Maximum document frequency (ignore terms appearing in >max_df of documents)
-            cache_path: Path to cache embeddings (optional)
+            cache_path: SQLite file to persist cached embeddings (optional)
+            cache_size: Maximum number of cached embeddings
         """
         try:
             from sklearn.feature_extraction.text import TfidfVectorizer
@@ -49,7 +103,8 @@ class DocumentEmbedder:
                 max_df=max_df,
                 stop_words='english',
                 lowercase=True,
-                strip_accents='unicode'
+                strip_accents='unicode',
+                dtype=EMBEDDING_DTYPE
             )
 
         except ImportError:
@@ -62,20 +117,17 @@ class DocumentEmbedder:
         self.ngram_range = ngram_range
         self.cache_path = cache_path
         self.is_fitted = False
+        self.last_matrix_stats: Dict[str, Any] = {}
 
-        # Cache for embeddings {document_hash: embedding}
-        self.embedding_cache: Dict[str, np.ndarray] = {}
-
-        # Load cache if available
-        if cache_path and cache_path.exists():
-            self._load_cache()
+        # Embeddings keyed by document hash + vectorizer fingerprint
+        self.embedding_cache = EmbeddingCache(cache_path, max_entries=cache_size)
 
         logger.info(
             f"DocumentEmbedder initialized: max_features={max_features}, "
             f"ngram_range={ngram_range}"
         )
 
-    def fit_transform(self, documents: List[str]) -> np.ndarray:
+    def fit_transform(self, documents: List[str]) -> Any:
         """
         Fit the vectorizer and transform documents to embeddings.
 
@@ -83,7 +135,8 @@ class DocumentEmbedder:
             documents: List of document texts
 
         Returns:
-            Matrix of document embeddings (n_documents x n_features)
+            Sparse CSR matrix of float32 document embeddings
+            (n_documents x n_features)
         """
         if not documents:
             logger.warning("Empty document list provided")
@@ -92,19 +145,19 @@ class DocumentEmbedder:
         logger.info(f"Fitting vectorizer on {len(documents)} documents")
 
         try:
-            # Fit and transform
-            embeddings = self.vectorizer.fit_transform(documents)
-            self.is_fitted = True
-
-            # Convert to dense array for easier manipulation
-            dense_embeddings = embeddings.toarray()
+            # Fit and transform (kept sparse: TF-IDF rows are mostly zeros)
+            embeddings = self.vectorizer.fit_transform(documents).tocsr()
+            self._mark_fitted()
 
+            self.last_matrix_stats = matrix_statistics(embeddings)
             logger.info(
-                f"Generated embeddings: shape={dense_embeddings.shape}, "
-                f"vocabulary_size={len(self.vectorizer.vocabulary_)}"
+                f"Generated embeddings: shape={embeddings.shape}, "
+                f"vocabulary_size={len(self.vectorizer.vocabulary_)}, "
+                f"density={self.last_matrix_stats['density']:.4f}, "
+                f"memory={self.last_matrix_stats['memory_bytes'] / (1024 * 1024):.2f}MB"
             )
 
-            return dense_embeddings
+            return embeddings
 
         except Exception as e:
             logger.error(f"Error during fit_transform: {e}")
@@ -118,7 +171,7 @@ class DocumentEmbedder:
             document: Document text
 
         Returns:
-            Document embedding vector
+            Dense float32 document embedding vector
 
         Raises:
             RuntimeError: If vectorizer not fitted
@@ -128,41 +181,82 @@ class DocumentEmbedder:
                 "Vectorizer not fitted. Call fit_transform() from e first."
             )
 
-        # Check cache
-        doc_hash = self._hash_document(document)
-        if doc_hash in self.embedding_cache:
-            logger.debug(f"Cache hit for document (hash={doc_hash[:8]})")
-            return self.embedding_cache[doc_hash]
-
-        # Transform
-        embedding = self.vectorizer.transform([document]).toarray()[0]
-
-        # Cache the embedding
-        self.embedding_cache[doc_hash] = embedding
+        return self.transform_batch([document]).toarray()[0]
 
-        return embedding
-
-    def transform_batch(self, documents: List[str]) -> np.ndarray:
+    def transform_batch(self, documents: List[str]) -> Any:
         """
         Transform multiple documents to embeddings.
 
+        Cached embeddings are reused; only uncached documents are vectorized.
+
         Args:
             documents: List of document texts
 
         Returns:
-            Matrix of embeddings
+            Sparse CSR matrix of float32 embeddings
         """
         if not self.is_fitted:
             raise RuntimeError(
                 "Vectorizer not fitted. Call fit_transform() first."
             )
 
-        embeddings = self.vectorizer.transform(documents).toarray()
-
-        logger.debug(f"Transformed {len(documents)} documents")
+        hashes = [self._hash_document(doc) for doc in documents]
+        cached = self.embedding_cache.get_many(hashes)
+
+        missing = [i for i, h in enumerate(hashes) if h not in cached]
+        if missing:
+            computed = self.vectorizer.transform([documents[i] for i in missing]).tocsr()
+            fresh = {hashes[i]: computed[row] for row, i in enumerate(missing)}
+            self.embedding_cache.put_many(fresh)
+            cached.update(fresh)
+
+        n_features = len(self.vectorizer.vocabulary_)
+        if documents:
+            embeddings = sp.vstack([cached[h] for h in hashes], format="csr")
+        else:
+            embeddings = sp.csr_matrix((0, n_features), dtype=EMBEDDING_DTYPE)
+        self.last_matrix_stats = matrix_statistics(embeddings)
+
+        logger.debug(
+            f"Transformed {len(documents)} documents "
+            f"({len(documents) - len(missing)} from cache)"
+        )
 
         return embeddings
 
+    def fingerprint(self) -> str:
+        """
+        Identify the fitted vectorizer state.
+
+        Covers the vectorizer parameters, vocabulary and IDF weights, so any
+        refit that changes the output produces a different fingerprint.
+
+        Returns:
+            Hex SHA-256 digest
+
+        Raises:
+            RuntimeError: If vectorizer not fitted
+        """
+        if not self.is_fitted:
+            raise RuntimeError(
+                "Vectorizer not fitted. Call fit_transform() first."
+            )
+
+        digest = hashlib.sha256()
+        params = self.vectorizer.get_params()
+        digest.update(repr(sorted((k, repr(v)) for k, v in params.items())).encode())
+        for term, index in sorted(self.vectorizer.vocabulary_.items()):
+            digest.update(f"{term}\0{index}\0".encode())
+        idf = getattr(self.vectorizer, "idf_", None)
+        if idf is not None:
+            digest.update(np.asarray(idf, dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def _mark_fitted(self) -> None:
+        """Record a (re)fitted vectorizer and invalidate stale cached embeddings."""
+        self.is_fitted = True
+        self.embedding_cache.set_fingerprint(self.fingerprint())
+
     def get_feature_names(self) -> List[str]:
         """
         Get the feature names (vocabulary terms).
@@ -201,14 +295,14 @@ class DocumentEmbedder:
 
     def get_top_terms(
         self,
-        embedding: np.ndarray,
+        embedding: Any,
         top_n: int = 10
     ) -> List[Tuple[str, float]]:
         """
         Get top N terms from an embedding by weight.
 
         Args:
-            embedding: Document embedding vector
+            embedding: Document embedding vector (dense, or a sparse 1-row matrix)
             top_n: Number of top terms to return
 
         Returns:
@@ -219,6 +313,10 @@ class DocumentEmbedder:
                 "Vectorizer not fitted. Call fit_transform() first."
             )
 
+        if hasattr(embedding, "toarray"):
+            embedding = embedding.toarray()
+        embedding = np.asarray(embedding).ravel()
+
         # Get feature names
         feature_names = self.get_feature_names()
 
@@ -265,7 +363,7 @@ class DocumentEmbedder:
             with open(path, 'rb') as f:
                 self.vectorizer = pickle.load(f)
 
-            self.is_fitted = True
+            self._mark_fitted()
             logger.info(f"Loaded vectorizer from {path}")
 
         except Exception as e:
@@ -274,44 +372,227 @@ class DocumentEmbedder:
 
     def clear_cache(self) -> None:
         """Clear the embedding cache."""
-        cache_size = len(self.embedding_cache)
-        self.embedding_cache.clear()
+        cache_size = self.embedding_cache.clear()
         logger.info(f"Cleared {cache_size} cached embeddings")
 
+    def close(self) -> None:
+        """Close the embedding cache."""
+        self.embedding_cache.close()
+
     def _hash_document(self, document: str) -> str:
         """Generate hash for a document."""
-        import hashlib
         return hashlib.sha256(document.encode()).hexdigest()
 
-    def _save_cache(self) -> None:
-        """Save embedding cache to disk."""
-        if not self.cache_path:
-            return
 
+class HashingDocumentEmbedder:
+    """
+    Streaming TF-IDF embedder over a fixed hashed feature space.
+
+    Terms are mapped to ``n_features`` columns by scikit-learn's stateless
+    HashingVectorizer, so no vocabulary has to be fitted and embeddings
+    keep the same dimensions as the corpus grows. Document frequencies are
+    accumulated incrementally with ``partial_fit``; IDF weights use the
+    same smoothed formula as TfidfTransformer.
+    """
+
+    def __init__(
+        self,
+        n_features: int = 2 ** 18,
+        ngram_range: Tuple[int, int] = (1, 2),
+        batch_size: int = 256
+    ):
+        """
+        Initialize the embedder.
+
+        Args:
+            n_features: Number of hashed feature columns
+            ngram_range: Range of n-grams to consider
+            batch_size: Documents per mini-batch when consuming a stream
+        """
         try:
-            with open(self.cache_path, 'wb') as f:
-                pickle.dump(self.embedding_cache, f)
+            from sklearn.feature_extraction.text import HashingVectorizer
 
-            logger.debug(f"Saved {len(self.embedding_cache)} embeddings to cache")
+            self.vectorizer = HashingVectorizer(
+                n_features=n_features,
+                ngram_range=ngram_range,
+                stop_words='english',
+                lowercase=True,
+                strip_accents='unicode',
+                alternate_sign=False,
+                norm=None,
+                dtype=EMBEDDING_DTYPE
+            )
 
-        except Exception as e:
-            logger.error(f"Error saving cache: {e}")
+        except ImportError:
+            raise ImportError(
+                "scikit-learn is required for document embedding. "
+                "Install with: pip install scikit-learn>=1.4.0"
+            )
 
-    def _load_cache(self) -> None:
-        """Load embedding cache from disk."""
-        if not self.cache_path or not self.cache_path.exists():
-            return
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.batch_size = batch_size
+        self.n_documents = 0
+        self.document_frequency = np.zeros(n_features, dtype=np.int64)
+        self.last_matrix_stats: Dict[str, Any] = {}
 
-        try:
-            with open(self.cache_path, 'rb') as f:
-                self.embedding_cache = pickle.load(f)
+        logger.info(
+            f"HashingDocumentEmbedder initialized: n_features={n_features}, "
+            f"ngram_range={ngram_range}"
+        )
+
+    def count(self, documents: List[str]) -> Any:
+        """
+        Hashed raw term counts.
 
-            logger.info(f"Loaded {len(self.embedding_cache)} embeddings from cache")
+        Args:
+            documents: List of document texts
 
-        except Exception as e:
-            logger.error(f"Error loading cache: {e}")
+        Returns:
+            Sparse CSR matrix of float32 counts (n_documents x n_features)
+        """
+        return self.vectorizer.transform(documents).tocsr()
+
+    def partial_fit(self, documents: List[str]) -> "HashingDocumentEmbedder":
+        """
+        Update document frequencies with a batch of documents.
+
+        Args:
+            documents: List of document texts
+
+        Returns:
+            self
+        """
+        self.partial_fit_counts(self.count(documents))
+        return self
+
+    def partial_fit_counts(self, counts: Any) -> None:
+        """Update document frequencies from a count matrix produced by ``count``."""
+        counts = sp.csr_matrix(counts)
+        counts.sum_duplicates()
+        self.document_frequency += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents += counts.shape[0]
+
+    @property
+    def idf(self) -> np.ndarray:
+        """Smoothed inverse document frequencies: ln((1 + n) / (1 + df)) + 1."""
+        return (
+            np.log((1.0 + self.n_documents) / (1.0 + self.document_frequency)) + 1.0
+        ).astype(EMBEDDING_DTYPE)
+
+    def weight(self, counts: Any) -> Any:
+        """
+        Apply the current IDF weights to counts and L2-normalize rows.
+
+        Args:
+            counts: Count matrix produced by ``count``
+
+        Returns:
+            Sparse CSR matrix of float32 embeddings
+        """
+        from sklearn.preprocessing import normalize
+
+        weighted = sp.csr_matrix(counts, dtype=EMBEDDING_DTYPE) @ sp.diags(self.idf)
+        embeddings = normalize(weighted.tocsr(), norm="l2", copy=False)
+        self.last_matrix_stats = matrix_statistics(embeddings)
+        return embeddings
+
+    def transform(self, documents: List[str]) -> Any:
+        """
+        Embed documents with the current IDF statistics (no update).
+
+        Args:
+            documents: List of document texts
 
-    def __del__(self):
-        """Cleanup: save cache on destruction."""
-        if self.cache_path and self.embedding_cache:
-            self._save_cache()
+        Returns:
+            Sparse CSR matrix of float32 embeddings
+        """
+        return self.weight(self.count(documents))
+
+    def partial_fit_transform(self, documents: List[str]) -> Any:
+        """Update statistics with a batch, then embed it."""
+        counts = self.count(documents)
+        self.partial_fit_counts(counts)
+        return self.weight(counts)
+
+    def fit_transform_stream(self, documents: Iterable[str]) -> Any:
+        """
+        Consume documents in mini-batches and embed them all.
+
+        Counts are computed batch by batch as documents arrive; IDF weights
+        are applied once the stream is exhausted, so every row uses the same
+        statistics.
+
+        Args:
+            documents: Iterable of document texts
+
+        Returns:
+            Sparse CSR matrix of float32 embeddings, in stream order
+        """
+        batches = []
+        pending: List[str] = []
+        for document in documents:
+            pending.append(document)
+            if len(pending) >= self.batch_size:
+                batches.append(self.count(pending))
+                self.partial_fit_counts(batches[-1])
+                pending = []
+        if pending:
+            batches.append(self.count(pending))
+            self.partial_fit_counts(batches[-1])
+
+        if not batches:
+            return sp.csr_matrix((0, self.n_features), dtype=EMBEDDING_DTYPE)
+
+        embeddings = self.weight(sp.vstack(batches, format="csr"))
+        logger.info(
+            f"Embedded {embeddings.shape[0]} streamed documents "
+            f"(corpus size {self.n_documents})"
+        )
+        return embeddings
+
+    def fingerprint(self) -> str:
+        """
+        Identify the feature space (hashing parameters).
+
+        IDF statistics are excluded: they drift as documents are added while
+        the columns keep their meaning.
+        """
+        params = self.vectorizer.get_params()
+        return hashlib.sha256(
+            repr(sorted((k, repr(v)) for k, v in params.items())).encode()
+        ).hexdigest()
+
+    def save_state(self, path: Path) -> None:
+        """
+        Save document-frequency statistics to disk.
+
+        Args:
+            path: Destination ``.npz`` file
+        """
+        np.savez_compressed(
+            path,
+            document_frequency=self.document_frequency,
+            n_documents=np.int64(self.n_documents),
+            fingerprint=np.array(self.fingerprint()),
+        )
+        logger.info(f"Saved hashing embedder state ({self.n_documents} documents) to {path}")
+
+    def load_state(self, path: Path) -> None:
+        """
+        Load document-frequency statistics saved by ``save_state``.
+
+        Args:
+            path: Source ``.npz`` file
+
+        Raises:
+            ValueError: If the state was saved with different hashing parameters
+        """
+        with np.load(path, allow_pickle=False) as state:
+            if str(state["fingerprint"]) != self.fingerprint():
+                raise ValueError(
+                    f"Embedder state at {path} was saved with different hashing parameters"
+                )
+            self.document_frequency = state["document_frequency"].astype(np.int64)
+            self.n_documents = int(state["n_documents"])
+        logger.info(f"Loaded hashing embedder state ({self.n_documents} documents)")
@@ -0,0 +1,307 @@
+"""
+Bounded, versioned cache of document embeddings.
+
+Embeddings are stored as sparse float32 rows in SQLite blobs, keyed by the
+document's content hash and a fingerprint of the vectorizer that produced
+them. Nothing is loaded up front: rows are read on demand and the most
+recently used ones are kept in a small in-memory LRU. The on-disk store is
+capped at ``max_entries`` and the least recently used rows are evicted.
+
+When the vectorizer is refitted its fingerprint changes, and rows written
+under any other fingerprint are dropped, so a vocabulary change can never
+return stale vectors.
+"""
+
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+logger = logging.getLogger(__name__)
+
+# Keys per "doc_hash IN (...)" lookup (well under SQLite's variable limit)
+_LOOKUP_BATCH = 500
+
+# Pickle protocols 2-5 start with the PROTO opcode and the protocol number
+_PICKLE_PROTOCOLS = {bytes([0x80, version]) for version in range(2, 6)}
+
+
+def _is_legacy_pickle(path: Path) -> bool:
+    """Whether ``path`` looks like the pickle file older versions cached to."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(2) in _PICKLE_PROTOCOLS
+    except OSError:
+        return False
+
+
+class EmbeddingCache:
+    """LRU cache of sparse embedding rows, optionally persisted in SQLite."""
+
+    SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS embeddings (
+        doc_hash TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        n_features INTEGER NOT NULL,
+        indices BLOB NOT NULL,
+        data BLOB NOT NULL,
+        last_used INTEGER NOT NULL,
+        PRIMARY KEY (doc_hash, fingerprint)
+    ) WITHOUT ROWID;
+
+    CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used);
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        max_entries: int = 100_000,
+        memory_entries: int = 1024
+    ):
+        """
+        Open (or create) an embedding cache.
+
+        Args:
+            db_path: SQLite file for a persistent cache (None = memory only)
+            max_entries: Maximum number of stored embeddings
+            memory_entries: Embeddings kept in the in-memory LRU
+        """
+        if max_entries < 1 or memory_entries < 0:
+            raise ValueError("max_entries must be positive and memory_entries non-negative")
+
+        self.db_path = Path(db_path) if db_path is not None else None
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries if self.db_path else max_entries
+        self.fingerprint: Optional[str] = None
+
+        self._lock = Lock()
+        self._memory: "OrderedDict[Tuple[str, str], sp.csr_matrix]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Rows in the database, kept up to date so eviction needs no COUNT(*)
+        self._stored = 0
+        if self.db_path is not None:
+            self._conn = self._connect(self.db_path)
+            self._stored = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @classmethod
+    def _connect(cls, db_path: Path) -> sqlite3.Connection:
+        """
+        Open the database, replacing a legacy pickle cache at the same path.
+
+        Raises:
+            sqlite3.DatabaseError: If the file is neither SQLite nor a pickle cache
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.DatabaseError:
+            conn.close()
+            if not _is_legacy_pickle(db_path):
+                raise
+            logger.warning(f"Replacing legacy pickle embedding cache at {db_path}")
+            db_path.unlink()
+            conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(cls.SCHEMA_SQL)
+        conn.commit()
+        return conn
+
+    def set_fingerprint(self, fingerprint: str) -> None:
+        """
+        Switch to a vectorizer fingerprint, dropping entries from other ones.
+
+        Args:
+            fingerprint: Identifier of the current vectorizer state
+        """
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return
+            self.fingerprint = fingerprint
+            self._memory.clear()
+            if self._conn is not None:
+                with self._conn:
+                    cursor = self._conn.execute(
+                        "DELETE FROM embeddings WHERE fingerprint != ?", (fingerprint,)
+                    )
+                self._stored -= cursor.rowcount
+                if cursor.rowcount:
+                    logger.info(f"Invalidated {cursor.rowcount} cached embeddings")
+
+    def get(self, doc_hash: str) -> Optional[sp.csr_matrix]:
+        """Cached 1-row embedding for ``doc_hash`` under the current fingerprint."""
+        return self.get_many([doc_hash]).get(doc_hash)
+
+    def get_many(self, doc_hashes: Iterable[str]) -> Dict[str, sp.csr_matrix]:
+        """
+        Look up several embeddings.
+
+        Args:
+            doc_hashes: Document content hashes
+
+        Returns:
+            Mapping of hash to 1-row CSR embedding for the hashes found
+        """
+        found: Dict[str, sp.csr_matrix] = {}
+        if self.fingerprint is None:
+            return found
+
+        with self._lock:
+            touched = []
+            for doc_hash in doc_hashes:
+                key = (doc_hash, self.fingerprint)
+                row = self._memory.get(key)
+                if row is not None:
+                    self._memory.move_to_end(key)
+                    found[doc_hash] = row
+                    continue
+                if self._conn is None:
+                    continue
+                stored = self._conn.execute(
+                    "SELECT n_features, indices, data FROM embeddings "
+                    "WHERE doc_hash = ? AND fingerprint = ?",
+                    key,
+                ).fetchone()
+                if stored is None:
+                    continue
+                row = self._decode(*stored)
+                self._remember(key, row)
+                found[doc_hash] = row
+                touched.append(key)
+
+            if touched:
+                now = time.time_ns()
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? "
+                        "WHERE doc_hash = ? AND fingerprint = ?",
+                        [(now, h, f) for h, f in touched],
+                    )
+        return found
+
+    def put(self, doc_hash: str, embedding: sp.csr_matrix) -> None:
+        """Store a 1-row embedding under the current fingerprint."""
+        self.put_many({doc_hash: embedding})
+
+    def put_many(self, embeddings: Dict[str, sp.csr_matrix]) -> None:
+        """
+        Store several 1-row embeddings under the current fingerprint.
+
+        Args:
+            embeddings: Mapping of document hash to 1-row embedding
+
+        Raises:
+            RuntimeError: If no fingerprint has been set
+        """
+        if self.fingerprint is None:
+            raise RuntimeError("Set a vectorizer fingerprint before caching embeddings")
+        if not embeddings:
+            return
+
+        with self._lock:
+            rows = []
+            now = time.time_ns()
+            for doc_hash, embedding in embeddings.items():
+                row = sp.csr_matrix(embedding, dtype=np.float32)
+                key = (doc_hash, self.fingerprint)
+                self._remember(key, row)
+                rows.append((
+                    doc_hash, self.fingerprint, row.shape[1],
+                    row.indices.astype(np.int32).tobytes(),
+                    row.data.tobytes(),
+                    now,
+                ))
+
+            if self._conn is not None:
+                with self._conn:
+                    replaced = self._count_stored(list(embeddings))
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings "
+                        "(doc_hash, fingerprint, n_features, indices, data, last_used) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    self._stored += len(rows) - replaced
+                    self._evict()
+
+    def _count_stored(self, doc_hashes: List[str]) -> int:
+        """Number of ``doc_hashes`` already stored under the current fingerprint."""
+        found = 0
+        for start in range(0, len(doc_hashes), _LOOKUP_BATCH):
+            batch = doc_hashes[start:start + _LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            found += self._conn.execute(
+                f"SELECT COUNT(*) FROM embeddings "
+                f"WHERE fingerprint = ? AND doc_hash IN ({placeholders})",
+                [self.fingerprint, *batch],
+            ).fetchone()[0]
+        return found
+
+    def _remember(self, key: Tuple[str, str], row: sp.csr_matrix) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entries."""
+        if self.memory_entries == 0:
+            return
+        self._memory[key] = row
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        """Delete least recently used rows beyond ``max_entries``."""
+        excess = self._stored - self.max_entries
+        if excess > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM embeddings WHERE (doc_hash, fingerprint) IN ("
+                "SELECT doc_hash, fingerprint FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self._stored -= cursor.rowcount
+            logger.debug(f"Evicted {cursor.rowcount} cached embeddings")
+
+    @staticmethod
+    def _decode(n_features: int, indices: bytes, data: bytes) -> sp.csr_matrix:
+        """Rebuild a 1-row CSR matrix from stored blobs."""
+        indices_arr = np.frombuffer(indices, dtype=np.int32)
+        data_arr = np.frombuffer(data, dtype=np.float32)
+        return sp.csr_matrix(
+            (data_arr, indices_arr, np.array([0, len(indices_arr)])),
+            shape=(1, n_features),
+        )
+
+    def clear(self) -> int:
+        """
+        Remove all cached embeddings.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            removed = len(self._memory)
+            self._memory.clear()
+            if self._conn is not None:
+                with self._conn:
+                    removed = self._conn.execute("DELETE FROM embeddings").rowcount
+                self._stored = 0
+        return removed
+
+    def __len__(self) -> int:
+        """Number of cached embeddings."""
+        with self._lock:
+            if self._conn is None:
+                return len(self._memory)
+            return self._stored
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
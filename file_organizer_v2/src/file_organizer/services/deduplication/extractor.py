@@ -3,14 +3,52 @@ Document text extraction module.
 
 Extracts text content from various document formats for semantic analysis.
 Supports PDF, DOCX, TXT, RTF, ODT and other common document formats.
+
+Batches are extracted across a process pool and streamed back as each file
+finishes, with a per-file timeout so one pathological document cannot stall
+the run.
 """
 
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Type
 import logging
+import os
+import time
 
 logger = logging.getLogger(__name__)
 
+# Seconds a single document may take before it is abandoned
+DEFAULT_EXTRACT_TIMEOUT = 60.0
+
+# Below this many files per worker a pool costs more than it saves
+MIN_FILES_PER_WORKER = 4
+
+# Per-process extractor instances (populated lazily in each worker)
+_extractors: Dict[type, "DocumentExtractor"] = {}
+
+
+def _extract_worker(args: Tuple[Type["DocumentExtractor"], str]) -> str:
+    """Process-pool entry point (must be module-level to be picklable)."""
+    extractor_class, path_str = args
+    extractor = _extractors.get(extractor_class)
+    if extractor is None:
+        extractor = _extractors[extractor_class] = extractor_class()
+    return extractor.extract_text(Path(path_str))
+
+
+def _terminate_pool(pool: ProcessPoolExecutor) -> None:
+    """Shut a pool down without waiting for stuck workers."""
+    terminate_workers = getattr(pool, "terminate_workers", None)
+    if terminate_workers is not None:  # Python 3.14+
+        terminate_workers()
+        return
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
 
 class DocumentExtractor:
     """
@@ -72,31 +110,137 @@ class DocumentExtractor:
             logger.error(f"Error extracting text from {file_path}: {e}")
             return ""
 
-    def extract_batch(self, file_paths: List[Path]) -> Dict[Path, str]:
+    def extract_batch(
+        self,
+        file_paths: List[Path],
+        max_workers: Optional[int] = None,
+        timeout: float = DEFAULT_EXTRACT_TIMEOUT
+    ) -> Dict[Path, str]:
         """
         Extract text from multiple documents in batch.
 
         Args:
             file_paths: List of document paths
+            max_workers: Worker processes (None = CPU count, 1 = in-process)
+            timeout: Seconds allowed per document in a worker
 
         Returns:
-            Dictionary mapping file paths to extracted text
+            Dictionary mapping file paths to extracted text, in input order
         """
-        results = {}
-
-        for file_path in file_paths:
-            try:
-                text = self.extract_text(file_path)
-                results[file_path] = text
-                logger.debug(f"Extracted {len(text)} chars from {file_path.name}")
-            except Exception as e:
-                logger.warning(f"Failed to extract {file_path}: {e}")
-                results[file_path] = ""
+        extracted = dict(self.iter_extract(file_paths, max_workers, timeout))
+        results = {file_path: extracted.get(file_path, "") for file_path in file_paths}
 
         logger.info(f"Batch extracted text from {len(results)} documents")
 
         return results
 
+    def iter_extract(
+        self,
+        file_paths: Iterable[Path],
+        max_workers: Optional[int] = None,
+        timeout: float = DEFAULT_EXTRACT_TIMEOUT
+    ) -> Iterator[Tuple[Path, str]]:
+        """
+        Extract documents in parallel, yielding each as soon as it finishes.
+
+        Documents that fail or exceed ``timeout`` yield an empty string.
+        Small batches run in-process (without timeouts).
+
+        Args:
+            file_paths: Document paths
+            max_workers: Worker processes (None = CPU count, 1 = in-process)
+            timeout: Seconds allowed per document in a worker
+
+        Yields:
+            (path, text) tuples in completion order
+        """
+        paths = list(file_paths)
+        workers = min(
+            max_workers or os.cpu_count() or 1,
+            max(1, len(paths) // MIN_FILES_PER_WORKER)
+        )
+
+        if workers <= 1:
+            for file_path in paths:
+                yield file_path, self._extract_safely(file_path)
+            return
+
+        yield from self._iter_extract_pool(paths, workers, timeout)
+
+    def _extract_safely(self, file_path: Path) -> str:
+        """Extract one document, returning "" on any failure."""
+        try:
+            text = self.extract_text(file_path)
+            logger.debug(f"Extracted {len(text)} chars from {file_path.name}")
+            return text
+        except Exception as e:
+            logger.warning(f"Failed to extract {file_path}: {e}")
+            return ""
+
+    def _iter_extract_pool(
+        self,
+        paths: List[Path],
+        workers: int,
+        timeout: float
+    ) -> Iterator[Tuple[Path, str]]:
+        """
+        Run extraction on a process pool with per-file timeouts.
+
+        At most ``workers`` tasks are in flight, so a task starts as soon as
+        it is submitted and its age measures its running time. When a task
+        times out the pool is torn down (the stuck worker cannot be
+        interrupted otherwise) and the other in-flight files are resubmitted
+        to a fresh pool.
+        """
+        queue = list(reversed(paths))
+        in_flight: Dict[Future, Tuple[Path, float]] = {}
+        pool = ProcessPoolExecutor(max_workers=workers)
+        extractor_class = type(self)
+
+        try:
+            while queue or in_flight:
+                while queue and len(in_flight) < workers:
+                    file_path = queue.pop()
+                    future = pool.submit(_extract_worker, (extractor_class, str(file_path)))
+                    in_flight[future] = (file_path, time.monotonic())
+
+                oldest = min(started for _, started in in_flight.values())
+                remaining = max(0.0, oldest + timeout - time.monotonic())
+                done, _ = wait(in_flight, timeout=remaining, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    file_path, _ = in_flight.pop(future)
+                    try:
+                        yield file_path, future.result()
+                    except Exception as e:
+                        logger.warning(f"Failed to extract {file_path}: {e}")
+                        yield file_path, ""
+
+                now = time.monotonic()
+                expired = [
+                    future for future, (_, started) in in_flight.items()
+                    if now - started >= timeout
+                ]
+                if not expired:
+                    continue
+
+                for future in expired:
+                    file_path, _ = in_flight.pop(future)
+                    logger.warning(f"Extraction timed out after {timeout}s: {file_path}")
+                    yield file_path, ""
+
+                # Restart the pool and requeue work that was still running
+                _terminate_pool(pool)
+                queue.extend(reversed([path for path, _ in in_flight.values()]))
+                in_flight.clear()
+                pool = ProcessPoolExecutor(max_workers=workers)
+        finally:
+            # Early exit by the consumer leaves work running
+            if in_flight:
+                _terminate_pool(pool)
+            else:
+                pool.shutdown(wait=True)
+
     def supports_format(self, file_path: Path) -> bool:
         """
         Check if a file format is supported.
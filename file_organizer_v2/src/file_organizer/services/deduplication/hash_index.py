@@ -0,0 +1,270 @@
+"""
+Indexes over 64-bit perceptual hashes.
+
+Provides two structures for Hamming-distance search:
+- BKTree: metric tree for incremental range queries. Queries only descend
+  into children whose edge distance lies within ``[d - radius, d + radius]``
+  (triangle inequality).
+- PackedHashes: hashes packed into a ``uint64`` NumPy array with batched
+  XOR + popcount for one-against-many and tiled all-pairs distances.
+"""
+
+from typing import Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+# Byte popcount table, used when np.bitwise_count is unavailable (NumPy < 2.0)
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def hex_to_int(hash_value: str) -> int:
+    """
+    Convert a hex perceptual hash to an integer.
+
+    Args:
+        hash_value: Hexadecimal hash string
+
+    Returns:
+        Integer value of the hash
+
+    Raises:
+        ValueError: If the string is not valid hex
+    """
+    try:
+        return int(hash_value, 16)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid hash format: {e}") from e
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two integer hashes."""
+    return (a ^ b).bit_count()
+
+
+class _Node:
+    """BK-tree node holding one distinct hash."""
+
+    __slots__ = ("hash_value", "children")
+
+    def __init__(self, hash_value: int):
+        self.hash_value = hash_value
+        self.children: Dict[int, "_Node"] = {}
+
+
+class BKTree(Generic[T]):
+    """
+    BK-tree for Hamming-distance range queries over integer hashes.
+
+    Each distinct hash is stored once as a tree node; items that share a
+    hash (exact perceptual duplicates) are kept in a side table, so
+    collections with many identical images stay shallow. Removing an item
+    only empties its side-table entry: the node stays in place as a routing
+    point and is reused if the hash is added again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty tree."""
+        self._root: Optional[_Node] = None
+        self._items: Dict[int, List[T]] = {}
+        self._item_count = 0
+
+    def add(self, hash_value: int, item: T) -> bool:
+        """
+        Add an item under its hash.
+
+        Args:
+            hash_value: Integer perceptual hash
+            item: Payload to store (e.g. an image path)
+
+        Returns:
+            True if the hash was new and a node was created
+        """
+        self._item_count += 1
+        existing = self._items.get(hash_value)
+        if existing is not None:
+            existing.append(item)
+            return False
+        self._items[hash_value] = [item]
+
+        if self._root is None:
+            self._root = _Node(hash_value)
+            return True
+
+        node = self._root
+        while True:
+            distance = (node.hash_value ^ hash_value).bit_count()
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _Node(hash_value)
+                return True
+            node = child
+
+    def remove(self, hash_value: int, item: T) -> bool:
+        """
+        Remove one occurrence of an item stored under ``hash_value``.
+
+        Returns:
+            True if the item was found and removed
+        """
+        items = self._items.get(hash_value)
+        if not items or item not in items:
+            return False
+        items.remove(item)
+        self._item_count -= 1
+        return True
+
+    def query(self, hash_value: int, max_distance: int) -> List[Tuple[int, int]]:
+        """
+        Find stored hashes within ``max_distance`` of ``hash_value``.
+
+        Args:
+            hash_value: Integer hash to search around
+            max_distance: Maximum Hamming distance (inclusive)
+
+        Returns:
+            List of (stored_hash, distance) tuples, unordered
+        """
+        results: List[Tuple[int, int]] = []
+        if self._root is None:
+            return results
+
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = (node.hash_value ^ hash_value).bit_count()
+            if distance <= max_distance and self._items[node.hash_value]:
+                results.append((node.hash_value, distance))
+            low = distance - max_distance
+            high = distance + max_distance
+            for edge, child in node.children.items():
+                if low <= edge <= high:
+                    stack.append(child)
+        return results
+
+    def query_items(self, hash_value: int, max_distance: int) -> List[Tuple[T, int]]:
+        """
+        Find stored items within ``max_distance`` of ``hash_value``.
+
+        Returns:
+            List of (item, distance) tuples
+        """
+        return [
+            (item, distance)
+            for stored, distance in self.query(hash_value, max_distance)
+            for item in self._items[stored]
+        ]
+
+    def get(self, hash_value: int) -> List[T]:
+        """Items stored under exactly ``hash_value``."""
+        return self._items.get(hash_value, [])
+
+    def hashes(self) -> Iterator[int]:
+        """Iterate over distinct stored hashes in insertion order."""
+        return (hash_value for hash_value, items in self._items.items() if items)
+
+    @property
+    def node_count(self) -> int:
+        """Number of tree nodes (distinct hashes added, including emptied ones)."""
+        return len(self._items)
+
+    def __len__(self) -> int:
+        """Total number of stored items."""
+        return self._item_count
+
+    def __contains__(self, hash_value: object) -> bool:
+        """Check whether a hash is stored."""
+        return bool(self._items.get(hash_value))
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """
+    Count set bits per element of a ``uint64`` array.
+
+    Args:
+        values: Array of dtype uint64, any shape
+
+    Returns:
+        Array of the same shape with dtype uint8
+    """
+    bitwise_count = getattr(np, "bitwise_count", None)
+    if bitwise_count is not None:
+        return bitwise_count(values)
+    as_bytes = np.ascontiguousarray(values).view(np.uint8)
+    counts = _POPCOUNT_TABLE[as_bytes].reshape(values.shape + (8,))
+    return counts.sum(axis=-1, dtype=np.uint8)
+
+
+class PackedHashes:
+    """
+    Perceptual hashes packed into a contiguous ``uint64`` array.
+
+    Distances are computed with vectorized XOR and popcount. All-pairs search
+    walks the upper triangle in square tiles, so peak memory is proportional
+    to ``block_size ** 2`` regardless of how many hashes are stored.
+    """
+
+    DEFAULT_BLOCK_SIZE = 2048
+
+    def __init__(self, hashes: Iterable[int]):
+        """
+        Pack integer hashes.
+
+        Args:
+            hashes: 64-bit integer hashes
+        """
+        self.values = np.fromiter(hashes, dtype=np.uint64)
+
+    @classmethod
+    def from_hex(cls, hashes: Iterable[str]) -> "PackedHashes":
+        """Pack hex-encoded hashes."""
+        return cls(hex_to_int(h) for h in hashes)
+
+    def distances_to(self, hash_value: int) -> np.ndarray:
+        """
+        Hamming distance from one hash to every stored hash.
+
+        Args:
+            hash_value: 64-bit integer hash
+
+        Returns:
+            uint8 array of distances, aligned with stored order
+        """
+        return popcount64(self.values ^ np.uint64(hash_value))
+
+    def within(self, hash_value: int, max_distance: int) -> np.ndarray:
+        """Indices of stored hashes within ``max_distance`` of ``hash_value``."""
+        return np.flatnonzero(self.distances_to(hash_value) <= max_distance)
+
+    def iter_pairs_within(
+        self,
+        max_distance: int,
+        block_size: int = DEFAULT_BLOCK_SIZE
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yield index pairs (i < j) whose hashes are within ``max_distance``.
+
+        Args:
+            max_distance: Maximum Hamming distance (inclusive)
+            block_size: Tile edge length
+
+        Yields:
+            (rows, cols) index arrays for each tile containing matches
+        """
+        values = self.values
+        n = len(values)
+        for row_start in range(0, n, block_size):
+            rows = values[row_start:row_start + block_size, None]
+            for col_start in range(row_start, n, block_size):
+                cols = values[None, col_start:col_start + block_size]
+                mask = popcount64(rows ^ cols) <= max_distance
+                if col_start == row_start:
+                    mask = np.triu(mask, k=1)
+                i, j = np.nonzero(mask)
+                if len(i):
+                    yield i + row_start, j + col_start
+
+    def __len__(self) -> int:
+        """Number of packed hashes."""
+        return len(self.values)
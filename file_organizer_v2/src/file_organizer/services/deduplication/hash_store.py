@@ -0,0 +1,265 @@
+"""
+Persistent perceptual hash store for incremental image deduplication.
+
+Stores perceptual hashes in SQLite keyed by file path and hash method,
+together with the file's size and modification time. A stored hash is
+reused only while that fingerprint still matches, so unchanged images are
+never decoded twice across runs.
+
+For near-duplicate lookups the store keeps a lazily built in-memory BK-tree
+per hash method, letting an ingest pipeline ask "is this new image a
+near-duplicate of anything in the library?" without scanning every hash.
+"""
+
+import logging
+import os
+import sqlite3
+from collections.abc import Iterable
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from .hash_index import BKTree, hex_to_int
+
+logger = logging.getLogger(__name__)
+
+
+class PerceptualHashStore:
+    """SQLite-backed cache and search index of perceptual image hashes."""
+
+    SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS image_hashes (
+        path TEXT NOT NULL,
+        method TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        hash TEXT NOT NULL,
+        PRIMARY KEY (path, method)
+    ) WITHOUT ROWID;
+
+    CREATE INDEX IF NOT EXISTS idx_image_hashes_method ON image_hashes(method);
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Open (or create) a hash store.
+
+        Args:
+            db_path: Path to SQLite database file.
+                    Defaults to ~/.file_organizer/image_hashes.db
+        """
+        if db_path is None:
+            db_path = Path.home() / ".file_organizer" / "image_hashes.db"
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA_SQL)
+        self._conn.commit()
+
+        # method -> BK-tree of path strings, and path -> current int hash
+        self._trees: Dict[str, BKTree[str]] = {}
+        self._current: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def fingerprint(path: Path) -> Optional[Tuple[int, int]]:
+        """
+        Return the (size, mtime_ns) fingerprint of a file.
+
+        Returns:
+            Fingerprint tuple, or None if the file cannot be stat-ed
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def lookup(
+        self,
+        paths: Iterable[Path],
+        method: str
+    ) -> Tuple[Dict[Path, str], List[Path]]:
+        """
+        Split paths into those with a valid stored hash and those without.
+
+        Args:
+            paths: Image paths to look up
+            method: Hash method
+
+        Returns:
+            Tuple of ({path: hash} for fresh entries, [paths needing hashing])
+        """
+        cached: Dict[Path, str] = {}
+        missing: List[Path] = []
+
+        with self._lock:
+            for path in paths:
+                fingerprint = self.fingerprint(path)
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, hash FROM image_hashes WHERE path = ? AND method = ?",
+                    (str(path), method),
+                ).fetchone()
+                if row is not None and fingerprint == (row[0], row[1]):
+                    cached[path] = row[2]
+                else:
+                    missing.append(path)
+
+        return cached, missing
+
+    def get(self, path: Path, method: str) -> Optional[str]:
+        """Stored hash for ``path`` if its fingerprint is unchanged, else None."""
+        cached, _ = self.lookup([path], method)
+        return cached.get(path)
+
+    def put_many(self, hashes: Dict[Path, str], method: str) -> None:
+        """
+        Store hashes for a hash method, replacing stale entries.
+
+        Args:
+            hashes: Mapping of image path to hex hash
+            method: Hash method the hashes were computed with
+        """
+        rows = []
+        for path, hash_value in hashes.items():
+            fingerprint = self.fingerprint(path)
+            if fingerprint is None:
+                continue
+            rows.append((str(path), method, fingerprint[0], fingerprint[1], hash_value))
+
+        if not rows:
+            return
+
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO image_hashes (path, method, size, mtime_ns, hash) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+            # Keep an already-built search index in sync
+            if method in self._trees:
+                for path_str, _, _, _, hash_value in rows:
+                    self._index_entry(method, path_str, hex_to_int(hash_value))
+
+        logger.debug(f"Stored {len(rows)} {method} hashes")
+
+    def put(self, path: Path, hash_value: str, method: str) -> None:
+        """Store a single hash."""
+        self.put_many({path: hash_value}, method)
+
+    def remove(self, paths: Iterable[Path], method: Optional[str] = None) -> int:
+        """
+        Remove entries for paths (e.g. deleted files).
+
+        Args:
+            paths: Paths to forget
+            method: Only remove this method's entries (None = all methods)
+
+        Returns:
+            Number of rows removed
+        """
+        path_strs = [str(p) for p in paths]
+        with self._lock:
+            with self._conn:
+                if method is None:
+                    cursor = self._conn.executemany(
+                        "DELETE FROM image_hashes WHERE path = ?",
+                        [(p,) for p in path_strs],
+                    )
+                else:
+                    cursor = self._conn.executemany(
+                        "DELETE FROM image_hashes WHERE path = ? AND method = ?",
+                        [(p, method) for p in path_strs],
+                    )
+            for m, current in self._current.items():
+                if method is None or m == method:
+                    for path_str in path_strs:
+                        value = current.pop(path_str, None)
+                        if value is not None:
+                            self._trees[m].remove(value, path_str)
+        return cursor.rowcount
+
+    def _index_entry(self, method: str, path_str: str, value: int) -> None:
+        """Add or update one entry in the in-memory index of ``method``."""
+        current = self._current[method]
+        previous = current.get(path_str)
+        if previous == value:
+            return
+        tree = self._trees[method]
+        if previous is not None:
+            # Superseded: drop the old entry so each path is indexed once
+            tree.remove(previous, path_str)
+        current[path_str] = value
+        tree.add(value, path_str)
+
+    def _ensure_index(self, method: str) -> BKTree[str]:
+        """Build the BK-tree for ``method`` from the database on first use."""
+        tree = self._trees.get(method)
+        if tree is not None:
+            return tree
+
+        tree = self._trees[method] = BKTree()
+        self._current[method] = {}
+        cursor = self._conn.execute(
+            "SELECT path, hash FROM image_hashes WHERE method = ?", (method,)
+        )
+        for path_str, hash_value in cursor:
+            self._index_entry(method, path_str, hex_to_int(hash_value))
+
+        logger.info(f"Built {method} search index over {len(tree)} stored hashes")
+        return tree
+
+    def find_similar(
+        self,
+        hash_value: str,
+        method: str,
+        threshold: int
+    ) -> List[Tuple[Path, int]]:
+        """
+        Find stored images within ``threshold`` of a hash.
+
+        Args:
+            hash_value: Hex perceptual hash to search around
+            method: Hash method the hash was computed with
+            threshold: Maximum Hamming distance (inclusive)
+
+        Returns:
+            List of (path, distance) tuples, closest first
+        """
+        value = hex_to_int(hash_value)
+        with self._lock:
+            tree = self._ensure_index(method)
+            matches = [
+                (Path(path_str), distance)
+                for path_str, distance in tree.query_items(value, threshold)
+            ]
+        return sorted(matches, key=lambda m: m[1])
+
+    def count(self, method: Optional[str] = None) -> int:
+        """Number of stored hashes (optionally for one method)."""
+        with self._lock:
+            if method is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM image_hashes").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM image_hashes WHERE method = ?", (method,)
+                ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
@@ -10,14 +10,21 @@ import logging
 from pathlib import Path
 from typing import Callable, Dict, List, Literal, Optional, Set, Tuple
 
-from imagededup.methods import AHash, DHash, PHash
 from PIL import Image
 
+from .clustering import UnionFind
+from .hash_index import BKTree, PackedHashes, hamming_distance, hex_to_int
+from .hash_store import PerceptualHashStore
+from .image_hashing import ParallelImageHasher, compute_image_hashes
+
 logger = logging.getLogger(__name__)
 
 # Supported hash algorithms
 HashMethod = Literal["phash", "dhash", "ahash"]
 
+# Similar-pair search strategies
+SearchMethod = Literal["vectorized", "bktree"]
+
 # Supported image formats
 SUPPORTED_FORMATS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".tif", ".webp"}
 
@@ -29,21 +36,32 @@ class ImageDeduplicator:
     Uses imagededup library for computing perceptual hashes and comparing
     images based on visual similarity rather than exact byte matches.
 
+    Images are decoded at reduced resolution (JPEG DCT scaling) before
+    hashing, and batches are hashed across a process pool.
+
     Supported algorithms:
     - pHash (Perceptual Hash): Best for general similarity detection
     - dHash (Difference Hash): Fast, good for detecting resized images
     - aHash (Average Hash): Fastest, good for exact duplicates
 
+    Similar pairs are found either with vectorized NumPy XOR/popcount over
+    tiles of packed ``uint64`` hashes (default, fastest for batch runs and
+    large thresholds) or with a BK-tree (useful for small thresholds).
+
     Attributes:
         hash_method: Hash algorithm to use
         threshold: Maximum Hamming distance for similarity (0-64)
-        hasher: Initialized hash computation object
+        search_method: Similar-pair search strategy
     """
 
     def __init__(
         self,
         hash_method: HashMethod = "phash",
-        threshold: int = 10
+        threshold: int = 10,
+        search_method: SearchMethod = "vectorized",
+        block_size: int = PackedHashes.DEFAULT_BLOCK_SIZE,
+        max_workers: Optional[int] = None,
+        hash_store: Optional[PerceptualHashStore] = None
     ):
         """
         Initialize the ImageDeduplicator.
@@ -57,9 +75,15 @@ class ImageDeduplicator:
                       - 6-10: Similar (resized, color adjusted)
                       - 11-20: Somewhat similar (cropped, filtered)
                       - 21+: Potentially different images
+            search_method: "vectorized" (NumPy tiles) or "bktree"
+            block_size: Tile edge length for vectorized all-pairs search
+            max_workers: Processes used for batch hashing
+                        (None = CPU count, 1 = hash in-process)
+            hash_store: Optional persistent store; unchanged images reuse
+                       their stored hashes and new hashes are saved to it
 
         Raises:
-            ValueError: If hash_method is not supported or threshold is invalid
+            ValueError: If hash_method, search_method or threshold is invalid
         """
         if hash_method not in ("phash", "dhash", "ahash"):
             raise ValueError(
@@ -72,16 +96,18 @@ class ImageDeduplicator:
                 f"Threshold must be between 0 and 64, got {threshold}"
             )
 
+        if search_method not in ("vectorized", "bktree"):
+            raise ValueError(
+                f"Unsupported search method: {search_method}. "
+                f"Use 'vectorized' or 'bktree'."
+            )
+
         self.hash_method = hash_method
         self.threshold = threshold
-
-        # Initialize hasher based on method
-        if hash_method == "phash":
-            self.hasher = PHash()
-        elif hash_method == "dhash":
-            self.hasher = DHash()
-        else:  # ahash
-            self.hasher = AHash()
+        self.search_method = search_method
+        self.block_size = block_size
+        self.max_workers = max_workers
+        self.hash_store = hash_store
 
     def get_image_hash(self, image_path: Path) -> Optional[str]:
         """
@@ -109,16 +135,8 @@ class ImageDeduplicator:
             )
             return None
 
-        try:
-            # imagededup expects string path
-            encoding = self.hasher.encode_image(str(image_path))
-            return encoding
-        except (IOError, OSError) as e:
-            logger.warning(f"Could not read image {image_path}: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Error processing image {image_path}: {e}")
-            return None
+        hashes = compute_image_hashes(image_path, (self.hash_method,))
+        return hashes[self.hash_method] if hashes is not None else None
 
     def compute_hamming_distance(self, hash1: str, hash2: str) -> int:
         """
@@ -137,20 +155,7 @@ class ImageDeduplicator:
         Raises:
             ValueError: If hashes are not valid hex strings
         """
-        try:
-            # Convert hex strings to integers
-            int1 = int(hash1, 16)
-            int2 = int(hash2, 16)
-
-            # XOR gives 1 for different bits, 0 for same bits
-            xor = int1 ^ int2
-
-            # Count number of 1s (different bits)
-            distance = bin(xor).count('1')
-
-            return distance
-        except ValueError as e:
-            raise ValueError(f"Invalid hash format: {e}") from e
+        return hamming_distance(hex_to_int(hash1), hex_to_int(hash2))
 
     def compute_similarity(self, img1: Path, img2: Path) -> Optional[float]:
         """
@@ -189,7 +194,8 @@ class ImageDeduplicator:
         Find duplicate and similar images in a directory.
 
         Groups images by similarity, with each group containing one representative
-        image and all its duplicates/similar images.
+        image and all its duplicates/similar images. Groups are the connected
+        components of the "within threshold" relation.
 
         Args:
             directory: Directory to scan for images
@@ -222,51 +228,14 @@ class ImageDeduplicator:
         logger.info(f"Found {len(image_files)} images to process")
 
         # Compute hashes for all images
-        image_hashes: Dict[Path, str] = {}
-
-        for idx, img_path in enumerate(image_files, 1):
-            img_hash = self.get_image_hash(img_path)
-            if img_hash is not None:
-                image_hashes[img_path] = img_hash
-
-            if progress_callback:
-                progress_callback(idx, len(image_files))
+        image_hashes = self.batch_compute_hashes(image_files, progress_callback)
 
         logger.info(f"Successfully hashed {len(image_hashes)} images")
 
-        # Find duplicates using imagededup's find_duplicates method
-        # Create mapping from string path to hash for imagededup
-        encoding_map = {str(path): hash_val for path, hash_val in image_hashes.items()}
-
-        # imagededup's find_duplicates returns dict[filename] -> list of similar filenames
-        duplicates_dict = self.hasher.find_duplicates(
-            encoding_map=encoding_map,
-            max_distance_threshold=self.threshold
-        )
-
-        # Convert back to Path objects and group by representative
+        # Group similar images and key each group by its first image's hash
         grouped_duplicates: Dict[str, List[Path]] = {}
-        processed: Set[str] = set()
-
-        for image_str, similar_list in duplicates_dict.items():
-            if image_str in processed:
-                continue
-
-            # Only include if there are actual duplicates
-            if similar_list:
-                image_path = Path(image_str)
-                similar_paths = [Path(s) for s in similar_list]
-
-                # Use the hash as the key for grouping
-                representative_hash = image_hashes[image_path]
-
-                # Create group with all similar images
-                group = [image_path] + similar_paths
-                grouped_duplicates[representative_hash] = group
-
-                # Mark all as processed
-                processed.add(image_str)
-                processed.update(similar_list)
+        for group in self._cluster_hashes(image_hashes):
+            grouped_duplicates[image_hashes[group[0]]] = group
 
         logger.info(f"Found {len(grouped_duplicates)} duplicate groups")
 
@@ -280,8 +249,11 @@ class ImageDeduplicator:
         """
         Cluster images into groups of similar images.
 
-        Uses single-linkage clustering: if any image in a cluster is similar
-        to a new image, the new image joins that cluster.
+        Uses single-linkage clustering: images within ``threshold`` of each
+        other are linked, and linked images end up in the same cluster.
+        Candidate pairs come from vectorized distance tiles or a BK-tree range
+        query over integer hashes and are merged with union-find, so no Python
+        loop runs over every pair of images.
 
         Args:
             images: List of image paths to cluster
@@ -293,48 +265,52 @@ class ImageDeduplicator:
         if not images:
             return []
 
-        # Compute hashes for all images
-        image_hashes: Dict[Path, str] = {}
-
-        for idx, img_path in enumerate(images, 1):
-            img_hash = self.get_image_hash(img_path)
-            if img_hash is not None:
-                image_hashes[img_path] = img_hash
-
-            if progress_callback:
-                progress_callback(idx, len(images))
+        image_hashes = self.batch_compute_hashes(images, progress_callback)
 
         if not image_hashes:
             return []
 
-        # Build clusters using single-linkage
-        clusters: List[List[Path]] = []
-        processed: Set[Path] = set()
+        return self._cluster_hashes(image_hashes)
 
-        for img_path, img_hash in image_hashes.items():
-            if img_path in processed:
-                continue
+    def _cluster_hashes(self, image_hashes: Dict[Path, str]) -> List[List[Path]]:
+        """
+        Group hashed images into clusters of 2+ similar images.
 
-            # Start new cluster
-            cluster = [img_path]
-            processed.add(img_path)
+        Identical hashes are collapsed first, so only distinct hashes take
+        part in the pair search.
 
-            # Find all similar images
-            for other_path, other_hash in image_hashes.items():
-                if other_path in processed:
-                    continue
+        Args:
+            image_hashes: Mapping of image path to hex perceptual hash
 
-                distance = self.compute_hamming_distance(img_hash, other_hash)
-                if distance <= self.threshold:
-                    cluster.append(other_path)
-                    processed.add(other_path)
+        Returns:
+            Clusters ordered by their first image, members in input order
+        """
+        # Distinct integer hashes in first-seen order
+        distinct: Dict[int, int] = {}
+        for img_hash in image_hashes.values():
+            distinct.setdefault(hex_to_int(img_hash), len(distinct))
+        values = list(distinct)
+
+        union_find: UnionFind[int] = UnionFind(range(len(values)))
+
+        if self.search_method == "bktree":
+            tree: BKTree[int] = BKTree()
+            for position, value in enumerate(values):
+                for other, _ in tree.query(value, self.threshold):
+                    union_find.union(position, distinct[other])
+                tree.add(value, position)
+        else:
+            packed = PackedHashes(values)
+            for rows, cols in packed.iter_pairs_within(self.threshold, self.block_size):
+                union_find.union_pairs(zip(rows.tolist(), cols.tolist()))
 
-            clusters.append(cluster)
+        clusters: Dict[int, List[Path]] = {}
+        for img_path, img_hash in image_hashes.items():
+            root = union_find.find(distinct[hex_to_int(img_hash)])
+            clusters.setdefault(root, []).append(img_path)
 
         # Filter out single-image clusters
-        clusters = [c for c in clusters if len(c) > 1]
-
-        return clusters
+        return [c for c in clusters.values() if len(c) > 1]
 
     def batch_compute_hashes(
         self,
@@ -344,7 +320,7 @@ class ImageDeduplicator:
         """
         Compute perceptual hashes for multiple images.
 
-        Processes images sequentially but returns all results together.
+        Images are hashed in parallel across ``max_workers`` processes.
         Failed images are logged but don't stop batch processing.
 
         Args:
@@ -355,18 +331,112 @@ class ImageDeduplicator:
             Dictionary mapping image paths to their perceptual hashes.
             Images that couldn't be hashed are excluded from results.
         """
-        results: Dict[Path, str] = {}
+        all_hashes = self.batch_compute_all_hashes(
+            image_paths, (self.hash_method,), progress_callback
+        )
+        return {path: hashes[self.hash_method] for path, hashes in all_hashes.items()}
+
+    def batch_compute_all_hashes(
+        self,
+        image_paths: List[Path],
+        methods: Tuple[HashMethod, ...] = ("phash", "dhash", "ahash"),
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[Path, Dict[str, str]]:
+        """
+        Compute several perceptual hashes per image from a single decode.
 
-        for idx, img_path in enumerate(image_paths, 1):
-            img_hash = self.get_image_hash(img_path)
-            if img_hash is not None:
-                results[img_path] = img_hash
+        Args:
+            image_paths: List of image paths to hash
+            methods: Hash methods to compute for every image
+            progress_callback: Optional callback function(current, total) for progress
 
-            if progress_callback:
-                progress_callback(idx, len(image_paths))
+        Returns:
+            Dictionary mapping image paths to {method: hash}.
+            Images that couldn't be hashed are excluded from results.
+        """
+        supported = [p for p in image_paths if p.suffix.lower() in SUPPORTED_FORMATS]
+        if len(supported) < len(image_paths):
+            logger.warning(
+                f"Skipping {len(image_paths) - len(supported)} files with unsupported formats"
+            )
 
+        if self.hash_store is None:
+            hasher = ParallelImageHasher(methods, max_workers=self.max_workers)
+            return hasher.hash_images(supported, progress_callback)
+
+        # Reuse stored hashes; only decode images missing any requested method
+        stored: Dict[str, Dict[Path, str]] = {}
+        to_hash: Set[Path] = set()
+        for method in methods:
+            stored[method], missing = self.hash_store.lookup(supported, method)
+            to_hash.update(missing)
+
+        pending = [p for p in supported if p in to_hash]
+        logger.info(
+            f"Reusing stored hashes for {len(supported) - len(pending)} images, "
+            f"hashing {len(pending)}"
+        )
+        hasher = ParallelImageHasher(methods, max_workers=self.max_workers)
+        computed = hasher.hash_images(pending, progress_callback)
+
+        for method in methods:
+            self.hash_store.put_many(
+                {path: hashes[method] for path, hashes in computed.items()}, method
+            )
+
+        results: Dict[Path, Dict[str, str]] = {}
+        for path in supported:
+            if path in computed:
+                results[path] = computed[path]
+            elif path not in to_hash:
+                results[path] = {method: stored[method][path] for method in methods}
         return results
 
+    def find_near_duplicates(
+        self,
+        image_path: Path,
+        add_to_index: bool = True
+    ) -> List[Tuple[Path, int]]:
+        """
+        Check a (new) image against every image in the hash store.
+
+        Intended for ingest pipelines: the store's search index answers in
+        sub-linear time instead of rescanning the library.
+
+        Args:
+            image_path: Image to check
+            add_to_index: If True, store the image's hash afterwards so later
+                         images are also checked against it
+
+        Returns:
+            List of (path, hamming_distance) for stored images within
+            ``threshold``, closest first; the image itself is excluded
+
+        Raises:
+            ValueError: If no hash_store is configured
+        """
+        if self.hash_store is None:
+            raise ValueError("find_near_duplicates requires a hash_store")
+
+        img_hash = self.hash_store.get(image_path, self.hash_method)
+        if img_hash is None:
+            img_hash = self.get_image_hash(image_path)
+            if img_hash is None:
+                return []
+
+        matches = [
+            (path, distance)
+            for path, distance in self.hash_store.find_similar(
+                img_hash, self.hash_method, self.threshold
+            )
+            if path != image_path
+        ]
+
+        if add_to_index:
+            self.hash_store.put(image_path, img_hash, self.hash_method)
+
+        return matches
+
     def _find_image_files(
         self,
         directory: Path,
@@ -0,0 +1,228 @@
+"""
+Parallel perceptual hashing engine.
+
+Perceptual hashes only need a tiny grayscale thumbnail (32x32 for pHash,
+9x8 for dHash, 8x8 for aHash), so decoding a 24-megapixel photo at full
+resolution wastes most of the work. This module:
+- Asks the JPEG decoder for a downscaled image via ``Image.draft`` (DCT
+  scaling) and uses ``Image.reduce`` for other formats
+- Computes several hash methods from a single decode
+- Spreads files across a process pool
+
+Preprocessing follows imagededup (RGB, Lanczos resize, grayscale) and the
+hash itself is computed by imagededup. Images small enough to skip
+downscaling hash exactly as ``encode_image`` does; downscaled ones may
+differ by a few bits, well inside the usual similarity threshold.
+"""
+
+import logging
+import os
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from imagededup.methods import AHash, DHash, PHash
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Hash input sizes used by imagededup
+HASH_TARGET_SIZES: Dict[str, Tuple[int, int]] = {
+    "phash": (32, 32),
+    "dhash": (9, 8),
+    "ahash": (8, 8),
+}
+
+# Decode at no less than this multiple of the hash input size, so the final
+# Lanczos resize still has enough pixels to filter
+DRAFT_OVERSAMPLE = 4
+
+# Below this many files per worker a pool costs more than it saves
+MIN_FILES_PER_WORKER = 8
+
+_HASHER_CLASSES = {"phash": PHash, "dhash": DHash, "ahash": AHash}
+
+# Per-process hasher instances (populated lazily in each worker)
+_hashers: Dict[str, object] = {}
+
+
+def _get_hasher(method: str):
+    """Return a cached imagededup hasher for ``method``."""
+    hasher = _hashers.get(method)
+    if hasher is None:
+        hasher = _hashers[method] = _HASHER_CLASSES[method](verbose=False)
+    return hasher
+
+
+def load_downscaled(image_path: Path, min_size: Tuple[int, int]) -> Image.Image:
+    """
+    Open an image as RGB, decoded at reduced resolution where possible.
+
+    Args:
+        image_path: Path to the image file
+        min_size: Smallest (width, height) the decoded image may have
+
+    Returns:
+        RGB image no smaller than ``min_size`` (unless the source is smaller)
+    """
+    with Image.open(image_path) as source:
+        # JPEG: let the decoder skip DCT coefficients (1/2, 1/4, 1/8 scale)
+        source.draft("RGB", min_size)
+        img = source
+
+        # Convert before reducing: Image.reduce rejects palette, 1-bit and
+        # 16-bit modes (GIFs, palette PNGs, scans)
+        if img.mode != "RGB":
+            # Match imagededup: drop alpha via RGBA before RGB
+            img = img.convert("RGBA").convert("RGB")
+
+        # Other formats: cheap integer box reduction after decode
+        factor = min(img.width // min_size[0], img.height // min_size[1])
+        if factor > 1:
+            img = img.reduce(factor)
+
+        # Detach from the file before it is closed
+        return source.copy() if img is source else img
+
+
+def compute_image_hashes(
+    image_path: Path,
+    methods: Sequence[str] = ("phash",)
+) -> Optional[Dict[str, str]]:
+    """
+    Compute one or more perceptual hashes from a single decode.
+
+    Args:
+        image_path: Path to the image file
+        methods: Hash methods to compute ("phash", "dhash", "ahash")
+
+    Returns:
+        Mapping of method to hex hash, or None if the image could not be read
+    """
+    largest = max((HASH_TARGET_SIZES[m] for m in methods), key=lambda s: s[0] * s[1])
+    draft_size = (largest[0] * DRAFT_OVERSAMPLE, largest[1] * DRAFT_OVERSAMPLE)
+
+    try:
+        image = load_downscaled(image_path, draft_size)
+        hashes: Dict[str, str] = {}
+        for method in methods:
+            resized = image.resize(HASH_TARGET_SIZES[method], Image.LANCZOS)
+            hash_value = _get_hasher(method).encode_image(
+                image_array=np.asarray(resized, dtype=np.uint8)
+            )
+            if hash_value is None:
+                return None
+            hashes[method] = hash_value
+        return hashes
+    except (IOError, OSError) as e:
+        logger.warning(f"Could not read image {image_path}: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Error processing image {image_path}: {e}")
+        return None
+
+
+def _hash_worker(args: Tuple[str, Tuple[str, ...]]) -> Optional[Dict[str, str]]:
+    """Process-pool entry point (must be module-level to be picklable)."""
+    path_str, methods = args
+    return compute_image_hashes(Path(path_str), methods)
+
+
+class ParallelImageHasher:
+    """
+    Computes perceptual hashes for many images across a process pool.
+
+    Small batches run in-process to avoid pool start-up cost.
+    """
+
+    def __init__(
+        self,
+        methods: Sequence[str] = ("phash",),
+        max_workers: Optional[int] = None,
+        chunksize: int = 16
+    ):
+        """
+        Initialize the hasher.
+
+        Args:
+            methods: Hash methods to compute for every image
+            max_workers: Worker processes (None = CPU count, 1 = in-process)
+            chunksize: Files handed to a worker at a time
+
+        Raises:
+            ValueError: If a method is not supported
+        """
+        for method in methods:
+            if method not in HASH_TARGET_SIZES:
+                raise ValueError(
+                    f"Unsupported hash method: {method}. "
+                    f"Use 'phash', 'dhash', or 'ahash'."
+                )
+        self.methods = tuple(methods)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+
+    def iter_hashes(
+        self,
+        image_paths: Iterable[Path],
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> Iterator[Tuple[Path, Optional[Dict[str, str]]]]:
+        """
+        Hash images, yielding results in input order.
+
+        Args:
+            image_paths: Image paths to hash
+            progress_callback: Optional callback function(current, total)
+
+        Yields:
+            (path, hashes) tuples; hashes is None for unreadable images
+        """
+        paths: List[Path] = list(image_paths)
+        total = len(paths)
+        workers = min(self.max_workers, max(1, total // MIN_FILES_PER_WORKER))
+
+        if workers <= 1:
+            results = (compute_image_hashes(p, self.methods) for p in paths)
+            yield from self._with_progress(paths, results, progress_callback)
+            return
+
+        tasks = [(str(p), self.methods) for p in paths]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_hash_worker, tasks, chunksize=self.chunksize)
+            yield from self._with_progress(paths, results, progress_callback)
+
+    @staticmethod
+    def _with_progress(
+        paths: List[Path],
+        results: Iterable[Optional[Dict[str, str]]],
+        progress_callback: Optional[Callable[[int, int], None]]
+    ) -> Iterator[Tuple[Path, Optional[Dict[str, str]]]]:
+        """Pair results with paths and report progress."""
+        total = len(paths)
+        for idx, (path, hashes) in enumerate(zip(paths, results), 1):
+            if progress_callback:
+                progress_callback(idx, total)
+            yield path, hashes
+
+    def hash_images(
+        self,
+        image_paths: Iterable[Path],
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[Path, Dict[str, str]]:
+        """
+        Hash images and collect the successful results.
+
+        Args:
+            image_paths: Image paths to hash
+            progress_callback: Optional callback function(current, total)
+
+        Returns:
+            Mapping of path to {method: hex hash}; failed images are excluded
+        """
+        return {
+            path: hashes
+            for path, hashes in self.iter_hashes(image_paths, progress_callback)
+            if hashes is not None
+        }
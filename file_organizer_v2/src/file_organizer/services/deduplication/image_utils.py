@@ -3,16 +3,27 @@ Image utility functions for deduplication operations.
 
 Provides helper functions for image validation, metadata extraction,
 format conversion, and batch processing operations.
+
+Metadata comes from ``probe_image``, which parses only the header bytes of
+JPEG, PNG, GIF, WebP, TIFF and BMP files (falling back to Pillow's lazy
+open for anything else) and caches one record per file fingerprint.
 """
 
 import logging
+import os
+import struct
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from threading import Lock
+from typing import BinaryIO, Dict, List, Optional, Tuple
 
 from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+# Number of probed files whose metadata is kept
+PROBE_CACHE_SIZE = 8192
+
 # Supported image formats
 SUPPORTED_FORMATS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".tif", ".webp"}
 
@@ -41,6 +52,9 @@ class ImageMetadata:
         mode: Image mode (RGB, RGBA, L, etc.)
         size_bytes: File size in bytes
         resolution: Total pixels (width * height)
+        has_transparency: Whether the image has an alpha channel or
+            transparent color
+        mtime_ns: File modification time in nanoseconds
     """
 
     def __init__(
@@ -50,7 +64,9 @@ class ImageMetadata:
         height: int,
         format: str,
         mode: str,
-        size_bytes: int
+        size_bytes: int,
+        has_transparency: bool = False,
+        mtime_ns: int = 0
     ):
         self.path = path
         self.width = width
@@ -59,6 +75,8 @@ class ImageMetadata:
         self.mode = mode
         self.size_bytes = size_bytes
         self.resolution = width * height
+        self.has_transparency = has_transparency
+        self.mtime_ns = mtime_ns
 
     def __repr__(self) -> str:
         return (
@@ -78,9 +96,279 @@ class ImageMetadata:
             "mode": self.mode,
             "size_bytes": self.size_bytes,
             "resolution": self.resolution,
+            "has_transparency": self.has_transparency,
         }
 
 
+# Header parsers: each reads from the start of the file and returns
+# (format, width, height, mode, has_transparency), or None if it cannot tell.
+_HeaderInfo = Tuple[str, int, int, str, bool]
+
+_JPEG_SOF_MARKERS = {
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF
+}
+_JPEG_MODES = {1: "L", 3: "RGB", 4: "CMYK"}
+
+
+def _parse_jpeg(f: BinaryIO) -> Optional[_HeaderInfo]:
+    """Walk JPEG segments up to the first start-of-frame marker."""
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte == b"\xff":
+            marker = f.read(1)
+            if marker != b"\xff":
+                break
+            byte = marker
+        else:
+            return None
+        if not marker:
+            return None
+        code = marker[0]
+        if code in (0x01, 0xD8) or 0xD0 <= code <= 0xD7:
+            continue  # Standalone markers carry no length
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        if code in _JPEG_SOF_MARKERS:
+            data = f.read(6)
+            if len(data) < 6:
+                return None
+            _, height, width, components = struct.unpack(">BHHB", data)
+            return "JPEG", width, height, _JPEG_MODES.get(components, "RGB"), False
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+_PNG_MODES = {0: "L", 2: "RGB", 3: "P", 4: "LA", 6: "RGBA"}
+
+
+def _parse_png(f: BinaryIO) -> Optional[_HeaderInfo]:
+    """Read IHDR, then scan chunk headers up to IDAT for tRNS."""
+    f.seek(8)
+    length, chunk_type = struct.unpack(">I4s", f.read(8))
+    if chunk_type != b"IHDR":
+        return None
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", f.read(10))
+    mode = _PNG_MODES.get(color_type, "RGB")
+    if color_type == 0 and bit_depth == 1:
+        mode = "1"
+    elif color_type == 0 and bit_depth == 16:
+        mode = "I;16"
+
+    transparent = color_type in (4, 6)
+    f.seek(8 + 8 + length + 4)  # Past IHDR data and CRC
+    while not transparent:
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type in (b"IDAT", b"IEND"):
+            break
+        transparent = chunk_type == b"tRNS"
+        f.seek(length + 4, os.SEEK_CUR)
+    return "PNG", width, height, mode, transparent
+
+
+def _parse_gif(f: BinaryIO) -> Optional[_HeaderInfo]:
+    """Read the logical screen size and the first graphic control block."""
+    f.seek(6)
+    width, height, flags = struct.unpack("<HHB", f.read(5))
+    f.seek(2, os.SEEK_CUR)
+    if flags & 0x80:
+        f.seek(3 * (2 << (flags & 0x07)), os.SEEK_CUR)  # Global color table
+
+    transparent = False
+    # Extensions before the first image may carry the transparency flag
+    while True:
+        introducer = f.read(1)
+        if introducer != b"!":
+            break
+        label = f.read(1)
+        if label == b"\xf9":
+            block = f.read(6)
+            transparent = len(block) == 6 and bool(block[1] & 0x01)
+            break
+        size = f.read(1)
+        while size and size[0]:
+            f.seek(size[0], os.SEEK_CUR)
+            size = f.read(1)
+    return "GIF", width, height, "P", transparent
+
+
+def _parse_webp(f: BinaryIO) -> Optional[_HeaderInfo]:
+    """Read the VP8, VP8L or VP8X chunk header."""
+    f.seek(12)
+    chunk = f.read(4)
+    data = f.read(26)
+    if chunk == b"VP8 " and len(data) >= 14 and data[7:10] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", data[10:14])
+        return "WEBP", width & 0x3FFF, height & 0x3FFF, "RGB", False
+    if chunk == b"VP8L" and len(data) >= 9 and data[4] == 0x2F:
+        bits = int.from_bytes(data[5:9], "little")
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+        alpha = bool((bits >> 28) & 1)
+        return "WEBP", width, height, "RGBA" if alpha else "RGB", alpha
+    if chunk == b"VP8X" and len(data) >= 14:
+        alpha = bool(data[4] & 0x10)
+        width = int.from_bytes(data[8:11], "little") + 1
+        height = int.from_bytes(data[11:14], "little") + 1
+        return "WEBP", width, height, "RGBA" if alpha else "RGB", alpha
+    return None
+
+
+_TIFF_TYPE_SIZES = {3: (2, "H"), 4: (4, "I")}
+
+
+def _parse_tiff(f: BinaryIO) -> Optional[_HeaderInfo]:
+    """Read the tags of the first IFD."""
+    f.seek(0)
+    order = "<" if f.read(2) == b"II" else ">"
+    f.seek(4)
+    (ifd_offset,) = struct.unpack(order + "I", f.read(4))
+    f.seek(ifd_offset)
+    (count,) = struct.unpack(order + "H", f.read(2))
+
+    tags: Dict[int, int] = {}
+    entries = f.read(12 * count)
+    for i in range(count):
+        tag, field_type, values = struct.unpack(
+            order + "HHI", entries[12 * i:12 * i + 8]
+        )
+        if field_type not in _TIFF_TYPE_SIZES:
+            continue
+        size, code = _TIFF_TYPE_SIZES[field_type]
+        raw = entries[12 * i + 8:12 * i + 8 + size]
+        if values == 1 or tag == 258:  # BitsPerSample may list one value per sample
+            (tags[tag],) = struct.unpack(order + code, raw)
+
+    if 256 not in tags or 257 not in tags:
+        return None
+    bits = tags.get(258, 1)
+    samples = tags.get(277, 1)
+    photometric = tags.get(262, 2 if samples >= 3 else 1)
+    extra_samples = 338 in tags
+
+    if photometric in (0, 1):
+        mode = "1" if bits == 1 else ("LA" if samples == 2 else "L")
+    elif photometric == 3:
+        mode = "P"
+    elif photometric == 5:
+        mode = "CMYK"
+    else:
+        mode = "RGBA" if samples >= 4 else "RGB"
+    transparent = mode in ("RGBA", "LA") or (extra_samples and samples in (2, 4))
+    return "TIFF", tags[256], tags[257], mode, transparent
+
+
+def _parse_bmp(f: BinaryIO) -> Optional[_HeaderInfo]:
+    """Read the DIB header."""
+    f.seek(14)
+    (header_size,) = struct.unpack("<I", f.read(4))
+    if header_size == 12:
+        width, height, _, bpp = struct.unpack("<HHHH", f.read(8))
+    else:
+        width, height, _, bpp = struct.unpack("<iiHH", f.read(12))
+    mode = "1" if bpp == 1 else "P" if bpp <= 8 else "RGB"
+    return "BMP", width, abs(height), mode, False
+
+
+def _parse_header(f: BinaryIO) -> Optional[_HeaderInfo]:
+    """Dispatch on the file signature."""
+    signature = f.read(16)
+    if signature.startswith(b"\xff\xd8"):
+        return _parse_jpeg(f)
+    if signature.startswith(b"\x89PNG\r\n\x1a\n"):
+        return _parse_png(f)
+    if signature[:6] in (b"GIF87a", b"GIF89a"):
+        return _parse_gif(f)
+    if signature[:4] == b"RIFF" and signature[8:12] == b"WEBP":
+        return _parse_webp(f)
+    if signature[:4] in (b"II*\x00", b"MM\x00*"):
+        return _parse_tiff(f)
+    if signature[:2] == b"BM":
+        return _parse_bmp(f)
+    return None
+
+
+_probe_cache: "OrderedDict[str, Tuple[Tuple[int, int], ImageMetadata]]" = OrderedDict()
+_probe_lock = Lock()
+
+
+def probe_image(image_path: Path) -> Optional[ImageMetadata]:
+    """
+    Read image metadata from the file header, without decoding pixels.
+
+    Results are cached per path and reused while the file's size and
+    modification time are unchanged.
+
+    Args:
+        image_path: Path to image file
+
+    Returns:
+        ImageMetadata record, or None if the file is missing or not a
+        readable image
+    """
+    try:
+        stat = os.stat(image_path)
+    except OSError:
+        return None
+
+    key = str(image_path)
+    fingerprint = (stat.st_size, stat.st_mtime_ns)
+    with _probe_lock:
+        cached = _probe_cache.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            _probe_cache.move_to_end(key)
+            return cached[1]
+
+    info: Optional[_HeaderInfo] = None
+    try:
+        with open(image_path, "rb") as f:
+            info = _parse_header(f)
+    except (OSError, struct.error, IndexError, ValueError) as e:
+        logger.debug(f"Header parse failed for {image_path}: {e}")
+
+    if info is None:
+        # Unknown or unusual layout: let Pillow identify it (still header-only)
+        try:
+            with Image.open(image_path) as img:
+                info = (
+                    img.format or "unknown", img.width, img.height, img.mode,
+                    img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info,
+                )
+        except Exception as e:
+            logger.debug(f"Could not identify image {image_path}: {e}")
+            return None
+
+    format, width, height, mode, has_transparency = info
+    metadata = ImageMetadata(
+        path=image_path,
+        width=width,
+        height=height,
+        format=format,
+        mode=mode,
+        size_bytes=stat.st_size,
+        has_transparency=has_transparency,
+        mtime_ns=stat.st_mtime_ns
+    )
+
+    with _probe_lock:
+        _probe_cache[key] = (fingerprint, metadata)
+        _probe_cache.move_to_end(key)
+        while len(_probe_cache) > PROBE_CACHE_SIZE:
+            _probe_cache.popitem(last=False)
+
+    return metadata
+
+
+def clear_probe_cache() -> None:
+    """Forget all cached header probes."""
+    with _probe_lock:
+        _probe_cache.clear()
+
+
 def get_image_metadata(image_path: Path) -> Optional[ImageMetadata]:
     """
     Extract metadata from an image file.
@@ -96,28 +384,10 @@ def get_image_metadata(image_path: Path) -> Optional[ImageMetadata]:
         logger.warning(f"Image not found: {image_path}")
         return None
 
-    try:
-        with Image.open(image_path) as img:
-            width, height = img.size
-            format = img.format or "unknown"
-            mode = img.mode
-
-        size_bytes = image_path.stat().st_size
-
-        return ImageMetadata(
-            path=image_path,
-            width=width,
-            height=height,
-            format=format,
-            mode=mode,
-            size_bytes=size_bytes
-        )
-    except (IOError, OSError) as e:
-        logger.warning(f"Could not read image {image_path}: {e}")
-        return None
-    except Exception as e:
-        logger.error(f"Error getting metadata for {image_path}: {e}")
-        return None
+    metadata = probe_image(image_path)
+    if metadata is None:
+        logger.warning(f"Could not read image {image_path}")
+    return metadata
 
 
 def get_image_dimensions(image_path: Path) -> Optional[Tuple[int, int]]:
@@ -130,12 +400,11 @@ def get_image_dimensions(image_path: Path) -> Optional[Tuple[int, int]]:
     Returns:
         Tuple of (width, height) in pixels, or None if image cannot be read
     """
-    try:
-        with Image.open(image_path) as img:
-            return img.size
-    except Exception as e:
-        logger.warning(f"Could not get dimensions for {image_path}: {e}")
+    metadata = probe_image(image_path)
+    if metadata is None:
+        logger.warning(f"Could not get dimensions for {image_path}")
         return None
+    return metadata.width, metadata.height
 
 
 def get_image_format(image_path: Path) -> Optional[str]:
@@ -148,12 +417,11 @@ def get_image_format(image_path: Path) -> Optional[str]:
     Returns:
         Format string (e.g., "JPEG", "PNG"), or None if cannot be determined
     """
-    try:
-        with Image.open(image_path) as img:
-            return img.format
-    except Exception as e:
-        logger.warning(f"Could not determine format for {image_path}: {e}")
+    metadata = probe_image(image_path)
+    if metadata is None:
+        logger.warning(f"Could not determine format for {image_path}")
         return None
+    return metadata.format
 
 
 def is_supported_format(file_path: Path) -> bool:
@@ -169,18 +437,22 @@ def is_supported_format(file_path: Path) -> bool:
     return file_path.suffix.lower() in SUPPORTED_FORMATS
 
 
-def validate_image_file(image_path: Path) -> Tuple[bool, Optional[str]]:
+def validate_image_file(
+    image_path: Path,
+    verify: bool = False
+) -> Tuple[bool, Optional[str]]:
     """
     Validate that a file is a readable image.
 
-    Performs comprehensive validation:
+    Performs validation:
     - File exists and is readable
     - Extension is supported
-    - File can be opened as image
-    - Image data is not corrupt
+    - Header identifies an image with valid dimensions
+    - With ``verify``, image data is not corrupt (reads the whole file)
 
     Args:
         image_path: Path to image file
+        verify: Also run Pillow's full integrity check
 
     Returns:
         Tuple of (is_valid, error_message)
@@ -196,23 +468,24 @@ def validate_image_file(image_path: Path) -> Tuple[bool, Optional[str]]:
     if not is_supported_format(image_path):
         return False, f"Unsupported format: {image_path.suffix}"
 
-    try:
-        with Image.open(image_path) as img:
-            # Verify image data is readable
-            img.verify()
-
-        # Reopen to get actual dimensions (verify closes the file)
-        with Image.open(image_path) as img:
-            width, height = img.size
-            if width <= 0 or height <= 0:
-                return False, f"Invalid dimensions: {width}x{height}"
-
-        return True, None
-
-    except (IOError, OSError) as e:
-        return False, f"Cannot read image: {e}"
-    except Exception as e:
-        return False, f"Corrupt or invalid image: {e}"
+    metadata = probe_image(image_path)
+    if metadata is None:
+        return False, "Cannot read image: unrecognized image header"
+
+    if metadata.width <= 0 or metadata.height <= 0:
+        return False, f"Invalid dimensions: {metadata.width}x{metadata.height}"
+
+    if verify:
+        try:
+            with Image.open(image_path) as img:
+                # Verify image data is readable
+                img.verify()
+        except (IOError, OSError) as e:
+            return False, f"Cannot read image: {e}"
+        except Exception as e:
+            return False, f"Corrupt or invalid image: {e}"
+
+    return True, None
 
 
 def filter_valid_images(file_paths: List[Path]) -> List[Path]:
@@ -3,42 +3,156 @@ Duplicate file index module.
 
 Maintains an efficient hash-to-files mapping for quick duplicate detection
 and provides statistics about duplicates and potential space savings.
+
+Two storage modes are available:
+- In-memory (default): compact ``__slots__`` records with interned directory
+  strings and integer nanosecond timestamps
+- SQLite-backed: pass ``db_path`` to keep the index on disk, for volumes
+  whose file count does not fit comfortably in RAM
+
+Statistics are kept as running counters, so ``get_statistics`` and
+``len()`` are O(1) in both modes.
+
+Hardlinks are recognised by (device, inode): extra links to a file that is
+already in a group count as members but not as separate copies, so
+``wasted_space`` is the space deleting duplicates would actually free.
 """
 
-from pathlib import Path
-from typing import Dict, List, Optional
+import os
+import sqlite3
+import sys
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+Timestamp = Union[datetime, int, float]
+
+
+def _to_ns(value: Optional[Timestamp]) -> int:
+    """Convert a datetime, float seconds or int nanoseconds to int nanoseconds."""
+    if value is None:
+        return 0
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1_000_000_000)
+    if isinstance(value, float):
+        return int(value * 1_000_000_000)
+    return int(value)
 
 
-@dataclass
 class FileMetadata:
-    """Metadata about a file in the duplicate index."""
-    
-    path: Path
-    size: int
-    modified_time: datetime
-    accessed_time: datetime
-    hash_value: str
-    
-    def __post_init__(self):
-        """Ensure path is a Path object."""
-        if not isinstance(self.path, Path):
-            self.path = Path(self.path)
+    """
+    Metadata about a file in the duplicate index.
+
+    Uses ``__slots__`` and stores the parent directory as an interned string
+    shared by every file in that directory. Timestamps are integer
+    nanoseconds; ``modified_time``/``accessed_time`` expose them as datetimes.
+    ``inode`` and ``device`` are 0 when unknown.
+    """
+
+    __slots__ = ("_dir", "_name", "size", "mtime_ns", "atime_ns", "hash_value", "inode", "device")
+
+    def __init__(
+        self,
+        path: Union[Path, str],
+        size: int,
+        modified_time: Optional[Timestamp] = None,
+        accessed_time: Optional[Timestamp] = None,
+        hash_value: str = "",
+        inode: int = 0,
+        device: int = 0,
+    ):
+        """
+        Create a metadata record.
+
+        Args:
+            path: Path to the file
+            size: File size in bytes
+            modified_time: Modification time (datetime, epoch seconds or ns)
+            accessed_time: Access time (datetime, epoch seconds or ns)
+            hash_value: Hash value of the file
+            inode: Inode number (0 if unknown)
+            device: Device number of the filesystem holding the inode
+        """
+        directory, name = os.path.split(os.fspath(path))
+        self._dir = sys.intern(directory)
+        self._name = name
+        self.size = size
+        self.mtime_ns = _to_ns(modified_time)
+        self.atime_ns = _to_ns(accessed_time)
+        self.hash_value = hash_value
+        self.inode = inode
+        self.device = device
+
+    @property
+    def file_id(self) -> Optional[Tuple[int, int]]:
+        """(device, inode) identifying the underlying file, or None if unknown."""
+        return (self.device, self.inode) if self.inode else None
+
+    @property
+    def path(self) -> Path:
+        """Path to the file."""
+        return Path(self._dir, self._name)
+
+    @property
+    def path_str(self) -> str:
+        """Path to the file as a string (avoids building a Path)."""
+        return os.path.join(self._dir, self._name)
+
+    @property
+    def modified_time(self) -> datetime:
+        """Modification time as a datetime."""
+        return datetime.fromtimestamp(self.mtime_ns / 1_000_000_000)
+
+    @property
+    def accessed_time(self) -> datetime:
+        """Access time as a datetime."""
+        return datetime.fromtimestamp(self.atime_ns / 1_000_000_000)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FileMetadata):
+            return NotImplemented
+        return (
+            self.path_str == other.path_str
+            and self.size == other.size
+            and self.mtime_ns == other.mtime_ns
+            and self.atime_ns == other.atime_ns
+            and self.hash_value == other.hash_value
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"FileMetadata(path={self.path_str!r}, size={self.size}, "
+            f"mtime_ns={self.mtime_ns}, hash_value={self.hash_value!r})"
+        )
 
 
 @dataclass
 class DuplicateGroup:
     """A group of duplicate files with the same hash."""
-    
+
     hash_value: str
     files: List[FileMetadata] = field(default_factory=list)
-    
+
     @property
     def count(self) -> int:
         """Number of files in this duplicate group."""
         return len(self.files)
-    
+
+    @property
+    def copies(self) -> int:
+        """Number of distinct files on disk (hardlinks to one inode count once)."""
+        ids = set()
+        unknown = 0
+        for file in self.files:
+            file_id = file.file_id
+            if file_id is None:
+                unknown += 1
+            else:
+                ids.add(file_id)
+        return len(ids) + unknown
+
     @property
     def total_size(self) -> int:
         """Total size of all files in this group."""
@@ -46,131 +160,459 @@ class DuplicateGroup:
             return 0
         # All files have the same size, multiply by count
         return self.files[0].size * self.count
-    
+
     @property
     def wasted_space(self) -> int:
-        """Space that could be saved by keeping only one file."""
-        if self.count <= 1:
+        """Space that could be saved by keeping only one copy."""
+        copies = self.copies
+        if copies <= 1:
             return 0
-        # Keep one copy, delete the rest
-        return self.files[0].size * (self.count - 1)
+        # Keep one copy, delete the rest; extra hardlinks free nothing
+        return self.files[0].size * (copies - 1)
 
 
 class DuplicateIndex:
     """
     Maintains an index of file hashes for duplicate detection.
-    
+
     Uses a dictionary with hash as key and list of file metadata as value.
     Provides O(1) lookup for duplicate detection and various statistics.
+    A hash is a duplicate group only when it covers two or more distinct
+    files; paths that are all hardlinks of one inode are not duplicates.
+
+    When ``db_path`` is given, records live in a SQLite database instead of
+    memory. Inserts are buffered and flushed in batches of ``batch_size``.
     """
-    
-    def __init__(self):
-        """Initialize an empty duplicate index."""
+
+    DEFAULT_BATCH_SIZE = 10000
+
+    SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS files (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        atime_ns INTEGER NOT NULL,
+        hash TEXT NOT NULL,
+        inode INTEGER NOT NULL DEFAULT 0,
+        device INTEGER NOT NULL DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS hash_groups (
+        hash TEXT PRIMARY KEY,
+        count INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        copies INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID;
+
+    CREATE INDEX IF NOT EXISTS idx_files_hash ON files(hash);
+    CREATE INDEX IF NOT EXISTS idx_files_size ON files(size);
+    CREATE INDEX IF NOT EXISTS idx_hash_groups_count ON hash_groups(count);
+    """
+
+    # Columns added after the first on-disk format: (table, column, definition)
+    ADDED_COLUMNS = [
+        ("files", "inode", "INTEGER NOT NULL DEFAULT 0"),
+        ("files", "device", "INTEGER NOT NULL DEFAULT 0"),
+        ("hash_groups", "copies", "INTEGER NOT NULL DEFAULT 0"),
+    ]
+
+    # Indexes on added columns; created after the upgrade so older databases
+    # have the columns first (new databases get them through the same path)
+    ADDED_INDEXES_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_files_inode ON files(device, inode);
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ):
+        """
+        Initialize an empty duplicate index.
+
+        Args:
+            db_path: Optional SQLite database file for on-disk mode.
+                    An existing database is reopened and its counters restored.
+            batch_size: Number of buffered inserts before flushing to SQLite
+        """
+        self.db_path = Path(db_path) if db_path is not None else None
+        self.batch_size = batch_size
+
         self._index: Dict[str, List[FileMetadata]] = {}
-        self._size_index: Dict[int, List[Path]] = {}
-    
+        # size -> the same records as in _index (no second Path per file)
+        self._size_index: Dict[int, List[FileMetadata]] = {}
+        # hash -> number of distinct files (inodes) in the in-memory index
+        self._copies: Dict[str, int] = {}
+        # (device, inode) -> hash, for files known to have several links
+        self._linked: Dict[Tuple[int, int], str] = {}
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._closed = False
+        self._pending: List[tuple] = []
+        # hash -> [count, size, copies] for groups touched since the last flush
+        self._group_cache: Dict[str, List[int]] = {}
+
+        self._reset_counters()
+
+        if self.db_path is not None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path))
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA_SQL)
+            self._add_missing_columns()
+            self._conn.executescript(self.ADDED_INDEXES_SQL)
+            self._conn.commit()
+            self._load_counters()
+
+        # Links to files indexed in an earlier session are looked up on disk
+        self._check_stored_links = self._total_files > 0
+
+    @property
+    def on_disk(self) -> bool:
+        """Whether the index is backed by SQLite."""
+        return self.db_path is not None
+
+    def _check_open(self) -> None:
+        """Refuse use of an on-disk index after ``close()``."""
+        if self._closed:
+            raise RuntimeError(f"Duplicate index at {self.db_path} is closed")
+
+    def _reset_counters(self) -> None:
+        """Reset running statistics counters."""
+        self._total_files = 0
+        self._unique_hashes = 0
+        self._duplicate_files = 0
+        self._duplicate_groups = 0
+        self._wasted_space = 0
+        self._largest_group = 0
+        self._linked_files = 0
+
+    def _add_missing_columns(self) -> None:
+        """Upgrade a database created before inode tracking."""
+        for table, column, definition in self.ADDED_COLUMNS:
+            columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                if column == "copies":
+                    # Older indexes had no inode data: every file was a copy
+                    self._conn.execute("UPDATE hash_groups SET copies = count")
+
+    def _load_counters(self) -> None:
+        """Restore counters from an existing SQLite index (one pass over groups)."""
+        row = self._conn.execute(
+            """
+            SELECT
+                COALESCE(SUM(count), 0),
+                COUNT(*),
+                COALESCE(SUM(CASE WHEN copies > 1 THEN count ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN copies > 1 THEN 1 ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN copies > 1 THEN size * (copies - 1) ELSE 0 END), 0),
+                COALESCE(MAX(CASE WHEN copies > 1 THEN count ELSE 0 END), 0),
+                COALESCE(SUM(count - copies), 0)
+            FROM hash_groups
+            """
+        ).fetchone()
+        (
+            self._total_files,
+            self._unique_hashes,
+            self._duplicate_files,
+            self._duplicate_groups,
+            self._wasted_space,
+            self._largest_group,
+            self._linked_files,
+        ) = row
+
+    def _update_counters(
+        self,
+        previous_count: int,
+        previous_copies: int,
+        group_size: int,
+        new_copy: bool = True
+    ) -> None:
+        """
+        Update running counters for a file joining a hash group.
+
+        Args:
+            previous_count: Number of files in the group before this one
+            previous_copies: Number of distinct files (inodes) in the group
+            group_size: Size of the files in the group
+            new_copy: False if the file is a hardlink to a group member
+        """
+        self._total_files += 1
+        if previous_count == 0:
+            self._unique_hashes += 1
+            return
+
+        copies = previous_copies + new_copy
+        if not new_copy:
+            self._linked_files += 1
+        if copies < 2:
+            return
+
+        if previous_copies < 2:
+            # The group just became a duplicate group; its earlier links count too
+            self._duplicate_groups += 1
+            self._duplicate_files += previous_count + 1
+        else:
+            self._duplicate_files += 1
+        if new_copy:
+            self._wasted_space += group_size
+        self._largest_group = max(self._largest_group, previous_count + 1)
+
+    def _is_new_copy(
+        self,
+        file_hash: str,
+        file_id: Optional[Tuple[int, int]],
+        links: int
+    ) -> bool:
+        """
+        Whether a file adds a distinct copy to its hash group.
+
+        Only files with more than one link can be a second path to an
+        inode, so only those are remembered. For a reopened on-disk index,
+        links to files from earlier sessions are found with an indexed
+        (device, inode) lookup that only runs for multi-link files.
+        """
+        if file_id is None or links <= 1:
+            return True
+
+        known = self._linked.get(file_id)
+        if known is None and self._conn is not None and self._check_stored_links:
+            row = self._conn.execute(
+                "SELECT hash FROM files WHERE device = ? AND inode = ? LIMIT 1", file_id
+            ).fetchone()
+            known = row[0] if row else None
+        if known is None:
+            self._linked[file_id] = file_hash
+        return known != file_hash
+
     def add_file(
         self,
         file_path: Path,
         file_hash: str,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict[str, Any]] = None
     ) -> None:
         """
         Add a file to the index.
-        
+
         Args:
             file_path: Path to the file
             file_hash: Hash value of the file
             metadata: Optional dictionary with file metadata.
-                     Expected keys: size, modified_time, accessed_time
+                     Expected keys: size, and either mtime_ns/atime_ns or
+                     modified_time/accessed_time. Optional inode, device and
+                     nlink identify hardlinks. Pass ``stat`` with an
+                     ``os.stat_result`` to reuse a stat the caller already did.
         """
+        self._check_open()
+
         # Get file stats if metadata not provided
         if metadata is None:
-            stat = file_path.stat()
-            metadata = {
-                "size": stat.st_size,
-                "modified_time": datetime.fromtimestamp(stat.st_mtime),
-                "accessed_time": datetime.fromtimestamp(stat.st_atime),
-            }
-        
+            metadata = {"stat": file_path.stat()}
+
+        stat = metadata.get("stat")
+        if stat is not None:
+            size = stat.st_size
+            mtime_ns = stat.st_mtime_ns
+            atime_ns = stat.st_atime_ns
+            inode, device, links = stat.st_ino, stat.st_dev, stat.st_nlink
+        else:
+            inode = metadata.get("inode", 0)
+            device = metadata.get("device", 0)
+            links = metadata.get("nlink", 1)
+            size = metadata.get("size", 0)
+            mtime_ns = metadata.get("mtime_ns")
+            if mtime_ns is None:
+                mtime_ns = _to_ns(metadata.get("modified_time"))
+            atime_ns = metadata.get("atime_ns")
+            if atime_ns is None:
+                atime_ns = _to_ns(metadata.get("accessed_time"))
+
+        file_id = (device, inode) if inode else None
+        new_copy = self._is_new_copy(file_hash, file_id, links)
+
+        if self._conn is not None:
+            self._add_to_db(
+                file_path, file_hash, size, mtime_ns, atime_ns, inode, device, new_copy
+            )
+            return
+
         # Create metadata object
         file_metadata = FileMetadata(
             path=file_path,
-            size=metadata.get("size", 0),
-            modified_time=metadata.get("modified_time", datetime.now()),
-            accessed_time=metadata.get("accessed_time", datetime.now()),
+            size=size,
+            modified_time=mtime_ns,
+            accessed_time=atime_ns,
             hash_value=file_hash,
+            inode=inode,
+            device=device,
         )
-        
+
         # Add to hash index
-        if file_hash not in self._index:
-            self._index[file_hash] = []
-        self._index[file_hash].append(file_metadata)
-        
+        files = self._index.get(file_hash)
+        if files is None:
+            files = self._index[file_hash] = []
+        copies = self._copies.get(file_hash, 0)
+        self._update_counters(
+            len(files), copies, files[0].size if files else size, new_copy or not files
+        )
+        self._copies[file_hash] = copies + (new_copy or not files)
+        files.append(file_metadata)
+
         # Add to size index for quick pre-filtering
-        size = file_metadata.size
         if size not in self._size_index:
             self._size_index[size] = []
-        self._size_index[size].append(file_path)
-    
+        self._size_index[size].append(file_metadata)
+
+    def _add_to_db(
+        self,
+        file_path: Path,
+        file_hash: str,
+        size: int,
+        mtime_ns: int,
+        atime_ns: int,
+        inode: int = 0,
+        device: int = 0,
+        new_copy: bool = True
+    ) -> None:
+        """Buffer a file record for the SQLite index."""
+        group = self._group_cache.get(file_hash)
+        if group is None:
+            row = self._conn.execute(
+                "SELECT count, size, copies FROM hash_groups WHERE hash = ?", (file_hash,)
+            ).fetchone()
+            group = [row[0], row[1], row[2]] if row else [0, size, 0]
+            self._group_cache[file_hash] = group
+
+        new_copy = new_copy or group[0] == 0
+        self._update_counters(group[0], group[2], group[1], new_copy)
+        group[0] += 1
+        group[2] += new_copy
+
+        self._pending.append(
+            (os.fspath(file_path), size, mtime_ns, atime_ns, file_hash, inode, device)
+        )
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered records to SQLite (no-op for in-memory indexes)."""
+        self._check_open()
+        if self._conn is None or not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO files (path, size, mtime_ns, atime_ns, hash, inode, device) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._pending,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hash_groups (hash, count, size, copies) VALUES (?, ?, ?, ?)",
+                [(h, g[0], g[1], g[2]) for h, g in self._group_cache.items()],
+            )
+        self._pending.clear()
+        self._group_cache.clear()
+
+    def _rows_to_metadata(self, rows: List[tuple]) -> List[FileMetadata]:
+        """Convert SQLite rows (path, size, mtime_ns, atime_ns, hash, inode, device) to records."""
+        return [FileMetadata(*row) for row in rows]
+
+    def iter_duplicates(self) -> Iterator[DuplicateGroup]:
+        """
+        Iterate over duplicate groups without materializing all of them.
+
+        Yields:
+            DuplicateGroup objects for hashes with 2+ files
+        """
+        self._check_open()
+        if self._conn is None:
+            for hash_value, files in self._index.items():
+                if self._copies[hash_value] > 1:
+                    yield DuplicateGroup(hash_value=hash_value, files=files)
+            return
+
+        self.flush()
+        hashes = self._conn.execute(
+            "SELECT hash FROM hash_groups WHERE copies > 1"
+        )
+        for (hash_value,) in hashes:
+            yield DuplicateGroup(
+                hash_value=hash_value,
+                files=self.get_files_by_hash(hash_value),
+            )
+
     def get_duplicates(self) -> Dict[str, DuplicateGroup]:
         """
         Get all duplicate file groups.
-        
+
         Returns:
             Dictionary mapping hash values to DuplicateGroup objects.
-            Only includes hashes with 2+ files (actual duplicates).
-        """
-        duplicates = {}
-        
-        for hash_value, files in self._index.items():
-            if len(files) > 1:
-                duplicates[hash_value] = DuplicateGroup(
-                    hash_value=hash_value,
-                    files=files
-                )
-        
-        return duplicates
-    
+            Only includes hashes with 2+ distinct files (actual duplicates).
+        """
+        return {group.hash_value: group for group in self.iter_duplicates()}
+
     def get_files_by_hash(self, file_hash: str) -> List[FileMetadata]:
         """
         Get all files with a specific hash.
-        
+
         Args:
             file_hash: Hash value to look up
-            
+
         Returns:
             List of file metadata objects with this hash
         """
-        return self._index.get(file_hash, [])
-    
+        self._check_open()
+        if self._conn is None:
+            return self._index.get(file_hash, [])
+
+        self.flush()
+        rows = self._conn.execute(
+            "SELECT path, size, mtime_ns, atime_ns, hash, inode, device FROM files "
+            "WHERE hash = ? ORDER BY id",
+            (file_hash,),
+        ).fetchall()
+        return self._rows_to_metadata(rows)
+
     def get_files_by_size(self, size: int) -> List[Path]:
         """
         Get all files with a specific size.
-        
+
         This is useful for pre-filtering before hashing.
-        
+
         Args:
             size: File size in bytes
-            
+
         Returns:
             List of file paths with this size
         """
-        return self._size_index.get(size, [])
-    
+        self._check_open()
+        if self._conn is None:
+            return [record.path for record in self._size_index.get(size, [])]
+
+        self.flush()
+        rows = self._conn.execute(
+            "SELECT path FROM files WHERE size = ? ORDER BY id", (size,)
+        ).fetchall()
+        return [Path(row[0]) for row in rows]
+
     def has_duplicates(self) -> bool:
         """
         Check if there are any duplicates in the index.
-        
+
         Returns:
             True if there are files with duplicate hashes
         """
-        return any(len(files) > 1 for files in self._index.values())
-    
+        self._check_open()
+        return self._duplicate_groups > 0
+
     def get_statistics(self) -> Dict:
         """
         Get statistics about the index.
-        
+
+        Runs in O(1) from counters maintained by ``add_file``.
+
         Returns:
             Dictionary with statistics including:
             - total_files: Total number of indexed files
@@ -179,40 +621,69 @@ class DuplicateIndex:
             - duplicate_groups: Number of duplicate groups
             - wasted_space: Total space that could be saved
             - largest_group: Size of the largest duplicate group
+            - hardlinked_files: Paths that are extra links to an indexed file
         """
-        duplicates = self.get_duplicates()
-        
-        total_files = sum(len(files) for files in self._index.values())
-        unique_files = len(self._index)
-        duplicate_files = sum(
-            len(files) for files in self._index.values() if len(files) > 1
-        )
-        duplicate_groups = len(duplicates)
-        wasted_space = sum(group.wasted_space for group in duplicates.values())
-        largest_group = max(
-            (group.count for group in duplicates.values()),
-            default=0
-        )
-        
+        self._check_open()
         return {
-            "total_files": total_files,
-            "unique_files": unique_files,
-            "duplicate_files": duplicate_files,
-            "duplicate_groups": duplicate_groups,
-            "wasted_space": wasted_space,
-            "wasted_space_mb": round(wasted_space / (1024 * 1024), 2),
-            "largest_group": largest_group,
+            "total_files": self._total_files,
+            "unique_files": self._unique_hashes,
+            "duplicate_files": self._duplicate_files,
+            "duplicate_groups": self._duplicate_groups,
+            "wasted_space": self._wasted_space,
+            "wasted_space_mb": round(self._wasted_space / (1024 * 1024), 2),
+            "largest_group": self._largest_group,
+            "hardlinked_files": self._linked_files,
         }
-    
+
     def clear(self) -> None:
         """Clear all data from the index."""
+        self._check_open()
         self._index.clear()
         self._size_index.clear()
-    
+        self._copies.clear()
+        self._linked.clear()
+        self._pending.clear()
+        self._group_cache.clear()
+        if self._conn is not None:
+            with self._conn:
+                self._conn.execute("DELETE FROM files")
+                self._conn.execute("DELETE FROM hash_groups")
+        self._reset_counters()
+
+    def close(self) -> None:
+        """
+        Flush pending records and close the SQLite connection, if any.
+
+        An on-disk index cannot be used after closing; further calls raise
+        RuntimeError. Closing twice is harmless.
+        """
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
+            self._closed = True
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
+
     def __len__(self) -> int:
         """Return total number of files in the index."""
-        return sum(len(files) for files in self._index.values())
-    
+        self._check_open()
+        return self._total_files
+
     def __contains__(self, file_hash: str) -> bool:
         """Check if a hash exists in the index."""
-        return file_hash in self._index
+        self._check_open()
+        if self._conn is None:
+            return file_hash in self._index
+        if file_hash in self._group_cache:
+            return True
+        row = self._conn.execute(
+            "SELECT 1 FROM hash_groups WHERE hash = ?", (file_hash,)
+        ).fetchone()
+        return row is not None
@@ -0,0 +1,128 @@
+"""
+Hardlink and reflink helpers for deduplication.
+
+Provides copy-on-write cloning (reflinks) where the filesystem supports
+it, and atomic replacement of a duplicate file with a link to the copy
+being kept, so duplicates can be collapsed without losing any path.
+"""
+
+import errno
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Literal, Optional
+
+# fcntl is Unix-only, not available on Windows
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+logger = logging.getLogger(__name__)
+
+LinkMethod = Literal["hardlink", "reflink"]
+
+# ioctl request that clones one file's extents into another (Linux,
+# supported by Btrfs, XFS with reflink=1, bcachefs, OCFS2 and others)
+FICLONE = 0x40049409
+
+# Errors meaning "this kind of link is not possible here", not a failure
+LINK_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EMLINK,
+    errno.EACCES,
+}
+
+
+def reflink_file(source: Path, target: Path) -> bool:
+    """
+    Create ``target`` as a copy-on-write clone of ``source``.
+
+    Args:
+        source: Existing file
+        target: Path of the clone; must not exist
+
+    Returns:
+        True if the clone was created, False if the platform or
+        filesystem does not support reflinks
+    """
+    if not HAS_FCNTL:
+        return False
+
+    error: Optional[OSError] = None
+    with open(source, "rb") as src, open(target, "xb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError as e:
+            error = e
+
+    if error is not None:
+        target.unlink(missing_ok=True)
+        if error.errno not in LINK_UNSUPPORTED_ERRNOS:
+            raise error
+        return False
+
+    shutil.copystat(source, target)
+    return True
+
+
+def same_file(first: Path, second: Path) -> bool:
+    """Whether two paths are links to the same inode."""
+    try:
+        return os.path.samefile(first, second)
+    except OSError:
+        return False
+
+
+def replace_with_link(
+    duplicate: Path,
+    original: Path,
+    method: LinkMethod = "hardlink"
+) -> None:
+    """
+    Replace a duplicate file with a link to the copy being kept.
+
+    The link is created under a temporary name next to ``duplicate`` and
+    renamed over it, so the duplicate's path is never missing. With a
+    hardlink both paths become the same file (later edits show in both);
+    a reflink shares data blocks but stays an independent file.
+
+    Args:
+        duplicate: File to replace
+        original: File to keep and link to
+        method: "hardlink" or "reflink"
+
+    Raises:
+        ValueError: If method is unknown or the paths are already the same file
+        OSError: If the link cannot be created (e.g. across filesystems,
+            or reflinks are unsupported)
+    """
+    if method not in ("hardlink", "reflink"):
+        raise ValueError(f"Invalid link method: {method}. Must be 'hardlink' or 'reflink'")
+
+    duplicate = Path(duplicate)
+    original = Path(original)
+    if same_file(duplicate, original):
+        raise ValueError(f"{duplicate} is already a link to {original}")
+
+    temp_path = duplicate.with_name(f".{duplicate.name}.{os.getpid()}.link")
+    temp_path.unlink(missing_ok=True)
+
+    try:
+        if method == "hardlink":
+            os.link(original, temp_path)
+        elif not reflink_file(original, temp_path):
+            raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported here", str(duplicate))
+        os.replace(temp_path, duplicate)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    logger.debug(f"Replaced {duplicate} with a {method} to {original}")
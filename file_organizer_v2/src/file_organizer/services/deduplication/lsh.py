@@ -0,0 +1,501 @@
+"""
+Random-projection LSH index for near-duplicate document detection.
+
+Each document vector is projected onto random ±1 hyperplanes; the sign
+bits form a signature that is split into bands. Two documents become a
+candidate pair when any band matches exactly. The probability of that
+rises steeply with cosine similarity (each bit agrees with probability
+``1 - angle / pi``), so exact cosine only has to be computed for a small
+set of candidates instead of all n² pairs.
+
+The hyperplane signs are derived from a hash of (seed, feature, band)
+rather than stored, so memory does not grow with the vocabulary: a batch
+only materialises signs for the features it actually uses, one band at a
+time.
+
+The index lives in SQLite (in memory by default, or on disk via
+``db_path``), so documents can be added incrementally across runs as long
+as they are embedded with the same vectorizer.
+"""
+
+import logging
+import math
+import sqlite3
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .semantic import is_sparse, normalize_rows, sp
+
+logger = logging.getLogger(__name__)
+
+# Candidate pairs scored per step of find_similar_pairs
+PAIR_CHUNK_SIZE = 10000
+
+# Ids per "WHERE id IN (...)" lookup (well under SQLite's variable limit)
+_LOOKUP_BATCH = 500
+
+# splitmix64 constants, used to derive hyperplane signs
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def _splitmix64(values: np.ndarray) -> np.ndarray:
+    """Vectorised splitmix64 finaliser over a uint64 array."""
+    z = values + _GOLDEN_GAMMA
+    z = (z ^ (z >> np.uint64(30))) * _MIX_1
+    z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    return z ^ (z >> np.uint64(31))
+
+
+class CosineLSHIndex:
+    """
+    Persistent banded random-projection LSH index with exact re-ranking.
+
+    Attributes:
+        n_features: Dimensionality of the indexed vectors
+        n_bands: Number of signature bands
+        rows_per_band: Hyperplanes (bits) per band
+        seed: Random seed for the hyperplanes
+    """
+
+    # Stored with the index parameters; bump when signatures change
+    PROJECTION = "hashed-sign-v1"
+
+    SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS lsh_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS lsh_documents (
+        id INTEGER PRIMARY KEY,
+        key TEXT NOT NULL UNIQUE,
+        indices BLOB NOT NULL,
+        data BLOB NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS lsh_buckets (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        doc_id INTEGER NOT NULL
+    );
+
+    -- Covering indexes: bucket -> documents for matching, and document ->
+    -- buckets so incremental runs read only the new documents' rows
+    DROP INDEX IF EXISTS idx_lsh_buckets;
+    CREATE INDEX IF NOT EXISTS idx_lsh_buckets_bucket ON lsh_buckets(band, bucket, doc_id);
+    CREATE INDEX IF NOT EXISTS idx_lsh_buckets_doc ON lsh_buckets(doc_id, band, bucket);
+    """
+
+    # Starts from the new documents' bucket rows (b) and finds older bucket
+    # mates (a) by index
+    CANDIDATE_PAIRS_SQL = """
+    SELECT DISTINCT a.doc_id, b.doc_id
+    FROM lsh_buckets b INDEXED BY idx_lsh_buckets_doc
+    CROSS JOIN lsh_buckets a INDEXED BY idx_lsh_buckets_bucket
+      ON a.band = b.band AND a.bucket = b.bucket AND a.doc_id < b.doc_id
+    WHERE b.doc_id >= ?
+    ORDER BY a.doc_id, b.doc_id
+    """
+
+    def __init__(
+        self,
+        n_features: int,
+        n_bands: int = 32,
+        rows_per_band: int = 12,
+        seed: int = 42,
+        db_path: Optional[Path] = None,
+        fingerprint: str = ""
+    ):
+        """
+        Create or open an LSH index.
+
+        Args:
+            n_features: Dimensionality of document vectors
+            n_bands: Number of bands (more bands = higher recall)
+            rows_per_band: Bits per band (more rows = fewer false candidates)
+            seed: Seed for the random hyperplanes
+            db_path: SQLite file for a persistent index (None = in memory)
+            fingerprint: Identifier of the vectorizer that produced the vectors;
+                        reopening an index with a different one is refused
+
+        Raises:
+            ValueError: If parameters are invalid or do not match a stored index
+        """
+        if not 1 <= rows_per_band <= 62:
+            raise ValueError(f"rows_per_band must be between 1 and 62, got {rows_per_band}")
+        if n_bands < 1:
+            raise ValueError(f"n_bands must be positive, got {n_bands}")
+
+        self.n_features = n_features
+        self.n_bands = n_bands
+        self.rows_per_band = rows_per_band
+        self.seed = seed
+        self.fingerprint = fingerprint
+        self.db_path = Path(db_path) if db_path is not None else None
+
+        if self.db_path is not None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path) if self.db_path else ":memory:")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA_SQL)
+        self._check_meta()
+
+        self._weights = (1 << np.arange(rows_per_band, dtype=np.int64))
+        self._bit_shifts = np.arange(rows_per_band, dtype=np.uint64)
+
+    def _check_meta(self) -> None:
+        """Store parameters on first use, or verify them against a stored index."""
+        params = {
+            "n_features": str(self.n_features),
+            "n_bands": str(self.n_bands),
+            "rows_per_band": str(self.rows_per_band),
+            "seed": str(self.seed),
+            "fingerprint": self.fingerprint,
+            "projection": self.PROJECTION,
+        }
+        stored = dict(self._conn.execute("SELECT key, value FROM lsh_meta").fetchall())
+        if not stored:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO lsh_meta (key, value) VALUES (?, ?)", params.items()
+                )
+            return
+
+        mismatched = [k for k, v in params.items() if stored.get(k) != v]
+        if mismatched:
+            raise ValueError(
+                f"LSH index at {self.db_path} was built with different "
+                f"parameters: {', '.join(mismatched)}"
+            )
+
+    @staticmethod
+    def candidate_probability(similarity: float, n_bands: int, rows_per_band: int) -> float:
+        """
+        Probability that two vectors with a given cosine become candidates.
+
+        Useful for choosing ``n_bands``/``rows_per_band`` for a threshold.
+        """
+        similarity = min(max(similarity, -1.0), 1.0)
+        p_bit = 1.0 - math.acos(similarity) / math.pi
+        return 1.0 - (1.0 - p_bit ** rows_per_band) ** n_bands
+
+    def _band_signs(self, features: np.ndarray, band: int) -> np.ndarray:
+        """
+        ±1 hyperplane components of one band for the given feature indices.
+
+        One 64-bit hash per (feature, band) supplies all ``rows_per_band``
+        sign bits, so the same feature always gets the same signs.
+
+        Returns:
+            float32 array (len(features) x rows_per_band)
+        """
+        salt = np.uint64((self.seed * self.n_bands + band) & 0xFFFFFFFFFFFFFFFF)
+        hashed = _splitmix64(_splitmix64(features.astype(np.uint64)) ^ salt)
+        bits = (hashed[:, None] >> self._bit_shifts) & np.uint64(1)
+        return 1.0 - 2.0 * bits.astype(np.float32)
+
+    def band_keys(self, vectors: Any) -> np.ndarray:
+        """
+        Compute band bucket keys for a batch of vectors.
+
+        Args:
+            vectors: Matrix (n x n_features), dense or sparse
+
+        Returns:
+            int64 array (n x n_bands) of bucket keys
+        """
+        if is_sparse(vectors):
+            vectors = vectors.tocsr()
+            # Only the columns this batch uses need hyperplane signs
+            features = np.unique(vectors.indices)
+            vectors = vectors[:, features]
+        else:
+            vectors = np.asarray(vectors, dtype=np.float32)
+            features = np.arange(vectors.shape[1])
+
+        keys = np.empty((vectors.shape[0], self.n_bands), dtype=np.int64)
+        for band in range(self.n_bands):
+            projected = np.asarray(vectors @ self._band_signs(features, band))
+            keys[:, band] = (projected > 0).astype(np.int64) @ self._weights
+        return keys
+
+    def add(self, keys: List[str], vectors: Any) -> List[int]:
+        """
+        Add documents to the index, replacing any with the same key.
+
+        Args:
+            keys: Unique document keys (e.g. file paths)
+            vectors: Matrix of document vectors (len(keys) x n_features)
+
+        Returns:
+            Internal document ids, aligned with ``keys``
+        """
+        if vectors.shape[0] != len(keys):
+            raise ValueError(
+                f"Vector count ({vectors.shape[0]}) must match key count ({len(keys)})"
+            )
+        if vectors.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected {self.n_features} features, got {vectors.shape[1]}"
+            )
+
+        normalized = normalize_rows(vectors)
+        if not is_sparse(normalized):
+            normalized = sp.csr_matrix(normalized)
+        normalized = normalized.tocsr()
+        bucket_keys = self.band_keys(normalized)
+
+        self.remove(keys)
+        ids: List[int] = []
+        with self._conn:
+            for row, key in enumerate(keys):
+                start, end = normalized.indptr[row], normalized.indptr[row + 1]
+                cursor = self._conn.execute(
+                    "INSERT INTO lsh_documents (key, indices, data) VALUES (?, ?, ?)",
+                    (
+                        key,
+                        normalized.indices[start:end].astype(np.int32).tobytes(),
+                        normalized.data[start:end].astype(np.float32).tobytes(),
+                    ),
+                )
+                doc_id = cursor.lastrowid
+                ids.append(doc_id)
+                # All-zero vectors have no direction and would share one bucket
+                if end > start:
+                    self._conn.executemany(
+                        "INSERT INTO lsh_buckets (band, bucket, doc_id) VALUES (?, ?, ?)",
+                        [(band, int(bucket_keys[row, band]), doc_id)
+                         for band in range(self.n_bands)],
+                    )
+
+        logger.debug(f"Indexed {len(keys)} documents")
+        return ids
+
+    def remove(self, keys: Iterable[str]) -> None:
+        """Remove documents by key (unknown keys are ignored)."""
+        with self._conn:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT id FROM lsh_documents WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    continue
+                self._conn.execute("DELETE FROM lsh_buckets WHERE doc_id = ?", (row[0],))
+                self._conn.execute("DELETE FROM lsh_documents WHERE id = ?", (row[0],))
+
+    def iter_candidate_pairs(
+        self,
+        min_doc_id: int = 0,
+        chunk_size: int = PAIR_CHUNK_SIZE
+    ) -> Iterator[List[Tuple[int, int]]]:
+        """
+        Candidate document id pairs sharing at least one band bucket, in chunks.
+
+        The join starts from the bucket rows of documents with id >=
+        ``min_doc_id`` and looks up their bucket mates by index, so an
+        incremental run reads only the new documents' rows and their
+        matches, not the whole bucket table.
+
+        Args:
+            min_doc_id: Only return pairs involving a document with id >= this
+                       (use the first id of a newly added batch for incremental runs)
+            chunk_size: Pairs per yielded list
+
+        Yields:
+            Lists of (smaller_id, larger_id) pairs, in sorted order
+        """
+        cursor = self._conn.execute(self.CANDIDATE_PAIRS_SQL, (min_doc_id,))
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield [(a, b) for a, b in rows]
+        finally:
+            cursor.close()
+
+    def candidate_pairs(self, min_doc_id: int = 0) -> List[Tuple[int, int]]:
+        """
+        All candidate pairs as one list (see ``iter_candidate_pairs``).
+
+        Returns:
+            Sorted list of (smaller_id, larger_id) pairs
+        """
+        return [pair for chunk in self.iter_candidate_pairs(min_doc_id) for pair in chunk]
+
+    def _select_by_ids(self, columns: str, doc_ids: List[int]) -> Iterator[tuple]:
+        """Yield ``(id, *columns)`` rows for ``doc_ids`` in batched IN lookups."""
+        for start in range(0, len(doc_ids), _LOOKUP_BATCH):
+            batch = doc_ids[start:start + _LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            yield from self._conn.execute(
+                f"SELECT id, {columns} FROM lsh_documents WHERE id IN ({placeholders})",
+                batch,
+            )
+
+    def _load_vectors(self, doc_ids: Iterable[int]) -> Tuple[Any, Dict[int, int]]:
+        """Load stored normalized vectors as a CSR matrix plus id -> row map."""
+        ids = sorted(set(doc_ids))
+        blobs = {
+            doc_id: (blob_indices, blob_data)
+            for doc_id, blob_indices, blob_data in self._select_by_ids("indices, data", ids)
+        }
+        indptr = [0]
+        indices: List[np.ndarray] = []
+        data: List[np.ndarray] = []
+        for doc_id in ids:
+            blob_indices, blob_data = blobs[doc_id]
+            indices.append(np.frombuffer(blob_indices, dtype=np.int32))
+            data.append(np.frombuffer(blob_data, dtype=np.float32))
+            indptr.append(indptr[-1] + len(indices[-1]))
+
+        matrix = sp.csr_matrix(
+            (
+                np.concatenate(data) if data else np.array([], dtype=np.float32),
+                np.concatenate(indices) if indices else np.array([], dtype=np.int32),
+                np.array(indptr),
+            ),
+            shape=(len(ids), self.n_features),
+        )
+        return matrix, {doc_id: row for row, doc_id in enumerate(ids)}
+
+    def score_pairs(self, pairs: List[Tuple[int, int]]) -> np.ndarray:
+        """
+        Exact cosine similarity for candidate pairs.
+
+        Loads the vectors of every document in ``pairs``; pass chunks (see
+        ``iter_candidate_pairs``) rather than all candidates at once.
+
+        Args:
+            pairs: (doc_id, doc_id) pairs
+
+        Returns:
+            float32 array of similarities aligned with ``pairs``
+        """
+        if not pairs:
+            return np.array([], dtype=np.float32)
+        matrix, row_of = self._load_vectors(i for pair in pairs for i in pair)
+        left = matrix[[row_of[a] for a, _ in pairs]]
+        right = matrix[[row_of[b] for _, b in pairs]]
+        scores = np.asarray(left.multiply(right).sum(axis=1)).ravel()
+        return np.clip(scores, 0.0, 1.0).astype(np.float32)
+
+    def find_similar_pairs(
+        self,
+        min_similarity: float,
+        min_doc_id: int = 0
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Candidate pairs whose exact cosine is at least ``min_similarity``.
+
+        Args:
+            min_similarity: Similarity threshold
+            min_doc_id: See ``candidate_pairs``
+
+        Returns:
+            List of (key, key, similarity) tuples
+        """
+        results: List[Tuple[str, str, float]] = []
+        n_candidates = 0
+        for pairs in self.iter_candidate_pairs(min_doc_id):
+            n_candidates += len(pairs)
+            scores = self.score_pairs(pairs)
+            matched = [
+                (a, b, float(score))
+                for (a, b), score in zip(pairs, scores.tolist())
+                if score >= min_similarity
+            ]
+            keys = self._keys_for(i for a, b, _ in matched for i in (a, b))
+            results.extend((keys[a], keys[b], score) for a, b, score in matched)
+
+        logger.info(
+            f"LSH: {n_candidates} candidate pairs, {len(results)} above {min_similarity}"
+        )
+        return results
+
+    def add_and_match(
+        self,
+        keys: List[str],
+        vectors: Any,
+        min_similarity: float
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Add new documents and return their near-duplicates (old or new).
+
+        Args:
+            keys: Keys of the new documents
+            vectors: Their vectors
+            min_similarity: Similarity threshold
+
+        Returns:
+            List of (key, key, similarity) tuples involving a new document
+        """
+        ids = self.add(keys, vectors)
+        if not ids:
+            return []
+        return self.find_similar_pairs(min_similarity, min_doc_id=min(ids))
+
+    def query(
+        self,
+        vector: Any,
+        min_similarity: float
+    ) -> List[Tuple[str, float]]:
+        """
+        Find indexed documents similar to a single vector (not added).
+
+        Returns:
+            List of (key, similarity) sorted by similarity descending
+        """
+        vector = vector if is_sparse(vector) else np.asarray(vector).reshape(1, -1)
+        normalized = normalize_rows(vector)
+        bucket_keys = self.band_keys(normalized)[0]
+
+        candidates = set()
+        for band in range(self.n_bands):
+            rows = self._conn.execute(
+                "SELECT doc_id FROM lsh_buckets WHERE band = ? AND bucket = ?",
+                (band, int(bucket_keys[band])),
+            ).fetchall()
+            candidates.update(r[0] for r in rows)
+
+        if not candidates:
+            return []
+
+        matrix, row_of = self._load_vectors(candidates)
+        query_vec = np.asarray(
+            normalized.toarray() if is_sparse(normalized) else normalized
+        ).ravel()
+        scores = np.clip(np.asarray(matrix @ query_vec).ravel(), 0.0, 1.0)
+        keys = self._keys_for(candidates)
+
+        results = [
+            (keys[doc_id], float(scores[row]))
+            for doc_id, row in row_of.items()
+            if scores[row] >= min_similarity
+        ]
+        return sorted(results, key=lambda r: r[1], reverse=True)
+
+    def _keys_for(self, doc_ids: Iterable[int]) -> Dict[int, str]:
+        """Map document ids to their keys."""
+        return dict(self._select_by_ids("key", sorted(set(doc_ids))))
+
+    def __len__(self) -> int:
+        """Number of indexed documents."""
+        return self._conn.execute("SELECT COUNT(*) FROM lsh_documents").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
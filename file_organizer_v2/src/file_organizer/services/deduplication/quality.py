@@ -2,13 +2,21 @@
 
 This module provides quality scoring and comparison logic to automatically
 select the highest quality image from a group of similar/duplicate images.
+
+Metrics come from the image header only (Pillow does not decode pixels
+until asked), are memoized per file fingerprint (size and mtime), and are
+gathered for a whole group on a thread pool.
 """
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import IntEnum
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -80,15 +88,29 @@ class ImageQualityAnalyzer:
         'has_transparency': 0.05 # Transparency can be important
     }
 
-    def __init__(self, weights: Optional[dict[str, float]] = None):
+    def __init__(
+        self,
+        weights: Optional[dict[str, float]] = None,
+        cache_size: int = 4096,
+        max_workers: Optional[int] = None
+    ):
         """Initialize quality analyzer.
 
         Args:
             weights: Custom weights for quality factors (must sum to 1.0)
+            cache_size: Number of images whose metrics are memoized
+            max_workers: Threads used to read a group's headers
+                (None = min(32, CPU count + 4), 1 = sequential)
         """
         self.weights = weights or self.DEFAULT_WEIGHTS
         self._validate_weights()
 
+        self.cache_size = cache_size
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        # path -> ((size, mtime_ns), metrics)
+        self._cache: OrderedDict[str, Tuple[Tuple[int, int], QualityMetrics]] = OrderedDict()
+        self._cache_lock = Lock()
+
         # Try to import PIL
         try:
             from PIL import Image
@@ -117,11 +139,18 @@ class ImageQualityAnalyzer:
         ext = path.suffix.lower()
         return self.FORMAT_RANKING.get(ext, ImageFormat.UNKNOWN)
 
-    def _extract_metrics_with_pil(self, path: Path) -> Optional[QualityMetrics]:
+    def _extract_metrics_with_pil(
+        self,
+        path: Path,
+        stat: Optional[os.stat_result] = None
+    ) -> Optional[QualityMetrics]:
         """Extract detailed metrics using PIL.
 
+        Only the header is parsed; pixel data is never decoded.
+
         Args:
             path: Path to image file
+            stat: Result of ``os.stat(path)``, if already known
 
         Returns:
             QualityMetrics object or None if extraction fails
@@ -159,10 +188,11 @@ class ImageQualityAnalyzer:
                 }
                 color_depth = mode_bits.get(img.mode, 24)
 
-                file_size = path.stat().st_size
+                stat = stat or path.stat()
+                file_size = stat.st_size
                 format_enum = self._get_format_from_extension(path)
                 aspect_ratio = width / height if height > 0 else 0
-                modification_time = path.stat().st_mtime
+                modification_time = stat.st_mtime
 
                 return QualityMetrics(
                     resolution=resolution,
@@ -180,18 +210,24 @@ class ImageQualityAnalyzer:
             logger.warning(f"Failed to extract metrics from {path}: {e}")
             return None
 
-    def _extract_metrics_basic(self, path: Path) -> QualityMetrics:
+    def _extract_metrics_basic(
+        self,
+        path: Path,
+        stat: Optional[os.stat_result] = None
+    ) -> QualityMetrics:
         """Extract basic metrics without PIL (fallback).
 
         Args:
             path: Path to image file
+            stat: Result of ``os.stat(path)``, if already known
 
         Returns:
             QualityMetrics with basic information
         """
-        file_size = path.stat().st_size
+        stat = stat or path.stat()
+        file_size = stat.st_size
         format_enum = self._get_format_from_extension(path)
-        modification_time = path.stat().st_mtime
+        modification_time = stat.st_mtime
 
         # Estimate resolution based on file size and format
         # These are very rough estimates
@@ -218,25 +254,65 @@ class ImageQualityAnalyzer:
     def get_quality_metrics(self, image_path: Path) -> Optional[QualityMetrics]:
         """Extract quality metrics from an image file.
 
+        Results are memoized and reused while the file's size and
+        modification time are unchanged.
+
         Args:
             image_path: Path to the image file
 
         Returns:
             QualityMetrics object or None if file doesn't exist
         """
-        if not image_path.exists():
+        try:
+            stat = os.stat(image_path)
+        except OSError:
             logger.error(f"Image file not found: {image_path}")
             return None
 
+        key = str(image_path)
+        fingerprint = (stat.st_size, stat.st_mtime_ns)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self._cache.move_to_end(key)
+                return cached[1]
+
         # Try PIL first for accurate metrics
-        metrics = self._extract_metrics_with_pil(image_path)
+        metrics = self._extract_metrics_with_pil(image_path, stat)
 
         # Fall back to basic metrics if PIL fails
         if metrics is None:
-            metrics = self._extract_metrics_basic(image_path)
+            metrics = self._extract_metrics_basic(image_path, stat)
+
+        with self._cache_lock:
+            self._cache[key] = (fingerprint, metrics)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
 
         return metrics
 
+    def get_metrics_batch(self, images: list[Path]) -> Dict[Path, Optional[QualityMetrics]]:
+        """Extract quality metrics for several images in parallel.
+
+        Args:
+            images: list of image paths
+
+        Returns:
+            Dictionary mapping each path to its metrics (None if missing)
+        """
+        workers = min(self.max_workers, len(images))
+        if workers <= 1:
+            return {img: self.get_quality_metrics(img) for img in images}
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(images, pool.map(self.get_quality_metrics, images)))
+
+    def clear_cache(self) -> None:
+        """Forget all memoized metrics."""
+        with self._cache_lock:
+            self._cache.clear()
+
     def assess_quality(self, image_path: Path) -> float:
         """Calculate overall quality score for an image.
 
@@ -252,6 +328,17 @@ class ImageQualityAnalyzer:
         if metrics is None:
             return 0.0
 
+        return self.score_metrics(metrics)
+
+    def score_metrics(self, metrics: QualityMetrics) -> float:
+        """Calculate the quality score (0.0-1.0) for extracted metrics.
+
+        Args:
+            metrics: Metrics of one image
+
+        Returns:
+            Weighted quality score
+        """
         score = 0.0
 
         # Resolution score (normalize to typical range: 0-25M pixels)
@@ -321,9 +408,10 @@ class ImageQualityAnalyzer:
         if len(images) == 1:
             return images[0]
 
-        # Score all images
+        # Score all images (metrics gathered in parallel)
+        metrics = self.get_metrics_batch(images)
         scored_images = [
-            (img, self.assess_quality(img))
+            (img, self.score_metrics(metrics[img]) if metrics[img] else 0.0)
             for img in images
         ]
 
@@ -394,13 +482,11 @@ class ImageQualityAnalyzer:
         Returns:
             List of tuples (path, score, metrics) sorted by quality (best first)
         """
-        results = []
-
-        for img in images:
-            metrics = self.get_quality_metrics(img)
-            if metrics:
-                score = self.assess_quality(img)
-                results.append((img, score, metrics))
+        results = [
+            (img, self.score_metrics(metrics), metrics)
+            for img, metrics in self.get_metrics_batch(images).items()
+            if metrics
+        ]
 
         # Sort by score descending
         results.sort(key=lambda x: x[1], reverse=True)
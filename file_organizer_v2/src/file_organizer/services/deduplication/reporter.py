@@ -2,16 +2,38 @@
 Storage reclamation reporter.
 
 Generates reports on duplicate detection and storage savings.
+
+``DuplicateReportWriter`` streams hash-based duplicate groups to NDJSON,
+CSV or Parquet for other tools to consume. Groups are spilled to a
+temporary SQLite table as they arrive and written out sorted by wasted
+space, so memory use does not grow with the number of groups.
 """
 
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, Iterable, List, Optional, Union
 import json
 import csv
 import logging
+import os
+import sqlite3
+import sys
+import tempfile
+
+from .index import DuplicateGroup
 
 logger = logging.getLogger(__name__)
 
+REPORT_FORMATS = ("ndjson", "csv", "parquet")
+
+_FORMAT_BY_SUFFIX = {
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".json": "ndjson",
+    ".csv": "csv",
+    ".parquet": "parquet",
+}
+
 
 class StorageReporter:
     """Generates reports on storage usage and duplicate detection."""
@@ -20,28 +42,31 @@ class StorageReporter:
         """Initialize the storage reporter."""
         pass
 
-    def calculate_reclamation(self, duplicate_groups: list[Dict]) -> Dict:
+    def calculate_reclamation(self, duplicate_groups: Iterable[Dict]) -> Dict:
         """
         Calculate storage reclamation metrics.
 
         Args:
-            duplicate_groups: list of duplicate groups
+            duplicate_groups: Duplicate groups (any iterable; consumed once)
 
         Returns:
             Dictionary with reclamation metrics
         """
-        total_files = sum(g['count'] for g in duplicate_groups)
-        total_size = sum(g['total_size'] for g in duplicate_groups)
-
-        # Recoverable = keep one file per group, delete rest
-        recoverable = sum(
-            g['total_size'] - (g['total_size'] / g['count'])
-            for g in duplicate_groups
-        )
+        total_groups = 0
+        total_files = 0
+        total_size = 0
+        recoverable = 0.0
+
+        for g in duplicate_groups:
+            total_groups += 1
+            total_files += g['count']
+            total_size += g['total_size']
+            # Recoverable = keep one file per group, delete rest
+            recoverable += g['total_size'] - (g['total_size'] / g['count'])
 
         metrics = {
             'total_duplicate_files': total_files,
-            'total_duplicate_groups': len(duplicate_groups),
+            'total_duplicate_groups': total_groups,
             'total_size': total_size,
             'recoverable_space': int(recoverable),
             'recovery_percentage': (recoverable / total_size * 100) if total_size > 0 else 0
@@ -159,3 +184,322 @@ class StorageReporter:
         except Exception as e:
             logger.error(f"Error exporting to JSON: {e}")
             raise
+
+
+class ReportSummary:
+    """Running totals over reported duplicate groups, in constant memory."""
+
+    __slots__ = ("groups", "files", "total_size", "wasted_space", "largest_group", "max_wasted")
+
+    def __init__(self):
+        self.groups = 0
+        self.files = 0
+        self.total_size = 0
+        self.wasted_space = 0
+        self.largest_group = 0
+        self.max_wasted = 0
+
+    def add(self, count: int, size: int, wasted_space: int) -> None:
+        """
+        Count one duplicate group.
+
+        Args:
+            count: Number of paths in the group
+            size: Size of each file in bytes
+            wasted_space: Bytes freed by keeping one copy
+        """
+        self.groups += 1
+        self.files += count
+        self.total_size += size * count
+        self.wasted_space += wasted_space
+        self.largest_group = max(self.largest_group, count)
+        self.max_wasted = max(self.max_wasted, wasted_space)
+
+    def to_dict(self) -> Dict[str, int]:
+        """Summary as a dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class DuplicateReportWriter:
+    """
+    Streams duplicate groups to a machine-readable report.
+
+    Formats:
+    - ``ndjson``: one JSON object per group, with its files
+    - ``csv``: one row per file, with group columns repeated
+    - ``parquet``: same rows as CSV (requires pyarrow)
+
+    With ``sort_by_wasted`` (the default) groups are spilled to a temporary
+    SQLite database as they arrive and written largest-waste first when the
+    writer is closed; otherwise they are written immediately.
+    """
+
+    FILE_FIELDS = [
+        "group_id", "hash", "size", "count", "copies", "wasted_space",
+        "path", "mtime_ns", "inode", "device",
+    ]
+
+    def __init__(
+        self,
+        output: Union[Path, str],
+        output_format: Optional[str] = None,
+        sort_by_wasted: bool = True,
+        spill_dir: Optional[Path] = None,
+        batch_size: int = 10000
+    ):
+        """
+        Open a report writer.
+
+        Args:
+            output: Report file path, or "-" for standard output
+            output_format: "ndjson", "csv" or "parquet"; inferred from the
+                file extension if None (NDJSON for standard output)
+            sort_by_wasted: Write groups sorted by wasted space, descending
+            spill_dir: Directory for the temporary sort database
+            batch_size: Groups buffered per spill insert, and rows per
+                Parquet row group
+
+        Raises:
+            ValueError: If the format is unknown or cannot be written to
+                standard output
+        """
+        self.output = output
+        if output_format is None:
+            suffix = "" if output == "-" else Path(output).suffix.lower()
+            output_format = _FORMAT_BY_SUFFIX.get(suffix, "ndjson")
+        if output_format not in REPORT_FORMATS:
+            raise ValueError(
+                f"Unsupported report format: {output_format}. Must be one of {REPORT_FORMATS}"
+            )
+        if output_format == "parquet" and output == "-":
+            raise ValueError("Parquet reports cannot be written to standard output")
+
+        self.output_format = output_format
+        self.sort_by_wasted = sort_by_wasted
+        self.batch_size = batch_size
+        self.summary = ReportSummary()
+
+        self._closed = False
+        self._next_id = 1
+        self._pending: List[tuple] = []
+        self._spill_path: Optional[Path] = None
+        self._spill: Optional[sqlite3.Connection] = None
+
+        if sort_by_wasted:
+            fd, spill_path = tempfile.mkstemp(
+                prefix="dedupe_report_", suffix=".db", dir=spill_dir
+            )
+            os.close(fd)
+            self._spill_path = Path(spill_path)
+            self._spill = sqlite3.connect(spill_path)
+            self._spill.execute("PRAGMA journal_mode=OFF")
+            self._spill.execute("PRAGMA synchronous=OFF")
+            self._spill.execute(
+                "CREATE TABLE groups (id INTEGER PRIMARY KEY, wasted INTEGER NOT NULL, record TEXT NOT NULL)"
+            )
+            self._sink = None
+        else:
+            self._sink = self._open_sink()
+
+    @staticmethod
+    def group_record(group: DuplicateGroup) -> Dict[str, Any]:
+        """
+        Convert a duplicate group to a report record.
+
+        Args:
+            group: Duplicate group from the index
+
+        Returns:
+            Dictionary with group fields and a ``files`` list
+        """
+        size = group.files[0].size if group.files else 0
+        return {
+            "hash": group.hash_value,
+            "size": size,
+            "count": group.count,
+            "copies": group.copies,
+            "wasted_space": group.wasted_space,
+            "files": [
+                {
+                    "path": f.path_str,
+                    "mtime_ns": f.mtime_ns,
+                    "inode": f.inode,
+                    "device": f.device,
+                }
+                for f in group.files
+            ],
+        }
+
+    def write_group(self, group: Union[DuplicateGroup, Dict[str, Any]]) -> None:
+        """
+        Add a duplicate group to the report.
+
+        Args:
+            group: DuplicateGroup, or a record from ``group_record``
+        """
+        record = self.group_record(group) if isinstance(group, DuplicateGroup) else group
+        self.summary.add(record["count"], record["size"], record["wasted_space"])
+
+        if self._spill is None:
+            self._sink.write({"group_id": self._next_id, **record})
+            self._next_id += 1
+            return
+
+        self._pending.append((record["wasted_space"], json.dumps(record)))
+        if len(self._pending) >= self.batch_size:
+            self._flush_spill()
+
+    def close(self) -> ReportSummary:
+        """
+        Finish the report (writing sorted groups, if sorting).
+
+        Returns:
+            Summary of all written groups
+        """
+        if self._closed:
+            return self.summary
+        self._closed = True
+
+        try:
+            if self._spill is not None:
+                self._flush_spill()
+                self._sink = self._open_sink()
+                rows = self._spill.execute(
+                    "SELECT record FROM groups ORDER BY wasted DESC, id"
+                )
+                for group_id, (text,) in enumerate(rows, 1):
+                    self._sink.write({"group_id": group_id, **json.loads(text)})
+        finally:
+            if self._sink is not None:
+                self._sink.close()
+            if self._spill is not None:
+                self._spill.close()
+                self._spill_path.unlink(missing_ok=True)
+
+        logger.info(f"Wrote {self.summary.groups} duplicate groups to {self.output}")
+        return self.summary
+
+    def __enter__(self) -> "DuplicateReportWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _flush_spill(self) -> None:
+        """Insert buffered groups into the sort database."""
+        if not self._pending:
+            return
+        with self._spill:
+            self._spill.executemany(
+                "INSERT INTO groups (wasted, record) VALUES (?, ?)", self._pending
+            )
+        self._pending.clear()
+
+    def _open_sink(self) -> "_ReportSink":
+        """Open the output in the configured format."""
+        if self.output_format == "parquet":
+            return _ParquetSink(Path(self.output), self.FILE_FIELDS, self.batch_size)
+        if self.output == "-":
+            stream = sys.stdout
+        else:
+            stream = open(self.output, "w", newline="", encoding="utf-8")
+        if self.output_format == "csv":
+            return _CsvSink(stream, self.FILE_FIELDS)
+        return _NdjsonSink(stream)
+
+
+def _file_rows(record: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    """Flatten a group record into one row per file."""
+    for file_info in record["files"]:
+        yield {
+            "group_id": record["group_id"],
+            "hash": record["hash"],
+            "size": record["size"],
+            "count": record["count"],
+            "copies": record["copies"],
+            "wasted_space": record["wasted_space"],
+            **file_info,
+        }
+
+
+class _ReportSink(ABC):
+    """Output for report records."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    @abstractmethod
+    def write(self, record: Dict[str, Any]) -> None:
+        """Write one duplicate group record."""
+        pass
+
+    def close(self) -> None:
+        if self._stream is sys.stdout:
+            self._stream.flush()
+        else:
+            self._stream.close()
+
+
+class _NdjsonSink(_ReportSink):
+    """One JSON object per line."""
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._stream.write(json.dumps(record, ensure_ascii=False))
+        self._stream.write("\n")
+
+
+class _CsvSink(_ReportSink):
+    """One CSV row per file."""
+
+    def __init__(self, stream, fields: List[str]):
+        super().__init__(stream)
+        self._writer = csv.DictWriter(stream, fieldnames=fields)
+        self._writer.writeheader()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._writer.writerows(_file_rows(record))
+
+
+class _ParquetSink(_ReportSink):
+    """One Parquet row per file, written in row groups."""
+
+    def __init__(self, path: Path, fields: List[str], batch_size: int):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "pyarrow is required for Parquet reports. "
+                "Install it with: pip install pyarrow"
+            ) from e
+
+        super().__init__(None)
+        self._pa = pa
+        self._schema = pa.schema([
+            (name, pa.string() if name in ("hash", "path") else pa.int64())
+            for name in fields
+        ])
+        self._writer = pq.ParquetWriter(str(path), self._schema)
+        self._batch_size = batch_size
+        self._rows: Dict[str, list] = {name: [] for name in fields}
+        self._count = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        for row in _file_rows(record):
+            for name, column in self._rows.items():
+                column.append(row[name])
+            self._count += 1
+        if self._count >= self._batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._count:
+            return
+        self._writer.write_table(self._pa.table(self._rows, schema=self._schema))
+        for column in self._rows.values():
+            column.clear()
+        self._count = 0
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
@@ -0,0 +1,201 @@
+"""
+Single-pass directory scanner for duplicate detection.
+
+Walks a tree with ``os.scandir`` and streams one ``ScannedFile`` record per
+matching regular file. Each entry costs at most one ``stat`` call (file
+type checks use the cached ``d_type`` from the directory listing), glob
+patterns are compiled once into a single regular expression, and
+directories matching an exclude pattern are pruned without being listed.
+
+Pattern semantics follow ``PurePath.match``: a relative pattern matches
+the trailing components of the path and an absolute one the whole path.
+In addition, a ``**`` component matches any number of directories, so
+``**/node_modules/**`` excludes a whole subtree.
+"""
+
+import logging
+import os
+import re
+import stat as stat_module
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+_CASE_INSENSITIVE = os.name == "nt"
+
+
+class ScannedFile(NamedTuple):
+    """A regular file found by ``scan_files``, with its stat fields."""
+
+    path: Path
+    size: int
+    mtime_ns: int
+    atime_ns: int
+    inode: int
+    device: int
+    nlink: int
+
+
+def _translate_component(component: str) -> str:
+    """Translate one glob path component to a regex that stays within it."""
+    parts = []
+    i, n = 0, len(component)
+    while i < n:
+        char = component[i]
+        i += 1
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = component.find("]", i + 1 if i < n and component[i] in "!]" else i)
+            if end == -1:
+                parts.append(re.escape(char))
+                continue
+            body = component[i:end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end + 1
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
+
+
+def _translate_pattern(pattern: str) -> str:
+    """Translate a path glob to a regex matched against a '/'-separated path."""
+    pattern = pattern.replace(os.sep, "/")
+    anchored = pattern.startswith("/")
+    components = [c for c in pattern.strip("/").split("/") if c]
+
+    regex = ""
+    for position, component in enumerate(components):
+        last = position == len(components) - 1
+        if component == "**":
+            if last:
+                # Trailing ** also matches the directory itself
+                regex = regex[:-1] + "(?:/.*)?" if regex else ".*"
+            else:
+                regex += "(?:[^/]*/)*"
+        else:
+            regex += _translate_component(component) + ("" if last else "/")
+
+    prefix = "^/" if anchored else "(?:^|/)"
+    return f"{prefix}{regex}$"
+
+
+def compile_patterns(patterns: Optional[Iterable[str]]) -> Optional[re.Pattern]:
+    """
+    Compile glob patterns into one regular expression.
+
+    Args:
+        patterns: Glob patterns, or None
+
+    Returns:
+        Compiled pattern to ``search`` against '/'-separated paths,
+        or None if there are no patterns
+    """
+    if not patterns:
+        return None
+    combined = "|".join(f"(?:{_translate_pattern(p)})" for p in patterns)
+    return re.compile(combined, re.IGNORECASE if _CASE_INSENSITIVE else 0)
+
+
+def _normalize(path: str) -> str:
+    """Path string in the '/'-separated form patterns are compiled for."""
+    return path.replace(os.sep, "/") if os.sep != "/" else path
+
+
+def scan_files(
+    directory: Path,
+    recursive: bool = True,
+    follow_symlinks: bool = False,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    min_size: int = 0,
+    max_size: Optional[int] = None,
+) -> Iterator[ScannedFile]:
+    """
+    Stream regular files under a directory.
+
+    Args:
+        directory: Directory to scan
+        recursive: Descend into subdirectories
+        follow_symlinks: Follow symlinked files and directories (directory
+            cycles are detected and skipped)
+        include: Glob patterns a file must match (any of them)
+        exclude: Glob patterns that exclude a file, or a whole directory
+            subtree when they match the directory
+        min_size: Minimum file size in bytes
+        max_size: Maximum file size in bytes (None = no limit)
+
+    Yields:
+        ScannedFile records, in no particular order
+    """
+    include_re = compile_patterns(include)
+    exclude_re = compile_patterns(exclude)
+
+    root = os.fspath(directory)
+    stack = [root]
+    visited: set[tuple[int, int]] = set()
+    if follow_symlinks:
+        root_stat = os.stat(root)
+        visited.add((root_stat.st_dev, root_stat.st_ino))
+
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError as e:
+            logger.debug(f"Cannot list {current}: {e}")
+            continue
+
+        with entries:
+            for entry in entries:
+                try:
+                    if not follow_symlinks and entry.is_symlink():
+                        continue
+
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        if not recursive:
+                            continue
+                        if exclude_re and exclude_re.search(_normalize(entry.path)):
+                            continue
+                        if follow_symlinks:
+                            dir_stat = entry.stat()
+                            key = (dir_stat.st_dev, dir_stat.st_ino)
+                            if key in visited:
+                                continue
+                            visited.add(key)
+                        stack.append(entry.path)
+                        continue
+
+                    st = entry.stat(follow_symlinks=follow_symlinks)
+                except OSError:
+                    continue
+
+                if not stat_module.S_ISREG(st.st_mode):
+                    continue
+                if st.st_size < min_size:
+                    continue
+                if max_size is not None and st.st_size > max_size:
+                    continue
+
+                if include_re or exclude_re:
+                    normalized = _normalize(entry.path)
+                    if include_re and not include_re.search(normalized):
+                        continue
+                    if exclude_re and exclude_re.search(normalized):
+                        continue
+
+                yield ScannedFile(
+                    Path(entry.path),
+                    st.st_size,
+                    st.st_mtime_ns,
+                    st.st_atime_ns,
+                    st.st_ino,
+                    st.st_dev,
+                    st.st_nlink,
+                )
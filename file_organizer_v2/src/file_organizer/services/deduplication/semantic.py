@@ -2,15 +2,86 @@
 Semantic similarity analysis module.
 
 Computes cosine similarity between document embeddings and identifies similar documents.
+Embeddings may be dense NumPy arrays or sparse SciPy matrices; sparse input
+stays sparse (float32) through normalization and the similarity product.
 """
 
-from typing import List, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Dict, Optional, Tuple, Union
 from pathlib import Path
 import numpy as np
 import logging
+import os
+
+try:
+    import scipy.sparse as sp
+except ImportError:  # pragma: no cover - scipy ships with scikit-learn
+    sp = None
+
+from .clustering import ClusterStats, SimilarityClusters
+
+if TYPE_CHECKING:
+    from .lsh import CosineLSHIndex
 
 logger = logging.getLogger(__name__)
 
+# Rows/columns per similarity tile: a dense float32 tile is ~4 MB
+DEFAULT_BLOCK_SIZE = 1024
+
+
+def is_sparse(matrix: Any) -> bool:
+    """Check whether ``matrix`` is a SciPy sparse matrix."""
+    return sp is not None and sp.issparse(matrix)
+
+
+def to_dense_vector(vector: Any) -> np.ndarray:
+    """Flatten a dense vector or a sparse 1-row matrix to a 1-D array."""
+    if is_sparse(vector):
+        return vector.toarray().ravel()
+    return np.asarray(vector).ravel()
+
+
+def file_sizes(paths: Iterable[Path]) -> Dict[Path, int]:
+    """
+    Stat each distinct path once.
+
+    Args:
+        paths: File paths (duplicates are looked up once)
+
+    Returns:
+        Mapping of path to size in bytes (0 for missing files)
+    """
+    sizes: Dict[Path, int] = {}
+    for path in paths:
+        if path in sizes:
+            continue
+        try:
+            sizes[path] = os.stat(path).st_size
+        except OSError:
+            sizes[path] = 0
+    return sizes
+
+
+def normalize_rows(embeddings: Any) -> Any:
+    """
+    L2-normalize each row, keeping sparse input sparse.
+
+    Args:
+        embeddings: Dense array or sparse matrix (n_documents x n_features)
+
+    Returns:
+        Row-normalized float32 matrix of the same kind; all-zero rows stay zero
+    """
+    if is_sparse(embeddings):
+        matrix = sp.csr_matrix(embeddings, dtype=np.float32)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1  # Avoid division by zero
+        return sp.diags((1.0 / norms).astype(np.float32)) @ matrix
+
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1  # Avoid division by zero
+    return matrix / norms
+
 
 class SemanticAnalyzer:
     """
@@ -35,19 +106,22 @@ class SemanticAnalyzer:
 
     def compute_similarity(
         self,
-        doc1_vector: np.ndarray,
-        doc2_vector: np.ndarray
+        doc1_vector: Any,
+        doc2_vector: Any
     ) -> float:
         """
         Compute cosine similarity between two document vectors.
 
         Args:
-            doc1_vector: First document embedding
-            doc2_vector: Second document embedding
+            doc1_vector: First document embedding (dense or sparse row)
+            doc2_vector: Second document embedding (dense or sparse row)
 
         Returns:
             Similarity score between 0 and 1
         """
+        doc1_vector = to_dense_vector(doc1_vector)
+        doc2_vector = to_dense_vector(doc2_vector)
+
         # Cosine similarity = dot(A, B) / (norm(A) * norm(B))
         dot_product = np.dot(doc1_vector, doc2_vector)
 
@@ -64,41 +138,203 @@ class SemanticAnalyzer:
 
     def find_similar_documents(
         self,
-        embeddings: np.ndarray,
+        embeddings: Any,
         paths: List[Path],
-        min_similarity: Optional[float] = None
+        min_similarity: Optional[float] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        top_k: Optional[int] = None
     ) -> Dict[Path, List[Tuple[Path, float]]]:
         """
         Find similar documents based on embeddings.
 
+        Similarities are computed tile by tile (see ``iter_similar_pairs``),
+        so the full n x n matrix is never materialized. With sparse
+        embeddings, only document pairs that share at least one term are
+        considered, so pairs with similarity 0 are never reported.
+
+        Args:
+            embeddings: Matrix of document embeddings (n_documents x n_features),
+                       dense or sparse
+            paths: List of file paths corresponding to embeddings
+            min_similarity: Minimum similarity threshold (default: self.threshold)
+            block_size: Rows/columns per similarity tile
+            top_k: Keep at most this many neighbours per document (None = all)
+
+        Returns:
+            Dictionary mapping each path to list of (similar_path, similarity) tuples
+        """
+        if embeddings.shape[0] != len(paths):
+            raise ValueError(
+                f"Embeddings count ({embeddings.shape[0]}) must match paths count ({len(paths)})"
+            )
+
+        logger.info(f"Finding similar documents among {len(paths)} documents")
+
+        pairs = (
+            (paths[i], paths[j], similarity)
+            for i, j, similarity in self.iter_similar_pairs(
+                embeddings, min_similarity, block_size=block_size, top_k=top_k
+            )
+        )
+        return self._collect_similar(paths, pairs)
+
+    def iter_similar_pairs(
+        self,
+        embeddings: Any,
+        min_similarity: Optional[float] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        top_k: Optional[int] = None
+    ) -> Iterator[Tuple[int, int, float]]:
+        """
+        Stream document pairs at or above a similarity threshold.
+
+        Similarity is computed in ``block_size`` x ``block_size`` tiles that
+        are thresholded immediately, so peak memory depends on the block
+        size and the number of matches, not on the corpus size. Without
+        ``top_k`` only the upper triangle is computed.
+
+        Args:
+            embeddings: Matrix of document embeddings (dense or sparse)
+            min_similarity: Minimum similarity threshold (default: self.threshold)
+            block_size: Rows/columns per similarity tile
+            top_k: Keep at most this many neighbours per document (None = all).
+                  A pair is kept if either document ranks the other in its top k.
+
+        Yields:
+            (i, j, similarity) with i < j, each pair once
+        """
+        if min_similarity is None:
+            min_similarity = self.threshold
+        if block_size < 1:
+            raise ValueError(f"block_size must be positive, got {block_size}")
+
+        normalized = normalize_rows(embeddings)
+        n = normalized.shape[0]
+
+        # j -> rows i < j whose pair (i, j) was already yielded from row i;
+        # dropped once row j's block has been processed
+        pending: Dict[int, set] = {}
+
+        for row_start in range(0, n, block_size):
+            row_end = min(row_start + block_size, n)
+            block = normalized[row_start:row_end]
+            # Without top-k, pairs below the diagonal were seen from the other side
+            col_origin = 0 if top_k is not None else row_start
+
+            found_rows, found_cols, found_values = [], [], []
+            for col_start in range(col_origin, n, block_size):
+                col_end = min(col_start + block_size, n)
+                tile = block @ normalized[col_start:col_end].T
+                if is_sparse(tile):
+                    tile = tile.tocoo()
+                    keep = tile.data >= min_similarity
+                    rows, cols, values = tile.row[keep], tile.col[keep], tile.data[keep]
+                else:
+                    rows, cols = np.nonzero(np.asarray(tile) >= min_similarity)
+                    values = np.asarray(tile)[rows, cols]
+
+                rows = rows + row_start
+                cols = cols + col_start
+                off_diagonal = rows != cols if top_k is not None else rows < cols
+                found_rows.append(rows[off_diagonal])
+                found_cols.append(cols[off_diagonal])
+                found_values.append(values[off_diagonal])
+
+            rows = np.concatenate(found_rows)
+            cols = np.concatenate(found_cols)
+            values = np.clip(np.concatenate(found_values), 0.0, 1.0)
+
+            if top_k is not None:
+                rows, cols, values = self._top_k_per_row(rows, cols, values, top_k)
+
+            for i, j, similarity in zip(rows.tolist(), cols.tolist(), values.tolist()):
+                if i < j:
+                    if top_k is not None:
+                        pending.setdefault(j, set()).add(i)
+                    yield i, j, similarity
+                elif j not in pending.get(i, ()):
+                    yield j, i, similarity
+
+            for row in range(row_start, row_end):
+                pending.pop(row, None)
+
+    @staticmethod
+    def _top_k_per_row(
+        rows: np.ndarray,
+        cols: np.ndarray,
+        values: np.ndarray,
+        top_k: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Keep the ``top_k`` highest values for each row index."""
+        order = np.lexsort((-values, rows))
+        rows, cols, values = rows[order], cols[order], values[order]
+        _, first, counts = np.unique(rows, return_index=True, return_counts=True)
+        rank = np.arange(len(rows)) - np.repeat(first, counts)
+        keep = rank < top_k
+        return rows[keep], cols[keep], values[keep]
+
+    def find_similar_documents_approx(
+        self,
+        embeddings: Any,
+        paths: List[Path],
+        min_similarity: Optional[float] = None,
+        index: Optional["CosineLSHIndex"] = None
+    ) -> Dict[Path, List[Tuple[Path, float]]]:
+        """
+        Find similar documents using LSH candidate generation.
+
+        Documents are bucketed by random-projection signatures and exact
+        cosine similarity is computed only for pairs sharing a bucket. Recall
+        is probabilistic (tunable via the index's bands and rows), but the
+        work grows with the number of candidates rather than n².
+
         Args:
-            embeddings: Matrix of document embeddings (n_documents x n_features)
+            embeddings: Matrix of document embeddings (dense or sparse)
             paths: List of file paths corresponding to embeddings
             min_similarity: Minimum similarity threshold (default: self.threshold)
+            index: Persistent index to add the documents to. Matches against
+                  documents indexed earlier are included. Defaults to a
+                  temporary in-memory index.
 
         Returns:
             Dictionary mapping each path to list of (similar_path, similarity) tuples
         """
+        from .lsh import CosineLSHIndex
+
         if min_similarity is None:
             min_similarity = self.threshold
 
-        if len(embeddings) != len(paths):
+        if embeddings.shape[0] != len(paths):
             raise ValueError(
-                f"Embeddings count ({len(embeddings)}) must match paths count ({len(paths)})"
+                f"Embeddings count ({embeddings.shape[0]}) must match paths count ({len(paths)})"
             )
 
-        logger.info(f"Finding similar documents among {len(paths)} documents")
+        logger.info(f"Finding similar documents among {len(paths)} documents (LSH)")
 
-        similar_docs: Dict[Path, List[Tuple[Path, float]]] = {path: [] for path in paths}
+        if index is None:
+            with CosineLSHIndex(n_features=embeddings.shape[1]) as temporary:
+                matches = temporary.add_and_match(
+                    [str(p) for p in paths], embeddings, min_similarity
+                )
+        else:
+            matches = index.add_and_match(
+                [str(p) for p in paths], embeddings, min_similarity
+            )
 
-        # Compute pairwise similarities
-        for i in range(len(paths)):
-            for j in range(i + 1, len(paths)):
-                similarity = self.compute_similarity(embeddings[i], embeddings[j])
+        pairs = ((Path(a), Path(b), similarity) for a, b, similarity in matches)
+        return self._collect_similar(paths, pairs)
 
-                if similarity >= min_similarity:
-                    similar_docs[paths[i]].append((paths[j], similarity))
-                    similar_docs[paths[j]].append((paths[i], similarity))
+    @staticmethod
+    def _collect_similar(
+        paths: List[Path],
+        pairs: Iterable[Tuple[Path, Path, float]]
+    ) -> Dict[Path, List[Tuple[Path, float]]]:
+        """Build the symmetric path -> [(similar_path, similarity)] mapping."""
+        similar_docs: Dict[Path, List[Tuple[Path, float]]] = {path: [] for path in paths}
+
+        for path1, path2, similarity in pairs:
+            similar_docs.setdefault(path1, []).append((path2, similarity))
+            similar_docs.setdefault(path2, []).append((path1, similarity))
 
         # Sort by similarity (descending)
         for path in similar_docs:
@@ -112,8 +348,8 @@ class SemanticAnalyzer:
 
     def find_similar_to_query(
         self,
-        query_embedding: np.ndarray,
-        document_embeddings: np.ndarray,
+        query_embedding: Any,
+        document_embeddings: Any,
         paths: List[Path],
         top_k: Optional[int] = None,
         min_similarity: Optional[float] = None
@@ -123,7 +359,7 @@ class SemanticAnalyzer:
 
         Args:
             query_embedding: Query document embedding
-            document_embeddings: Matrix of document embeddings
+            document_embeddings: Matrix of document embeddings (dense or sparse)
             paths: List of file paths
             top_k: Return top K most similar (optional)
             min_similarity: Minimum similarity threshold
@@ -134,13 +370,14 @@ class SemanticAnalyzer:
         if min_similarity is None:
             min_similarity = self.threshold
 
-        similarities = []
+        query = normalize_rows(to_dense_vector(query_embedding)[np.newaxis, :])[0]
+        normalized = normalize_rows(document_embeddings)
 
-        for i, doc_embedding in enumerate(document_embeddings):
-            similarity = self.compute_similarity(query_embedding, doc_embedding)
+        # One sparse (or dense) matrix-vector product for all documents
+        scores = np.clip(np.asarray(normalized @ query).ravel(), 0.0, 1.0)
+        matches = np.flatnonzero(scores >= min_similarity)
 
-            if similarity >= min_similarity:
-                similarities.append((paths[i], similarity))
+        similarities = [(paths[i], float(scores[i])) for i in matches.tolist()]
 
         # Sort by similarity (descending)
         similarities.sort(key=lambda x: x[1], reverse=True)
@@ -155,69 +392,92 @@ class SemanticAnalyzer:
 
     def cluster_by_similarity(
         self,
-        similar_docs: Dict[Path, List[Tuple[Path, float]]]
+        similar_docs: Union[
+            Dict[Path, List[Tuple[Path, float]]],
+            Iterable[Tuple[Path, Path, float]]
+        ]
     ) -> List[List[Path]]:
         """
         Cluster documents by similarity into groups.
 
-        Uses a simple greedy clustering approach: documents are clustered if they
-        share similar documents.
+        Documents are clustered transitively (connected components of the
+        similarity graph) with union-find, so the result does not depend on
+        input order.
 
         Args:
-            similar_docs: Dictionary from find_similar_documents()
+            similar_docs: Dictionary from find_similar_documents(), or a stream
+                         of (path, path, similarity) pairs
 
         Returns:
             List of document clusters (each cluster is a list of paths)
         """
         logger.info("Clustering similar documents")
 
-        # Track which documents have been assigned to clusters
-        assigned = set()
-        clusters = []
-
-        for path, similars in similar_docs.items():
-            if path in assigned or not similars:
-                continue
-
-            # Create new cluster
-            cluster = {path}
-            assigned.add(path)
-
-            # Add all similar documents
-            for similar_path, _ in similars:
-                if similar_path not in assigned:
-                    cluster.add(similar_path)
-                    assigned.add(similar_path)
-
-            clusters.append(list(cluster))
+        clusters = [members for members, _ in self._build_clusters(similar_docs)]
 
         logger.info(f"Created {len(clusters)} document clusters")
 
         return clusters
 
+    def _build_clusters(
+        self,
+        similar_docs: Union[
+            Dict[Path, List[Tuple[Path, float]]],
+            Iterable[Tuple[Path, Path, float]]
+        ]
+    ) -> List[Tuple[List[Path], ClusterStats]]:
+        """Union similar pairs into clusters of 2+ documents with aggregates."""
+        if isinstance(similar_docs, dict):
+            clusters: SimilarityClusters[Path] = SimilarityClusters(similar_docs)
+            pairs: Iterable[Tuple[Path, Path, float]] = self._dict_pairs(similar_docs)
+        else:
+            clusters = SimilarityClusters()
+            pairs = similar_docs
+
+        clusters.add_pairs(pairs)
+        return clusters.clusters(min_size=2)
+
+    @staticmethod
+    def _dict_pairs(
+        similar_docs: Dict[Path, List[Tuple[Path, float]]]
+    ) -> Iterator[Tuple[Path, Path, float]]:
+        """Yield each unordered pair of a symmetric similarity dict once."""
+        position = {path: i for i, path in enumerate(similar_docs)}
+        for path, similars in similar_docs.items():
+            for similar_path, similarity in similars:
+                other = position.get(similar_path)
+                if other is None or other > position[path]:
+                    yield path, similar_path, similarity
+
     def compute_similarity_matrix(
         self,
-        embeddings: np.ndarray
-    ) -> np.ndarray:
+        embeddings: Any
+    ) -> Any:
         """
         Compute full pairwise similarity matrix.
 
+        Sparse embeddings produce a sparse float32 similarity matrix holding
+        only pairs that share terms; dense embeddings produce a dense one.
+
         Args:
-            embeddings: Matrix of document embeddings
+            embeddings: Matrix of document embeddings (dense or sparse)
 
         Returns:
             Similarity matrix (n_documents x n_documents)
         """
         # Normalize embeddings for efficient cosine similarity
-        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-        norms[norms == 0] = 1  # Avoid division by zero
-        normalized = embeddings / norms
+        normalized = normalize_rows(embeddings)
 
         # Cosine similarity matrix = normalized @ normalized.T
-        similarity_matrix = np.dot(normalized, normalized.T)
+        similarity_matrix = normalized @ normalized.T
 
         # Clamp values to [0, 1]
-        similarity_matrix = np.clip(similarity_matrix, 0.0, 1.0)
+        if is_sparse(similarity_matrix):
+            similarity_matrix = similarity_matrix.tocsr()
+            np.clip(similarity_matrix.data, 0.0, 1.0, out=similarity_matrix.data)
+            similarity_matrix.eliminate_zeros()
+        else:
+            similarity_matrix = np.clip(similarity_matrix, 0.0, 1.0)
 
         logger.debug(f"Computed similarity matrix: shape={similarity_matrix.shape}")
 
@@ -225,9 +485,13 @@ class SemanticAnalyzer:
 
     def get_duplicate_groups(
         self,
-        embeddings: np.ndarray,
+        embeddings: Any,
         paths: List[Path],
-        min_similarity: Optional[float] = None
+        min_similarity: Optional[float] = None,
+        approximate: bool = False,
+        index: Optional["CosineLSHIndex"] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        top_k: Optional[int] = None
     ) -> List[Dict]:
         """
         Get groups of duplicate/similar documents with metadata.
@@ -236,48 +500,48 @@ class SemanticAnalyzer:
             embeddings: Document embeddings
             paths: File paths
             min_similarity: Minimum similarity threshold
+            approximate: Use LSH candidate generation instead of all pairs
+            index: Persistent LSH index (implies approximate)
+            block_size: Similarity tile size for the exact search
+            top_k: Neighbours kept per document in the exact search (None = all)
 
         Returns:
             List of duplicate group dictionaries
         """
-        similar_docs = self.find_similar_documents(
-            embeddings, paths, min_similarity
-        )
-
-        clusters = self.cluster_by_similarity(similar_docs)
-
-        # Build group metadata
-        groups = []
-
-        for cluster in clusters:
-            if len(cluster) < 2:
-                continue
-
-            # Calculate average similarity within cluster
-            cluster_sims = []
-            for i, path1 in enumerate(cluster):
-                for path2 in cluster[i + 1:]:
-                    # Find similarity from similar_docs
-                    sims = [s for p, s in similar_docs.get(path1, []) if p == path2]
-                    if sims:
-                        cluster_sims.append(sims[0])
-
-            avg_similarity = (
-                sum(cluster_sims) / len(cluster_sims)
-                if cluster_sims else 0.0
+        if approximate or index is not None:
+            similar_docs = self.find_similar_documents_approx(
+                embeddings, paths, min_similarity, index=index
             )
-
-            # Calculate total size
-            total_size = sum(
-                path.stat().st_size if path.exists() else 0
-                for path in cluster
+            pairs: Iterable[Tuple[Path, Path, float]] = self._dict_pairs(similar_docs)
+        else:
+            if embeddings.shape[0] != len(paths):
+                raise ValueError(
+                    f"Embeddings count ({embeddings.shape[0]}) must match "
+                    f"paths count ({len(paths)})"
+                )
+            pairs = (
+                (paths[i], paths[j], similarity)
+                for i, j, similarity in self.iter_similar_pairs(
+                    embeddings, min_similarity, block_size=block_size, top_k=top_k
+                )
             )
 
+        clusters: SimilarityClusters[Path] = SimilarityClusters(paths)
+        clusters.add_pairs(pairs)
+        found = clusters.clusters(min_size=2)
+
+        # One stat per clustered file
+        sizes = file_sizes(path for members, _ in found for path in members)
+
+        groups = []
+        for cluster, stats in found:
             groups.append({
                 'files': [str(p) for p in cluster],
                 'count': len(cluster),
-                'avg_similarity': avg_similarity,
-                'total_size': total_size,
+                'avg_similarity': stats.mean_similarity,
+                'min_similarity': stats.min_similarity,
+                'max_similarity': stats.max_similarity,
+                'total_size': sum(sizes[path] for path in cluster),
                 'representative': str(cluster[0])  # First file as representative
             })
 
@@ -303,17 +567,20 @@ class SemanticAnalyzer:
 
     def get_statistics(
         self,
-        similarity_matrix: np.ndarray
+        similarity_matrix: Any
     ) -> Dict:
         """
         Compute statistics from similarity matrix.
 
         Args:
-            similarity_matrix: Pairwise similarity matrix
+            similarity_matrix: Pairwise similarity matrix (dense or sparse)
 
         Returns:
             Statistics dictionary
         """
+        if is_sparse(similarity_matrix):
+            return self._sparse_statistics(similarity_matrix)
+
         # Exclude diagonal (self-similarity)
         n = similarity_matrix.shape[0]
         mask = ~np.eye(n, dtype=bool)
@@ -329,3 +596,39 @@ class SemanticAnalyzer:
         }
 
         return stats
+
+    def _sparse_statistics(self, similarity_matrix: Any) -> Dict:
+        """
+        Statistics for a sparse similarity matrix without densifying it.
+
+        Off-diagonal cells that are not stored count as similarity 0.
+        """
+        n = similarity_matrix.shape[0]
+        total = n * n - n
+        off_diagonal = sp.triu(similarity_matrix, k=1, format="coo").data
+        # The matrix is symmetric: every stored upper value appears twice
+        values = np.asarray(off_diagonal, dtype=np.float64)
+        stored = 2 * len(values)
+        zeros = total - stored
+
+        mean = 2 * values.sum() / total
+        variance = 2 * np.square(values).sum() / total - mean ** 2
+
+        sorted_values = np.sort(np.repeat(values, 2))
+        median_positions = [(total - 1) // 2, total // 2]
+        median = float(np.mean([
+            0.0 if pos < zeros else sorted_values[pos - zeros]
+            for pos in median_positions
+        ]))
+
+        return {
+            'mean_similarity': float(mean),
+            'median_similarity': median,
+            'std_similarity': float(np.sqrt(max(variance, 0.0))),
+            'max_similarity': float(values.max()) if stored else 0.0,
+            'min_similarity': 0.0 if zeros else float(values.min()),
+            'above_threshold_count': int(
+                2 * np.sum(values >= self.threshold)
+                + (zeros if self.threshold <= 0 else 0)
+            )
+        }
@@ -9,16 +9,29 @@ import sqlite3
 import json
 import logging
 from pathlib import Path
-from typing import Optional, Any
+from typing import Iterator, Optional, Any
 from contextlib import contextmanager
-from threading import RLock
+from threading import RLock, get_ident
 from datetime import datetime, timezone
 
+from ...utils.sqlite_pool import (
+    DEFAULT_CACHE_SIZE_KB,
+    DEFAULT_MMAP_SIZE,
+    DEFAULT_POOL_SIZE,
+    configure_connection,
+    create_pool,
+)
+
 logger = logging.getLogger(__name__)
 
 
 class PreferenceDatabaseManager:
-    """Manages SQLite database connections and schema for preference tracking."""
+    """
+    Manages SQLite database connections and schema for preference tracking.
+
+    Writes share one autocommit writer connection behind a lock; reads use
+    a pool of reader connections so they do not wait for writes.
+    """
 
     # Database schema version
     SCHEMA_VERSION = 1
@@ -117,13 +130,23 @@ class PreferenceDatabaseManager:
     CREATE INDEX IF NOT EXISTS idx_category_overrides_pattern ON category_overrides(category_pattern);
     """
 
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        mmap_size: int = DEFAULT_MMAP_SIZE,
+        cache_size_kb: int = DEFAULT_CACHE_SIZE_KB
+    ):
         """
         Initialize database manager.
 
         Args:
             db_path: Path to SQLite database file.
                     Defaults to ~/.file_organizer/preferences.db
+            pool_size: Maximum number of reader connections (0 reads
+                through the writer connection)
+            mmap_size: Bytes of the database to memory-map per connection
+            cache_size_kb: Page cache size per connection in KiB
         """
         if db_path is None:
             db_path = Path.home() / '.file_organizer' / 'preferences.db'
@@ -131,8 +154,12 @@ class PreferenceDatabaseManager:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
         self._connection: Optional[sqlite3.Connection] = None
+        self._pool = create_pool(self.db_path, pool_size, mmap_size, cache_size_kb)
         self._lock = RLock()
+        self._writer_thread: Optional[int] = None
         self._initialized = False
 
         logger.info(f"Preference database manager initialized: {self.db_path}")
@@ -220,6 +247,7 @@ class PreferenceDatabaseManager:
                 isolation_level=None  # Autocommit mode
             )
             self._connection.row_factory = sqlite3.Row
+            configure_connection(self._connection, self.mmap_size, self.cache_size_kb)
             logger.debug(f"Database connection established: {self.db_path}")
 
         return self._connection
@@ -234,6 +262,7 @@ class PreferenceDatabaseManager:
         """
         conn = self.get_connection()
         with self._lock:
+            self._writer_thread = get_ident()
             try:
                 conn.execute("BEGIN")
                 yield conn
@@ -243,8 +272,32 @@ class PreferenceDatabaseManager:
                 logger.error(f"Transaction failed: {e}")
                 raise
 
+    @contextmanager
+    def _read_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Connection for a read query.
+
+        Yields:
+            A pooled reader, or the writer (under the lock) when pooling is
+            off or this thread is inside ``transaction()``
+        """
+        writer = self._connection
+        own_writes = (
+            writer is not None
+            and writer.in_transaction
+            and self._writer_thread == get_ident()
+        )
+        if self._pool is None or own_writes:
+            with self._lock:
+                yield self.get_connection()
+        else:
+            with self._pool.reader() as conn:
+                yield conn
+
     def close(self) -> None:
-        """Close database connection."""
+        """Close reader and writer connections."""
+        if self._pool is not None:
+            self._pool.close()
         with self._lock:
             if self._connection:
                 self._connection.close()
@@ -312,6 +365,8 @@ class PreferenceDatabaseManager:
                     (preference_type, key, value, confidence, frequency, now, now, source, context_json)
                 )
                 row = cursor.fetchone()
+                # Finish the statement so the autocommit write is committed
+                cursor.close()
                 pref_id = row[0] if row else None
                 if pref_id is None:
                     raise RuntimeError("Failed to retrieve preference ID after insert/update")
@@ -331,9 +386,7 @@ class PreferenceDatabaseManager:
         Returns:
             Preference dictionary or None if not found
         """
-        conn = self.get_connection()
-
-        with self._lock:
+        with self._read_connection() as conn:
             cursor = conn.execute(
                 """
                 SELECT * FROM preferences
@@ -342,6 +395,7 @@ class PreferenceDatabaseManager:
                 (preference_type, key)
             )
             row = cursor.fetchone()
+            cursor.close()
 
             if row:
                 result = dict(row)
@@ -360,9 +414,7 @@ class PreferenceDatabaseManager:
         Returns:
             List of preference dictionaries
         """
-        conn = self.get_connection()
-
-        with self._lock:
+        with self._read_connection() as conn:
             cursor = conn.execute(
                 """
                 SELECT * FROM preferences
@@ -507,9 +559,7 @@ class PreferenceDatabaseManager:
         Returns:
             List of correction dictionaries
         """
-        conn = self.get_connection()
-
-        with self._lock:
+        with self._read_connection() as conn:
             if correction_type:
                 cursor = conn.execute(
                     """
@@ -549,9 +599,7 @@ class PreferenceDatabaseManager:
         Returns:
             Dictionary with preference statistics
         """
-        conn = self.get_connection()
-
-        with self._lock:
+        with self._read_connection() as conn:
             cursor = conn.execute(
                 """
                 SELECT
@@ -586,5 +634,6 @@ class PreferenceDatabaseManager:
             if stats["total_preferences"] > 0:
                 cursor = conn.execute("SELECT AVG(confidence) FROM preferences")
                 stats["average_confidence"] = cursor.fetchone()[0] or 0.0
+                cursor.close()
 
             return stats
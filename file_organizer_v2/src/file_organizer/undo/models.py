@@ -95,12 +95,14 @@ class RollbackResult:
         operations_failed: Number of operations that failed
         errors: List of (operation_id, error_message) tuples
         warnings: List of non-critical warnings
+        rolled_back_ids: IDs of the operations that were rolled back
     """
     success: bool
     operations_rolled_back: int = 0
     operations_failed: int = 0
     errors: List[Tuple[int, str]] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
+    rolled_back_ids: List[int] = field(default_factory=list)
 
     def __bool__(self) -> bool:
         """Allow RollbackResult to be used in boolean context."""
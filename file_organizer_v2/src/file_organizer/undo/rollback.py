@@ -6,9 +6,11 @@ handling all operation types and transaction management.
 """
 
 import logging
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
 
 from ..history.models import Operation, OperationType, OperationStatus
 from .validator import OperationValidator
@@ -25,15 +27,18 @@ class RollbackExecutor:
     to undo or redo file operations.
     """
 
-    def __init__(self, validator: Optional[OperationValidator] = None):
+    def __init__(self, validator: Optional[OperationValidator] = None, max_workers: int = 8):
         """
         Initialize rollback executor.
 
         Args:
             validator: Operation validator
+            max_workers: Threads used to validate and undo independent
+                operations of a transaction (1 runs them one at a time)
         """
         self.validator = validator or OperationValidator()
         self.trash_dir = self.validator.trash_dir
+        self.max_workers = max(1, max_workers)
 
     def rollback_operation(self, operation: Operation) -> bool:
         """
@@ -372,6 +377,61 @@ class RollbackExecutor:
             logger.error(f"Failed to redo create operation {operation.id}: {e}")
             return False
 
+    def plan_rollback(self, operations: List[Operation]) -> List[List[Operation]]:
+        """
+        Plan the undo of a transaction as waves of independent operations.
+
+        Operations are undone newest first. An operation has to wait for
+        every newer operation on the same path, or on a path above or below
+        it (such as files moved into a directory that was later renamed),
+        because undoing the newer one restores the state the older one
+        expects. Operations in one wave have no such dependency on each
+        other and can be undone concurrently; each wave only depends on
+        earlier waves.
+
+        Args:
+            operations: Operations of the transaction, in any order if they
+                all have IDs, otherwise in the order they were logged
+
+        Returns:
+            List of waves, each a list of operations in undo order
+        """
+        if all(operation.id is not None for operation in operations):
+            ordered = sorted(operations, key=lambda op: op.id, reverse=True)
+        else:
+            ordered = list(reversed(operations))
+
+        levels: List[int] = []
+        last_touch: Dict[str, int] = {}
+        touched_below: Dict[str, List[int]] = {}
+
+        for index, operation in enumerate(ordered):
+            paths = [
+                str(path) for path in (operation.source_path, operation.destination_path)
+                if path
+            ]
+            ancestors = {path: self._ancestors(path) for path in paths}
+
+            dependencies: Set[int] = set()
+            for path in paths:
+                for key in (path, *ancestors[path]):
+                    if key in last_touch:
+                        dependencies.add(last_touch[key])
+                # This operation now orders everything below the path
+                dependencies.update(touched_below.pop(path, ()))
+
+            levels.append(max((levels[d] for d in dependencies), default=-1) + 1)
+
+            for path in paths:
+                last_touch[path] = index
+                for ancestor in ancestors[path]:
+                    touched_below.setdefault(ancestor, []).append(index)
+
+        waves: List[List[Operation]] = [[] for _ in range(max(levels, default=-1) + 1)]
+        for operation, level in zip(ordered, levels):
+            waves[level].append(operation)
+        return waves
+
     def rollback_transaction(
         self,
         transaction_id: str,
@@ -380,6 +440,14 @@ class RollbackExecutor:
         """
         Rollback an entire transaction atomically.
 
+        The operations are planned into waves (see ``plan_rollback``). The
+        first wave is validated before anything is touched, so a conflict
+        there leaves the file system unchanged; later waves depend on the
+        state earlier waves restore and are validated just before they
+        run. Within a wave, validation (including integrity hashing) and
+        the undo itself run on ``max_workers`` threads. The rollback stops
+        at the first wave with a failure.
+
         Args:
             transaction_id: Transaction ID
             operations: List of operations in transaction
@@ -389,33 +457,62 @@ class RollbackExecutor:
         """
         logger.info(f"Rolling back transaction {transaction_id} with {len(operations)} operations")
 
+        waves = self.plan_rollback(operations)
+        logger.debug(f"Planned rollback of transaction {transaction_id} in {len(waves)} waves")
+
         rolled_back = 0
         failed = 0
         errors = []
         warnings = []
+        rolled_back_ids = []
 
-        # Rollback operations in reverse order
-        for operation in reversed(operations):
-            try:
-                success = self.rollback_operation(operation)
-                if success:
-                    rolled_back += 1
-                else:
-                    failed += 1
-                    errors.append((operation.id, "Rollback operation returned False"))
-            except Exception as e:
-                failed += 1
-                errors.append((operation.id, str(e)))
-                logger.error(
-                    f"Failed to rollback operation {operation.id} in transaction {transaction_id}: {e}"
-                )
-
-                # For atomic rollback, stop on first failure
-                warnings.append(
-                    f"Transaction rollback stopped at operation {operation.id}. "
-                    f"{rolled_back} operations rolled back, {len(operations) - rolled_back - 1} pending."
-                )
-                break
+        pool = ThreadPoolExecutor(max_workers=self.max_workers) if self.max_workers > 1 else None
+        run = pool.map if pool else map
+        try:
+            for number, wave in enumerate(waves):
+                validations = self.validator.validate_undo_batch(wave, self.max_workers)
+                invalid = [
+                    (operation, validation)
+                    for operation, validation in zip(wave, validations)
+                    if not validation.can_proceed
+                ]
+                if invalid:
+                    for operation, validation in invalid:
+                        failed += 1
+                        message = validation.error_message or "Validation failed"
+                        if validation.conflicts:
+                            message += f": {validation.conflicts[0]}"
+                        errors.append((operation.id, message))
+                    logger.error(
+                        f"Validation failed for {len(invalid)} operations in wave {number} "
+                        f"of transaction {transaction_id}"
+                    )
+                    break
+
+                for validation in validations:
+                    for warning in validation.warnings:
+                        logger.warning(warning)
+
+                for operation, success in zip(wave, run(self.rollback_operation, wave)):
+                    if success:
+                        rolled_back += 1
+                        rolled_back_ids.append(operation.id)
+                    else:
+                        failed += 1
+                        errors.append((operation.id, "Rollback operation returned False"))
+
+                if failed:
+                    break
+        finally:
+            if pool:
+                pool.shutdown()
+
+        pending = len(operations) - rolled_back - failed
+        if failed and pending:
+            warnings.append(
+                f"Transaction rollback stopped after a failure. "
+                f"{rolled_back} operations rolled back, {pending} pending."
+            )
 
         success = failed == 0
         result = RollbackResult(
@@ -423,7 +520,8 @@ class RollbackExecutor:
             operations_rolled_back=rolled_back,
             operations_failed=failed,
             errors=errors,
-            warnings=warnings
+            warnings=warnings,
+            rolled_back_ids=rolled_back_ids
         )
 
         if success:
@@ -439,6 +537,16 @@ class RollbackExecutor:
 
         return result
 
+    @staticmethod
+    def _ancestors(path: str) -> List[str]:
+        """Parent directories of a path, nearest first."""
+        ancestors = []
+        parent = os.path.dirname(path)
+        while parent and parent != path:
+            ancestors.append(parent)
+            path, parent = parent, os.path.dirname(parent)
+        return ancestors
+
     def _move_to_trash(self, file_path: Path, operation_id: Optional[int] = None) -> Path:
         """
         Move a file to trash.
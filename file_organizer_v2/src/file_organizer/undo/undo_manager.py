@@ -150,20 +150,19 @@ class UndoManager:
             logger.warning(f"No operations to undo in transaction {transaction_id}")
             return False
 
-        # Validate all operations first
-        logger.debug(f"Validating {len(operations)} operations...")
-        for operation in operations:
-            validation = self.validator.validate_undo(operation)
-            if not validation.can_proceed:
-                logger.error(
-                    f"Transaction validation failed at operation {operation.id}: "
-                    f"{validation.error_message}"
-                )
-                return False
-
-        # Execute rollback
+        # Validate and execute rollback; the executor validates every
+        # operation before undoing it, in dependency order
         result = self.executor.rollback_transaction(transaction_id, operations)
 
+        # Mark what was undone, even after a partial failure, so a retry
+        # only attempts the remaining operations
+        rolled_back_ids = [op_id for op_id in result.rolled_back_ids if op_id is not None]
+        if rolled_back_ids:
+            self.history.db.execute_many(
+                "UPDATE operations SET status = ? WHERE id = ?",
+                [(OperationStatus.ROLLED_BACK.value, op_id) for op_id in rolled_back_ids]
+            )
+
         if result.success:
             logger.info(
                 f"Successfully undid transaction {transaction_id}: "
@@ -9,8 +9,11 @@ import hashlib
 import logging
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from stat import S_ISREG
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
 
 from ..history.models import Operation, OperationType, OperationStatus
 from .models import ValidationResult, Conflict, ConflictType
@@ -27,18 +30,28 @@ class OperationValidator:
     and conflict detection.
     """
 
-    def __init__(self, trash_dir: Optional[Path] = None):
+    HASH_CHUNK_SIZE = 1024 * 1024
+    HASH_CACHE_SIZE = 65536
+
+    def __init__(self, trash_dir: Optional[Path] = None, strict: bool = False):
         """
         Initialize the validator.
 
         Args:
             trash_dir: Directory for deleted files. Defaults to ~/.file_organizer/trash/
+            strict: Always hash files to check integrity, even when their
+                recorded fingerprint still matches
         """
         if trash_dir is None:
             trash_dir = Path.home() / ".file_organizer" / "trash"
         self.trash_dir = trash_dir
+        self.strict = strict
         self.trash_dir.mkdir(parents=True, exist_ok=True)
 
+        # Hashes keyed by (path, size, mtime_ns, inode); a changed file gets a new key
+        self._hash_cache: Dict[Tuple[str, int, int, int], str] = {}
+        self._hash_cache_lock = Lock()
+
     def validate_undo(self, operation: Operation) -> ValidationResult:
         """
         Validate an undo operation.
@@ -90,6 +103,31 @@ class OperationValidator:
             error_message=error_message
         )
 
+    def validate_undo_batch(
+        self,
+        operations: List[Operation],
+        max_workers: int = 8
+    ) -> List[ValidationResult]:
+        """
+        Validate undo of many operations in parallel.
+
+        Validation is dominated by file hashing and stat calls, which
+        release the GIL, so a thread pool overlaps the I/O of independent
+        files.
+
+        Args:
+            operations: Operations to validate
+            max_workers: Number of validation threads
+
+        Returns:
+            ValidationResult for each operation, in the same order
+        """
+        if max_workers <= 1 or len(operations) <= 1:
+            return [self.validate_undo(operation) for operation in operations]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(self.validate_undo, operations))
+
     def validate_redo(self, operation: Operation) -> ValidationResult:
         """
         Validate a redo operation.
@@ -153,7 +191,8 @@ class OperationValidator:
         else:
             # Check file integrity
             if operation.file_hash and not self.check_file_integrity(
-                operation.destination_path, operation.file_hash
+                operation.destination_path, operation.file_hash,
+                self._recorded_fingerprint(operation)
             ):
                 conflicts.append(Conflict(
                     conflict_type=ConflictType.HASH_MISMATCH,
@@ -201,7 +240,8 @@ class OperationValidator:
         else:
             # Check file integrity
             if operation.file_hash and not self.check_file_integrity(
-                operation.destination_path, operation.file_hash
+                operation.destination_path, operation.file_hash,
+                self._recorded_fingerprint(operation)
             ):
                 conflicts.append(Conflict(
                     conflict_type=ConflictType.HASH_MISMATCH,
@@ -239,7 +279,9 @@ class OperationValidator:
             ))
         else:
             # Check file integrity
-            if operation.file_hash and not self.check_file_integrity(trash_path, operation.file_hash):
+            if operation.file_hash and not self.check_file_integrity(
+                trash_path, operation.file_hash, self._recorded_fingerprint(operation)
+            ):
                 conflicts.append(Conflict(
                     conflict_type=ConflictType.HASH_MISMATCH,
                     path=str(trash_path),
@@ -286,7 +328,8 @@ class OperationValidator:
         else:
             # Verify it's the same file (hash check)
             if operation.file_hash and not self.check_file_integrity(
-                operation.destination_path, operation.file_hash
+                operation.destination_path, operation.file_hash,
+                self._recorded_fingerprint(operation)
             ):
                 conflicts.append(Conflict(
                     conflict_type=ConflictType.HASH_MISMATCH,
@@ -402,32 +445,103 @@ class OperationValidator:
 
         return conflicts
 
-    def check_file_integrity(self, path: Path, expected_hash: str) -> bool:
+    def check_file_integrity(
+        self,
+        path: Path,
+        expected_hash: str,
+        fingerprint: Optional[Dict[str, int]] = None
+    ) -> bool:
         """
         Check if file hash matches expected value.
 
+        With a fingerprint recorded when the hash was taken (see
+        ``file_fingerprint``), the file is only stat-ed: matching size,
+        mtime_ns and inode (compared only on the same device, since a move
+        across filesystems changes it) mean the file is unchanged, and a
+        different size means it changed. Otherwise, or in strict mode, the
+        file is hashed.
+
         Args:
             path: Path to file
             expected_hash: Expected SHA256 hash
+            fingerprint: Stat fingerprint recorded with the hash (optional)
 
         Returns:
             True if hash matches, False otherwise
         """
         try:
-            if not path.exists() or not path.is_file():
-                return False
-
-            sha256_hash = hashlib.sha256()
-            with open(path, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
-
-            actual_hash = sha256_hash.hexdigest()
-            return actual_hash == expected_hash
+            if fingerprint and not self.strict:
+                st = os.stat(path)
+                if not S_ISREG(st.st_mode):
+                    return False
+                if st.st_size != fingerprint.get('size', st.st_size):
+                    return False
+                if self._fingerprint_matches(fingerprint, st):
+                    return True
+
+            return self.compute_file_hash(path) == expected_hash
+        except FileNotFoundError:
+            return False
         except Exception as e:
             logger.warning(f"Failed to check file integrity for {path}: {e}")
             return False
 
+    @staticmethod
+    def _recorded_fingerprint(operation: Operation) -> Optional[Dict[str, int]]:
+        """Stat fingerprint logged with the operation's hash, if any."""
+        return (operation.metadata or {}).get('fingerprint')
+
+    @staticmethod
+    def _fingerprint_matches(fingerprint: Dict[str, int], st: os.stat_result) -> bool:
+        """Whether a file's stat result matches a recorded fingerprint."""
+        if fingerprint.get('size') != st.st_size or fingerprint.get('mtime_ns') != st.st_mtime_ns:
+            return False
+        inode = fingerprint.get('inode')
+        if not inode or not st.st_ino or fingerprint.get('device') != st.st_dev:
+            # Inode unavailable, or not comparable across filesystems
+            return True
+        return inode == st.st_ino
+
+    def compute_file_hash(self, path: Path) -> Optional[str]:
+        """
+        Compute the SHA256 hash of a file, reusing a cached hash if still valid.
+
+        A cached hash is reused only while the file's size, mtime and inode
+        are unchanged, so validating the same files twice (e.g. before and
+        during a transaction rollback) reads them once.
+
+        Args:
+            path: Path to file
+
+        Returns:
+            Hex digest, or None if the path is not a regular file
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not S_ISREG(stat.st_mode):
+            return None
+
+        key = (str(path), stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        with self._hash_cache_lock:
+            cached = self._hash_cache.get(key)
+        if cached is not None:
+            return cached
+
+        sha256_hash = hashlib.sha256()
+        with open(path, "rb") as f:
+            for byte_block in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b""):
+                sha256_hash.update(byte_block)
+        actual_hash = sha256_hash.hexdigest()
+
+        with self._hash_cache_lock:
+            if len(self._hash_cache) >= self.HASH_CACHE_SIZE:
+                # Evict the oldest entry (dicts keep insertion order)
+                del self._hash_cache[next(iter(self._hash_cache))]
+            self._hash_cache[key] = actual_hash
+        return actual_hash
+
     def check_path_exists(self, path: Path) -> bool:
         """
         Check if path exists.
@@ -168,28 +168,18 @@ class HistoryViewer:
 
         return operations
 
-    def search_by_path(self, path: str) -> List[Operation]:
+    def search_by_path(self, path: str, limit: Optional[int] = None) -> List[Operation]:
         """
         Search for operations affecting a specific path.
 
         Args:
             path: Path to search for (can be partial)
+            limit: Maximum number of results
 
         Returns:
-            List of operations affecting this path
+            List of operations affecting this path, newest first
         """
-        # Get all operations (with reasonable limit)
-        operations = self.history.get_operations(limit=10000)
-
-        # Filter by path
-        matching_ops = []
-        for op in operations:
-            source_match = path in str(op.source_path)
-            dest_match = op.destination_path and path in str(op.destination_path)
-            if source_match or dest_match:
-                matching_ops.append(op)
-
-        return matching_ops
+        return self.history.search_by_path(path, limit=limit)
 
     def display_filtered_operations(
         self,
@@ -213,7 +203,7 @@ class HistoryViewer:
         """
         # Apply path search if specified
         if search:
-            operations = self.search_by_path(search)
+            operations = self.search_by_path(search, limit=limit)
             if not operations:
                 print(f"No operations found affecting path: {search}")
                 return
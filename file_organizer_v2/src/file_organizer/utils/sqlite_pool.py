@@ -0,0 +1,195 @@
+"""
+Reader connection pool for SQLite databases in WAL mode.
+
+In WAL mode readers never block the writer or each other, but only when
+they use their own connections. ``SQLiteConnectionPool`` hands out reader
+connections so that concurrent threads can query in parallel, while the
+owning database manager keeps a single writer connection behind its lock
+(SQLite allows one writer at a time regardless, so threads queue on it).
+"""
+
+import logging
+import queue
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_CACHE_SIZE_KB = 16 * 1024
+
+
+def configure_connection(
+    conn: sqlite3.Connection,
+    mmap_size: int = DEFAULT_MMAP_SIZE,
+    cache_size_kb: int = DEFAULT_CACHE_SIZE_KB,
+) -> None:
+    """
+    Apply per-connection performance pragmas.
+
+    ``synchronous=NORMAL`` is durable across application crashes in WAL
+    mode and only syncs at checkpoints, instead of on every commit.
+
+    Args:
+        conn: Connection to configure
+        mmap_size: Bytes of the database file to memory-map (0 disables)
+        cache_size_kb: Page cache size in KiB
+    """
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+    conn.execute(f"PRAGMA cache_size={-int(cache_size_kb)}")
+
+
+class SQLiteConnectionPool:
+    """
+    Pool of read-only connections to one SQLite database.
+
+    Connections are created lazily up to ``size`` and reused most recently
+    returned first, so a thread that reads repeatedly keeps getting a warm
+    page cache. When all connections are in use, ``reader()`` waits for one
+    to be returned.
+
+    Example:
+        with pool.reader() as conn:
+            rows = conn.execute("SELECT ...").fetchall()
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        size: int = DEFAULT_POOL_SIZE,
+        timeout: float = 30.0,
+        mmap_size: int = DEFAULT_MMAP_SIZE,
+        cache_size_kb: int = DEFAULT_CACHE_SIZE_KB,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            db_path: Path to the SQLite database file
+            size: Maximum number of reader connections
+            timeout: Seconds to wait for a locked database
+            mmap_size: Bytes to memory-map per connection
+            cache_size_kb: Page cache size per connection in KiB
+
+        Raises:
+            ValueError: If size is less than 1
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self.db_path = Path(db_path)
+        self.size = size
+        self.timeout = timeout
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = Lock()
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a reader connection.
+
+        Cursors must be exhausted or closed before the block ends; an open
+        statement would keep the connection's read snapshot alive.
+
+        Yields:
+            Read-only connection with ``sqlite3.Row`` rows
+        """
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                # Connections closed by close() while borrowed are dropped
+                alive = conn in self._connections
+            if alive:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+
+    def _checkout(self) -> sqlite3.Connection:
+        """Take an idle connection, creating one if the pool is not full."""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                if len(self._connections) < self.size:
+                    conn = self._connect()
+                    self._connections.append(conn)
+                    return conn
+
+            # Wait briefly, then re-check in case close() emptied the pool
+            try:
+                return self._idle.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a reader connection."""
+        conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,
+            timeout=self.timeout,
+            isolation_level=None,
+        )
+        conn.row_factory = sqlite3.Row
+        configure_connection(conn, self.mmap_size, self.cache_size_kb)
+        conn.execute("PRAGMA query_only=ON")
+        logger.debug(f"Opened reader connection {len(self._connections) + 1}/{self.size}: {self.db_path}")
+        return conn
+
+    def close(self) -> None:
+        """Close all reader connections; later reads open new ones."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"Error closing reader connection: {e}")
+
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+    @property
+    def connection_count(self) -> int:
+        """Number of reader connections opened so far."""
+        return len(self._connections)
+
+
+def create_pool(
+    db_path: Path,
+    size: int,
+    mmap_size: int = DEFAULT_MMAP_SIZE,
+    cache_size_kb: int = DEFAULT_CACHE_SIZE_KB,
+) -> Optional[SQLiteConnectionPool]:
+    """
+    Create a reader pool, or None when pooling is disabled or impossible.
+
+    Args:
+        db_path: Path to the SQLite database file
+        size: Maximum number of reader connections (0 disables pooling)
+        mmap_size: Bytes to memory-map per connection
+        cache_size_kb: Page cache size per connection in KiB
+
+    Returns:
+        Connection pool, or None for ``size == 0`` and in-memory databases
+    """
+    if size <= 0 or str(db_path) == ":memory:":
+        return None
+    return SQLiteConnectionPool(db_path, size, mmap_size=mmap_size, cache_size_kb=cache_size_kb)
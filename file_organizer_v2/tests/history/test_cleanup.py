@@ -2,13 +2,16 @@
 Tests for history cleanup functionality.
 """
 
+import sqlite3
 import tempfile
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import pytest
 
 from file_organizer.history.cleanup import HistoryCleanup, HistoryCleanupConfig
-from file_organizer.history.models import OperationStatus, OperationType
+from file_organizer.history.models import OperationStatus, OperationType, to_epoch_us
 from file_organizer.history.tracker import OperationHistory
 
 
@@ -155,8 +158,9 @@ class TestHistoryCleanup:
 
     def test_cleanup_orphaned_transactions(self, history, cleanup):
         """Test cleaning up orphaned transactions."""
-        # Start a transaction but don't add any operations
-        history.start_transaction()
+        # Finish a transaction without adding any operations
+        txn_id = history.start_transaction()
+        history.commit_transaction(txn_id)
 
         # Add operations without transaction
         history.log_operation(OperationType.MOVE, Path('/test/path'))
@@ -165,6 +169,17 @@ class TestHistoryCleanup:
         deleted = cleanup._cleanup_orphaned_transactions()
         assert deleted == 1  # Should delete the empty transaction
 
+    def test_cleanup_keeps_transactions_in_progress(self, history, cleanup):
+        """An open transaction whose operations are still buffered survives cleanup."""
+        txn_id = history.start_transaction()
+        batch = history.batch(flush_interval=60)
+        batch.log_operation(OperationType.MOVE, Path('/test/path'), transaction_id=txn_id)
+
+        assert cleanup._cleanup_orphaned_transactions() == 0
+
+        history.commit_transaction(txn_id)
+        assert history.get_transaction(txn_id).operation_count == 1
+
     def test_auto_cleanup(self, history, cleanup):
         """Test automatic cleanup."""
         # Add many operations to trigger cleanup
@@ -237,3 +252,133 @@ class TestHistoryCleanup:
         assert 'database_size_mb' in stats
         assert 'oldest_operation' in stats
         assert 'newest_operation' in stats
+
+
+class TestBatchedCleanup:
+    """Test suite for batched, incremental cleanup."""
+
+    @pytest.fixture
+    def history(self, tmp_path):
+        """OperationHistory with 95 old operations and 5 recent ones."""
+        hist = OperationHistory(tmp_path / 'history.db')
+        old = to_epoch_us(datetime.utcnow() - timedelta(days=365))
+        hist.db.execute_many(
+            "INSERT INTO operations (operation_type, timestamp, source_path, status) VALUES (?, ?, ?, ?)",
+            [('move', old + i, f'/old/path{i}', 'completed') for i in range(95)]
+        )
+        for i in range(5):
+            hist.log_operation(OperationType.MOVE, Path(f'/new/path{i}'))
+        yield hist
+        hist.close()
+
+    def _cleanup(self, history, progress):
+        """HistoryCleanup with small batches that records progress."""
+        config = HistoryCleanupConfig(
+            max_operations=10, max_age_days=30, cleanup_batch_size=20,
+            batch_pause=0, checkpoint_interval=2
+        )
+        return HistoryCleanup(
+            history.db, config,
+            progress_callback=lambda p: progress.append((p.phase, p.deleted, p.total))
+        )
+
+    def test_count_deletes_oldest_in_batches(self, history):
+        """Count cleanup deletes exactly the oldest operations, batch by batch."""
+        progress = []
+        deleted = self._cleanup(history, progress).cleanup_by_count()
+
+        assert deleted == 90
+        assert [p[1] for p in progress] == [20, 40, 60, 80, 90]
+        assert {p[2] for p in progress} == {90}
+        remaining = sorted(str(op.source_path) for op in history.get_operations())
+        assert remaining[:5] == [f'/new/path{i}' for i in range(5)]
+        assert len(remaining) == 10
+
+    def test_age_uses_timestamps(self, history):
+        """Age cleanup removes only old operations and returns free pages."""
+        progress = []
+        deleted = self._cleanup(history, progress).cleanup_old_operations()
+
+        assert deleted == 95
+        assert {p[0] for p in progress} == {'age'}
+        assert history.db.get_operation_count() == 5
+        assert history.db.fetch_one("PRAGMA freelist_count")[0] == 0
+
+    def test_size_keeps_minimum(self, history):
+        """Size cleanup stops at min_operations instead of emptying the table."""
+        cleanup = self._cleanup(history, [])
+        cleanup.config.min_operations = 30
+        deleted = cleanup.cleanup_by_size(max_size_mb=0)
+
+        assert deleted == 70
+        assert history.db.get_operation_count() == 30
+
+    def test_size_with_realistic_paths(self, tmp_path):
+        """Size cleanup deletes about what the limit needs, path index included."""
+        history = OperationHistory(tmp_path / 'paths.db')
+        try:
+            with history.batch(hash_files=False) as batch:
+                for i in range(4000):
+                    name = f'report_{i:06d}_final_version.pdf'
+                    batch.log_operation(
+                        OperationType.MOVE,
+                        Path(f'/home/user/Documents/Projects/archive-{i % 97}/subfolder/{name}'),
+                        Path(f'/home/user/Organized/Documents/2024/{i % 12:02d}/{name}')
+                    )
+            history.db.checkpoint("TRUNCATE")
+            used = history.db.get_used_size()
+            limit_mb = used / 2 / (1024 * 1024)
+
+            config = HistoryCleanupConfig(cleanup_batch_size=500, batch_pause=0)
+            deleted = HistoryCleanup(history.db, config).cleanup_by_size(max_size_mb=limit_mb)
+
+            assert history.db.get_used_size() <= used / 2
+            assert 1000 < deleted < 3000
+            assert history.db.fetch_one("PRAGMA freelist_count")[0] == 0
+        finally:
+            history.close()
+
+    def test_auto_cleanup_converts_old_databases(self, tmp_path):
+        """A database without incremental auto-vacuum is vacuumed once so it shrinks."""
+        db_path = tmp_path / 'old.db'
+        conn = sqlite3.connect(db_path)
+        conn.executescript("PRAGMA auto_vacuum=NONE; CREATE TABLE legacy (x);")
+        conn.close()
+
+        history = OperationHistory(db_path)
+        try:
+            assert not history.db.uses_incremental_vacuum()
+            history.db.execute_many(
+                "INSERT INTO operations (operation_type, timestamp, source_path, status) VALUES (?, ?, ?, ?)",
+                [('move', i, f'/old/{"x" * 200}/{i}', 'completed') for i in range(3000)]
+            )
+            history.db.checkpoint("TRUNCATE")
+            size_before = history.db.get_database_size()
+
+            config = HistoryCleanupConfig(max_size_mb=1, batch_pause=0)
+            HistoryCleanup(history.db, config).auto_cleanup()
+
+            assert history.db.uses_incremental_vacuum()
+            assert history.db.get_database_size() < size_before / 2
+        finally:
+            history.close()
+
+    def test_background_cleanup(self, history):
+        """auto_cleanup can run on its own thread while logging continues."""
+        threads = []
+        cleanup = self._cleanup(history, [])
+        cleanup.progress_callback = lambda p: threads.append(threading.current_thread().name)
+
+        thread = cleanup.start_background()
+        history.log_operation(OperationType.MOVE, Path('/during/cleanup'))
+        thread.join(timeout=10)
+
+        assert not cleanup.is_running
+        assert set(threads) == {'history-cleanup'}
+        assert history.db.get_operation_count() <= 11
+
+    def test_stop_before_start(self, history):
+        """A stopped cleanup does not prevent later runs."""
+        cleanup = self._cleanup(history, [])
+        cleanup.stop()
+        assert cleanup.cleanup_by_count() == 90
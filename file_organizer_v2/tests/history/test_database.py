@@ -2,7 +2,9 @@
 Tests for database manager.
 """
 
+import sqlite3
 import tempfile
+import threading
 from pathlib import Path
 
 import pytest
@@ -149,6 +151,23 @@ class TestDatabaseManager:
         assert results[0]['operation_type'] == 'move'
         assert results[1]['operation_type'] == 'rename'
 
+    def test_iter_query(self, db_manager):
+        """iter_query streams all rows through fetchmany-sized chunks."""
+        db_manager.execute_many(
+            "INSERT INTO operations (operation_type, timestamp, source_path, status) VALUES (?, ?, ?, ?)",
+            [('move', i, f'/test/path{i}', 'completed') for i in range(7)]
+        )
+
+        rows = db_manager.iter_query(
+            "SELECT source_path FROM operations WHERE timestamp >= ? ORDER BY timestamp",
+            (2,),
+            chunk_size=2
+        )
+
+        assert [row['source_path'] for row in rows] == [f'/test/path{i}' for i in range(2, 7)]
+        # The lock is released once the iterator is exhausted
+        assert db_manager.fetch_one("SELECT COUNT(*) AS n FROM operations")['n'] == 7
+
     def test_get_database_size(self, db_manager):
         """Test get_database_size method."""
         size = db_manager.get_database_size()
@@ -206,3 +225,150 @@ class TestDatabaseManager:
         # Should be able to access by column name
         assert result['operation_type'] == 'move'
         assert result['source_path'] == '/test/path'
+
+
+V1_SCHEMA = """
+CREATE TABLE operations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    operation_type TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    source_path TEXT NOT NULL,
+    destination_path TEXT,
+    file_hash TEXT,
+    metadata TEXT,
+    transaction_id TEXT,
+    status TEXT NOT NULL DEFAULT 'completed',
+    error_message TEXT,
+    created_at TEXT DEFAULT (datetime('now'))
+);
+CREATE TABLE transactions (
+    transaction_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    completed_at TEXT,
+    operation_count INTEGER DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'in_progress',
+    metadata TEXT
+);
+CREATE TABLE schema_version (
+    version INTEGER PRIMARY KEY,
+    applied_at TEXT DEFAULT (datetime('now'))
+);
+CREATE INDEX idx_operations_status ON operations(status);
+INSERT INTO schema_version (version) VALUES (1);
+INSERT INTO transactions VALUES ('t1', '2024-01-01T00:00:00Z', '2024-01-01T00:00:05.250000Z', 1, 'completed', '{}');
+INSERT INTO operations (operation_type, timestamp, source_path, destination_path, transaction_id, status)
+VALUES ('move', '2024-01-01T00:00:01.000001Z', '/src/report.pdf', '/dst/Docs/report.pdf', 't1', 'completed');
+"""
+
+
+class TestSchemaV2:
+    """Test suite for the v2 schema and its migration."""
+
+    @pytest.fixture
+    def db_manager(self, tmp_path):
+        """Create database manager instance."""
+        db = DatabaseManager(tmp_path / 'history.db')
+        db.initialize()
+        yield db
+        db.close()
+
+    def test_migrates_v1_database(self, tmp_path):
+        """ISO timestamps become epoch microseconds and indexes are rebuilt."""
+        db_path = tmp_path / 'history.db'
+        conn = sqlite3.connect(db_path)
+        conn.executescript(V1_SCHEMA)
+        conn.close()
+
+        with DatabaseManager(db_path) as db:
+            version = db.fetch_one("SELECT MAX(version) AS v FROM schema_version")['v']
+            operation = db.fetch_one("SELECT * FROM operations")
+            transaction = db.fetch_one("SELECT * FROM transactions")
+            status_index = db.fetch_one(
+                "SELECT sql FROM sqlite_master WHERE name = 'idx_operations_status'"
+            )['sql']
+            matches = db.fetch_all(
+                "SELECT rowid FROM operation_paths WHERE operation_paths MATCH ?", ('"Docs"',)
+            )
+
+        assert version == DatabaseManager.SCHEMA_VERSION
+        assert operation['timestamp'] == 1704067201000001
+        assert operation['source_path'] == '/src/report.pdf'
+        assert (transaction['started_at'], transaction['completed_at']) == (
+            1704067200000000, 1704067205250000
+        )
+        assert 'status, timestamp' in status_index
+        assert [row[0] for row in matches] == [operation['id']]
+
+    def test_status_queries_use_covering_index(self, db_manager):
+        """Status and time range filters are answered from the composite index."""
+        plan = db_manager.fetch_all(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM operations WHERE status = ? AND timestamp < ?",
+            ('failed', 0)
+        )
+        assert any('COVERING INDEX idx_operations_status' in row['detail'] for row in plan)
+
+    def test_path_index_follows_changes(self, db_manager):
+        """Triggers keep the path index in sync with the operations table."""
+        db_manager.execute_many(
+            "INSERT INTO operations (operation_type, timestamp, source_path, status) VALUES (?, ?, ?, ?)",
+            [('move', 1, '/a/alpha.txt', 'completed'), ('move', 2, '/b/beta.txt', 'completed')]
+        )
+        with db_manager.transaction() as conn:
+            conn.execute("UPDATE operations SET source_path = '/c/gamma.txt' WHERE timestamp = 2")
+            conn.execute("DELETE FROM operations WHERE timestamp = 1")
+
+        def match(term):
+            return db_manager.fetch_all(
+                "SELECT rowid FROM operation_paths WHERE operation_paths MATCH ?", (f'"{term}"',)
+            )
+
+        assert match('alpha') == []
+        assert match('beta') == []
+        assert len(match('gamma')) == 1
+
+
+class TestConnectionPool:
+    """Test suite for pooled reads."""
+
+    @pytest.fixture
+    def db_manager(self, tmp_path):
+        """Create database manager instance."""
+        db = DatabaseManager(tmp_path / 'history.db', pool_size=2)
+        db.initialize()
+        yield db
+        db.close()
+
+    def test_reads_do_not_wait_for_writer(self, db_manager):
+        """Another thread can read while a write transaction holds the lock."""
+        result = {}
+
+        def read():
+            result['count'] = db_manager.get_operation_count()
+
+        with db_manager.transaction() as conn:
+            conn.execute(
+                "INSERT INTO operations (operation_type, timestamp, source_path, status) VALUES (?, ?, ?, ?)",
+                ('move', 1, '/test/path', 'completed')
+            )
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(timeout=5)
+            assert not reader.is_alive()
+
+        assert result['count'] == 0
+        assert db_manager.get_operation_count() == 1
+
+    def test_reads_own_uncommitted_writes(self, db_manager):
+        """A thread with uncommitted writes reads through the writer."""
+        db_manager.execute_query(
+            "INSERT INTO operations (operation_type, timestamp, source_path, status) VALUES (?, ?, ?, ?)",
+            ('move', 1, '/test/path', 'completed')
+        )
+        assert db_manager.get_operation_count() == 1
+        db_manager.get_connection().commit()
+
+    def test_writer_pragmas(self, db_manager):
+        """The writer uses synchronous=NORMAL and the configured cache."""
+        conn = db_manager.get_connection()
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -db_manager.cache_size_kb
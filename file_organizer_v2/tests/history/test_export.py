@@ -3,6 +3,7 @@ Tests for history export functionality.
 """
 
 import csv
+import gzip
 import json
 import tempfile
 from datetime import datetime
@@ -11,7 +12,7 @@ from pathlib import Path
 import pytest
 
 from file_organizer.history.export import HistoryExporter
-from file_organizer.history.models import OperationType
+from file_organizer.history.models import Operation, OperationType
 from file_organizer.history.tracker import OperationHistory
 
 
@@ -254,3 +255,134 @@ class TestHistoryExporter:
         )
 
         assert stats['operations_exported'] == 5
+
+
+class TestStreamingExport:
+    """Test chunked streaming exports."""
+
+    @pytest.fixture
+    def history(self, tmp_path):
+        """History with operations spread over several transactions."""
+        hist = OperationHistory(tmp_path / 'history.db')
+        for t in range(3):
+            txn_id = hist.start_transaction()
+            for i in range(9):
+                hist.log_operation(
+                    OperationType.MOVE,
+                    Path(f'/src/{t}/file{i}.txt'),
+                    Path(f'/dst/{t}/file{i}.txt'),
+                    transaction_id=txn_id
+                )
+            hist.commit_transaction(txn_id)
+        hist.log_operation(OperationType.DELETE, Path('/src/loose.txt'))
+        yield hist
+        hist.close()
+
+    @pytest.fixture
+    def exporter(self, history):
+        """Exporter with a chunk size smaller than the history."""
+        return HistoryExporter(history.db, chunk_size=4)
+
+    def test_rows_stream_across_chunks(self, exporter):
+        """All rows stream in order across chunk boundaries."""
+        query, params = exporter._build_operation_query(None, None, None)
+        rows = list(exporter._iter_rows(query, params))
+
+        assert len(rows) == 28
+        assert [row['timestamp'] for row in rows] == sorted(
+            (row['timestamp'] for row in rows), reverse=True
+        )
+
+    def test_records_match_operation_to_dict(self, history, exporter):
+        """Rows serialize exactly as Operation.to_dict would."""
+        history.log_operation(OperationType.RENAME, Path('/src/meta.txt'), metadata={'note': 'x'})
+        query, params = exporter._build_operation_query(None, None, None)
+
+        for row in exporter._iter_rows(query, params):
+            assert exporter._operation_record(row) == Operation.from_row(row).to_dict()
+
+    def test_json_matches_document_layout(self, exporter, tmp_path):
+        """The streamed JSON document parses with counts and transactions."""
+        output_path = tmp_path / 'export.json'
+        stats = exporter.export_to_json(output_path)
+
+        data = json.loads(output_path.read_text())
+        assert stats == {'operations_exported': 28, 'transactions_exported': 3}
+        assert data['operation_count'] == len(data['operations']) == 28
+        assert data['transaction_count'] == len(data['transactions']) == 3
+        assert data['operations'][0]['source_path'] == '/src/loose.txt'
+
+    def test_json_transactions_follow_filter(self, history, exporter, tmp_path):
+        """Only transactions of the exported operations are included."""
+        txn_id = history.start_transaction()
+        history.log_operation(
+            OperationType.COPY, Path('/src/copy.txt'), Path('/dst/copy.txt'),
+            transaction_id=txn_id
+        )
+        history.commit_transaction(txn_id)
+
+        copies_path = tmp_path / 'copies.json'
+        stats = exporter.export_to_json(copies_path, operation_type=OperationType.COPY)
+        moves_path = tmp_path / 'moves.json'
+        exporter.export_to_json(moves_path, operation_type=OperationType.MOVE)
+
+        assert stats == {'operations_exported': 1, 'transactions_exported': 1}
+        assert [t['transaction_id'] for t in json.loads(copies_path.read_text())['transactions']] == [txn_id]
+        moves = json.loads(moves_path.read_text())
+        assert moves['transaction_count'] == 3
+        assert txn_id not in {t['transaction_id'] for t in moves['transactions']}
+
+    def test_json_empty(self, history, tmp_path):
+        """An export matching nothing is still valid JSON."""
+        exporter = HistoryExporter(history.db)
+        output_path = tmp_path / 'empty.json'
+        stats = exporter.export_to_json(output_path, operation_type=OperationType.COPY)
+
+        data = json.loads(output_path.read_text())
+        assert stats['operations_exported'] == 0
+        assert data['operations'] == []
+        assert 'transactions' not in data
+
+    def test_jsonl_gzip(self, exporter, tmp_path):
+        """A .gz path produces gzip-compressed JSON Lines."""
+        output_path = tmp_path / 'export.jsonl.gz'
+        count = exporter.export_to_jsonl(output_path, operation_type=OperationType.MOVE)
+
+        with gzip.open(output_path, 'rt') as f:
+            records = [json.loads(line) for line in f]
+
+        assert count == len(records) == 27
+        assert all(r['operation_type'] == 'move' for r in records)
+        assert all(r['destination_path'].startswith('/dst/') for r in records)
+
+    def test_csv_compress_flag(self, exporter, tmp_path):
+        """compress=True gzips CSV regardless of the file name."""
+        output_path = tmp_path / 'export.csv'
+        count = exporter.export_to_csv(output_path, compress=True)
+
+        with gzip.open(output_path, 'rt', newline='') as f:
+            rows = list(csv.DictReader(f))
+
+        assert count == len(rows) == 28
+        assert {row['source_path'] for row in rows} >= {'/src/0/file0.txt', '/src/loose.txt'}
+
+    def test_parquet(self, exporter, tmp_path):
+        """Parquet output has a typed columnar schema."""
+        pa = pytest.importorskip('pyarrow')
+        pq = pytest.importorskip('pyarrow.parquet')
+
+        output_path = tmp_path / 'export.parquet'
+        count = exporter.export_to_parquet(output_path)
+
+        table = pq.read_table(output_path)
+        assert count == table.num_rows == 28
+        assert pq.ParquetFile(output_path).num_row_groups == 7
+        assert table.schema.field('timestamp').type == pa.timestamp('us', tz='UTC')
+        assert table.column('operation_type').to_pylist().count('move') == 27
+
+    def test_parquet_requires_pyarrow(self, exporter, tmp_path, mocker):
+        """A missing pyarrow raises ImportError with install instructions."""
+        mocker.patch.dict('sys.modules', {'pyarrow': None, 'pyarrow.parquet': None})
+
+        with pytest.raises(ImportError, match='pip install pyarrow'):
+            exporter.export_to_parquet(tmp_path / 'export.parquet')
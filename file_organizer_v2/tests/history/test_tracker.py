@@ -2,6 +2,7 @@
 Tests for operation tracker.
 """
 
+import sqlite3
 import tempfile
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -78,6 +79,22 @@ class TestOperationHistory:
         # SHA256 hash should be 64 characters
         assert len(operations[0].file_hash) == 64
 
+    def test_log_operation_records_fingerprint(self, history, tmp_path):
+        """A move logged after it ran hashes the destination and records its fingerprint."""
+        source = tmp_path / 'a.txt'
+        destination = tmp_path / 'b.txt'
+        source.write_bytes(b'test content')
+        source.rename(destination)
+
+        history.log_operation(OperationType.MOVE, source, destination)
+
+        operation = history.get_operations()[0]
+        st = destination.stat()
+        assert operation.file_hash == history._calculate_file_hash(destination)
+        assert operation.metadata['fingerprint'] == {
+            'size': 12, 'mtime_ns': st.st_mtime_ns, 'inode': st.st_ino, 'device': st.st_dev
+        }
+
     def test_log_operation_with_metadata(self, history, temp_file):
         """Test that file metadata is collected."""
         history.log_operation(
@@ -290,3 +307,152 @@ class TestOperationHistory:
         assert len(operations) == 1
         assert operations[0].status == OperationStatus.FAILED
         assert operations[0].error_message == "Permission denied"
+
+
+class TestOperationBatch:
+    """Test suite for batched operation logging."""
+
+    @pytest.fixture
+    def history(self, tmp_path):
+        """Create OperationHistory instance."""
+        hist = OperationHistory(tmp_path / 'history.db')
+        yield hist
+        hist.close()
+
+    def test_flush_on_size(self, history, mocker):
+        """Operations are written in one transaction per full batch."""
+        transaction_id = history.start_transaction()
+        transaction = mocker.spy(history.db, 'transaction')
+
+        with history.batch(batch_size=4, flush_interval=60) as batch:
+            for i in range(10):
+                batch.log_operation(OperationType.MOVE, Path(f'/test/path{i}'), transaction_id=transaction_id)
+            assert len(history.get_operations()) == 8
+
+        assert transaction.call_count == 3
+        assert batch.logged_count == 10
+        assert len(history.get_operations()) == 10
+        assert history.get_transaction(transaction_id).operation_count == 10
+
+    def test_flush_on_interval(self, history, mocker):
+        """A buffer older than the flush interval is written on the next call."""
+        clock = mocker.patch('file_organizer.history.tracker.time.monotonic', return_value=100.0)
+        batch = history.batch(batch_size=100, flush_interval=5)
+
+        batch.log_operation(OperationType.DELETE, Path('/test/a'))
+        assert history.get_operations() == []
+
+        clock.return_value = 106.0
+        batch.log_operation(OperationType.DELETE, Path('/test/b'))
+        assert len(history.get_operations()) == 2
+
+    def test_deferred_hash_follows_move(self, history, tmp_path):
+        """Hashes are computed at flush time, from the destination if the source moved."""
+        source = tmp_path / 'a.txt'
+        source.write_bytes(b'test content')
+        destination = tmp_path / 'b.txt'
+
+        with history.batch() as batch:
+            batch.log_operation(OperationType.MOVE, source, destination)
+            source.rename(destination)
+
+        operation = history.get_operations()[0]
+        assert operation.file_hash == history._calculate_file_hash(destination)
+        assert operation.metadata['size'] == 12
+        assert operation.metadata['fingerprint']['inode'] == destination.stat().st_ino
+
+    def test_delete_hashed_at_log_time(self, history, tmp_path):
+        """Deleted files keep the hash taken before they disappeared."""
+        path = tmp_path / 'gone.txt'
+        path.write_bytes(b'test content')
+        expected = history._calculate_file_hash(path)
+
+        with history.batch() as batch:
+            batch.log_operation(OperationType.DELETE, path)
+            path.unlink()
+
+        operation = history.get_operations()[0]
+        assert operation.file_hash == expected
+        assert 'fingerprint' in operation.metadata
+
+    def test_replaced_file_not_hashed(self, history, tmp_path):
+        """A file replaced before the flush gets no hash instead of a wrong one."""
+        source = tmp_path / 'a.txt'
+        source.write_bytes(b'first')
+        destination = tmp_path / 'b.txt'
+        other = tmp_path / 'c.txt'
+        other.write_bytes(b'second, longer')
+
+        with history.batch() as batch:
+            batch.log_operation(OperationType.MOVE, source, destination)
+            source.rename(destination)
+            # A later operation overwrites the destination before the flush
+            other.replace(destination)
+
+        operation = history.get_operations()[0]
+        assert operation.file_hash is None
+        assert 'fingerprint' not in operation.metadata
+
+    def test_failed_flush_keeps_operations(self, history, mocker):
+        """Operations stay buffered when writing them fails."""
+        transaction_id = history.start_transaction()
+        batch = history.batch(flush_interval=60)
+        batch.log_operation(OperationType.MOVE, Path('/test/a'), transaction_id=transaction_id)
+        batch.log_operation(OperationType.MOVE, Path('/test/b'), transaction_id=transaction_id)
+
+        mocker.patch.object(history.db, 'transaction', side_effect=sqlite3.OperationalError('locked'))
+        with pytest.raises(sqlite3.OperationalError):
+            batch.flush()
+        mocker.stopall()
+
+        assert batch.flush() == 2
+        assert [op.source_path for op in history.get_operations()] == [Path('/test/b'), Path('/test/a')]
+        assert history.get_transaction(transaction_id).operation_count == 2
+
+    def test_commit_flushes_open_batches(self, history):
+        """Committing or closing writes operations still in a buffer."""
+        transaction_id = history.start_transaction()
+        batch = history.batch(flush_interval=60)
+        batch.log_operation(OperationType.MOVE, Path('/test/path'), transaction_id=transaction_id)
+
+        history.commit_transaction(transaction_id)
+
+        assert history.get_transaction(transaction_id).operation_count == 1
+        assert len(history.get_operations(transaction_id=transaction_id)) == 1
+
+    def test_invalid_batch_size(self, history):
+        """Batch size must be positive."""
+        with pytest.raises(ValueError, match="batch_size"):
+            history.batch(batch_size=0)
+
+
+class TestSearchByPath:
+    """Test suite for indexed path search."""
+
+    @pytest.fixture
+    def history(self, tmp_path):
+        """Create OperationHistory with a few logged moves."""
+        hist = OperationHistory(tmp_path / 'history.db')
+        hist.log_operation(OperationType.MOVE, Path('/in/Report.pdf'), Path('/out/docs/Report.pdf'))
+        hist.log_operation(OperationType.MOVE, Path('/in/photo.jpg'), Path('/out/images/photo.jpg'))
+        hist.log_operation(OperationType.DELETE, Path('/in/report-old.pdf'))
+        yield hist
+        hist.close()
+
+    @pytest.mark.parametrize("has_path_index", [True, False])
+    def test_substring_match(self, history, has_path_index):
+        """Index and scan return the same case-sensitive substring matches."""
+        history.db.has_path_index = has_path_index
+
+        assert [str(op.source_path) for op in history.search_by_path('Report')] == ['/in/Report.pdf']
+        assert [str(op.source_path) for op in history.search_by_path('images/')] == ['/in/photo.jpg']
+        assert len(history.search_by_path('.pdf')) == 2
+        assert len(history.search_by_path('in', limit=1)) == 1
+        assert history.search_by_path('"quoted"') == []
+
+    def test_date_filters_on_integer_timestamps(self, history):
+        """Date filters compare against the stored epoch timestamps."""
+        now = datetime.utcnow()
+        assert len(history.get_operations(start_date=now - timedelta(minutes=1))) == 3
+        assert history.get_operations(end_date=now - timedelta(minutes=1)) == []
+        assert history.get_operations()[0].timestamp.tzinfo is not None
@@ -0,0 +1,153 @@
+"""
+Tests for BackupManager.
+
+Tests that backups avoid copying data where possible, that the SQLite
+manifest survives reopening and imports the legacy JSON manifest, and
+that restore and cleanup work from the manifest.
+"""
+
+import errno
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from file_organizer.services.deduplication import backup as backup_module
+from file_organizer.services.deduplication.backup import BackupManager
+
+
+@pytest.fixture
+def source(tmp_path):
+    """A file to back up."""
+    path = tmp_path / "data" / "report.txt"
+    path.parent.mkdir()
+    path.write_text("original contents")
+    return path
+
+
+class TestCreateBackup:
+    """Test backup placement strategies."""
+
+    def test_auto_links_instead_of_copying(self, tmp_path, source):
+        """Auto mode shares data with the original (reflink or hardlink)."""
+        with BackupManager(tmp_path) as manager:
+            backup_path = manager.create_backup(source)
+            info = manager.get_backup_info(backup_path)
+
+        assert info["method"] in ("reflink", "hardlink")
+        if info["method"] == "hardlink":
+            assert backup_path.stat().st_ino == source.stat().st_ino
+
+        source.unlink()
+        assert backup_path.read_text() == "original contents"
+
+    def test_copy_mode(self, tmp_path, source, mocker):
+        """Copy mode never links."""
+        link = mocker.spy(os, "link")
+        with BackupManager(tmp_path, link_mode="copy") as manager:
+            backup_path = manager.create_backup(source)
+            assert manager.get_backup_info(backup_path)["method"] == "copy"
+
+        link.assert_not_called()
+        assert backup_path.stat().st_ino != source.stat().st_ino
+        assert backup_path.read_text() == "original contents"
+
+    def test_falls_back_to_copy(self, tmp_path, source, mocker):
+        """Unsupported reflinks and cross-device hardlinks fall back to a copy."""
+        mocker.patch.object(backup_module, "reflink_file", return_value=False)
+        mocker.patch.object(
+            backup_module.os, "link", side_effect=OSError(errno.EXDEV, "cross-device")
+        )
+        with BackupManager(tmp_path) as manager:
+            backup_path = manager.create_backup(source)
+            assert manager.get_backup_info(backup_path)["method"] == "copy"
+        assert backup_path.read_text() == "original contents"
+
+    def test_same_name_does_not_collide(self, tmp_path, mocker):
+        """Files with the same name in one timestamp get distinct backups."""
+        fixed = datetime(2024, 1, 1, 12, 0, 0)
+        mocker.patch.object(backup_module, "datetime", wraps=datetime, **{"now.return_value": fixed})
+        paths = []
+        for folder in ("a", "b"):
+            path = tmp_path / folder / "same.txt"
+            path.parent.mkdir()
+            path.write_text(folder)
+            paths.append(path)
+
+        with BackupManager(tmp_path) as manager:
+            backups = [manager.create_backup(p) for p in paths]
+
+        assert backups[0] != backups[1]
+        assert [b.read_text() for b in backups] == ["a", "b"]
+
+    def test_invalid_link_mode(self, tmp_path):
+        """Unknown link modes are rejected."""
+        with pytest.raises(ValueError, match="Invalid link_mode"):
+            BackupManager(tmp_path, link_mode="symlink")
+
+
+class TestManifest:
+    """Test manifest persistence, restore and cleanup."""
+
+    def test_manifest_persists(self, tmp_path, source):
+        """Entries are visible after reopening."""
+        with BackupManager(tmp_path) as manager:
+            backup_path = manager.create_backup(source)
+
+        with BackupManager(tmp_path) as reopened:
+            backups = reopened.list_backups()
+            stats = reopened.get_statistics()
+            issues = reopened.verify_backups()
+
+        assert [b["backup_path"] for b in backups] == [str(backup_path)]
+        assert backups[0]["exists"]
+        assert stats["total_backups"] == 1
+        assert sum(stats["backups_by_method"].values()) == 1
+        assert issues == []
+
+    def test_imports_legacy_manifest(self, tmp_path):
+        """A JSON manifest from older versions is imported once."""
+        backup_dir = tmp_path / BackupManager.BACKUP_DIR_NAME
+        backup_dir.mkdir()
+        old_backup = backup_dir / "old_20240101.txt"
+        old_backup.write_text("old")
+        (backup_dir / "manifest.json").write_text(json.dumps({
+            str(old_backup): {
+                "original_path": str(tmp_path / "old.txt"),
+                "backup_path": str(old_backup),
+                "backup_time": "2024-01-01T00:00:00",
+                "file_size": 3,
+                "original_mtime": "2023-12-31T00:00:00",
+            }
+        }))
+
+        with BackupManager(tmp_path) as manager:
+            info = manager.get_backup_info(old_backup)
+
+        assert info["original_path"] == str(tmp_path / "old.txt")
+        assert not (backup_dir / "manifest.json").exists()
+        assert (backup_dir / "manifest.json.migrated").exists()
+
+    def test_restore_is_independent(self, tmp_path, source):
+        """A restored file does not share data with its backup."""
+        with BackupManager(tmp_path) as manager:
+            backup_path = manager.create_backup(source)
+            source.unlink()
+            restored = manager.restore_backup(backup_path)
+
+        assert restored == source
+        restored.write_text("edited after restore")
+        assert backup_path.read_text() == "original contents"
+
+    def test_cleanup_old_backups(self, tmp_path, source):
+        """Backups older than the cutoff are deleted along with their entries."""
+        with BackupManager(tmp_path) as manager:
+            backup_path = manager.create_backup(source)
+            old_time = (datetime.now() - timedelta(days=40)).isoformat()
+            with manager._conn:
+                manager._conn.execute("UPDATE backups SET backup_time = ?", (old_time,))
+
+            assert manager.cleanup_old_backups(max_age_days=30) == [backup_path]
+            assert manager.list_backups() == []
+        assert not backup_path.exists()
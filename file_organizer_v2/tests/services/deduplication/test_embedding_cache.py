@@ -0,0 +1,159 @@
+"""
+Tests for the embedding cache and its use by DocumentEmbedder.
+
+Tests LRU eviction, persistence across instances, and invalidation when
+the vectorizer is refitted.
+"""
+
+import pickle
+import sqlite3
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from file_organizer.services.deduplication.embedder import DocumentEmbedder
+from file_organizer.services.deduplication.embedding_cache import EmbeddingCache
+
+DOCUMENTS = [
+    "quarterly revenue report for the finance department",
+    "holiday photos from the beach trip with family",
+    "kubernetes deployment guide for container clusters",
+]
+
+
+def _row(values):
+    """1-row CSR matrix from a list."""
+    return sp.csr_matrix(np.array([values], dtype=np.float32))
+
+
+class TestEmbeddingCache:
+    """Test cache storage and eviction."""
+
+    def test_requires_fingerprint(self):
+        """Storing without a fingerprint is refused; lookups miss."""
+        cache = EmbeddingCache()
+        assert cache.get("a") is None
+        with pytest.raises(RuntimeError):
+            cache.put("a", _row([1, 0]))
+
+    def test_persists_and_loads_lazily(self, tmp_path):
+        """Entries survive reopening and are read on demand."""
+        db_path = tmp_path / "cache.db"
+        cache = EmbeddingCache(db_path)
+        cache.set_fingerprint("v1")
+        cache.put("a", _row([0, 1.5, 0]))
+        cache.close()
+
+        reopened = EmbeddingCache(db_path)
+        assert len(reopened._memory) == 0
+        reopened.set_fingerprint("v1")
+        assert reopened.get("a").toarray().tolist() == [[0, 1.5, 0]]
+        reopened.close()
+
+    def test_fingerprint_change_invalidates(self, tmp_path):
+        """Switching fingerprints drops entries from the old one."""
+        cache = EmbeddingCache(tmp_path / "cache.db")
+        cache.set_fingerprint("v1")
+        cache.put("a", _row([1, 0]))
+        cache.set_fingerprint("v2")
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        cache.close()
+
+    def test_lru_eviction(self, tmp_path):
+        """The least recently used entry is evicted first."""
+        cache = EmbeddingCache(tmp_path / "cache.db", max_entries=2, memory_entries=0)
+        cache.set_fingerprint("v1")
+        cache.put("a", _row([1, 0]))
+        cache.put("b", _row([0, 1]))
+        assert cache.get("a") is not None  # touch a
+        cache.put("c", _row([1, 1]))
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        cache.close()
+
+    def test_replaces_legacy_file(self, tmp_path):
+        """An old pickle cache at the same path is replaced."""
+        db_path = tmp_path / "cache.db"
+        db_path.write_bytes(pickle.dumps({"doc": np.zeros(3)}))
+        cache = EmbeddingCache(db_path)
+        cache.set_fingerprint("v1")
+        cache.put("a", _row([1]))
+        assert len(cache) == 1
+        cache.close()
+
+    def test_keeps_unrelated_file(self, tmp_path):
+        """Any other non-SQLite file is left alone and reported."""
+        db_path = tmp_path / "notes.txt"
+        db_path.write_bytes(b"important notes, not a database" * 200)
+
+        with pytest.raises(sqlite3.DatabaseError):
+            EmbeddingCache(db_path)
+        assert db_path.read_bytes().startswith(b"important notes")
+
+    def test_count_tracks_replacements(self, tmp_path):
+        """Replacing entries does not count towards the size limit."""
+        db_path = tmp_path / "cache.db"
+        cache = EmbeddingCache(db_path, max_entries=3, memory_entries=0)
+        cache.set_fingerprint("v1")
+        cache.put_many({"a": _row([1, 0]), "b": _row([0, 1])})
+        cache.put_many({"a": _row([2, 0]), "b": _row([0, 2]), "c": _row([1, 1])})
+        assert len(cache) == 3
+        assert cache.get("a").toarray().tolist() == [[2, 0]]
+        cache.put("d", _row([3, 3]))
+        assert len(cache) == 3
+        cache.close()
+
+        reopened = EmbeddingCache(db_path, max_entries=3)
+        assert len(reopened) == 3
+        reopened.close()
+
+
+class TestEmbedderCaching:
+    """Test DocumentEmbedder integration."""
+
+    def test_transform_uses_cache(self, tmp_path):
+        """Cached and freshly computed embeddings are identical."""
+        embedder = DocumentEmbedder(max_features=50, cache_path=tmp_path / "cache.db")
+        embedder.fit_transform(DOCUMENTS)
+
+        first = embedder.transform_batch(DOCUMENTS)
+        assert len(embedder.embedding_cache) == len(DOCUMENTS)
+        second = embedder.transform_batch(DOCUMENTS)
+
+        np.testing.assert_array_equal(first.toarray(), second.toarray())
+        assert embedder.transform(DOCUMENTS[1]).tolist() == first[1].toarray()[0].tolist()
+        embedder.close()
+
+    def test_refit_invalidates(self, tmp_path):
+        """A refit with a different vocabulary discards cached embeddings."""
+        embedder = DocumentEmbedder(max_features=50, cache_path=tmp_path / "cache.db")
+        embedder.fit_transform(DOCUMENTS)
+        old_fingerprint = embedder.fingerprint()
+        embedder.transform_batch(DOCUMENTS)
+
+        embedder.fit_transform(DOCUMENTS + ["recipe for chocolate cake"])
+
+        assert embedder.fingerprint() != old_fingerprint
+        assert len(embedder.embedding_cache) == 0
+        embedder.close()
+
+    def test_same_fit_keeps_cache(self, tmp_path):
+        """Refitting on the same corpus keeps the fingerprint and the cache."""
+        db_path = tmp_path / "cache.db"
+        embedder = DocumentEmbedder(max_features=50, cache_path=db_path)
+        embedder.fit_transform(DOCUMENTS)
+        embedder.transform_batch(DOCUMENTS)
+        embedder.close()
+
+        again = DocumentEmbedder(max_features=50, cache_path=db_path)
+        again.fit_transform(DOCUMENTS)
+        assert len(again.embedding_cache.get_many(
+            again._hash_document(d) for d in DOCUMENTS
+        )) == len(DOCUMENTS)
+        again.close()
@@ -0,0 +1,101 @@
+"""
+Tests for parallel document extraction and streaming deduplication.
+
+Tests that pooled extraction returns the same text as sequential
+extraction, that slow documents time out without stalling the batch, and
+that the hashing embedding mode finds the same duplicates.
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from file_organizer.services.deduplication.document_dedup import DocumentDeduplicator
+from file_organizer.services.deduplication.extractor import DocumentExtractor
+
+TEXTS = [
+    "quarterly revenue report for the finance department with budget forecasts " * 3,
+    "quarterly revenue report for the finance department with budget forecast " * 3,
+    "holiday photos from the beach trip with family and friends last summer " * 3,
+    "kubernetes deployment guide for container orchestration clusters at scale " * 3,
+    "recipe for chocolate cake with vanilla frosting and fresh strawberries " * 3,
+    "annual maintenance schedule for the office heating and cooling systems " * 3,
+    "holiday photos from the beach trip with family and friends last summer!" * 3,
+    "notes from the architecture review meeting about the storage migration " * 3,
+]
+
+
+class SlowExtractor(DocumentExtractor):
+    """Extractor that hangs on files named slow*.txt."""
+
+    def extract_text(self, file_path: Path) -> str:
+        """Sleep for slow files, otherwise extract normally."""
+        if file_path.name.startswith("slow"):
+            time.sleep(30)
+        return super().extract_text(file_path)
+
+
+@pytest.fixture
+def documents(tmp_path):
+    """Text documents on disk."""
+    paths = []
+    for i, text in enumerate(TEXTS):
+        path = tmp_path / f"doc{i}.txt"
+        path.write_text(text)
+        paths.append(path)
+    return paths
+
+
+class TestParallelExtraction:
+    """Test pooled, streaming extraction."""
+
+    def test_pool_matches_sequential(self, documents):
+        """Pooled extraction returns the same text in input order."""
+        extractor = DocumentExtractor()
+        sequential = extractor.extract_batch(documents, max_workers=1)
+        parallel = extractor.extract_batch(documents, max_workers=2)
+
+        assert list(parallel) == documents
+        assert parallel == sequential
+
+    def test_missing_file_yields_empty(self, documents, tmp_path):
+        """Unreadable files produce empty text instead of an error."""
+        missing = tmp_path / "missing.txt"
+        results = DocumentExtractor().extract_batch(documents + [missing], max_workers=2)
+        assert results[missing] == ""
+
+    def test_timeout_skips_slow_file(self, documents, tmp_path):
+        """A hanging file times out and the rest of the batch completes."""
+        slow = tmp_path / "slow.txt"
+        slow.write_text("never read")
+        paths = [slow] + documents
+
+        started = time.monotonic()
+        results = dict(SlowExtractor().iter_extract(paths, max_workers=2, timeout=1.0))
+
+        assert time.monotonic() - started < 20
+        assert results[slow] == ""
+        assert all(results[p] for p in documents)
+
+
+class TestStreamingDeduplication:
+    """Test DocumentDeduplicator embedding modes."""
+
+    def test_hashing_matches_tfidf(self, documents):
+        """Both embedding modes group the same near-duplicates."""
+        groups = {}
+        for method in ("tfidf", "hashing"):
+            deduper = DocumentDeduplicator(
+                similarity_threshold=0.8, embedding_method=method, max_workers=2
+            )
+            result = deduper.find_duplicates(documents)
+            groups[method] = [sorted(g['files']) for g in result['duplicate_groups']]
+
+        assert groups["hashing"] == groups["tfidf"]
+        assert [str(documents[2]), str(documents[6])] in groups["hashing"]
+
+    def test_invalid_embedding_method(self):
+        """Unknown embedding methods are rejected."""
+        with pytest.raises(ValueError, match="Unsupported embedding method"):
+            DocumentDeduplicator(embedding_method="word2vec")  # type: ignore
@@ -0,0 +1,231 @@
+"""
+Tests for perceptual hash indexes and union-find clustering.
+
+Tests BK-tree range queries and vectorized distances against a brute-force
+reference, and the image clustering built on top of them.
+"""
+
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from file_organizer.services.deduplication.clustering import SimilarityClusters, UnionFind
+from file_organizer.services.deduplication.hash_index import (
+    BKTree,
+    PackedHashes,
+    _POPCOUNT_TABLE,
+    hamming_distance,
+    hex_to_int,
+    popcount64,
+)
+from file_organizer.services.deduplication.image_dedup import ImageDeduplicator
+
+
+def _random_hashes(count: int, seed: int = 0) -> list[int]:
+    """Random 64-bit hashes with some near-duplicates mixed in."""
+    rng = random.Random(seed)
+    base = [rng.getrandbits(64) for _ in range(count // 2)]
+    near = [h ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for h in base]
+    return base + near
+
+
+class TestBKTree:
+    """Test BK-tree range queries."""
+
+    @pytest.mark.parametrize("radius", [0, 2, 5, 10])
+    def test_query_matches_brute_force(self, radius):
+        """Range query returns exactly the brute-force neighbours."""
+        hashes = _random_hashes(400)
+        tree: BKTree[int] = BKTree()
+        for i, h in enumerate(hashes):
+            tree.add(h, i)
+
+        for probe in hashes[:50]:
+            expected = {h for h in set(hashes) if hamming_distance(h, probe) <= radius}
+            found = {h for h, _ in tree.query(probe, radius)}
+            assert found == expected
+
+    def test_identical_hashes_share_node(self):
+        """Items with the same hash share one node."""
+        tree: BKTree[str] = BKTree()
+        assert tree.add(0xFF, "a") is True
+        assert tree.add(0xFF, "b") is False
+        assert len(tree) == 2
+        assert tree.node_count == 1
+        assert sorted(item for item, _ in tree.query_items(0xFF, 0)) == ["a", "b"]
+
+    def test_remove_item(self):
+        """Removed items and emptied hashes are no longer returned."""
+        tree: BKTree[str] = BKTree()
+        tree.add(0xFF, "a")
+        tree.add(0xFF, "b")
+        tree.add(0x0F, "c")
+
+        assert tree.remove(0xFF, "a") is True
+        assert tree.remove(0xFF, "a") is False
+        assert tree.remove(0x0F, "c") is True
+        assert tree.query_items(0xFF, 8) == [("b", 0)]
+        assert 0x0F not in tree
+        assert len(tree) == 1
+
+        # The emptied node is reused rather than duplicated
+        assert tree.add(0x0F, "c") is False
+        assert tree.node_count == 2
+
+    def test_empty_query(self):
+        """Querying an empty tree returns nothing."""
+        assert BKTree().query(0, 64) == []
+
+    def test_hex_to_int_invalid(self):
+        """Invalid hex raises ValueError."""
+        with pytest.raises(ValueError, match="Invalid hash format"):
+            hex_to_int("not-hex")
+
+
+class TestPackedHashes:
+    """Test vectorized Hamming distances."""
+
+    def test_distances_to(self):
+        """One-against-many distances match the scalar computation."""
+        hashes = _random_hashes(200, seed=1)
+        packed = PackedHashes(hashes)
+        probe = hashes[7]
+        expected = [hamming_distance(h, probe) for h in hashes]
+        assert packed.distances_to(probe).tolist() == expected
+
+    def test_from_hex_and_within(self):
+        """Hex input packs to the same values and within() filters by radius."""
+        packed = PackedHashes.from_hex(["0000000000000000", "0000000000000003", "ffffffffffffffff"])
+        assert packed.within(0, 2).tolist() == [0, 1]
+        assert len(packed) == 3
+
+    @pytest.mark.parametrize("block_size", [1, 7, 64, 2048])
+    def test_pairs_match_brute_force(self, block_size):
+        """Tiled all-pairs search finds each pair exactly once."""
+        hashes = _random_hashes(150, seed=2)
+        packed = PackedHashes(hashes)
+        found = set()
+        for rows, cols in packed.iter_pairs_within(6, block_size=block_size):
+            for i, j in zip(rows.tolist(), cols.tolist()):
+                assert i < j
+                assert (i, j) not in found
+                found.add((i, j))
+
+        expected = {
+            (i, j)
+            for i in range(len(hashes))
+            for j in range(i + 1, len(hashes))
+            if hamming_distance(hashes[i], hashes[j]) <= 6
+        }
+        assert found == expected
+
+    def test_lookup_table_popcount(self):
+        """The byte lookup fallback agrees with bit_count."""
+        values = np.array(_random_hashes(64, seed=4), dtype=np.uint64).reshape(8, 8)
+        as_bytes = values.view(np.uint8)
+        counts = _POPCOUNT_TABLE[as_bytes].reshape(values.shape + (8,)).sum(axis=-1)
+        assert counts.tolist() == popcount64(values).tolist()
+        assert counts[0, 0] == int(values[0, 0]).bit_count()
+
+
+class TestUnionFind:
+    """Test the disjoint-set structure."""
+
+    def test_union_and_groups(self):
+        """Unions are transitive and groups keep insertion order."""
+        uf = UnionFind(["a", "b", "c", "d", "e"])
+        uf.union("a", "c")
+        uf.union("c", "e")
+        uf.union("b", "d")
+
+        assert uf.connected("a", "e")
+        assert not uf.connected("a", "b")
+        assert uf.set_size("e") == 3
+        assert uf.groups() == [["a", "c", "e"], ["b", "d"]]
+        assert uf.groups(min_size=3) == [["a", "c", "e"]]
+
+    def test_find_adds_unknown(self):
+        """Finding an unknown item registers it."""
+        uf: UnionFind[int] = UnionFind()
+        assert uf.find(7) == 7
+        assert 7 in uf
+        assert len(uf) == 1
+
+
+class TestSimilarityClusters:
+    """Test union-find with per-cluster aggregates."""
+
+    def test_aggregates_follow_merges(self):
+        """Aggregates are combined when clusters merge."""
+        clusters = SimilarityClusters(["a", "b", "c", "d", "e"])
+        clusters.add_pair("a", "b", 0.9)
+        clusters.add_pair("c", "d", 0.7)
+        clusters.add_pair("b", "c", 0.8)
+        clusters.add_pair("a", "d", 0.6)  # already connected
+
+        (members, stats), = clusters.clusters()
+        assert members == ["a", "b", "c", "d"]
+        assert stats.pair_count == 4
+        assert stats.mean_similarity == pytest.approx(0.75)
+        assert stats.min_similarity == 0.6
+        assert stats.max_similarity == 0.9
+        assert clusters.stats("e") is None
+
+    def test_order_independent(self):
+        """The same pairs in any order give the same clusters."""
+        pairs = [(i, i + 1, 0.9) for i in range(0, 20, 2)] + [(1, 2, 0.95), (7, 18, 0.85)]
+        expected = None
+        for seed in range(5):
+            random.Random(seed).shuffle(pairs)
+            clusters = SimilarityClusters(range(20))
+            clusters.add_pairs(pairs)
+            result = [(m, s.pair_count) for m, s in clusters.clusters()]
+            expected = expected or result
+            assert result == expected
+
+
+class TestImageClustering:
+    """Test ImageDeduplicator clustering on precomputed hashes."""
+
+    @pytest.mark.parametrize("search_method", ["vectorized", "bktree"])
+    def test_cluster_is_transitive(self, search_method):
+        """Chains of near hashes form a single cluster."""
+        deduper = ImageDeduplicator(threshold=1, search_method=search_method)
+        hashes = {
+            Path("a.jpg"): "0000000000000000",
+            Path("b.jpg"): "0000000000000001",
+            Path("c.jpg"): "0000000000000003",
+            Path("d.jpg"): "ffffffffffffffff",
+            Path("e.jpg"): "ffffffffffffffff",
+            Path("f.jpg"): "00000000ffff0000",
+        }
+
+        clusters = deduper._cluster_hashes(hashes)
+
+        assert clusters == [
+            [Path("a.jpg"), Path("b.jpg"), Path("c.jpg")],
+            [Path("d.jpg"), Path("e.jpg")],
+        ]
+
+    @pytest.mark.parametrize("search_method", ["vectorized", "bktree"])
+    def test_cluster_matches_brute_force(self, search_method):
+        """Clusters equal connected components of the brute-force graph."""
+        deduper = ImageDeduplicator(threshold=4, search_method=search_method, block_size=64)
+        values = _random_hashes(300, seed=3)
+        hashes = {Path(f"{i}.jpg"): f"{h:016x}" for i, h in enumerate(values)}
+        paths = list(hashes)
+
+        reference: UnionFind[Path] = UnionFind(paths)
+        for i, p in enumerate(paths):
+            for q in paths[i + 1:]:
+                if deduper.compute_hamming_distance(hashes[p], hashes[q]) <= 4:
+                    reference.union(p, q)
+
+        assert deduper._cluster_hashes(hashes) == reference.groups(min_size=2)
+
+    def test_invalid_search_method(self):
+        """Unknown search methods are rejected."""
+        with pytest.raises(ValueError, match="Unsupported search method"):
+            ImageDeduplicator(search_method="quadratic")  # type: ignore
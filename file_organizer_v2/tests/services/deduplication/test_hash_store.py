@@ -0,0 +1,162 @@
+"""
+Tests for PerceptualHashStore.
+
+Tests fingerprint-based reuse, near-duplicate search and integration with
+ImageDeduplicator.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from file_organizer.services.deduplication.hash_store import PerceptualHashStore
+from file_organizer.services.deduplication.image_dedup import ImageDeduplicator
+
+
+def _make_image(path: Path, seed: int) -> Path:
+    """Write a random smooth image to ``path``."""
+    rng = np.random.default_rng(seed)
+    small = (rng.random((12, 16, 3)) * 255).astype("uint8")
+    Image.fromarray(small).resize((64, 48), Image.BICUBIC).save(path)
+    return path
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Hash store in a temporary directory."""
+    with PerceptualHashStore(tmp_path / "hashes.db") as s:
+        yield s
+
+
+class TestPerceptualHashStore:
+    """Test the persistent store on its own."""
+
+    def test_lookup_reuses_fresh_entries(self, store, tmp_path):
+        """Unchanged files hit the store; unknown files miss."""
+        a = tmp_path / "a.png"
+        a.write_bytes(b"x")
+        b = tmp_path / "b.png"
+        b.write_bytes(b"y")
+        store.put(a, "00000000000000ff", "phash")
+
+        cached, missing = store.lookup([a, b], "phash")
+        assert cached == {a: "00000000000000ff"}
+        assert missing == [b]
+        assert store.get(a, "dhash") is None
+
+    def test_changed_file_invalidated(self, store, tmp_path):
+        """A changed fingerprint makes the stored hash stale."""
+        a = tmp_path / "a.png"
+        a.write_bytes(b"x")
+        store.put(a, "00000000000000ff", "phash")
+
+        a.write_bytes(b"longer content")
+        assert store.get(a, "phash") is None
+
+    def test_persists_across_instances(self, tmp_path):
+        """Hashes survive reopening the database."""
+        a = tmp_path / "a.png"
+        a.write_bytes(b"x")
+        with PerceptualHashStore(tmp_path / "h.db") as first:
+            first.put(a, "0f", "phash")
+        with PerceptualHashStore(tmp_path / "h.db") as second:
+            assert second.get(a, "phash") == "0f"
+            assert second.count() == 1
+
+    def test_find_similar(self, store, tmp_path):
+        """Search returns entries within the threshold, closest first."""
+        paths = []
+        for i, h in enumerate(["0000000000000000", "0000000000000003", "ffffffffffffffff"]):
+            p = tmp_path / f"{i}.png"
+            p.write_bytes(bytes([i]))
+            store.put(p, h, "phash")
+            paths.append(p)
+
+        assert sorted(store.find_similar("0000000000000001", "phash", 2)) == [
+            (paths[0], 1),
+            (paths[1], 1),
+        ]
+        assert store.find_similar("0000000000000000", "phash", 0) == [(paths[0], 0)]
+
+    def test_updated_and_removed_entries_leave_index(self, store, tmp_path):
+        """Superseded or removed hashes are no longer returned."""
+        a = tmp_path / "a.png"
+        a.write_bytes(b"x")
+        store.put(a, "0000000000000000", "phash")
+        assert store.find_similar("0000000000000000", "phash", 0) == [(a, 0)]
+
+        store.put(a, "ffffffffffffffff", "phash")
+        store.put(a, "ffffffffffffffff", "phash")
+        assert store.find_similar("0000000000000000", "phash", 0) == []
+        assert store.find_similar("ffffffffffffffff", "phash", 0) == [(a, 0)]
+
+        assert store.remove([a]) == 1
+        assert store.find_similar("ffffffffffffffff", "phash", 0) == []
+
+    def test_hash_flipping_back_is_listed_once(self, store, tmp_path):
+        """A path whose hash changes and changes back appears once."""
+        a = tmp_path / "a.png"
+        a.write_bytes(b"x")
+        for h in ["0000000000000000", "ffffffffffffffff", "0000000000000000"]:
+            store.put(a, h, "phash")
+
+        assert store.find_similar("0000000000000000", "phash", 0) == [(a, 0)]
+        assert len(store._trees["phash"]) == 1
+
+    def test_remove_then_put_is_listed_once(self, store, tmp_path):
+        """Re-adding a removed path does not duplicate it."""
+        a = tmp_path / "a.png"
+        a.write_bytes(b"x")
+        store.put(a, "0000000000000000", "phash")
+        store.put(a, "0000000000000001", "phash")
+        store.put(a, "0000000000000000", "phash")
+        store.remove([a])
+        store.put(a, "0000000000000000", "phash")
+
+        assert store.find_similar("0000000000000000", "phash", 1) == [(a, 0)]
+        assert len(store._trees["phash"]) == 1
+
+
+class TestDeduplicatorWithStore:
+    """Test ImageDeduplicator using a hash store."""
+
+    def test_second_run_uses_store(self, store, tmp_path, monkeypatch):
+        """Images hashed once are not decoded again."""
+        paths = [_make_image(tmp_path / f"{i}.png", i) for i in range(3)]
+        deduper = ImageDeduplicator(max_workers=1, hash_store=store)
+        first = deduper.batch_compute_hashes(paths)
+        assert store.count("phash") == 3
+
+        def fail(*args, **kwargs):
+            raise AssertionError("image decoded again")
+
+        monkeypatch.setattr(
+            "file_organizer.services.deduplication.image_dedup.ParallelImageHasher.hash_images",
+            lambda self, paths, cb=None: {} if not paths else fail(),
+        )
+        assert deduper.batch_compute_hashes(paths) == first
+
+    def test_find_near_duplicates(self, store, tmp_path):
+        """New images are matched against the stored library."""
+        library = [_make_image(tmp_path / f"lib{i}.png", i) for i in range(3)]
+        deduper = ImageDeduplicator(threshold=4, max_workers=1, hash_store=store)
+        deduper.batch_compute_hashes(library)
+
+        copy = tmp_path / "new_copy.png"
+        copy.write_bytes(library[1].read_bytes())
+        os.utime(copy, ns=(1, 1))
+
+        matches = deduper.find_near_duplicates(copy)
+        assert matches[0] == (library[1], 0)
+        assert store.get(copy, "phash") is not None
+
+        fresh = _make_image(tmp_path / "fresh.png", 99)
+        assert library[1] not in [p for p, _ in deduper.find_near_duplicates(fresh)]
+
+    def test_find_near_duplicates_requires_store(self, tmp_path):
+        """Without a store the watch API is unavailable."""
+        with pytest.raises(ValueError, match="hash_store"):
+            ImageDeduplicator().find_near_duplicates(tmp_path / "x.png")
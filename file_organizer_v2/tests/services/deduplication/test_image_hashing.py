@@ -0,0 +1,150 @@
+"""
+Tests for the parallel perceptual hashing engine.
+
+Tests decode-time downscaling, multi-hash single decode and agreement
+with imagededup's own encoder.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from imagededup.methods import PHash
+from PIL import Image
+
+from file_organizer.services.deduplication.hash_index import hamming_distance, hex_to_int
+from file_organizer.services.deduplication.image_dedup import ImageDeduplicator
+from file_organizer.services.deduplication.image_hashing import (
+    ParallelImageHasher,
+    compute_image_hashes,
+    load_downscaled,
+)
+
+
+def _make_image(path: Path, seed: int, size: tuple[int, int] = (64, 48)) -> Path:
+    """Write a random smooth image to ``path``."""
+    rng = np.random.default_rng(seed)
+    small = (rng.random((12, 16, 3)) * 255).astype("uint8")
+    Image.fromarray(small).resize(size, Image.BICUBIC).save(path)
+    return path
+
+
+class TestLoadDownscaled:
+    """Test reduced-resolution decoding."""
+
+    def test_jpeg_draft_reduces_size(self, tmp_path):
+        """Large JPEGs are decoded at a fraction of full size."""
+        path = _make_image(tmp_path / "big.jpg", 0, size=(2048, 1536))
+        img = load_downscaled(path, (128, 128))
+        assert img.mode == "RGB"
+        assert 128 <= img.width < 2048
+        assert img.height >= 128
+
+    def test_png_reduce(self, tmp_path):
+        """Non-JPEG images are box-reduced but stay above the minimum size."""
+        path = _make_image(tmp_path / "big.png", 1, size=(1000, 800))
+        img = load_downscaled(path, (128, 128))
+        assert img.size == (167, 134)  # factor 6, rounded up
+
+    def test_alpha_converted(self, tmp_path):
+        """Images with alpha are converted to RGB."""
+        path = tmp_path / "alpha.png"
+        Image.new("RGBA", (40, 40), (10, 20, 30, 128)).save(path)
+        assert load_downscaled(path, (8, 8)).mode == "RGB"
+
+    @pytest.mark.parametrize("mode", ["P", "1", "I;16", "L"])
+    def test_reduce_other_modes(self, tmp_path, mode):
+        """Palette, 1-bit, 16-bit and grayscale PNGs are reduced as RGB."""
+        path = tmp_path / f"{mode.replace(';', '')}.png"
+        Image.open(_make_image(tmp_path / "src.png", 5, size=(400, 300))).convert(mode).save(path)
+        img = load_downscaled(path, (64, 64))
+        assert img.mode == "RGB"
+        assert img.size == (100, 75)
+
+    def test_gif(self, tmp_path):
+        """GIFs (palette mode) are decoded and reduced."""
+        path = tmp_path / "anim.gif"
+        Image.open(_make_image(tmp_path / "src.png", 6, size=(400, 300))).save(path)
+        img = load_downscaled(path, (64, 64))
+        assert img.mode == "RGB"
+        assert img.size == (100, 75)
+
+
+class TestComputeImageHashes:
+    """Test single-decode hashing."""
+
+    def test_multiple_methods(self, tmp_path):
+        """All requested methods are computed."""
+        path = _make_image(tmp_path / "a.png", 2)
+        hashes = compute_image_hashes(path, ("phash", "dhash", "ahash"))
+        assert set(hashes) == {"phash", "dhash", "ahash"}
+        assert all(len(h) == 16 for h in hashes.values())
+
+    def test_matches_imagededup(self, tmp_path):
+        """Small images hash exactly as imagededup's encoder does."""
+        path = _make_image(tmp_path / "a.png", 3)
+        expected = PHash(verbose=False).encode_image(str(path))
+        assert compute_image_hashes(path, ("phash",))["phash"] == expected
+
+    def test_downscaled_jpeg_close_to_imagededup(self, tmp_path):
+        """Draft decoding stays within a couple of bits of full decoding."""
+        path = _make_image(tmp_path / "big.jpg", 4, size=(2400, 1600))
+        expected = PHash(verbose=False).encode_image(str(path))
+        actual = compute_image_hashes(path, ("phash",))["phash"]
+        assert hamming_distance(hex_to_int(expected), hex_to_int(actual)) <= 2
+
+    @pytest.mark.parametrize("suffix, mode", [(".gif", "P"), (".png", "P"), (".png", "1")])
+    def test_palette_and_bilevel_images_hash(self, tmp_path, suffix, mode):
+        """Large GIFs, palette PNGs and 1-bit PNGs produce hashes."""
+        path = tmp_path / f"img{suffix}"
+        Image.open(_make_image(tmp_path / "src.png", 7, size=(800, 600))).convert(mode).save(path)
+        hashes = compute_image_hashes(path, ("phash", "dhash"))
+        assert hashes is not None
+        assert set(hashes) == {"phash", "dhash"}
+
+    def test_unreadable_returns_none(self, tmp_path):
+        """Corrupt files yield None instead of raising."""
+        path = tmp_path / "bad.jpg"
+        path.write_bytes(b"not an image")
+        assert compute_image_hashes(path) is None
+
+
+class TestParallelImageHasher:
+    """Test process-pool hashing."""
+
+    def test_pool_matches_in_process(self, tmp_path):
+        """Pooled and in-process hashing agree and keep input order."""
+        paths = [_make_image(tmp_path / f"{i}.png", i) for i in range(20)]
+        paths.append(tmp_path / "missing.png")
+
+        serial = ParallelImageHasher(("phash", "ahash"), max_workers=1)
+        pooled = ParallelImageHasher(("phash", "ahash"), max_workers=2, chunksize=4)
+
+        serial_results = list(serial.iter_hashes(paths))
+        pooled_results = list(pooled.iter_hashes(paths))
+        assert serial_results == pooled_results
+        assert [p for p, _ in pooled_results] == paths
+        assert pooled_results[-1][1] is None
+        assert len(pooled.hash_images(paths)) == 20
+
+    def test_progress_callback(self, tmp_path):
+        """Progress is reported once per file."""
+        paths = [_make_image(tmp_path / f"{i}.png", i) for i in range(3)]
+        calls = []
+        ParallelImageHasher(max_workers=1).hash_images(paths, lambda c, t: calls.append((c, t)))
+        assert calls == [(1, 3), (2, 3), (3, 3)]
+
+    def test_invalid_method(self):
+        """Unknown methods are rejected."""
+        with pytest.raises(ValueError, match="Unsupported hash method"):
+            ParallelImageHasher(("md5",))
+
+    def test_deduplicator_batch(self, tmp_path):
+        """ImageDeduplicator batch hashing agrees with single-image hashing."""
+        paths = [_make_image(tmp_path / f"{i}.png", i) for i in range(4)]
+        paths.append(tmp_path / "notes.txt")
+        deduper = ImageDeduplicator(max_workers=1)
+
+        batch = deduper.batch_compute_hashes(paths)
+        assert list(batch) == paths[:4]
+        assert batch[paths[0]] == deduper.get_image_hash(paths[0])
@@ -0,0 +1,134 @@
+"""
+Tests for header-only image metadata probing.
+
+Tests that the header parsers agree with Pillow for each supported
+format, that results are cached per file fingerprint, and that the
+helpers built on the probe never decode pixel data.
+"""
+
+import os
+
+import pytest
+from PIL import Image
+
+from file_organizer.services.deduplication import image_utils
+from file_organizer.services.deduplication.image_utils import (
+    clear_probe_cache,
+    get_best_quality_image,
+    get_image_dimensions,
+    get_image_format,
+    probe_image,
+    validate_image_file,
+)
+
+CASES = [
+    ("rgb.jpg", "RGB", {}),
+    ("gray.jpg", "L", {}),
+    ("progressive.jpg", "RGB", {"progressive": True}),
+    ("cmyk.jpg", "CMYK", {}),
+    ("rgb.png", "RGB", {}),
+    ("rgba.png", "RGBA", {}),
+    ("gray.png", "L", {}),
+    ("bilevel.png", "1", {}),
+    ("palette.png", "P", {}),
+    ("palette.gif", "P", {}),
+    ("lossy.webp", "RGB", {}),
+    ("alpha.webp", "RGBA", {}),
+    ("lossless.webp", "RGB", {"lossless": True}),
+    ("rgb.tiff", "RGB", {}),
+    ("rgba.tif", "RGBA", {}),
+    ("gray.tiff", "L", {}),
+    ("rgb.bmp", "RGB", {}),
+]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    """Each test starts with an empty probe cache."""
+    clear_probe_cache()
+    yield
+    clear_probe_cache()
+
+
+@pytest.mark.parametrize("name,mode,options", CASES)
+def test_probe_matches_pillow(tmp_path, name, mode, options):
+    """Header parsing agrees with Pillow on format, size and mode."""
+    path = tmp_path / name
+    Image.new(mode, (123, 45)).save(path, **options)
+
+    metadata = probe_image(path)
+
+    with Image.open(path) as img:
+        assert metadata.format == img.format
+        assert (metadata.width, metadata.height) == img.size
+        assert metadata.mode == img.mode
+        assert metadata.has_transparency == (
+            img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+        )
+    assert metadata.size_bytes == path.stat().st_size
+
+
+class TestProbe:
+    """Test probe caching and fallbacks."""
+
+    def test_transparency_chunks(self, tmp_path):
+        """PNG tRNS and GIF transparent colors are detected."""
+        png = tmp_path / "trns.png"
+        Image.new("RGB", (8, 8)).save(png, transparency=(0, 0, 0))
+        gif = tmp_path / "trns.gif"
+        Image.new("P", (8, 8)).save(gif, transparency=0)
+
+        assert probe_image(png).has_transparency
+        assert probe_image(gif).has_transparency
+
+    def test_cached_until_file_changes(self, tmp_path, mocker):
+        """Repeated probes reuse the record until size or mtime change."""
+        path = tmp_path / "img.png"
+        Image.new("RGB", (10, 10)).save(path)
+        spy = mocker.spy(image_utils, "_parse_header")
+
+        first = probe_image(path)
+        assert get_image_dimensions(path) == (10, 10)
+        assert get_image_format(path) == "PNG"
+        assert validate_image_file(path) == (True, None)
+        assert spy.call_count == 1
+        assert probe_image(path) is first
+
+        Image.new("RGB", (20, 10)).save(path)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert get_image_dimensions(path) == (20, 10)
+        assert spy.call_count == 2
+
+    def test_does_not_decode(self, tmp_path, mocker):
+        """Helpers never load pixel data."""
+        paths = []
+        for name, size in [("a.jpg", (30, 30)), ("b.png", (60, 40))]:
+            path = tmp_path / name
+            Image.new("RGB", size).save(path)
+            paths.append(path)
+        load = mocker.patch.object(Image.Image, "load")
+
+        assert get_best_quality_image(paths) == paths[1]
+        load.assert_not_called()
+
+    def test_unrecognized_file(self, tmp_path):
+        """Non-image files and missing files are rejected."""
+        bogus = tmp_path / "bogus.jpg"
+        bogus.write_bytes(b"not an image at all")
+
+        assert probe_image(bogus) is None
+        assert probe_image(tmp_path / "missing.png") is None
+        valid, error = validate_image_file(bogus)
+        assert not valid
+        assert "Cannot read image" in error
+
+    def test_truncated_data_needs_verify(self, tmp_path):
+        """A valid header passes by default; verify=True checks the data."""
+        path = tmp_path / "truncated.png"
+        Image.effect_noise((64, 64), 50).convert("RGB").save(path)
+        path.write_bytes(path.read_bytes()[:200])
+
+        assert validate_image_file(path) == (True, None)
+        valid, _ = validate_image_file(path, verify=True)
+        assert not valid
@@ -0,0 +1,254 @@
+"""
+Tests for DuplicateIndex.
+
+Tests compact in-memory records, O(1) statistics counters and the
+SQLite-backed on-disk mode.
+"""
+
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from file_organizer.services.deduplication.detector import DuplicateDetector
+from file_organizer.services.deduplication.index import DuplicateIndex, FileMetadata
+
+
+def _meta(size: int, mtime_ns: int = 1_000_000_000) -> dict:
+    return {"size": size, "mtime_ns": mtime_ns, "atime_ns": mtime_ns}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def index(request, tmp_path):
+    """Index in each storage mode."""
+    if request.param == "memory":
+        idx = DuplicateIndex()
+    else:
+        idx = DuplicateIndex(db_path=tmp_path / "index.db", batch_size=2)
+    yield idx
+    idx.close()
+
+
+class TestFileMetadata:
+    """Test the compact metadata record."""
+
+    def test_slots_no_dict(self):
+        """Records use __slots__ and carry no per-instance dict."""
+        meta = FileMetadata(Path("/a/b.txt"), 10, 0, 0, "h")
+        assert not hasattr(meta, "__dict__")
+
+    def test_directory_interned(self):
+        """Files in the same directory share the directory string."""
+        a = FileMetadata("/photos/2024/a.jpg", 1, 0, 0, "h1")
+        b = FileMetadata("/photos/2024/" + "b.jpg", 1, 0, 0, "h2")
+        assert a._dir is b._dir
+
+    def test_datetime_roundtrip(self):
+        """Datetime inputs are exposed back as datetimes."""
+        when = datetime(2024, 5, 1, 12, 30, 0)
+        meta = FileMetadata(Path("/x/y"), 5, when, when, "h")
+        assert meta.path == Path("/x/y")
+        assert meta.modified_time == when
+        assert meta.accessed_time == when
+
+
+class TestDuplicateIndex:
+    """Test index behaviour in both storage modes."""
+
+    def test_statistics_counters(self, index):
+        """Counters match the groups added."""
+        index.add_file(Path("/d/a"), "h1", _meta(100))
+        index.add_file(Path("/d/b"), "h1", _meta(100))
+        index.add_file(Path("/d/c"), "h1", _meta(100))
+        index.add_file(Path("/d/d"), "h2", _meta(50))
+        index.add_file(Path("/d/e"), "h2", _meta(50))
+        index.add_file(Path("/d/f"), "h3", _meta(10))
+
+        stats = index.get_statistics()
+        assert len(index) == 6
+        assert stats["total_files"] == 6
+        assert stats["unique_files"] == 3
+        assert stats["duplicate_files"] == 5
+        assert stats["duplicate_groups"] == 2
+        assert stats["wasted_space"] == 250
+        assert stats["largest_group"] == 3
+        assert index.has_duplicates()
+
+    def test_statistics_match_groups(self, index):
+        """Counter-based statistics agree with materialized groups."""
+        for i in range(7):
+            index.add_file(Path(f"/d/{i}"), f"h{i % 3}", _meta(10 * (i % 3 + 1)))
+
+        groups = index.get_duplicates()
+        stats = index.get_statistics()
+        assert stats["duplicate_groups"] == len(groups)
+        assert stats["wasted_space"] == sum(g.wasted_space for g in groups.values())
+        assert stats["duplicate_files"] == sum(g.count for g in groups.values())
+
+    def test_lookups(self, index):
+        """Hash and size lookups return added files in insertion order."""
+        index.add_file(Path("/d/a"), "h1", _meta(100, 5))
+        index.add_file(Path("/d/b"), "h1", _meta(100, 6))
+
+        files = index.get_files_by_hash("h1")
+        assert [f.path for f in files] == [Path("/d/a"), Path("/d/b")]
+        assert files[1].mtime_ns == 6
+        assert index.get_files_by_size(100) == [Path("/d/a"), Path("/d/b")]
+        assert "h1" in index
+        assert "missing" not in index
+
+    def test_clear(self, index):
+        """Clearing resets data and counters."""
+        index.add_file(Path("/d/a"), "h1", _meta(1))
+        index.add_file(Path("/d/b"), "h1", _meta(1))
+        index.clear()
+
+        assert len(index) == 0
+        assert not index.has_duplicates()
+        assert index.get_duplicates() == {}
+
+    def test_stat_reused(self, tmp_path):
+        """A provided stat result is used instead of calling stat again."""
+        file_path = tmp_path / "f.txt"
+        file_path.write_text("abc")
+        stat = file_path.stat()
+        file_path.unlink()
+
+        index = DuplicateIndex()
+        index.add_file(file_path, "h", {"stat": stat})
+        assert index.get_files_by_hash("h")[0].mtime_ns == stat.st_mtime_ns
+
+
+    def test_size_index_shares_records(self):
+        """The size index reuses the hash index's records."""
+        idx = DuplicateIndex()
+        idx.add_file(Path("/d/a"), "h1", _meta(100))
+        idx.add_file(Path("/d/b"), "h2", _meta(100))
+
+        assert idx.get_files_by_size(100) == [Path("/d/a"), Path("/d/b")]
+        assert idx._size_index[100][0] is idx.get_files_by_hash("h1")[0]
+
+
+class TestSQLiteDuplicateIndex:
+    """Test SQLite-specific behaviour."""
+
+    def test_reopen_restores_counters(self, tmp_path):
+        """Reopening an on-disk index restores statistics."""
+        db_path = tmp_path / "index.db"
+        with DuplicateIndex(db_path=db_path) as index:
+            index.add_file(Path("/d/a"), "h1", _meta(100))
+            index.add_file(Path("/d/b"), "h1", _meta(100))
+            index.add_file(Path("/d/c"), "h2", _meta(7))
+            expected = index.get_statistics()
+
+        with DuplicateIndex(db_path=db_path) as reopened:
+            assert reopened.on_disk
+            assert reopened.get_statistics() == expected
+            reopened.add_file(Path("/d/d"), "h1", _meta(100))
+            assert reopened.get_statistics()["largest_group"] == 3
+            assert len(reopened.get_files_by_hash("h1")) == 3
+
+    def test_upgrades_old_database(self, tmp_path):
+        """A database without inode columns is upgraded and indexed by inode."""
+        db_path = tmp_path / "index.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript(
+            """
+            CREATE TABLE files (
+                id INTEGER PRIMARY KEY, path TEXT NOT NULL, size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL, atime_ns INTEGER NOT NULL, hash TEXT NOT NULL
+            );
+            CREATE TABLE hash_groups (
+                hash TEXT PRIMARY KEY, count INTEGER NOT NULL, size INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            INSERT INTO files (path, size, mtime_ns, atime_ns, hash)
+                VALUES ('/d/a', 100, 1, 1, 'h1'), ('/d/b', 100, 1, 1, 'h1');
+            INSERT INTO hash_groups VALUES ('h1', 2, 100);
+            """
+        )
+        conn.close()
+
+        with DuplicateIndex(db_path=db_path) as index:
+            assert index.get_statistics()["wasted_space"] == 100
+            plan = index._conn.execute(
+                "EXPLAIN QUERY PLAN SELECT hash FROM files WHERE device = 1 AND inode = 2"
+            ).fetchall()
+
+        assert any("idx_files_inode" in row[-1] for row in plan)
+
+    def test_use_after_close_raises(self, tmp_path):
+        """A closed on-disk index refuses use instead of falling back to memory."""
+        index = DuplicateIndex(db_path=tmp_path / "index.db")
+        index.add_file(Path("/d/a"), "h1", _meta(100))
+        index.close()
+        index.close()
+
+        assert index.on_disk
+        with pytest.raises(RuntimeError, match="closed"):
+            index.add_file(Path("/d/b"), "h1", _meta(100))
+        with pytest.raises(RuntimeError, match="closed"):
+            index.get_statistics()
+        with pytest.raises(RuntimeError, match="closed"):
+            index.get_files_by_hash("h1")
+
+    def test_detector_with_disk_index(self, tmp_path):
+        """DuplicateDetector keeps a caller-supplied empty on-disk index."""
+        data = tmp_path / "data"
+        data.mkdir()
+        (data / "a.txt").write_text("same")
+        (data / "b.txt").write_text("same")
+        (data / "c.txt").write_text("different")
+
+        index = DuplicateIndex(db_path=tmp_path / "index.db")
+        detector = DuplicateDetector(index=index)
+        assert detector.index is index
+
+        detector.scan_directory(data)
+        groups = detector.get_duplicate_groups()
+        assert len(groups) == 1
+        group = next(iter(groups.values()))
+        assert sorted(f.path.name for f in group.files) == ["a.txt", "b.txt"]
+        index.close()
+
+
+class TestHardlinkAccounting:
+    """Test inode-aware duplicate statistics."""
+
+    @staticmethod
+    def _linked(size: int, inode: int, nlink: int = 2) -> dict:
+        return {**_meta(size), "inode": inode, "device": 1, "nlink": nlink}
+
+    def test_links_are_not_copies(self, index):
+        """Extra links join the group but add no wasted space."""
+        index.add_file(Path("/d/a"), "h1", self._linked(100, inode=1))
+        index.add_file(Path("/d/a_link"), "h1", self._linked(100, inode=1))
+        assert index.get_duplicates() == {}
+        assert not index.has_duplicates()
+
+        index.add_file(Path("/d/b"), "h1", self._linked(100, inode=2, nlink=1))
+        stats = index.get_statistics()
+        assert stats["duplicate_groups"] == 1
+        assert stats["duplicate_files"] == 3
+        assert stats["wasted_space"] == 100
+        assert stats["hardlinked_files"] == 1
+
+        group = index.get_duplicates()["h1"]
+        assert group.count == 3
+        assert group.copies == 2
+        assert group.wasted_space == stats["wasted_space"]
+
+    def test_reopened_index_keeps_links(self, tmp_path):
+        """On-disk counters and links survive reopening."""
+        db_path = tmp_path / "index.db"
+        with DuplicateIndex(db_path=db_path) as index:
+            index.add_file(Path("/d/a"), "h1", self._linked(100, inode=1))
+            index.add_file(Path("/d/b"), "h1", self._linked(100, inode=2, nlink=1))
+            expected = index.get_statistics()
+
+        with DuplicateIndex(db_path=db_path) as reopened:
+            assert reopened.get_statistics() == expected
+            reopened.add_file(Path("/d/a_link"), "h1", self._linked(100, inode=1))
+            stats = reopened.get_statistics()
+            assert stats["wasted_space"] == 100
+            assert stats["hardlinked_files"] == 1
@@ -0,0 +1,92 @@
+"""
+Tests for hardlink-aware duplicate detection and link replacement.
+
+Tests that the detector hashes each inode once and reports exact
+reclaimable space, and that duplicates can be replaced with links.
+"""
+
+import os
+
+import pytest
+
+from file_organizer.services.deduplication.detector import DuplicateDetector
+from file_organizer.services.deduplication.linking import replace_with_link, same_file
+
+
+@pytest.fixture
+def linked_tree(tmp_path):
+    """Two copies of one file, one of which has a second hardlink."""
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.bin").write_bytes(b"x" * 1000)
+    os.link(data / "a.bin", data / "a_link.bin")
+    (data / "b.bin").write_bytes(b"x" * 1000)
+    return data
+
+
+class TestInodeAwareDetection:
+    """Test DuplicateDetector with hardlinks."""
+
+    def test_hashes_each_inode_once(self, linked_tree, mocker):
+        """Links share one hash computation and count as one copy."""
+        detector = DuplicateDetector()
+        spy = mocker.spy(detector.hasher, "compute_hash")
+        detector.scan_directory(linked_tree)
+
+        assert spy.call_count == 2
+        groups = detector.get_duplicate_groups()
+        assert len(groups) == 1
+        group = next(iter(groups.values()))
+        assert group.count == 3
+        assert group.copies == 2
+        assert group.wasted_space == 1000
+        assert detector.get_statistics()["wasted_space"] == 1000
+
+    def test_only_links_is_not_a_duplicate(self, tmp_path, mocker):
+        """Paths that are all links to one file are not hashed or reported."""
+        (tmp_path / "a.bin").write_bytes(b"y" * 10)
+        os.link(tmp_path / "a.bin", tmp_path / "b.bin")
+
+        detector = DuplicateDetector()
+        spy = mocker.spy(detector.hasher, "compute_hash")
+        detector.scan_directory(tmp_path)
+
+        spy.assert_not_called()
+        assert detector.get_duplicate_groups() == {}
+
+
+class TestReplaceWithLink:
+    """Test replacing duplicates with links."""
+
+    def test_hardlink(self, linked_tree):
+        """The duplicate becomes a hardlink to the kept file."""
+        replace_with_link(linked_tree / "b.bin", linked_tree / "a.bin")
+
+        assert same_file(linked_tree / "b.bin", linked_tree / "a.bin")
+        assert (linked_tree / "b.bin").read_bytes() == b"x" * 1000
+        assert sorted(p.name for p in linked_tree.iterdir()) == ["a.bin", "a_link.bin", "b.bin"]
+
+        detector = DuplicateDetector()
+        detector.scan_directory(linked_tree)
+        assert detector.get_duplicate_groups() == {}
+
+    def test_already_linked(self, linked_tree):
+        """Linking a file to itself is refused."""
+        with pytest.raises(ValueError, match="already a link"):
+            replace_with_link(linked_tree / "a_link.bin", linked_tree / "a.bin")
+
+    def test_failed_link_keeps_duplicate(self, linked_tree, mocker):
+        """If the link cannot be made, the duplicate is left untouched."""
+        mocker.patch(
+            "file_organizer.services.deduplication.linking.reflink_file", return_value=False
+        )
+        with pytest.raises(OSError):
+            replace_with_link(linked_tree / "b.bin", linked_tree / "a.bin", method="reflink")
+
+        assert not same_file(linked_tree / "b.bin", linked_tree / "a.bin")
+        assert sorted(p.name for p in linked_tree.iterdir()) == ["a.bin", "a_link.bin", "b.bin"]
+
+    def test_invalid_method(self, linked_tree):
+        """Unknown methods are rejected."""
+        with pytest.raises(ValueError, match="Invalid link method"):
+            replace_with_link(linked_tree / "b.bin", linked_tree / "a.bin", method="symlink")
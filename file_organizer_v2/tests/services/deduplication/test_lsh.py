@@ -0,0 +1,191 @@
+"""
+Tests for the random-projection LSH index.
+
+Tests that candidate generation finds near-duplicate pairs, that exact
+scores match full cosine similarity, and that an on-disk index can be
+reopened and extended incrementally.
+"""
+
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from file_organizer.services.deduplication.lsh import CosineLSHIndex
+from file_organizer.services.deduplication.semantic import SemanticAnalyzer, normalize_rows
+
+
+def _near_duplicate_matrix(n_groups: int = 40, n_features: int = 300, seed: int = 0):
+    """Sparse matrix of groups of 3 highly similar rows each."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n_groups):
+        base = sp.random(1, n_features, density=0.1, random_state=rng, dtype=np.float32)
+        for _ in range(3):
+            noise = sp.random(1, n_features, density=0.01, random_state=rng, dtype=np.float32)
+            rows.append(base + 0.05 * noise)
+    return sp.vstack(rows).tocsr()
+
+
+def _exact_pairs(matrix, threshold: float) -> dict:
+    """Brute-force pairs above threshold."""
+    normalized = normalize_rows(matrix).toarray()
+    sims = normalized @ normalized.T
+    n = sims.shape[0]
+    return {
+        (i, j): sims[i, j]
+        for i in range(n)
+        for j in range(i + 1, n)
+        if sims[i, j] >= threshold
+    }
+
+
+class TestCosineLSHIndex:
+    """Test index construction, matching and persistence."""
+
+    def test_finds_near_duplicates(self):
+        """High-similarity pairs are found with exact scores."""
+        matrix = _near_duplicate_matrix()
+        keys = [str(i) for i in range(matrix.shape[0])]
+        expected = _exact_pairs(matrix, 0.9)
+
+        with CosineLSHIndex(n_features=matrix.shape[1]) as index:
+            found = index.add_and_match(keys, matrix, 0.9)
+
+        found_pairs = {(int(a), int(b)): s for a, b, s in found}
+        assert set(found_pairs) == set(expected)
+        for pair, score in found_pairs.items():
+            assert score == pytest.approx(expected[pair], abs=1e-5)
+
+    def test_candidates_are_sparse(self):
+        """Unrelated documents rarely become candidates."""
+        matrix = _near_duplicate_matrix(n_groups=60)
+        n = matrix.shape[0]
+
+        with CosineLSHIndex(n_features=matrix.shape[1]) as index:
+            index.add([str(i) for i in range(n)], matrix)
+            candidates = index.candidate_pairs()
+
+        assert len(candidates) < n * (n - 1) // 2 // 10
+
+    def test_incremental_persistent_index(self, tmp_path):
+        """A reopened index matches new documents against old ones."""
+        matrix = _near_duplicate_matrix(n_groups=10)
+        db_path = tmp_path / "lsh.db"
+        old = list(range(0, matrix.shape[0], 3))
+        new = [i + 1 for i in old]
+
+        with CosineLSHIndex(n_features=matrix.shape[1], db_path=db_path) as index:
+            index.add([str(i) for i in old], matrix[old])
+
+        with CosineLSHIndex(n_features=matrix.shape[1], db_path=db_path) as index:
+            assert len(index) == len(old)
+            found = index.add_and_match([str(i) for i in new], matrix[new], 0.9)
+
+        assert {(int(a), int(b)) for a, b, _ in found} == set(zip(old, new))
+
+    def test_parameter_mismatch_rejected(self, tmp_path):
+        """Reopening with different parameters raises ValueError."""
+        db_path = tmp_path / "lsh.db"
+        CosineLSHIndex(n_features=10, db_path=db_path, fingerprint="v1").close()
+
+        with pytest.raises(ValueError, match="fingerprint"):
+            CosineLSHIndex(n_features=10, db_path=db_path, fingerprint="v2")
+
+    def test_readding_key_replaces(self):
+        """Adding an existing key replaces its vector."""
+        matrix = _near_duplicate_matrix(n_groups=2)
+        with CosineLSHIndex(n_features=matrix.shape[1]) as index:
+            index.add(["a", "b"], matrix[[0, 1]])
+            index.add(["a"], matrix[[4]])
+            assert len(index) == 2
+            results = index.query(matrix[4], 0.99)
+
+        assert [key for key, _ in results] == ["a"]
+
+    def test_candidate_chunks(self):
+        """Chunked candidates add up to the full sorted candidate list."""
+        matrix = _near_duplicate_matrix(n_groups=20)
+        with CosineLSHIndex(n_features=matrix.shape[1]) as index:
+            index.add([str(i) for i in range(matrix.shape[0])], matrix)
+            chunks = list(index.iter_candidate_pairs(chunk_size=7))
+            candidates = index.candidate_pairs()
+
+        assert all(len(chunk) <= 7 for chunk in chunks)
+        assert [pair for chunk in chunks for pair in chunk] == candidates
+        assert candidates == sorted(candidates)
+
+    def test_incremental_candidates_use_indexes(self):
+        """Incremental candidate generation searches indexes, never scans buckets."""
+        matrix = _near_duplicate_matrix(n_groups=5)
+        with CosineLSHIndex(n_features=matrix.shape[1]) as index:
+            index.add([str(i) for i in range(matrix.shape[0])], matrix)
+            plan = [
+                row[-1] for row in index._conn.execute(
+                    f"EXPLAIN QUERY PLAN {CosineLSHIndex.CANDIDATE_PAIRS_SQL}", (10,)
+                )
+            ]
+
+        assert not any(detail.startswith("SCAN") for detail in plan)
+        assert any("idx_lsh_buckets_doc" in detail for detail in plan)
+
+    def test_large_vocabulary_memory(self):
+        """Hyperplanes are not materialised for the whole feature space."""
+        n_features = 2 ** 20
+        rng = np.random.default_rng(3)
+        base = sp.random(1, n_features, density=0.0002, random_state=rng, dtype=np.float32)
+        matrix = sp.vstack([base, base * 2, sp.random(
+            1, n_features, density=0.0002, random_state=rng, dtype=np.float32
+        )]).tocsr()
+
+        tracemalloc.start()
+        try:
+            with CosineLSHIndex(n_features=n_features) as index:
+                found = index.add_and_match(["a", "b", "c"], matrix, 0.99)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        assert [(a, b) for a, b, _ in found] == [("a", "b")]
+        # A dense float32 plane matrix would need 1.6 GB here
+        assert peak < 50 * 1024 * 1024
+
+    def test_bit_agreement_tracks_angle(self):
+        """Signature bits disagree at roughly angle / pi."""
+        rng = np.random.default_rng(4)
+        base = rng.standard_normal(2000).astype(np.float32)
+        other = base + 0.8 * rng.standard_normal(2000).astype(np.float32)
+        matrix = normalize_rows(np.vstack([base, other]))
+        cosine = float(matrix[0] @ matrix[1])
+
+        with CosineLSHIndex(n_features=2000, n_bands=200, rows_per_band=16) as index:
+            keys = index.band_keys(matrix)
+
+        differing = sum(bin(int(a) ^ int(b)).count("1") for a, b in zip(*keys))
+        assert differing / (200 * 16) == pytest.approx(np.arccos(cosine) / np.pi, abs=0.03)
+
+    def test_candidate_probability(self):
+        """Candidate probability increases with similarity."""
+        low = CosineLSHIndex.candidate_probability(0.3, 32, 12)
+        high = CosineLSHIndex.candidate_probability(0.9, 32, 12)
+        assert low < 0.2
+        assert high > 0.99
+
+
+class TestApproximateAnalyzer:
+    """Test SemanticAnalyzer integration."""
+
+    def test_approx_matches_exact(self):
+        """LSH search reports the same neighbours as the exact search."""
+        matrix = _near_duplicate_matrix(n_groups=20, seed=5)
+        paths = [Path(f"doc{i}.txt") for i in range(matrix.shape[0])]
+        analyzer = SemanticAnalyzer(threshold=0.9)
+
+        exact = analyzer.find_similar_documents(matrix, paths)
+        approx = analyzer.find_similar_documents_approx(matrix, paths)
+
+        assert set(approx) == set(exact)
+        for path in paths:
+            assert [p for p, _ in approx[path]] == [p for p, _ in exact[path]]
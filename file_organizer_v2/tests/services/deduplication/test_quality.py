@@ -0,0 +1,86 @@
+"""
+Tests for ImageQualityAnalyzer.
+
+Tests that metrics are memoized per file fingerprint, refreshed when a
+file changes, and gathered in parallel for ranking.
+"""
+
+import os
+
+import pytest
+from PIL import Image
+
+from file_organizer.services.deduplication.quality import ImageFormat, ImageQualityAnalyzer
+
+
+@pytest.fixture
+def images(tmp_path):
+    """Images of different sizes and formats."""
+    paths = []
+    for name, size, mode in [
+        ("small.jpg", (40, 30), "RGB"),
+        ("large.png", (400, 300), "RGBA"),
+        ("medium.jpg", (200, 150), "RGB"),
+    ]:
+        path = tmp_path / name
+        Image.new(mode, size, color=(120, 80, 40, 255)[:len(mode)]).save(path)
+        paths.append(path)
+    return paths
+
+
+class TestQualityCaching:
+    """Test memoized metric extraction."""
+
+    def test_metrics_are_memoized(self, images, mocker):
+        """A second lookup does not reopen the image."""
+        analyzer = ImageQualityAnalyzer()
+        spy = mocker.spy(analyzer, "_extract_metrics_with_pil")
+
+        first = analyzer.get_quality_metrics(images[1])
+        analyzer.assess_quality(images[1])
+        analyzer.compare_quality(images[1], images[0])
+
+        assert spy.call_count == 2  # images[1] once, images[0] once
+        assert analyzer.get_quality_metrics(images[1]) is first
+
+    def test_changed_file_is_reanalyzed(self, images):
+        """Metrics are refreshed when the fingerprint changes."""
+        analyzer = ImageQualityAnalyzer()
+        path = images[0]
+        assert analyzer.get_quality_metrics(path).width == 40
+
+        Image.new("RGB", (80, 60)).save(path)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert analyzer.get_quality_metrics(path).width == 80
+
+    def test_cache_is_bounded(self, images):
+        """The least recently used entry is dropped beyond cache_size."""
+        analyzer = ImageQualityAnalyzer(cache_size=2)
+        for path in images:
+            analyzer.get_quality_metrics(path)
+        assert list(analyzer._cache) == [str(images[1]), str(images[2])]
+
+    def test_missing_file(self, tmp_path):
+        """Missing files produce no metrics and a zero score."""
+        analyzer = ImageQualityAnalyzer()
+        assert analyzer.get_quality_metrics(tmp_path / "missing.jpg") is None
+        assert analyzer.assess_quality(tmp_path / "missing.jpg") == 0.0
+
+
+class TestQualityRanking:
+    """Test group ranking on parallel metrics."""
+
+    @pytest.mark.parametrize("max_workers", [1, 4])
+    def test_ranking(self, images, max_workers):
+        """Images are ranked best first with consistent scores."""
+        analyzer = ImageQualityAnalyzer(max_workers=max_workers)
+        ranked = analyzer.get_ranked_images(images)
+
+        assert [path.name for path, _, _ in ranked] == ["large.png", "medium.jpg", "small.jpg"]
+        assert ranked[0][2].format == ImageFormat.PNG
+        assert ranked[0][2].has_transparency
+        for path, score, _ in ranked:
+            assert score == pytest.approx(analyzer.assess_quality(path))
+        assert analyzer.get_best_quality(images) == images[1]
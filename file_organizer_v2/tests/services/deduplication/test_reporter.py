@@ -0,0 +1,133 @@
+"""
+Tests for streaming duplicate reports.
+
+Tests that groups are written sorted by wasted space in each format, that
+the detector hands over groups during the scan, and that the summary is
+kept as running totals.
+"""
+
+import csv
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from file_organizer.services.deduplication.detector import DuplicateDetector, ScanOptions
+from file_organizer.services.deduplication.index import DuplicateGroup, FileMetadata
+from file_organizer.services.deduplication.reporter import DuplicateReportWriter, StorageReporter
+
+
+def _group(hash_value: str, size: int, count: int) -> DuplicateGroup:
+    """Duplicate group of ``count`` distinct files of ``size`` bytes."""
+    files = [
+        FileMetadata(f"/data/{hash_value}_{i}", size, 0, 0, hash_value, inode=i + 1, device=1)
+        for i in range(count)
+    ]
+    return DuplicateGroup(hash_value, files)
+
+
+GROUPS = [_group("small", 10, 3), _group("large", 1000, 2), _group("medium", 100, 4)]
+
+
+class TestReportWriter:
+    """Test report formats and ordering."""
+
+    def test_ndjson_sorted_by_wasted_space(self, tmp_path):
+        """Groups come out largest waste first, numbered in that order."""
+        path = tmp_path / "report.ndjson"
+        with DuplicateReportWriter(path, batch_size=2) as writer:
+            for group in GROUPS:
+                writer.write_group(group)
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [r["hash"] for r in records] == ["large", "medium", "small"]
+        assert [r["group_id"] for r in records] == [1, 2, 3]
+        assert [r["wasted_space"] for r in records] == [1000, 300, 20]
+        assert records[1]["files"][0] == {
+            "path": "/data/medium_0", "mtime_ns": 0, "inode": 1, "device": 1
+        }
+        assert list(tmp_path.iterdir()) == [path]  # spill file removed
+
+    def test_csv_one_row_per_file(self, tmp_path):
+        """CSV rows repeat group columns for every file."""
+        path = tmp_path / "report.csv"
+        with DuplicateReportWriter(path) as writer:
+            for group in GROUPS:
+                writer.write_group(group)
+
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 9
+        assert rows[0]["hash"] == "large"
+        assert rows[0]["path"] == "/data/large_0"
+        assert {r["group_id"] for r in rows if r["hash"] == "small"} == {"3"}
+
+    def test_unsorted_writes_immediately(self, tmp_path, monkeypatch):
+        """Without sorting, groups reach the output as they are added."""
+        stream = io.StringIO()
+        monkeypatch.setattr("sys.stdout", stream)
+        writer = DuplicateReportWriter("-", sort_by_wasted=False)
+        writer.write_group(GROUPS[0])
+
+        assert json.loads(stream.getvalue())["hash"] == "small"
+        writer.close()
+
+    def test_summary(self, tmp_path):
+        """The summary totals every group."""
+        with DuplicateReportWriter(tmp_path / "r.ndjson") as writer:
+            for group in GROUPS:
+                writer.write_group(group)
+
+        assert writer.summary.to_dict() == {
+            "groups": 3,
+            "files": 9,
+            "total_size": 30 + 2000 + 400,
+            "wasted_space": 1320,
+            "largest_group": 4,
+            "max_wasted": 1000,
+        }
+
+    def test_parquet(self, tmp_path):
+        """Parquet reports hold one row per file."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "report.parquet"
+        with DuplicateReportWriter(path, batch_size=2) as writer:
+            for group in GROUPS:
+                writer.write_group(group)
+
+        table = pq.read_table(path)
+        assert table.num_rows == 9
+        assert table.column("hash").to_pylist()[0] == "large"
+
+    def test_invalid_format(self, tmp_path):
+        """Unknown formats and Parquet on stdout are rejected."""
+        with pytest.raises(ValueError, match="Unsupported report format"):
+            DuplicateReportWriter(tmp_path / "r.txt", output_format="xml")
+        with pytest.raises(ValueError, match="standard output"):
+            DuplicateReportWriter("-", output_format="parquet")
+
+
+class TestScanReporting:
+    """Test detector integration."""
+
+    def test_groups_reported_during_scan(self, tmp_path):
+        """Every duplicate group is handed to the callback exactly once."""
+        for name, content in [("a", "xx"), ("b", "xx"), ("c", "yyyy"), ("d", "yyyy"), ("e", "zzz")]:
+            (tmp_path / name).write_text(content)
+
+        reported = []
+        detector = DuplicateDetector()
+        detector.scan_directory(tmp_path, ScanOptions(group_callback=reported.append))
+
+        assert sorted(g.hash_value for g in reported) == sorted(detector.get_duplicate_groups())
+        assert sorted(sorted(Path(f.path).name for f in g.files) for g in reported) == [
+            ["a", "b"], ["c", "d"]
+        ]
+
+    def test_reclamation_from_iterator(self):
+        """StorageReporter accepts a one-shot iterator of groups."""
+        groups = iter([{"count": 2, "total_size": 200}, {"count": 4, "total_size": 40}])
+        metrics = StorageReporter().calculate_reclamation(groups)
+        assert metrics["total_duplicate_groups"] == 2
+        assert metrics["recoverable_space"] == 130
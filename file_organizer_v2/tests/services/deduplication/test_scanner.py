@@ -0,0 +1,124 @@
+"""
+Tests for the scandir-based file scanner.
+
+Tests that compiled glob patterns agree with PurePath.match, that excluded
+subtrees are pruned without being listed, that each file is stat-ed once,
+and that DuplicateDetector runs on the streamed records.
+"""
+
+from pathlib import Path, PurePosixPath
+
+import pytest
+
+from file_organizer.services.deduplication import scanner
+from file_organizer.services.deduplication.detector import DuplicateDetector, ScanOptions
+from file_organizer.services.deduplication.scanner import compile_patterns, scan_files
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """A small tree with nested, hidden and excluded directories."""
+    files = {
+        "a.txt": "same",
+        "b.log": "same",
+        "docs/c.txt": "same",
+        "docs/deep/d.md": "other",
+        "node_modules/pkg/e.txt": "same",
+        ".git/objects/f": "same",
+        "empty.txt": "",
+    }
+    for rel, text in files.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return tmp_path
+
+
+def _names(root, **kwargs):
+    """Relative posix paths yielded by scan_files."""
+    return sorted(f.path.relative_to(root).as_posix() for f in scan_files(root, **kwargs))
+
+
+class TestPatterns:
+    """Test glob compilation."""
+
+    @pytest.mark.parametrize("pattern", ["*.txt", "c.*", "docs/*.txt", "d?cs/*", "[ab].*", "[!a]*.txt", "/x/*/c.txt"])
+    @pytest.mark.parametrize("path", ["/x/a.txt", "/x/b.log", "/x/docs/c.txt", "/x/y/docs/c.txt"])
+    def test_matches_purepath(self, pattern, path):
+        """Patterns without ** behave like PurePath.match."""
+        compiled = compile_patterns([pattern])
+        assert bool(compiled.search(path)) == PurePosixPath(path).match(pattern)
+
+    def test_double_star_spans_directories(self):
+        """A ** component matches zero or more directories."""
+        compiled = compile_patterns(["**/node_modules/**"])
+        assert compiled.search("/x/node_modules")
+        assert compiled.search("/x/a/b/node_modules/pkg/e.txt")
+        assert not compiled.search("/x/node_modules_backup/e.txt")
+
+    def test_no_patterns(self):
+        """Empty pattern lists compile to None."""
+        assert compile_patterns(None) is None
+        assert compile_patterns([]) is None
+
+
+class TestScanFiles:
+    """Test the directory walk."""
+
+    def test_finds_regular_files(self, tree):
+        """All regular files are streamed with their stat fields."""
+        records = {f.path.name: f for f in scan_files(tree)}
+        assert set(records) == {"a.txt", "b.log", "c.txt", "d.md", "e.txt", "f", "empty.txt"}
+
+        stat = (tree / "a.txt").stat()
+        record = records["a.txt"]
+        assert (record.size, record.mtime_ns, record.inode, record.device) == (
+            stat.st_size, stat.st_mtime_ns, stat.st_ino, stat.st_dev
+        )
+
+    def test_filters(self, tree):
+        """Include, exclude, size and recursion filters apply."""
+        assert _names(tree, include=["*.txt"], exclude=["node_modules", ".git"], min_size=1) == [
+            "a.txt", "docs/c.txt"
+        ]
+        assert _names(tree, recursive=False) == ["a.txt", "b.log", "empty.txt"]
+        assert _names(tree, max_size=0) == ["empty.txt"]
+
+    def test_excluded_directories_are_not_listed(self, tree, mocker):
+        """Pruned subtrees are never passed to scandir."""
+        spy = mocker.spy(scanner.os, "scandir")
+        _names(tree, exclude=["**/node_modules/**", ".git"])
+
+        listed = {Path(call.args[0]).relative_to(tree).as_posix() for call in spy.call_args_list}
+        assert listed == {".", "docs", "docs/deep"}
+
+    def test_symlinks(self, tree):
+        """Symlinks are skipped unless followed; directory cycles terminate."""
+        (tree / "link.txt").symlink_to(tree / "a.txt")
+        (tree / "docs" / "loop").symlink_to(tree, target_is_directory=True)
+
+        assert "link.txt" not in _names(tree)
+        followed = _names(tree, follow_symlinks=True)
+        assert "link.txt" in followed
+        assert "docs/loop/a.txt" not in followed
+
+
+class TestDetectorScan:
+    """Test DuplicateDetector on scanned records."""
+
+    def test_single_stat_per_file(self, tree, mocker):
+        """Grouping reuses the scan's stat results instead of re-stat-ing."""
+        options = ScanOptions(exclude_patterns=["node_modules"])
+        detector = DuplicateDetector()
+        path_stat = mocker.spy(Path, "stat")
+
+        size_groups = detector._group_by_size(detector._find_files(tree, options), options)
+
+        path_stat.assert_not_called()
+        assert sorted(len(files) for files in size_groups.values()) == [1, 1, 4]
+
+        detector.scan_directory(tree, options)
+        groups = detector.get_duplicate_groups()
+        assert len(groups) == 1
+        names = sorted(f.path.name for f in next(iter(groups.values())).files)
+        assert names == ["a.txt", "b.log", "c.txt", "f"]
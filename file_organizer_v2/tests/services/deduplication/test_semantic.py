@@ -0,0 +1,279 @@
+"""
+Tests for DocumentEmbedder and SemanticAnalyzer.
+
+Tests that sparse TF-IDF embeddings give the same answers as the dense
+path while staying sparse and float32.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from file_organizer.services.deduplication.embedder import (
+    DocumentEmbedder,
+    HashingDocumentEmbedder,
+    matrix_statistics,
+)
+from file_organizer.services.deduplication.semantic import SemanticAnalyzer
+
+DOCUMENTS = [
+    "quarterly revenue report for the finance department with budget forecasts",
+    "quarterly revenue report for the finance department with budget forecast",
+    "holiday photos from the beach trip with family and friends",
+    "beach trip holiday photos with friends and family",
+    "kubernetes deployment guide for container orchestration clusters",
+    "recipe for chocolate cake with vanilla frosting",
+]
+
+
+@pytest.fixture
+def embeddings():
+    """Sparse TF-IDF embeddings of the sample documents."""
+    return DocumentEmbedder(max_features=200).fit_transform(DOCUMENTS)
+
+
+@pytest.fixture
+def paths():
+    """Paths matching DOCUMENTS."""
+    return [Path(f"doc{i}.txt") for i in range(len(DOCUMENTS))]
+
+
+class TestSparseEmbeddings:
+    """Test embedder output format."""
+
+    def test_fit_transform_sparse_float32(self, embeddings):
+        """Embeddings stay sparse CSR with float32 values."""
+        assert sp.isspmatrix_csr(embeddings) or isinstance(embeddings, sp.csr_array)
+        assert embeddings.dtype == np.float32
+        assert embeddings.shape[0] == len(DOCUMENTS)
+
+    def test_matrix_statistics(self, embeddings):
+        """Density and memory statistics describe the sparse matrix."""
+        stats = matrix_statistics(embeddings)
+        n_docs, n_features = embeddings.shape
+        assert stats["nnz"] == embeddings.nnz
+        assert stats["density"] == pytest.approx(embeddings.nnz / (n_docs * n_features))
+        assert stats["dense_memory_bytes"] == n_docs * n_features * 4
+        assert stats["memory_bytes"] < stats["dense_memory_bytes"]
+
+    def test_last_matrix_stats_recorded(self):
+        """fit_transform records statistics of its output."""
+        embedder = DocumentEmbedder(max_features=200)
+        embedder.fit_transform(DOCUMENTS)
+        assert embedder.last_matrix_stats["n_documents"] == len(DOCUMENTS)
+
+    def test_top_terms_accepts_sparse_row(self, embeddings):
+        """Top terms work on a sparse row."""
+        embedder = DocumentEmbedder(max_features=200)
+        matrix = embedder.fit_transform(DOCUMENTS)
+        terms = embedder.get_top_terms(matrix[4], top_n=3)
+        assert len(terms) == 3
+        assert all(weight > 0 for _, weight in terms)
+
+
+class TestSparseSimilarity:
+    """Test that sparse and dense paths agree."""
+
+    def test_similarity_matrix_matches_dense(self, embeddings):
+        """Sparse similarity matrix equals the dense computation."""
+        analyzer = SemanticAnalyzer()
+        sparse_sim = analyzer.compute_similarity_matrix(embeddings)
+        dense_sim = analyzer.compute_similarity_matrix(embeddings.toarray())
+
+        assert sp.issparse(sparse_sim)
+        assert sparse_sim.dtype == np.float32
+        np.testing.assert_allclose(sparse_sim.toarray(), dense_sim, atol=1e-6)
+
+    def test_find_similar_documents_matches_dense(self, embeddings, paths):
+        """Similar pairs are identical for sparse and dense input."""
+        analyzer = SemanticAnalyzer(threshold=0.5)
+        sparse_result = analyzer.find_similar_documents(embeddings, paths)
+        dense_result = analyzer.find_similar_documents(embeddings.toarray(), paths)
+
+        assert {p: [q for q, _ in v] for p, v in sparse_result.items()} == {
+            p: [q for q, _ in v] for p, v in dense_result.items()
+        }
+        assert [q for q, _ in sparse_result[paths[0]]] == [paths[1]]
+        assert [q for q, _ in sparse_result[paths[2]]] == [paths[3]]
+
+    def test_find_similar_to_query(self, embeddings, paths):
+        """Query search works on sparse matrices and sparse queries."""
+        analyzer = SemanticAnalyzer(threshold=0.5)
+        results = analyzer.find_similar_to_query(embeddings[0], embeddings, paths)
+        assert [p for p, _ in results] == [paths[0], paths[1]]
+        assert results[0][1] == pytest.approx(1.0, abs=1e-6)
+
+    def test_compute_similarity_sparse_rows(self, embeddings):
+        """Pairwise similarity accepts sparse rows."""
+        analyzer = SemanticAnalyzer()
+        dense = embeddings.toarray()
+        assert analyzer.compute_similarity(embeddings[0], embeddings[1]) == pytest.approx(
+            analyzer.compute_similarity(dense[0], dense[1]), abs=1e-6
+        )
+
+    def test_statistics_match_dense(self, embeddings):
+        """Sparse statistics equal dense statistics."""
+        analyzer = SemanticAnalyzer(threshold=0.3)
+        sparse_stats = analyzer.get_statistics(analyzer.compute_similarity_matrix(embeddings))
+        dense_stats = analyzer.get_statistics(
+            analyzer.compute_similarity_matrix(embeddings.toarray())
+        )
+        for key, value in dense_stats.items():
+            assert sparse_stats[key] == pytest.approx(value, abs=1e-5), key
+
+
+class TestBlockedSimilarity:
+    """Test the tiled similarity engine."""
+
+    @pytest.mark.parametrize("block_size", [1, 2, 4, 1024])
+    @pytest.mark.parametrize("dense", [False, True])
+    def test_pairs_match_full_matrix(self, embeddings, block_size, dense):
+        """Tiled pairs equal the thresholded upper triangle of the full matrix."""
+        analyzer = SemanticAnalyzer(threshold=0.2)
+        matrix = embeddings.toarray() if dense else embeddings
+        full = np.asarray(analyzer.compute_similarity_matrix(embeddings).toarray())
+
+        pairs = list(analyzer.iter_similar_pairs(matrix, block_size=block_size))
+
+        expected = {
+            (i, j) for i in range(len(DOCUMENTS)) for j in range(i + 1, len(DOCUMENTS))
+            if full[i, j] >= 0.2
+        }
+        assert {(i, j) for i, j, _ in pairs} == expected
+        assert len(pairs) == len(expected)
+        for i, j, similarity in pairs:
+            assert similarity == pytest.approx(full[i, j], abs=1e-5)
+
+    @pytest.mark.parametrize("block_size", [1, 3, 1024])
+    def test_top_k_keeps_best_neighbours(self, block_size):
+        """Each document keeps only its top-k neighbours; pairs are not repeated."""
+        rng = np.random.default_rng(0)
+        matrix = rng.random((20, 8)).astype(np.float32)
+        analyzer = SemanticAnalyzer(threshold=0.0)
+        full = analyzer.compute_similarity_matrix(matrix)
+        np.fill_diagonal(full, -1)
+        top = {i: set(np.argsort(-full[i])[:2].tolist()) for i in range(20)}
+        expected = {
+            (min(i, j), max(i, j)) for i, neighbours in top.items() for j in neighbours
+        }
+
+        pairs = [
+            (i, j) for i, j, _ in
+            analyzer.iter_similar_pairs(matrix, block_size=block_size, top_k=2)
+        ]
+
+        assert len(pairs) == len(set(pairs))
+        assert set(pairs) == expected
+
+    def test_top_k_pending_is_evicted(self):
+        """Pairs waiting for their second row are dropped once that row is done."""
+        rng = np.random.default_rng(1)
+        matrix = rng.random((60, 8)).astype(np.float32)
+        analyzer = SemanticAnalyzer(threshold=0.0)
+        stream = analyzer.iter_similar_pairs(matrix, block_size=5, top_k=3)
+
+        for _ in stream:
+            state = stream.gi_frame.f_locals
+            # Only rows of the current or later blocks can still be waiting
+            assert all(row >= state["row_start"] for row in state["pending"])
+
+    def test_cluster_accepts_pair_stream(self, embeddings, paths):
+        """Clustering accepts streamed pairs directly."""
+        analyzer = SemanticAnalyzer(threshold=0.5)
+        stream = (
+            (paths[i], paths[j], s)
+            for i, j, s in analyzer.iter_similar_pairs(embeddings, block_size=2)
+        )
+        clusters = analyzer.cluster_by_similarity(stream)
+        assert sorted(sorted(c) for c in clusters) == [
+            [paths[0], paths[1]], [paths[2], paths[3]]
+        ]
+
+
+class TestDuplicateGroups:
+    """Test union-find based grouping."""
+
+    def test_groups_are_transitive(self, paths):
+        """A chain of similar documents forms one group regardless of order."""
+        analyzer = SemanticAnalyzer(threshold=0.5)
+        similar_docs = {
+            paths[0]: [(paths[1], 0.9)],
+            paths[1]: [(paths[0], 0.9), (paths[2], 0.6)],
+            paths[2]: [(paths[1], 0.6)],
+            paths[3]: [],
+        }
+        reversed_docs = dict(reversed(list(similar_docs.items())))
+
+        clusters = analyzer.cluster_by_similarity(similar_docs)
+        assert clusters == [[paths[0], paths[1], paths[2]]]
+        assert [sorted(c) for c in analyzer.cluster_by_similarity(reversed_docs)] == [
+            sorted(clusters[0])
+        ]
+
+    def test_group_metadata(self, tmp_path, embeddings):
+        """Groups report pair-averaged similarity and file sizes."""
+        files = []
+        for i in range(len(DOCUMENTS)):
+            path = tmp_path / f"doc{i}.txt"
+            path.write_text(DOCUMENTS[i])
+            files.append(path)
+
+        analyzer = SemanticAnalyzer(threshold=0.5)
+        groups = analyzer.get_duplicate_groups(embeddings, files)
+        full = analyzer.compute_similarity_matrix(embeddings).toarray()
+
+        assert [g['files'] for g in groups] == [
+            [str(files[0]), str(files[1])], [str(files[2]), str(files[3])]
+        ]
+        assert groups[0]['avg_similarity'] == pytest.approx(full[0, 1], abs=1e-5)
+        assert groups[1]['total_size'] == files[2].stat().st_size + files[3].stat().st_size
+
+
+class TestHashingEmbedder:
+    """Test the streaming hashing embedder."""
+
+    def test_matches_sklearn_pipeline(self):
+        """Embeddings equal HashingVectorizer + TfidfTransformer."""
+        from sklearn.feature_extraction.text import TfidfTransformer
+
+        embedder = HashingDocumentEmbedder(n_features=2 ** 12, batch_size=2)
+        streamed = embedder.fit_transform_stream(iter(DOCUMENTS))
+        reference = TfidfTransformer().fit_transform(embedder.count(DOCUMENTS))
+
+        assert streamed.dtype == np.float32
+        assert streamed.shape == (len(DOCUMENTS), 2 ** 12)
+        np.testing.assert_allclose(streamed.toarray(), reference.toarray(), atol=1e-6)
+
+    def test_partial_fit_is_incremental(self):
+        """Fitting in batches gives the same statistics as one pass."""
+        batched = HashingDocumentEmbedder(n_features=2 ** 12)
+        batched.partial_fit(DOCUMENTS[:2]).partial_fit(DOCUMENTS[2:])
+        single = HashingDocumentEmbedder(n_features=2 ** 12).partial_fit(DOCUMENTS)
+
+        assert batched.n_documents == len(DOCUMENTS)
+        np.testing.assert_array_equal(batched.document_frequency, single.document_frequency)
+        np.testing.assert_allclose(
+            batched.transform(DOCUMENTS).toarray(), single.transform(DOCUMENTS).toarray()
+        )
+
+    def test_state_round_trip(self, tmp_path):
+        """Saved statistics reload; mismatched parameters are refused."""
+        embedder = HashingDocumentEmbedder(n_features=2 ** 10).partial_fit(DOCUMENTS)
+        path = tmp_path / "state.npz"
+        embedder.save_state(path)
+
+        restored = HashingDocumentEmbedder(n_features=2 ** 10)
+        restored.load_state(path)
+        assert restored.n_documents == len(DOCUMENTS)
+        np.testing.assert_array_equal(restored.idf, embedder.idf)
+
+        with pytest.raises(ValueError, match="different hashing parameters"):
+            HashingDocumentEmbedder(n_features=2 ** 11).load_state(path)
+
+    def test_similar_documents_found(self, paths):
+        """Hashed embeddings find the same near-duplicates as TF-IDF."""
+        embeddings = HashingDocumentEmbedder().fit_transform_stream(DOCUMENTS)
+        result = SemanticAnalyzer(threshold=0.5).find_similar_documents(embeddings, paths)
+        assert [q for q, _ in result[paths[0]]] == [paths[1]]
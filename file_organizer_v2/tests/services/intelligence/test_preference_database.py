@@ -377,17 +377,17 @@ class TestConcurrency:
         """Test concurrent preference additions."""
         import threading
 
-        def add_prefs():
+        def add_prefs(worker):
             for i in range(10):
                 db_manager.add_preference(
                     "folder_mapping",
-                    f"key_{threading.get_ident()}_{i}",
+                    f"key_{worker}_{i}",
                     f"value_{i}",
                     0.5
                 )
 
-        # Create multiple threads
-        threads = [threading.Thread(target=add_prefs) for _ in range(3)]
+        # Create multiple threads (thread idents can be reused, so key by worker)
+        threads = [threading.Thread(target=add_prefs, args=(n,)) for n in range(3)]
 
         # Start all threads
         for t in threads:
@@ -418,3 +418,53 @@ class TestContextManager:
             pref = manager.get_preference("folder_mapping", "key1")
             assert pref is not None
             assert pref['value'] == "value1"
+
+
+class TestReaderPool:
+    """Test pooled reader connections."""
+
+    def test_reads_do_not_wait_for_writer(self, temp_db):
+        """Reads run on pooled connections while the writer lock is held."""
+        import threading
+
+        manager = PreferenceDatabaseManager(db_path=temp_db, pool_size=2)
+        manager.initialize()
+        manager.add_preference("folder_mapping", "docs", "Documents")
+
+        result = {}
+
+        def read():
+            result["pref"] = manager.get_preference("folder_mapping", "docs")
+
+        with manager._lock:
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(timeout=5)
+            assert not reader.is_alive()
+
+        assert result["pref"]["value"] == "Documents"
+        manager.close()
+
+    def test_transaction_reads_own_writes(self, temp_db):
+        """Inside a transaction, reads see its uncommitted changes."""
+        manager = PreferenceDatabaseManager(db_path=temp_db)
+        manager.initialize()
+
+        with manager.transaction() as conn:
+            conn.execute(
+                "INSERT INTO preferences (preference_type, key, value, created_at, updated_at) "
+                "VALUES ('folder_mapping', 'tmp', 'Temp', 'now', 'now')"
+            )
+            assert manager.get_preference("folder_mapping", "tmp") is not None
+
+        manager.close()
+
+    def test_pool_disabled(self, temp_db):
+        """A pool size of 0 reads through the writer connection."""
+        manager = PreferenceDatabaseManager(db_path=temp_db, pool_size=0)
+        manager.initialize()
+        manager.add_preference("folder_mapping", "docs", "Documents")
+
+        assert manager._pool is None
+        assert manager.get_preference("folder_mapping", "docs")["value"] == "Documents"
+        manager.close()
@@ -302,6 +302,109 @@ class TestRollbackExecutor(unittest.TestCase):
         self.assertFalse(result.success)
         self.assertGreater(result.operations_failed, 0)
 
+    def _move(self, op_id, source, destination):
+        """Move a file and return the matching operation."""
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(source), str(destination))
+        return Operation(
+            id=op_id,
+            operation_type=OperationType.MOVE,
+            timestamp=datetime.utcnow(),
+            source_path=source,
+            destination_path=destination,
+            transaction_id="txn1",
+            status=OperationStatus.COMPLETED
+        )
+
+    def test_plan_independent_operations(self):
+        """Operations on unrelated paths form a single wave."""
+        operations = []
+        for i in range(5):
+            source = self.test_dir / f"in{i}.txt"
+            source.write_text(str(i))
+            operations.append(self._move(i + 1, source, self.test_dir / "out" / f"in{i}.txt"))
+
+        waves = self.executor.plan_rollback(operations)
+
+        self.assertEqual(len(waves), 1)
+        self.assertEqual([op.id for op in waves[0]], [5, 4, 3, 2, 1])
+
+    def test_plan_orders_dependent_operations(self):
+        """Chains on one path and moves under a moved directory are ordered."""
+        a, b, c = (self.test_dir / name for name in ("a.txt", "b.txt", "c.txt"))
+        folder = self.test_dir / "folder"
+        renamed = self.test_dir / "renamed"
+        folder.mkdir()
+        a.write_text("a")
+        self.source_file.write_text("other")
+
+        operations = [
+            self._move(1, a, b),
+            self._move(2, b, c),
+            self._move(3, self.source_file, folder / "source.txt"),
+            self._move(4, folder, renamed),
+        ]
+
+        waves = self.executor.plan_rollback(operations)
+
+        self.assertEqual([[op.id for op in wave] for wave in waves], [[4, 2], [3, 1]])
+
+    def test_rollback_transaction_chains(self):
+        """Dependent operations are validated and undone in order."""
+        a, b, c = (self.test_dir / name for name in ("a.txt", "b.txt", "c.txt"))
+        folder = self.test_dir / "folder"
+        renamed = self.test_dir / "renamed"
+        folder.mkdir()
+        a.write_text("a")
+
+        operations = [
+            self._move(1, a, b),
+            self._move(2, b, c),
+            self._move(3, self.source_file, folder / "source.txt"),
+            self._move(4, folder, renamed),
+        ]
+
+        # Given newest first, as UndoManager fetches them
+        result = self.executor.rollback_transaction("txn1", list(reversed(operations)))
+
+        self.assertTrue(result.success, result.errors)
+        self.assertEqual(sorted(result.rolled_back_ids), [1, 2, 3, 4])
+        self.assertEqual(a.read_text(), "a")
+        self.assertEqual(self.source_file.read_text(), "test content")
+        self.assertFalse(renamed.exists())
+
+    def test_rollback_transaction_parallel(self):
+        """Many independent moves are undone on a thread pool."""
+        executor = RollbackExecutor(validator=self.validator, max_workers=4)
+        operations = []
+        for i in range(40):
+            source = self.test_dir / "in" / f"{i}.txt"
+            source.parent.mkdir(exist_ok=True)
+            source.write_text(str(i))
+            operations.append(self._move(i + 1, source, self.test_dir / "out" / f"{i}.txt"))
+
+        result = executor.rollback_transaction("txn1", operations)
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.operations_rolled_back, 40)
+        self.assertEqual(len(list((self.test_dir / "in").iterdir())), 40)
+
+    def test_rollback_transaction_validates_first(self):
+        """A conflict in the first wave leaves every file in place."""
+        operations = []
+        for i in range(3):
+            source = self.test_dir / f"in{i}.txt"
+            source.write_text(str(i))
+            operations.append(self._move(i + 1, source, self.test_dir / f"out{i}.txt"))
+        (self.test_dir / "in1.txt").write_text("occupied")
+
+        result = self.executor.rollback_transaction("txn1", operations)
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.operations_rolled_back, 0)
+        self.assertEqual([op_id for op_id, _ in result.errors], [2])
+        self.assertTrue(all((self.test_dir / f"out{i}.txt").exists() for i in range(3)))
+
 
 if __name__ == '__main__':
     unittest.main()
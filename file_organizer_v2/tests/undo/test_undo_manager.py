@@ -123,6 +123,11 @@ class TestUndoManager(unittest.TestCase):
         self.assertTrue(file2.exists())
         self.assertFalse(dest2.exists())
 
+        # Undone operations are marked, so the transaction is not undone twice
+        operations = self.history.get_operations(transaction_id=txn_id)
+        self.assertTrue(all(op.status == OperationStatus.ROLLED_BACK for op in operations))
+        self.assertFalse(self.manager.undo_transaction(txn_id))
+
     def test_redo_last_operation(self):
         """Test redoing the last rolled back operation."""
         # Log and undo operation
@@ -4,13 +4,18 @@ Unit tests for OperationValidator.
 Tests validation logic for undo/redo operations.
 """
 
+import hashlib
+import os
 import shutil
 import tempfile
 import unittest
 from datetime import datetime
 from pathlib import Path
+from unittest import mock
 
-from file_organizer.history.models import Operation, OperationStatus, OperationType
+from file_organizer.history.models import (
+    Operation, OperationStatus, OperationType, file_fingerprint
+)
 from file_organizer.undo.models import ConflictType
 from file_organizer.undo.validator import OperationValidator
 
@@ -243,6 +248,76 @@ class TestOperationValidator(unittest.TestCase):
 
         self.assertFalse(result)
 
+    def test_file_hash_cache(self):
+        """Unchanged files are hashed once; modified files are re-hashed."""
+        self.source_file.write_bytes(b"first")
+        first_hash = hashlib.sha256(b"first").hexdigest()
+        with mock.patch("file_organizer.undo.validator.open", create=True, wraps=open) as opened:
+            self.assertTrue(self.validator.check_file_integrity(self.source_file, first_hash))
+            self.assertTrue(self.validator.check_file_integrity(self.source_file, first_hash))
+        self.assertEqual(opened.call_count, 1)
+
+        self.source_file.write_bytes(b"second, longer")
+        self.assertFalse(self.validator.check_file_integrity(self.source_file, first_hash))
+
+    def _fingerprinted(self, content):
+        """Write content to the source file and return its hash and fingerprint."""
+        self.source_file.write_bytes(content)
+        return hashlib.sha256(content).hexdigest(), file_fingerprint(os.stat(self.source_file))
+
+    def test_integrity_fast_path(self):
+        """A matching fingerprint skips hashing; a different size fails without hashing."""
+        file_hash, fingerprint = self._fingerprinted(b"original")
+        with mock.patch.object(self.validator, "compute_file_hash") as compute:
+            self.assertTrue(self.validator.check_file_integrity(self.source_file, file_hash, fingerprint))
+            self.source_file.write_bytes(b"changed, longer")
+            self.assertFalse(self.validator.check_file_integrity(self.source_file, file_hash, fingerprint))
+        compute.assert_not_called()
+
+    def test_integrity_falls_back_to_hash(self):
+        """A touched file with the same size is hashed to decide."""
+        file_hash, fingerprint = self._fingerprinted(b"original")
+        st = os.stat(self.source_file)
+        os.utime(self.source_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertTrue(self.validator.check_file_integrity(self.source_file, file_hash, fingerprint))
+
+        # Same size and restored mtime, different content: only a hash can tell
+        self.source_file.write_bytes(b"ORIGINAL")
+        os.utime(self.source_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+        strict = OperationValidator(trash_dir=self.trash_dir, strict=True)
+        self.assertTrue(self.validator.check_file_integrity(self.source_file, file_hash, fingerprint))
+        self.assertFalse(strict.check_file_integrity(self.source_file, file_hash, fingerprint))
+
+    def test_integrity_inode_mismatch(self):
+        """A different inode on the same device forces a hash."""
+        file_hash, fingerprint = self._fingerprinted(b"original")
+        fingerprint["inode"] += 1
+        self.source_file.write_bytes(b"ORIGINAL")
+        st = os.stat(self.source_file)
+        fingerprint["mtime_ns"] = st.st_mtime_ns
+
+        self.assertFalse(self.validator.check_file_integrity(self.source_file, file_hash, fingerprint))
+
+    def test_validate_undo_batch(self):
+        """Batch validation returns one result per operation, in order."""
+        operations = []
+        for i in range(6):
+            dest = self.test_dir / f"moved{i}.txt"
+            if i % 2 == 0:
+                dest.write_text(f"content {i}")
+            operations.append(Operation(
+                id=i,
+                operation_type=OperationType.MOVE,
+                timestamp=datetime.utcnow(),
+                source_path=self.test_dir / f"orig{i}.txt",
+                destination_path=dest,
+                status=OperationStatus.COMPLETED
+            ))
+
+        results = self.validator.validate_undo_batch(operations, max_workers=3)
+
+        self.assertEqual([r.can_proceed for r in results], [True, False] * 3)
+
     def test_check_path_exists(self):
         """Test path existence check."""
         self.assertTrue(self.validator.check_path_exists(self.source_file))
@@ -0,0 +1,104 @@
+"""
+Tests for the SQLite reader connection pool.
+
+Tests that readers are created lazily up to the pool size, reused, read
+concurrently with an open write transaction, and reopen after close.
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from file_organizer.utils.sqlite_pool import SQLiteConnectionPool, create_pool
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A WAL database with one row."""
+    path = tmp_path / "pool.db"
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE items (value INTEGER)")
+    conn.execute("INSERT INTO items VALUES (1)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+class TestSQLiteConnectionPool:
+    """Test reader checkout and configuration."""
+
+    def test_reuses_connections(self, db_path):
+        """Sequential reads share one connection."""
+        pool = SQLiteConnectionPool(db_path, size=3)
+        for _ in range(5):
+            with pool.reader() as conn:
+                assert conn.execute("SELECT value FROM items").fetchone()["value"] == 1
+        assert pool.connection_count == 1
+        pool.close()
+
+    def test_size_limits_connections(self, db_path):
+        """Concurrent readers beyond the pool size wait for a connection."""
+        pool = SQLiteConnectionPool(db_path, size=2)
+        barrier = threading.Barrier(2)
+
+        def read():
+            with pool.reader() as conn:
+                conn.execute("SELECT value FROM items").fetchall()
+                try:
+                    barrier.wait(timeout=0.5)
+                except threading.BrokenBarrierError:
+                    pass
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert pool.connection_count == 2
+        pool.close()
+
+    def test_reads_during_write_transaction(self, db_path):
+        """Readers see the last commit while a write transaction is open."""
+        writer = sqlite3.connect(db_path)
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("INSERT INTO items VALUES (2)")
+
+        pool = SQLiteConnectionPool(db_path, size=1)
+        with pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+
+        writer.commit()
+        with pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 2
+        writer.close()
+        pool.close()
+
+    def test_readers_are_read_only_and_configured(self, db_path):
+        """Reader connections reject writes and carry the pragmas."""
+        pool = SQLiteConnectionPool(db_path, size=1, cache_size_kb=4096)
+        with pool.reader() as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -4096
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO items VALUES (3)")
+        pool.close()
+
+    def test_reopens_after_close(self, db_path):
+        """Reads after close open fresh connections."""
+        pool = SQLiteConnectionPool(db_path, size=1)
+        with pool.reader():
+            pass
+        pool.close()
+
+        with pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+        pool.close()
+
+    def test_create_pool(self, db_path):
+        """Pooling is off for size 0 and in-memory databases."""
+        assert create_pool(db_path, 0) is None
+        assert create_pool(":memory:", 4) is None
+        assert create_pool(db_path, 2).size == 2